@@ -42,8 +42,9 @@ app.add_middleware(
 # Classes pour les services partagés
 class Services:
     lnd_client = DataSourceFactory.get_lnd_client()
+    async_lnd_client = DataSourceFactory.get_async_lnd_client()
     lnrouter_client = DataSourceFactory.get_lnrouter_client()
-    metrics_collector = MetricsCollector(lnd_client=lnd_client)
+    metrics_collector = MetricsCollector(lnd_client=async_lnd_client)
     node_aggregator = NodeAggregator(lnd_client=lnd_client, lnrouter_client=lnrouter_client)
     visualization_exporter = VisualizationExporter(
         metrics_collector=metrics_collector, 
@@ -53,12 +54,17 @@ class Services:
 
 services = Services()
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Ferme les connexions partagées (LND, HTTP, MongoDB) à l'arrêt de l'API"""
+    await DataSourceFactory.shutdown()
+
 # Routes pour le nœud
 @app.get("/api/v1/node/info", tags=["Nœud"])
 async def get_node_info():
     """Récupère les informations du nœud local"""
     try:
-        return services.lnd_client.get_node_info()
+        return await services.async_lnd_client.get_node_info()
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des informations du nœud: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -84,7 +90,7 @@ async def list_channels(
         data_source = DataSourceFactory.get_data_source(source)
         
         # Récupérer les informations du nœud local
-        node_info = services.lnd_client.get_node_info()
+        node_info = await services.async_lnd_client.get_node_info()
         pubkey = node_info.get("pubkey")
         
         # Récupérer les canaux depuis la source de données
@@ -128,7 +134,7 @@ async def get_forwarding_history(
         end_time = int(datetime.now().timestamp())
         start_time = end_time - hours * 3600
         
-        return services.lnd_client.get_forwarding_history(
+        return await services.async_lnd_client.get_forwarding_history(
             start_time=start_time,
             end_time=end_time,
             limit=limit
@@ -250,6 +256,29 @@ async def create_daily_snapshot():
         logger.error(f"Erreur lors de la création du snapshot: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/v1/metrics/trends", tags=["Métriques"])
+async def get_metrics_trends(
+    metrics: str = Query(..., description="Métriques séparées par des virgules (alias ou chemins, ex: node_metrics.total_capacity)"),
+    days: int = Query(30, description="Nombre de jours d'historique"),
+    bucket_seconds: int = Query(None, description="Taille d'un point en secondes (par défaut : au plus max_points points)"),
+    aggregation: str = Query("avg", description="Agrégation par point (avg, min, max, sum, first, last)"),
+    max_points: int = Query(500, description="Nombre maximal de points")
+):
+    """Récupère les séries historiques de plusieurs métriques"""
+    try:
+        return await services.metrics_collector.query_trends(
+            [metric.strip() for metric in metrics.split(",") if metric.strip()],
+            days=days,
+            bucket_seconds=bucket_seconds,
+            aggregation=aggregation,
+            max_points=max_points
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération des tendances: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Route pour les rapports
 @app.get("/api/v1/reports/{report_type}", tags=["Rapports"])
 async def generate_report(
@@ -286,7 +315,7 @@ async def get_node_status():
     
     # Vérifier l'état du nœud LND
     try:
-        node_info = services.lnd_client.get_node_info()
+        node_info = await services.async_lnd_client.get_node_info()
         status["node"] = {
             "status": "ok",
             "alias": node_info.get("alias"),
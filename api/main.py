@@ -8,6 +8,7 @@ from api.health import router as health_router
 from api.routes import router as api_router
 from api.umbrel_ui import router as umbrel_ui_router
 from services.health_check_manager import HealthCheckManager
+from services.http_client import get_http_client_manager
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +43,13 @@ async def startup_event():
     
     # Initialiser la factory de sources de données avec le health check
     await DataSourceFactory.initialize()
+    
+    # Clients HTTP partagés, fermés par DataSourceFactory.shutdown()
+    http_stats = get_http_client_manager().get_stats()
+    logger.info(
+        f"Clients HTTP: HTTP/2 {'activé' if http_stats['http2'] else 'désactivé'}, "
+        f"{http_stats['max_connections']} connexions max par hôte"
+    )
 
 @app.on_event("shutdown")
 async def shutdown_event():
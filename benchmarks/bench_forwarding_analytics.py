@@ -0,0 +1,155 @@
+"""Benchmark des agrégations de forwarding : boucles Python vs ForwardingAnalytics
+
+Sur un historique synthétique, compare :
+
+- liste de dictionnaires (get_forwarding_history, API REST) : l'ancienne
+  boucle par événement de MetricsCollector / FeusteyService au noyau
+  vectorisé (conversion en colonnes comprise) ;
+- lots colonnaires (iter_forwarding_batches) : l'ancien cumul par lot
+  (np.unique + bincount, un appel par canal entrant et sortant) au noyau,
+  sur les mêmes agrégats puis avec les paires de canaux, les intervalles
+  horaires et les percentiles du taux de frais.
+
+Usage:
+    python benchmarks/bench_forwarding_analytics.py --events 1000000 --channels 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_metrics_aggregation import make_events
+from services.forwarding_analytics import ForwardingAnalytics
+
+
+def python_loop(events):
+    """Ancienne agrégation par événement (totaux, entrées, sorties, activité)"""
+    channels_in, channels_out, activity = {}, {}, {}
+    for event in events:
+        entry = channels_in.setdefault(event["chan_id_in"], {"count": 0, "amount": 0, "fees": 0})
+        entry["count"] += 1
+        entry["amount"] += event["amt_in"]
+        entry["fees"] += event["fee"]
+        entry = channels_out.setdefault(event["chan_id_out"], {"count": 0, "amount": 0})
+        entry["count"] += 1
+        entry["amount"] += event["amt_out"]
+        activity[event["chan_id_in"]] = activity.get(event["chan_id_in"], 0) + 1
+        activity[event["chan_id_out"]] = activity.get(event["chan_id_out"], 0) + 1
+    total_amount = sum(event["amt_out"] for event in events)
+    total_fees = sum(event["fee"] for event in events)
+    return total_amount, total_fees, channels_in, channels_out, activity
+
+
+def accumulate_by_key(stats, keys, **columns):
+    """Ancien cumul par lot de VisualizationExporter"""
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse)
+    sums = {
+        name: np.bincount(inverse, weights=values, minlength=len(unique_keys))
+        for name, values in columns.items()
+    }
+    for i, key in enumerate(unique_keys.tolist()):
+        entry = stats.setdefault(key, {"count": 0, **{name: 0 for name in columns}})
+        entry["count"] += int(counts[i])
+        for name in columns:
+            entry[name] += int(sums[name][i])
+
+
+def make_batches(events, batch_size):
+    """Lots colonnaires au format de LNDClient.iter_forwarding_batches"""
+    columns = {
+        "timestamp": np.array([event["timestamp_ns"] // 10**9 for event in events], dtype=np.int64),
+        "chan_id_in": np.array([int(event["chan_id_in"]) for event in events], dtype=np.uint64),
+        "chan_id_out": np.array([int(event["chan_id_out"]) for event in events], dtype=np.uint64),
+        **{
+            name: np.array([event[name] for event in events], dtype=np.int64)
+            for name in ("amt_in", "amt_out", "fee")
+        }
+    }
+    return [
+        {name: values[i:i + batch_size] for name, values in columns.items()}
+        for i in range(0, len(events), batch_size)
+    ]
+
+
+async def stream(batches):
+    for batch in batches:
+        yield batch
+
+
+def kernel(analytics):
+    analytics.channels_in()
+    analytics.channels_out()
+    analytics.channel_activity()
+    return analytics
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--channels", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    events = make_events(args.events, args.channels, int(time.time()))
+    batches = make_batches(events, args.batch_size)
+
+    # Même résultat des deux côtés
+    analytics = kernel(ForwardingAnalytics.from_events(events))
+    _, _, channels_in, channels_out, _ = python_loop(events)
+    assert analytics.channels_in() == channels_in and analytics.channels_out() == channels_out
+
+    results = [
+        ("dictionnaires : boucle Python", best_of(lambda: python_loop(events), args.repeat)),
+        ("dictionnaires : ForwardingAnalytics",
+         best_of(lambda: kernel(ForwardingAnalytics.from_events(events)), args.repeat)),
+    ]
+
+    def old_batches():
+        stats_in, stats_out = {}, {}
+        for batch in batches:
+            accumulate_by_key(stats_in, batch["chan_id_in"], amount=batch["amt_in"], fees=batch["fee"])
+            accumulate_by_key(stats_out, batch["chan_id_out"], amount=batch["amt_out"])
+
+    def new_batches_in_out():
+        kernel(asyncio.run(ForwardingAnalytics.from_batches(stream(batches))))
+
+    def new_batches():
+        analytics = asyncio.run(ForwardingAnalytics.from_batches(
+            stream(batches), bucket_seconds=3600, pairs=True, fee_rates=True
+        ))
+        kernel(analytics)
+        analytics.pair_flows()
+        analytics.time_buckets()
+        analytics.fee_rate_percentiles()
+
+    results += [
+        ("lots : cumul par lot (entrées/sorties)", best_of(old_batches, args.repeat)),
+        ("lots : ForwardingAnalytics (entrées/sorties)", best_of(new_batches_in_out, args.repeat)),
+        ("lots : ForwardingAnalytics (tout)", best_of(new_batches, args.repeat)),
+    ]
+
+    print(f"{args.events} événements, {args.channels} canaux (meilleur de {args.repeat})")
+    for label, elapsed in results:
+        print(f"  {label:<42} {elapsed * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark du chargement du cache du graphe : JSON vs cache binaire mappé
+
+Génère un graphe synthétique de la taille du réseau Lightning public,
+l'écrit dans l'ancien format (document JSON unique) et dans le cache
+binaire, puis mesure le temps d'ouverture de chacun jusqu'à obtenir un
+graphe exploitable (dictionnaires pour JSON, GraphStore pour le binaire).
+
+Usage:
+    python benchmarks/bench_graph_cache.py --nodes 15000 --channels 80000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from services.graph_cache import read_graph_cache, write_graph_cache
+from services.graph_store import GraphStore
+
+
+def make_graph(n_nodes: int, n_channels: int, seed: int = 42) -> dict:
+    rng = np.random.default_rng(seed)
+    pubkeys = ["02" + os.urandom(32).hex() for _ in range(n_nodes)]
+    ends = rng.integers(0, n_nodes, size=(n_channels, 2))
+
+    def policy():
+        return {
+            "time_lock_delta": 40, "min_htlc": 1000,
+            "fee_base_msat": int(rng.integers(0, 2000)),
+            "fee_rate_milli_msat": int(rng.integers(0, 3000)),
+            "disabled": bool(rng.random() < 0.05),
+            "max_htlc_msat": 990000000
+        }
+
+    return {
+        "nodes": [
+            {"pub_key": pubkey, "alias": f"node-{i}", "color": "#3399ff", "last_update": 1700000000}
+            for i, pubkey in enumerate(pubkeys)
+        ],
+        "channels": [
+            {
+                "channel_id": str(800000 << 40 | i),
+                "node1_pub": pubkeys[a], "node2_pub": pubkeys[b],
+                "capacity": int(rng.integers(20000, 10000000)),
+                "node1_policy": policy(), "node2_policy": policy()
+            }
+            for i, (a, b) in enumerate(ends.tolist())
+        ]
+    }
+
+
+def timed(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=15000)
+    parser.add_argument("--channels", type=int, default=80000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    graph = make_graph(args.nodes, args.channels)
+    store = GraphStore.from_graph_data(graph)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "graph.json")
+        bin_path = os.path.join(tmp, "graph.bin")
+        with open(json_path, "w") as f:
+            json.dump({"timestamp": "2024-01-01T00:00:00", "graph": graph}, f)
+        write_graph_cache(store, bin_path)
+
+        def load_json():
+            with open(json_path) as f:
+                json.load(f)
+
+        json_elapsed = timed(load_json, args.repeat)
+        json_store_elapsed = json_elapsed + timed(
+            lambda: GraphStore.from_graph_data(graph), args.repeat
+        )
+        bin_elapsed = timed(lambda: read_graph_cache(bin_path), args.repeat)
+        sizes = (os.path.getsize(json_path), os.path.getsize(bin_path))
+
+    print(f"Graphe: {args.nodes} nœuds, {args.channels} canaux")
+    print(f"  JSON              {json_elapsed * 1000:8.1f} ms  {sizes[0] / 1e6:6.1f} Mo")
+    print(f"  JSON + GraphStore {json_store_elapsed * 1000:8.1f} ms")
+    print(f"  Binaire (mmap)    {bin_elapsed * 1000:8.1f} ms  {sizes[1] / 1e6:6.1f} Mo")
+    print(f"  Gain: x{json_store_elapsed / bin_elapsed:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Benchmark des appels HTTP : client éphémère par requête vs clients partagés
+
+Un serveur HTTPS local (certificat autosigné généré pour l'occasion) joue
+le rôle des API MCP / LNRouter / Feustey. Compare la latence des requêtes
+faites comme avant (un httpx.AsyncClient ouvert et fermé à chaque appel :
+connexion TCP et poignée de main TLS à chaque fois) à celle des clients
+partagés de services.http_client (connexions conservées), en séquence puis
+par rafales concurrentes comme lors de l'enrichissement des pairs.
+
+Usage:
+    python benchmarks/bench_http_client.py --requests 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import json
+import os
+import ssl
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from services.http_client import HTTPClientManager
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # En-têtes et corps dans un même segment TCP (pas d'attente d'ACK retardé)
+    wbufsize = 65536
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        body = json.dumps({"pub_key": self.path.rsplit("/", 1)[-1], "alias": "node"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def make_certificate(directory: str):
+    """Certificat autosigné pour localhost ; retourne (certificat, clé)"""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([
+            x509.DNSName("localhost"), x509.IPAddress(ipaddress.ip_address("127.0.0.1"))
+        ]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ))
+    return cert_path, key_path
+
+
+def start_server(cert_path: str, key_path: str) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.connections = 0
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def ephemeral_request(url: str, verify: ssl.SSLContext):
+    """Ancien _make_request : un client par appel"""
+    async with httpx.AsyncClient(verify=verify) as client:
+        response = await client.get(url, timeout=60.0)
+        response.raise_for_status()
+        return response.json()
+
+
+async def shared_request(manager: HTTPClientManager, url: str):
+    response = await manager.get_client(url).get(url)
+    response.raise_for_status()
+    return response.json()
+
+
+async def measure(request, urls, concurrency: int):
+    """Latences (ms) de chaque requête, par rafales de concurrency requêtes"""
+    latencies = []
+
+    async def timed(url):
+        start = time.perf_counter()
+        await request(url)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    for i in range(0, len(urls), concurrency):
+        await asyncio.gather(*(timed(url) for url in urls[i:i + concurrency]))
+    return latencies, time.perf_counter() - started
+
+
+def describe(latencies, elapsed):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return (f"p50 {statistics.median(latencies):7.2f} ms  p99 {p99:7.2f} ms  "
+            f"total {elapsed * 1000:8.1f} ms")
+
+
+async def run(base_url: str, server, cert_path: str, args):
+    urls = [f"{base_url}/nodes/{i:066x}" for i in range(args.requests)]
+    verify = ssl.create_default_context(cafile=cert_path)
+    manager = HTTPClientManager(http2=True)
+    # Les clients partagés font confiance au certificat via SSL_CERT_FILE
+    os.environ["SSL_CERT_FILE"] = cert_path
+
+    print(f"{args.requests} requêtes HTTPS locales (HTTP/2 côté client: {manager.http2}, "
+          f"serveur HTTP/1.1)")
+    for concurrency in (1, args.concurrency):
+        for label, request in (
+            ("client par requête", lambda url: ephemeral_request(url, verify)),
+            ("clients partagés", lambda url: shared_request(manager, url)),
+        ):
+            server.connections = 0
+            latencies, elapsed = await measure(request, urls, concurrency)
+            print(f"  concurrence {concurrency:>3} | {label:<20} {describe(latencies, elapsed)}"
+                  f"  connexions {server.connections}")
+    await manager.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path, key_path = make_certificate(directory)
+        server = start_server(cert_path, key_path)
+        try:
+            asyncio.run(run(f"https://localhost:{server.server_address[1]}", server, cert_path, args))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark du débit concurrent LNDClient (bloquant) vs AsyncLNDClient (grpc.aio)
+
+Un faux serveur Lightning gRPC local répond à GetInfo après un délai fixe
+(simulant un nœud LND chargé). On lance N handlers asyncio concurrents,
+comme le ferait uvicorn avec N requêtes simultanées :
+
+- client synchrone : chaque appel bloque la boucle, les requêtes sont
+  donc traitées en série ;
+- client asynchrone : les appels sont multiplexés sur le canal grpc.aio.
+
+Usage:
+    python benchmarks/bench_lnd_client.py --requests 200 --delay 0.02
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent import futures
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+# Le code généré importe lightning_pb2 en absolu
+sys.path.insert(0, os.path.join(ROOT, 'proto'))
+
+import grpc
+from grpc import aio
+
+from proto import lightning_pb2 as ln
+from proto import lightning_pb2_grpc as lnrpc
+from services.lnd_client import LNDClient
+from services.async_lnd_client import AsyncLNDClient
+
+
+class FakeLightning(lnrpc.LightningServicer):
+    """Faux service Lightning qui répond après un délai fixe"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def GetInfo(self, request, context):
+        time.sleep(self.delay)
+        return ln.GetInfoResponse(
+            identity_pubkey="02" + "ab" * 32,
+            alias="bench",
+            block_height=800000,
+            synced_to_chain=True
+        )
+
+
+def start_server(delay: float, workers: int):
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=workers))
+    lnrpc.add_LightningServicer_to_server(FakeLightning(delay), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    return server, f"127.0.0.1:{port}"
+
+
+async def run_sync(address: str, n_requests: int) -> float:
+    client = LNDClient(cert_path="-", macaroon_path="-", grpc_host=address)
+    client._channel = grpc.insecure_channel(address)
+    client._stub = lnrpc.LightningStub(client._channel)
+
+    async def handler():
+        # Même schéma que les handlers FastAPI actuels : appel bloquant
+        return client.stub.GetInfo(ln.GetInfoRequest())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(n_requests)))
+    elapsed = time.perf_counter() - start
+    client._channel.close()
+    return elapsed
+
+
+async def run_async(address: str, n_requests: int) -> float:
+    client = AsyncLNDClient(cert_path="-", macaroon_path="-", grpc_host=address)
+    channel = aio.insecure_channel(address)
+    client._channel = channel
+    client._stub = lnrpc.LightningStub(channel)
+
+    async def handler():
+        return await client.stub.GetInfo(ln.GetInfoRequest())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(n_requests)))
+    elapsed = time.perf_counter() - start
+    await client.close()
+    # close() ne ferme pas le canal : il a été ouvert par le benchmark
+    await channel.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.02,
+                        help="Latence simulée de LND par appel (secondes)")
+    parser.add_argument("--workers", type=int, default=64)
+    args = parser.parse_args()
+
+    server, address = start_server(args.delay, args.workers)
+    try:
+        sync_elapsed = asyncio.run(run_sync(address, args.requests))
+        async_elapsed = asyncio.run(run_async(address, args.requests))
+    finally:
+        server.stop(None)
+
+    print(f"{args.requests} requêtes concurrentes, latence LND {args.delay * 1000:.0f} ms")
+    for name, elapsed in (("LNDClient", sync_elapsed), ("AsyncLNDClient", async_elapsed)):
+        print(f"  {name:<15} {elapsed:7.3f} s  {args.requests / elapsed:9.1f} req/s")
+    print(f"  Gain: x{sync_elapsed / async_elapsed:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Benchmark des agrégations de forwarding : fichier SQLite local vs pipeline MongoDB
+
+Une année d'événements de forwarding synthétiques est écrite dans chaque
+stockage (par lots, agrégats compris), puis les requêtes utilisées par le
+collecteur et les exports sont chronométrées :
+
+- summarize_forwards sur 24 h, 30 jours et un an (totaux et détail par canal) ;
+- get_forwarding_rollups journaliers, par intervalle et par canal, sur un an ;
+- rebuild_forwarding_rollups (recalcul complet des agrégats).
+
+MongoDB est optionnel : sans serveur joignable, seul SQLite est mesuré.
+La base MongoDB indiquée est supprimée à la fin.
+
+Usage:
+    python benchmarks/bench_metrics_aggregation.py --events 1000000 --url mongodb://localhost:27017/daznode_bench
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from services.sqlite_metrics_storage import SQLiteMetricsStorage
+
+YEAR = 365 * 86400
+
+
+def make_events(n_events: int, n_channels: int, end: int, seed: int = 42) -> list:
+    """Événements synthétiques répartis sur l'année précédant end, triés par date"""
+    rng = np.random.default_rng(seed)
+    timestamps_ns = np.sort(rng.integers((end - YEAR) * 10**9, end * 10**9, n_events))
+    chan_in = rng.integers(0, n_channels, n_events)
+    chan_out = (chan_in + rng.integers(1, n_channels, n_events)) % n_channels
+    amounts = rng.integers(1_000, 5_000_000, n_events)
+    fees = amounts // 1000 + 1
+    return [
+        {
+            "timestamp_ns": int(timestamps_ns[i]),
+            "chan_id_in": str(800000 * 10**6 + int(chan_in[i])),
+            "chan_id_out": str(800000 * 10**6 + int(chan_out[i])),
+            "amt_in": int(amounts[i] + fees[i]), "amt_out": int(amounts[i]), "fee": int(fees[i]),
+            "offset_index": i + 1
+        }
+        for i in range(n_events)
+    ]
+
+
+async def timed(coroutine_factory, repeat: int) -> float:
+    """Meilleur temps (secondes) sur repeat exécutions"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await coroutine_factory()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def run(storage, events: list, end: int, batch_size: int, repeat: int) -> dict:
+    await storage.ensure_indexes()
+    results = {}
+
+    start = time.perf_counter()
+    for i in range(0, len(events), batch_size):
+        await storage.write_forwarding_events([dict(event) for event in events[i:i + batch_size]])
+    results["écriture (agrégats compris)"] = time.perf_counter() - start
+
+    for label, seconds in (("24 h", 86400), ("30 jours", 30 * 86400), ("1 an", YEAR)):
+        results[f"summarize_forwards {label}"] = await timed(
+            lambda: storage.summarize_forwards(end - seconds, end), repeat
+        )
+    for group_by in ("bucket_start", "channel_id"):
+        results[f"rollups jour / {group_by}"] = await timed(
+            lambda: storage.get_forwarding_rollups("day", end - YEAR, end, group_by), repeat
+        )
+    results["rebuild_forwarding_rollups"] = await timed(storage.rebuild_forwarding_rollups, 1)
+    return results
+
+
+def connect_mongo(url: str):
+    """Stockage MongoDB si le serveur répond, sinon None"""
+    try:
+        from pymongo import MongoClient
+        from pymongo.errors import PyMongoError
+        from services.metrics_storage import MongoMetricsStorage
+    except ImportError as e:
+        print(f"MongoDB ignoré: {e}")
+        return None, None
+
+    admin = MongoClient(url, serverSelectionTimeoutMS=3000)
+    try:
+        admin.admin.command("ping")
+    except PyMongoError as e:
+        print(f"MongoDB indisponible ({url}), seul SQLite est mesuré: {e}")
+        admin.close()
+        return None, None
+    admin.drop_database(admin.get_default_database().name)
+    return admin, MongoMetricsStorage(url)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=500_000,
+                        help="Nombre d'événements de forwarding sur un an")
+    parser.add_argument("--channels", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--url", default="mongodb://localhost:27017/daznode_bench")
+    args = parser.parse_args()
+
+    end = int(time.time())
+    events = make_events(args.events, args.channels, end)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        storage = SQLiteMetricsStorage(os.path.join(directory, "metrics.db"))
+        results["sqlite"] = asyncio.run(run(storage, events, end, args.batch_size, args.repeat))
+        print(f"Fichier SQLite: {storage.get_stats()['size_bytes'] / 2**20:.1f} Mo")
+        storage.close()
+
+    admin, mongo = connect_mongo(args.url)
+    if mongo is not None:
+        try:
+            results["mongodb"] = asyncio.run(run(mongo, events, end, args.batch_size, args.repeat))
+        finally:
+            mongo.close()
+            admin.drop_database(admin.get_default_database().name)
+            admin.close()
+
+    backends = list(results)
+    print(f"{args.events} événements sur un an, {args.channels} canaux (meilleur de {args.repeat})")
+    print(f"  {'opération':<34}" + "".join(f"{backend:>12}" for backend in backends))
+    for operation in results["sqlite"]:
+        print(f"  {operation:<34}" + "".join(
+            f"{results[backend][operation] * 1000:10.1f}ms" for backend in backends
+        ))
+
+
+if __name__ == "__main__":
+    main()
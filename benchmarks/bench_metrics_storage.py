@@ -0,0 +1,147 @@
+"""Benchmark de la latence de l'API pendant l'écriture d'un snapshot : pymongo vs motor
+
+Une application FastAPI minimale est interrogée en continu (requêtes
+séquentielles via ASGI, comme un client qui sonde l'API) pendant que des
+snapshots de la taille d'un nœud réel sont écrits dans MongoDB :
+
+- pymongo : insert_one synchrone dans la coroutine (ancien MetricsCollector),
+  la boucle d'événements est bloquée pendant chaque aller-retour ;
+- motor : MongoMetricsStorage.insert_snapshot, la boucle continue de servir
+  les requêtes pendant l'écriture.
+
+Nécessite un serveur MongoDB ; la base indiquée est vidée à la fin.
+
+Usage:
+    python benchmarks/bench_metrics_storage.py --url mongodb://localhost:27017/daznode_bench
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from services.metrics_storage import MongoMetricsStorage
+
+
+def make_snapshot(index: int, n_channels: int) -> dict:
+    """Snapshot synthétique au format de MetricsCollector.create_daily_snapshot"""
+    timestamp = (datetime(2024, 1, 1) + timedelta(seconds=index)).isoformat()
+    return {
+        "timestamp": timestamp,
+        "node_metrics": {"total_capacity": 10**9, "num_active_channels": n_channels},
+        "channel_metrics": [
+            {
+                "timestamp": timestamp, "channel_id": str(800000 * 10**6 + i),
+                "remote_pubkey": "02" + f"{i:064x}", "capacity": 5_000_000,
+                "local_balance": 2_500_000, "remote_balance": 2_500_000,
+                "local_ratio": 0.5, "balance_score": 1.0, "active": True
+            }
+            for i in range(n_channels)
+        ],
+        "forwarding_metrics": {
+            "channels_in": {str(i): {"count": 10, "amount": 10**6, "fees": 100} for i in range(n_channels)},
+            "channels_out": {str(i): {"count": 10, "amount": 10**6} for i in range(n_channels)}
+        }
+    }
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/health")
+    async def health():
+        return {"status": "ok"}
+
+    return app
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> list:
+    """Interroge l'API en boucle et retourne les latences (secondes)"""
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/api/v1/health")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def run(mode: str, url: str, snapshots: list, interval: float) -> list:
+    sync_client = MongoClient(url) if mode == "pymongo" else None
+    storage = MongoMetricsStorage(url) if mode == "motor" else None
+
+    async def write():
+        for snapshot in snapshots:
+            if mode == "pymongo":
+                sync_client.get_default_database()["daily_snapshots"].insert_one(dict(snapshot))
+            elif mode == "motor":
+                await storage.insert_snapshot(snapshot)
+            else:
+                await asyncio.sleep(0.05)
+            await asyncio.sleep(0)
+
+    stop = asyncio.Event()
+    transport = httpx.ASGITransport(app=make_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        probe_task = asyncio.create_task(probe(client, stop, interval))
+        await asyncio.sleep(0.2)
+        await write()
+        stop.set()
+        latencies = await probe_task
+
+    if sync_client is not None:
+        sync_client.close()
+    if storage is not None:
+        storage.close()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="mongodb://localhost:27017/daznode_bench")
+    parser.add_argument("--snapshots", type=int, default=20)
+    parser.add_argument("--channels", type=int, default=500,
+                        help="Nombre de canaux par snapshot (taille du document)")
+    parser.add_argument("--interval", type=float, default=0.001,
+                        help="Pause entre deux requêtes de la sonde (secondes)")
+    args = parser.parse_args()
+
+    admin = MongoClient(args.url, serverSelectionTimeoutMS=3000)
+    try:
+        admin.admin.command("ping")
+    except PyMongoError as e:
+        sys.exit(f"MongoDB indisponible ({args.url}): {e}")
+
+    database = admin.get_default_database()
+    results = {}
+    try:
+        for run_index, mode in enumerate(("aucune écriture", "pymongo", "motor")):
+            database["daily_snapshots"].drop()
+            snapshots = [
+                make_snapshot(run_index * args.snapshots + i, args.channels)
+                for i in range(args.snapshots)
+            ]
+            results[mode] = np.array(asyncio.run(run(mode, args.url, snapshots, args.interval)))
+    finally:
+        admin.drop_database(database.name)
+        admin.close()
+
+    print(f"{args.snapshots} snapshots de {args.channels} canaux, latence de l'API pendant l'écriture")
+    for mode, latencies in results.items():
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        print(f"  {mode:<16} {len(latencies):6d} requêtes  p50 {p50:7.2f} ms  "
+              f"p99 {p99:7.2f} ms  max {latencies.max() * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
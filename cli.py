@@ -262,6 +262,16 @@ def collect_metrics(daily, export):
     
     asyncio.run(run())
 
+@metrics.command('schedule')
+@click.option('--interval-hours', type=int, help="Intervalle entre deux snapshots complets (heures)")
+def schedule_metrics(interval_hours):
+    """Lance la collecte planifiée des métriques (balances, forwards, contexte réseau, snapshots)"""
+    console.print("[bold green]Collecte planifiée démarrée[/bold green] (Ctrl+C pour arrêter)")
+    try:
+        asyncio.run(metrics_collector.run_periodic_collection(interval_hours))
+    except KeyboardInterrupt:
+        console.print("[yellow]Collecte planifiée arrêtée[/yellow]")
+
 # Groupe de commandes liées aux visualisations
 @cli.group()
 def viz():
@@ -42,11 +42,51 @@ class Settings(BaseSettings):
     # LNROUTER API CONFIGURATION
     LNROUTER_API_URL: str = "https://lnrouter.app/api/v1"
     LNROUTER_API_KEY: Optional[str] = None
+    # Analyse de topologie du graphe (calcul en arrière-plan)
+    TOPOLOGY_BETWEENNESS_SAMPLES: int = 256
+    TOPOLOGY_SEED: int = 42
+    TOPOLOGY_WORKERS: int = 0  # 0 = tous les cœurs
+    TOPOLOGY_REFRESH_INTERVAL: int = 600  # secondes
+    # Montant de référence des routes précalculées depuis NODE_PUBKEY
+    SELF_ROUTES_AMOUNT_SATS: int = 100000
+    
+    # CLIENTS HTTP (MCP, LNRouter, Feustey) : un pool de connexions par hôte
+    HTTP_CLIENT_HTTP2: bool = True  # nécessite le paquet h2 (httpx[http2])
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 20
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: float = 30.0  # secondes
+    HTTP_CLIENT_TIMEOUT: float = 60.0  # secondes
+    HTTP_CLIENT_CONNECT_TIMEOUT: float = 10.0  # secondes
+    # Cache des réponses des API externes (LNRouter, MCP)
+    API_CACHE_MAXSIZE: int = 4096
+    API_CACHE_TTL_SECONDS: float = 300.0
+    LNROUTER_KEY_NODES_CACHE_TTL_SECONDS: float = 3600.0
+    # Récupérations groupées et pagination des API externes (MCP)
+    API_BULK_CHUNK_SIZE: int = 50  # identifiants par lot
+    API_BULK_CONCURRENCY: int = 10  # requêtes simultanées
+    API_PAGE_SIZE: int = 100  # éléments par page
+    # Cache en lecture devant les sources de données (DataSourceFactory)
+    DATA_SOURCE_CACHE_ENABLED: bool = True
+    DATA_SOURCE_CACHE_MAXSIZE: int = 1024  # entrées par méthode
+    DATA_SOURCE_CACHE_NEGATIVE_TTL_SECONDS: float = 60.0  # nœuds et canaux introuvables
+    DATA_SOURCE_CACHE_CHANNEL_EVENTS: bool = True  # invalidation sur événements de canal LND
+    # Enrichissement des pairs par lots (NodeAggregator.get_enriched_nodes)
+    NODE_ENRICHMENT_CONCURRENCY: int = 10  # nœuds enrichis simultanément
+    NODE_ENRICHMENT_TIMEOUT_SECONDS: float = 10.0  # par nœud
+    NODE_ENRICHMENT_CACHE_TTL_SECONDS: float = 300.0
     
     # LND NODE CONFIGURATION
     LND_GRPC_HOST: str = "localhost:10009"
     LND_TLS_CERT_PATH: Optional[str] = None
     LND_MACAROON_PATH: Optional[str] = None
+    # Canaux gRPC partagés : keepalive, reconnexion et taille des messages
+    LND_KEEPALIVE_TIME_MS: int = 30000
+    LND_KEEPALIVE_TIMEOUT_MS: int = 10000
+    LND_MAX_MESSAGE_LENGTH: int = 200 * 1024 * 1024  # DescribeGraph dépasse 4 Mo
+    LND_RECONNECT_BACKOFF_MS: int = 1000
+    LND_MAX_RECONNECT_BACKOFF_MS: int = 60000
+    # Graphe réseau tenu à jour via DescribeGraph + SubscribeChannelGraph
+    GRAPH_SYNC_ENABLED: bool = False
     
     # AMBOSS API CONFIGURATION
     AMBOSS_API_URL: str = "https://api.amboss.space/graphql"
@@ -57,6 +97,13 @@ class Settings(BaseSettings):
 
     # DATABASE
     DATABASE_URL: Optional[str] = None
+    # Pool de connexions MongoDB (motor), partagé par tous les collecteurs
+    DATABASE_POOL_SIZE: int = 20
+    DATABASE_MIN_POOL_SIZE: int = 2
+    DATABASE_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    DATABASE_CONNECT_TIMEOUT_MS: int = 5000
+    DATABASE_SOCKET_TIMEOUT_MS: int = 30000
+    DATABASE_RETRY_WRITES: bool = True
     
     # Alby Configuration
     ALBY_PUBLIC_KEY: Optional[str] = None
@@ -81,6 +128,26 @@ class Settings(BaseSettings):
     # METRICS COLLECTION
     METRICS_COLLECTION_INTERVAL_HOURS: int = 24
     METRICS_HISTORY_DAYS: int = 90
+    METRICS_LOCAL_DB_PATH: str = "data/metrics.db"  # stockage SQLite si DATABASE_URL n'est pas défini
+    METRICS_FORWARDING_BATCH_SIZE: int = 10000  # événements par page LND et par bulk_write
+    CHANNEL_BALANCE_SAMPLE_INTERVAL: int = 300  # secondes minimum entre deux points de balance
+    SNAPSHOT_SOURCE_TIMEOUT: float = 30.0  # délai maximal par source lors d'un snapshot
+    METRICS_BALANCE_INTERVAL_SECONDS: int = 60  # échantillonnage planifié des balances
+    METRICS_FORWARDING_INTERVAL_SECONDS: int = 300  # ingestion planifiée des forwards
+    METRICS_NETWORK_CONTEXT_INTERVAL_SECONDS: int = 3600  # contexte réseau (MCP, LNRouter)
+    METRICS_SCHEDULER_JITTER: float = 0.1  # gigue maximale, en fraction de l'intervalle
+
+    # RÉTENTION DES MÉTRIQUES (jours, 0 : sans limite)
+    METRICS_FORWARDING_RETENTION_DAYS: int = 30  # événements bruts (les agrégats restent)
+    METRICS_HOURLY_ROLLUP_RETENTION_DAYS: int = 90
+    METRICS_DAILY_ROLLUP_RETENTION_DAYS: int = 730  # agrégats hebdomadaires sans limite
+    METRICS_BALANCE_RAW_RETENTION_DAYS: int = 7  # puis un point par heure
+    METRICS_BALANCE_HOURLY_RETENTION_DAYS: int = 90  # puis un point par jour
+    METRICS_BALANCE_RETENTION_DAYS: int = 730
+    METRICS_SNAPSHOT_RETENTION_DAYS: int = 730  # compactés au-delà de METRICS_HISTORY_DAYS
+    METRICS_RETENTION_BATCH_SIZE: int = 5000  # documents par lot
+    METRICS_RETENTION_MAX_BATCHES: int = 100  # lots par étape et par exécution
+    METRICS_RETENTION_INTERVAL_SECONDS: int = 3600
 
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True, extra="ignore")
 
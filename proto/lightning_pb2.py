@@ -13,13 +13,29 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0flightning.proto\x12\x05lnrpc\"\x10\n\x0eGetInfoRequest\"\x8a\x02\n\x0fGetInfoResponse\x12\x17\n\x0fidentity_pubkey\x18\x01 \x01(\t\x12\r\n\x05\x61lias\x18\x02 \x01(\t\x12\x14\n\x0c\x62lock_height\x18\x03 \x01(\r\x12\x17\n\x0fsynced_to_chain\x18\x04 \x01(\x08\x12\x17\n\x0fsynced_to_graph\x18\x05 \x01(\x08\x12\x1b\n\x13num_active_channels\x18\x06 \x01(\r\x12\x1d\n\x15num_inactive_channels\x18\x07 \x01(\r\x12\x1c\n\x14num_pending_channels\x18\x08 \x01(\r\x12\x0f\n\x07version\x18\t \x01(\t\x12\x0e\n\x06\x63hains\x18\n \x03(\t\x12\x0c\n\x04uris\x18\x0b \x03(\t\"A\n\x13ListChannelsRequest\x12\x13\n\x0b\x61\x63tive_only\x18\x01 \x01(\x08\x12\x15\n\rinactive_only\x18\x02 \x01(\x08\"8\n\x14ListChannelsResponse\x12 \n\x08\x63hannels\x18\x01 \x03(\x0b\x32\x0e.lnrpc.Channel\"\xc9\x03\n\x07\x43hannel\x12\x12\n\nchannel_id\x18\x01 \x01(\x04\x12\x15\n\rremote_pubkey\x18\x02 \x01(\t\x12\x10\n\x08\x63\x61pacity\x18\x03 \x01(\x03\x12\x15\n\rlocal_balance\x18\x04 \x01(\x03\x12\x16\n\x0eremote_balance\x18\x05 \x01(\x03\x12\x19\n\x11unsettled_balance\x18\x06 \x01(\x03\x12\x0e\n\x06\x61\x63tive\x18\x07 \x01(\x08\x12\x0f\n\x07private\x18\x08 \x01(\x08\x12\x11\n\tinitiator\x18\t \x01(\x08\x12\x1b\n\x13total_satoshis_sent\x18\n \x01(\x03\x12\x1f\n\x17total_satoshis_received\x18\x0b \x01(\x03\x12\x13\n\x0bnum_updates\x18\x0c \x01(\r\x12\x12\n\ncommit_fee\x18\r \x01(\x03\x12\x15\n\rcommit_weight\x18\x0e \x01(\x03\x12\x12\n\nfee_per_kw\x18\x0f \x01(\x03\x12\x19\n\x11\x63han_status_flags\x18\x10 \x01(\t\x12\x1e\n\x16local_chan_reserve_sat\x18\x11 \x01(\x03\x12\x1f\n\x17remote_chan_reserve_sat\x18\x12 \x01(\x03\x12\x15\n\rchannel_point\x18\x13 \x01(\t\"O\n\x18\x46orwardingHistoryRequest\x12\x12\n\nstart_time\x18\x01 \x01(\x04\x12\x10\n\x08\x65nd_time\x18\x02 \x01(\x04\x12\r\n\x05limit\x18\x03 \x01(\r\"N\n\x19\x46orwardingHistoryResponse\x12\x31\n\x11\x66orwarding_events\x18\x01 \x03(\x0b\x32\x16.lnrpc.ForwardingEvent\"\x8d\x01\n\x0f\x46orwardingEvent\x12\x11\n\ttimestamp\x18\x01 \x01(\x04\x12\x12\n\nchan_id_in\x18\x02 \x01(\x04\x12\x13\n\x0b\x63han_id_out\x18\x03 \x01(\x04\x12\x0e\n\x06\x61mt_in\x18\x04 \x01(\x03\x12\x0f\n\x07\x61mt_out\x18\x05 \x01(\x03\x12\x0b\n\x03\x66\x65\x65\x18\x06 \x01(\x03\x12\x10\n\x08\x66\x65\x65_msat\x18\x07 \x01(\x03\x32\xec\x01\n\tLightning\x12:\n\x07GetInfo\x12\x15.lnrpc.GetInfoRequest\x1a\x16.lnrpc.GetInfoResponse\"\x00\x12I\n\x0cListChannels\x12\x1a.lnrpc.ListChannelsRequest\x1a\x1b.lnrpc.ListChannelsResponse\"\x00\x12X\n\x11\x46orwardingHistory\x12\x1f.lnrpc.ForwardingHistoryRequest\x1a .lnrpc.ForwardingHistoryResponse\"\x00\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0flightning.proto\x12\x05lnrpc\"\x10\n\x0eGetInfoRequest\"\x8a\x02\n\x0fGetInfoResponse\x12\x17\n\x0fidentity_pubkey\x18\x01 \x01(\t\x12\r\n\x05\x61lias\x18\x02 \x01(\t\x12\x14\n\x0c\x62lock_height\x18\x03 \x01(\r\x12\x17\n\x0fsynced_to_chain\x18\x04 \x01(\x08\x12\x17\n\x0fsynced_to_graph\x18\x05 \x01(\x08\x12\x1b\n\x13num_active_channels\x18\x06 \x01(\r\x12\x1d\n\x15num_inactive_channels\x18\x07 \x01(\r\x12\x1c\n\x14num_pending_channels\x18\x08 \x01(\r\x12\x0f\n\x07version\x18\t \x01(\t\x12\x0e\n\x06\x63hains\x18\n \x03(\t\x12\x0c\n\x04uris\x18\x0b \x03(\t\"A\n\x13ListChannelsRequest\x12\x13\n\x0b\x61\x63tive_only\x18\x01 \x01(\x08\x12\x15\n\rinactive_only\x18\x02 \x01(\x08\"8\n\x14ListChannelsResponse\x12 \n\x08\x63hannels\x18\x01 \x03(\x0b\x32\x0e.lnrpc.Channel\"\xc9\x03\n\x07\x43hannel\x12\x12\n\nchannel_id\x18\x01 \x01(\x04\x12\x15\n\rremote_pubkey\x18\x02 \x01(\t\x12\x10\n\x08\x63\x61pacity\x18\x03 \x01(\x03\x12\x15\n\rlocal_balance\x18\x04 \x01(\x03\x12\x16\n\x0eremote_balance\x18\x05 \x01(\x03\x12\x19\n\x11unsettled_balance\x18\x06 \x01(\x03\x12\x0e\n\x06\x61\x63tive\x18\x07 \x01(\x08\x12\x0f\n\x07private\x18\x08 \x01(\x08\x12\x11\n\tinitiator\x18\t \x01(\x08\x12\x1b\n\x13total_satoshis_sent\x18\n \x01(\x03\x12\x1f\n\x17total_satoshis_received\x18\x0b \x01(\x03\x12\x13\n\x0bnum_updates\x18\x0c \x01(\r\x12\x12\n\ncommit_fee\x18\r \x01(\x03\x12\x15\n\rcommit_weight\x18\x0e \x01(\x03\x12\x12\n\nfee_per_kw\x18\x0f \x01(\x03\x12\x19\n\x11\x63han_status_flags\x18\x10 \x01(\t\x12\x1e\n\x16local_chan_reserve_sat\x18\x11 \x01(\x03\x12\x1f\n\x17remote_chan_reserve_sat\x18\x12 \x01(\x03\x12\x15\n\rchannel_point\x18\x13 \x01(\t\"\x89\x01\n\x18\x46orwardingHistoryRequest\x12\x12\n\nstart_time\x18\x01 \x01(\x04\x12\x10\n\x08\x65nd_time\x18\x02 \x01(\x04\x12\x14\n\x0cindex_offset\x18\x03 \x01(\r\x12\x16\n\x0enum_max_events\x18\x04 \x01(\r\x12\x19\n\x11peer_alias_lookup\x18\x05 \x01(\x08\"i\n\x19\x46orwardingHistoryResponse\x12\x31\n\x11\x66orwarding_events\x18\x01 \x03(\x0b\x32\x16.lnrpc.ForwardingEvent\x12\x19\n\x11last_offset_index\x18\x02 \x01(\r\"\xd2\x01\n\x0f\x46orwardingEvent\x12\x15\n\ttimestamp\x18\x01 \x01(\x04\x42\x02\x18\x01\x12\x12\n\nchan_id_in\x18\x02 \x01(\x04\x12\x13\n\x0b\x63han_id_out\x18\x04 \x01(\x04\x12\x0e\n\x06\x61mt_in\x18\x05 \x01(\x04\x12\x0f\n\x07\x61mt_out\x18\x06 \x01(\x04\x12\x0b\n\x03\x66\x65\x65\x18\x07 \x01(\x04\x12\x10\n\x08\x66\x65\x65_msat\x18\x08 \x01(\x04\x12\x13\n\x0b\x61mt_in_msat\x18\t \x01(\x04\x12\x14\n\x0c\x61mt_out_msat\x18\n \x01(\x04\x12\x14\n\x0ctimestamp_ns\x18\x0b \x01(\x04\"n\n\x0c\x43hannelPoint\x12\x1c\n\x12\x66unding_txid_bytes\x18\x01 \x01(\x0cH\x00\x12\x1a\n\x10\x66unding_txid_str\x18\x02 \x01(\tH\x00\x12\x14\n\x0coutput_index\x18\x03 \x01(\rB\x0e\n\x0c\x66unding_txid\"N\n\x13\x43hannelGraphRequest\x12\x1b\n\x13include_unannounced\x18\x01 \x01(\x08\x12\x1a\n\x12include_auth_proof\x18\x02 \x01(\x08\"V\n\x0c\x43hannelGraph\x12#\n\x05nodes\x18\x01 \x03(\x0b\x32\x14.lnrpc.LightningNode\x12!\n\x05\x65\x64ges\x18\x02 \x03(\x0b\x32\x12.lnrpc.ChannelEdge\",\n\x0bNodeAddress\x12\x0f\n\x07network\x18\x01 \x01(\t\x12\x0c\n\x04\x61\x64\x64r\x18\x02 \x01(\t\"z\n\rLightningNode\x12\x13\n\x0blast_update\x18\x01 \x01(\r\x12\x0f\n\x07pub_key\x18\x02 \x01(\t\x12\r\n\x05\x61lias\x18\x03 \x01(\t\x12%\n\taddresses\x18\x04 \x03(\x0b\x32\x12.lnrpc.NodeAddress\x12\r\n\x05\x63olor\x18\x05 \x01(\t\"\xac\x01\n\rRoutingPolicy\x12\x17\n\x0ftime_lock_delta\x18\x01 \x01(\r\x12\x10\n\x08min_htlc\x18\x02 \x01(\x03\x12\x15\n\rfee_base_msat\x18\x03 \x01(\x03\x12\x1b\n\x13\x66\x65\x65_rate_milli_msat\x18\x04 \x01(\x03\x12\x10\n\x08\x64isabled\x18\x05 \x01(\x08\x12\x15\n\rmax_htlc_msat\x18\x06 \x01(\x04\x12\x13\n\x0blast_update\x18\x07 \x01(\r\"\xde\x01\n\x0b\x43hannelEdge\x12\x12\n\nchannel_id\x18\x01 \x01(\x04\x12\x12\n\nchan_point\x18\x02 \x01(\t\x12\x17\n\x0blast_update\x18\x03 \x01(\rB\x02\x18\x01\x12\x11\n\tnode1_pub\x18\x04 \x01(\t\x12\x11\n\tnode2_pub\x18\x05 \x01(\t\x12\x10\n\x08\x63\x61pacity\x18\x06 \x01(\x03\x12*\n\x0cnode1_policy\x18\x07 \x01(\x0b\x32\x14.lnrpc.RoutingPolicy\x12*\n\x0cnode2_policy\x18\x08 \x01(\x0b\x32\x14.lnrpc.RoutingPolicy\"\x1b\n\x19GraphTopologySubscription\"\xa3\x01\n\x13GraphTopologyUpdate\x12\'\n\x0cnode_updates\x18\x01 \x03(\x0b\x32\x11.lnrpc.NodeUpdate\x12\x31\n\x0f\x63hannel_updates\x18\x02 \x03(\x0b\x32\x18.lnrpc.ChannelEdgeUpdate\x12\x30\n\x0c\x63losed_chans\x18\x03 \x03(\x0b\x32\x1a.lnrpc.ClosedChannelUpdate\"l\n\nNodeUpdate\x12\x14\n\x0cidentity_key\x18\x02 \x01(\t\x12\r\n\x05\x61lias\x18\x04 \x01(\t\x12\r\n\x05\x63olor\x18\x05 \x01(\t\x12*\n\x0enode_addresses\x18\x07 \x03(\x0b\x32\x12.lnrpc.NodeAddress\"\xc0\x01\n\x11\x43hannelEdgeUpdate\x12\x0f\n\x07\x63han_id\x18\x01 \x01(\x04\x12\'\n\nchan_point\x18\x02 \x01(\x0b\x32\x13.lnrpc.ChannelPoint\x12\x10\n\x08\x63\x61pacity\x18\x03 \x01(\x03\x12,\n\x0erouting_policy\x18\x04 \x01(\x0b\x32\x14.lnrpc.RoutingPolicy\x12\x18\n\x10\x61\x64vertising_node\x18\x05 \x01(\t\x12\x17\n\x0f\x63onnecting_node\x18\x06 \x01(\t\"x\n\x13\x43losedChannelUpdate\x12\x0f\n\x07\x63han_id\x18\x01 \x01(\x04\x12\x10\n\x08\x63\x61pacity\x18\x02 \x01(\x03\x12\x15\n\rclosed_height\x18\x03 \x01(\r\x12\'\n\nchan_point\x18\x04 \x01(\x0b\x32\x13.lnrpc.ChannelPoint\"\x1a\n\x18\x43hannelEventSubscription\"\x93\x04\n\x12\x43hannelEventUpdate\x12&\n\x0copen_channel\x18\x01 \x01(\x0b\x32\x0e.lnrpc.ChannelH\x00\x12\x34\n\x0e\x63losed_channel\x18\x02 \x01(\x0b\x32\x1a.lnrpc.ChannelCloseSummaryH\x00\x12-\n\x0e\x61\x63tive_channel\x18\x03 \x01(\x0b\x32\x13.lnrpc.ChannelPointH\x00\x12/\n\x10inactive_channel\x18\x04 \x01(\x0b\x32\x13.lnrpc.ChannelPointH\x00\x12\x34\n\x14pending_open_channel\x18\x06 \x01(\x0b\x32\x14.lnrpc.PendingUpdateH\x00\x12\x35\n\x16\x66ully_resolved_channel\x18\x07 \x01(\x0b\x32\x13.lnrpc.ChannelPointH\x00\x12\x32\n\x04type\x18\x05 \x01(\x0e\x32$.lnrpc.ChannelEventUpdate.UpdateType\"\x92\x01\n\nUpdateType\x12\x10\n\x0cOPEN_CHANNEL\x10\x00\x12\x12\n\x0e\x43LOSED_CHANNEL\x10\x01\x12\x12\n\x0e\x41\x43TIVE_CHANNEL\x10\x02\x12\x14\n\x10INACTIVE_CHANNEL\x10\x03\x12\x18\n\x14PENDING_OPEN_CHANNEL\x10\x04\x12\x1a\n\x16\x46ULLY_RESOLVED_CHANNEL\x10\x05\x42\t\n\x07\x63hannel\"\xa8\x03\n\x13\x43hannelCloseSummary\x12\x15\n\rchannel_point\x18\x01 \x01(\t\x12\x0f\n\x07\x63han_id\x18\x02 \x01(\x04\x12\x12\n\nchain_hash\x18\x03 \x01(\t\x12\x17\n\x0f\x63losing_tx_hash\x18\x04 \x01(\t\x12\x15\n\rremote_pubkey\x18\x05 \x01(\t\x12\x10\n\x08\x63\x61pacity\x18\x06 \x01(\x03\x12\x14\n\x0c\x63lose_height\x18\x07 \x01(\r\x12\x17\n\x0fsettled_balance\x18\x08 \x01(\x03\x12\x1b\n\x13time_locked_balance\x18\t \x01(\x03\x12:\n\nclose_type\x18\n \x01(\x0e\x32&.lnrpc.ChannelCloseSummary.ClosureType\"\x8a\x01\n\x0b\x43losureType\x12\x15\n\x11\x43OOPERATIVE_CLOSE\x10\x00\x12\x15\n\x11LOCAL_FORCE_CLOSE\x10\x01\x12\x16\n\x12REMOTE_FORCE_CLOSE\x10\x02\x12\x10\n\x0c\x42REACH_CLOSE\x10\x03\x12\x14\n\x10\x46UNDING_CANCELED\x10\x04\x12\r\n\tABANDONED\x10\x05\"3\n\rPendingUpdate\x12\x0c\n\x04txid\x18\x01 \x01(\x0c\x12\x14\n\x0coutput_index\x18\x02 \x01(\r\">\n\x13InvoiceSubscription\x12\x11\n\tadd_index\x18\x01 \x01(\x04\x12\x14\n\x0csettle_index\x18\x02 \x01(\x04\"\xff\x06\n\x07Invoice\x12\x0c\n\x04memo\x18\x01 \x01(\t\x12\x12\n\nr_preimage\x18\x03 \x01(\x0c\x12\x0e\n\x06r_hash\x18\x04 \x01(\x0c\x12\r\n\x05value\x18\x05 \x01(\x03\x12\x12\n\nvalue_msat\x18\x17 \x01(\x03\x12\x13\n\x07settled\x18\x06 \x01(\x08\x42\x02\x18\x01\x12\x15\n\rcreation_date\x18\x07 \x01(\x03\x12\x13\n\x0bsettle_date\x18\x08 \x01(\x03\x12\x17\n\x0fpayment_request\x18\t \x01(\t\x12\x18\n\x10\x64\x65scription_hash\x18\n \x01(\x0c\x12\x0e\n\x06\x65xpiry\x18\x0b \x01(\x04\x12\x15\n\rfallback_addr\x18\x0c \x01(\t\x12\x13\n\x0b\x63ltv_expiry\x18\r \x01(\x04\x12%\n\x0broute_hints\x18\x0e \x03(\x0b\x32\x10.lnrpc.RouteHint\x12\x0f\n\x07private\x18\x0f \x01(\x08\x12\x11\n\tadd_index\x18\x10 \x01(\x04\x12\x14\n\x0csettle_index\x18\x11 \x01(\x04\x12\x14\n\x08\x61mt_paid\x18\x12 \x01(\x03\x42\x02\x18\x01\x12\x14\n\x0c\x61mt_paid_sat\x18\x13 \x01(\x03\x12\x15\n\ramt_paid_msat\x18\x14 \x01(\x03\x12*\n\x05state\x18\x15 \x01(\x0e\x32\x1b.lnrpc.Invoice.InvoiceState\x12!\n\x05htlcs\x18\x16 \x03(\x0b\x32\x12.lnrpc.InvoiceHTLC\x12.\n\x08\x66\x65\x61tures\x18\x18 \x03(\x0b\x32\x1c.lnrpc.Invoice.FeaturesEntry\x12\x12\n\nis_keysend\x18\x19 \x01(\x08\x12\x14\n\x0cpayment_addr\x18\x1a \x01(\x0c\x12\x0e\n\x06is_amp\x18\x1b \x01(\x08\x12>\n\x11\x61mp_invoice_state\x18\x1c \x03(\x0b\x32#.lnrpc.Invoice.AmpInvoiceStateEntry\x1a?\n\rFeaturesEntry\x12\x0b\n\x03key\x18\x01 \x01(\r\x12\x1d\n\x05value\x18\x02 \x01(\x0b\x32\x0e.lnrpc.Feature:\x02\x38\x01\x1aN\n\x14\x41mpInvoiceStateEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12%\n\x05value\x18\x02 \x01(\x0b\x32\x16.lnrpc.AMPInvoiceState:\x02\x38\x01\"A\n\x0cInvoiceState\x12\x08\n\x04OPEN\x10\x00\x12\x0b\n\x07SETTLED\x10\x01\x12\x0c\n\x08\x43\x41NCELED\x10\x02\x12\x0c\n\x08\x41\x43\x43\x45PTED\x10\x03\".\n\tRouteHint\x12!\n\thop_hints\x18\x01 \x03(\x0b\x32\x0e.lnrpc.HopHint\"\x82\x01\n\x07HopHint\x12\x0f\n\x07node_id\x18\x01 \x01(\t\x12\x0f\n\x07\x63han_id\x18\x02 \x01(\x04\x12\x15\n\rfee_base_msat\x18\x03 \x01(\r\x12#\n\x1b\x66\x65\x65_proportional_millionths\x18\x04 \x01(\r\x12\x19\n\x11\x63ltv_expiry_delta\x18\x05 \x01(\r\"\xd6\x02\n\x0bInvoiceHTLC\x12\x0f\n\x07\x63han_id\x18\x01 \x01(\x04\x12\x12\n\nhtlc_index\x18\x02 \x01(\x04\x12\x10\n\x08\x61mt_msat\x18\x03 \x01(\x04\x12\x15\n\raccept_height\x18\x04 \x01(\x05\x12\x13\n\x0b\x61\x63\x63\x65pt_time\x18\x05 \x01(\x03\x12\x14\n\x0cresolve_time\x18\x06 \x01(\x03\x12\x15\n\rexpiry_height\x18\x07 \x01(\x05\x12&\n\x05state\x18\x08 \x01(\x0e\x32\x17.lnrpc.InvoiceHTLCState\x12=\n\x0e\x63ustom_records\x18\t \x03(\x0b\x32%.lnrpc.InvoiceHTLC.CustomRecordsEntry\x12\x1a\n\x12mpp_total_amt_msat\x18\n \x01(\x04\x1a\x34\n\x12\x43ustomRecordsEntry\x12\x0b\n\x03key\x18\x01 \x01(\x04\x12\r\n\x05value\x18\x02 \x01(\x0c:\x02\x38\x01\"{\n\x0f\x41MPInvoiceState\x12&\n\x05state\x18\x01 \x01(\x0e\x32\x17.lnrpc.InvoiceHTLCState\x12\x14\n\x0csettle_index\x18\x02 \x01(\x04\x12\x13\n\x0bsettle_time\x18\x03 \x01(\x03\x12\x15\n\ramt_paid_msat\x18\x05 \x01(\x03\">\n\x07\x46\x65\x61ture\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x13\n\x0bis_required\x18\x03 \x01(\x08\x12\x10\n\x08is_known\x18\x04 \x01(\x08*;\n\x10InvoiceHTLCState\x12\x0c\n\x08\x41\x43\x43\x45PTED\x10\x00\x12\x0b\n\x07SETTLED\x10\x01\x12\x0c\n\x08\x43\x41NCELED\x10\x02\x32\xaa\x04\n\tLightning\x12:\n\x07GetInfo\x12\x15.lnrpc.GetInfoRequest\x1a\x16.lnrpc.GetInfoResponse\"\x00\x12I\n\x0cListChannels\x12\x1a.lnrpc.ListChannelsRequest\x1a\x1b.lnrpc.ListChannelsResponse\"\x00\x12X\n\x11\x46orwardingHistory\x12\x1f.lnrpc.ForwardingHistoryRequest\x1a .lnrpc.ForwardingHistoryResponse\"\x00\x12\x42\n\rDescribeGraph\x12\x1a.lnrpc.ChannelGraphRequest\x1a\x13.lnrpc.ChannelGraph\"\x00\x12Y\n\x15SubscribeChannelGraph\x12 .lnrpc.GraphTopologySubscription\x1a\x1a.lnrpc.GraphTopologyUpdate\"\x00\x30\x01\x12X\n\x16SubscribeChannelEvents\x12\x1f.lnrpc.ChannelEventSubscription\x1a\x19.lnrpc.ChannelEventUpdate\"\x00\x30\x01\x12\x43\n\x11SubscribeInvoices\x12\x1a.lnrpc.InvoiceSubscription\x1a\x0e.lnrpc.Invoice\"\x00\x30\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'lightning_pb2', _globals)
 if _descriptor._USE_C_DESCRIPTORS == False:
   DESCRIPTOR._options = None
+  _FORWARDINGEVENT.fields_by_name['timestamp']._options = None
+  _FORWARDINGEVENT.fields_by_name['timestamp']._serialized_options = b'\030\001'
+  _CHANNELEDGE.fields_by_name['last_update']._options = None
+  _CHANNELEDGE.fields_by_name['last_update']._serialized_options = b'\030\001'
+  _INVOICE_FEATURESENTRY._options = None
+  _INVOICE_FEATURESENTRY._serialized_options = b'8\001'
+  _INVOICE_AMPINVOICESTATEENTRY._options = None
+  _INVOICE_AMPINVOICESTATEENTRY._serialized_options = b'8\001'
+  _INVOICE.fields_by_name['settled']._options = None
+  _INVOICE.fields_by_name['settled']._serialized_options = b'\030\001'
+  _INVOICE.fields_by_name['amt_paid']._options = None
+  _INVOICE.fields_by_name['amt_paid']._serialized_options = b'\030\001'
+  _INVOICEHTLC_CUSTOMRECORDSENTRY._options = None
+  _INVOICEHTLC_CUSTOMRECORDSENTRY._serialized_options = b'8\001'
+  _globals['_INVOICEHTLCSTATE']._serialized_start=5549
+  _globals['_INVOICEHTLCSTATE']._serialized_end=5608
   _globals['_GETINFOREQUEST']._serialized_start=26
   _globals['_GETINFOREQUEST']._serialized_end=42
   _globals['_GETINFORESPONSE']._serialized_start=45
@@ -30,12 +46,70 @@ if _descriptor._USE_C_DESCRIPTORS == False:
   _globals['_LISTCHANNELSRESPONSE']._serialized_end=436
   _globals['_CHANNEL']._serialized_start=439
   _globals['_CHANNEL']._serialized_end=896
-  _globals['_FORWARDINGHISTORYREQUEST']._serialized_start=898
-  _globals['_FORWARDINGHISTORYREQUEST']._serialized_end=977
-  _globals['_FORWARDINGHISTORYRESPONSE']._serialized_start=979
-  _globals['_FORWARDINGHISTORYRESPONSE']._serialized_end=1057
-  _globals['_FORWARDINGEVENT']._serialized_start=1060
-  _globals['_FORWARDINGEVENT']._serialized_end=1201
-  _globals['_LIGHTNING']._serialized_start=1204
-  _globals['_LIGHTNING']._serialized_end=1440
+  _globals['_FORWARDINGHISTORYREQUEST']._serialized_start=899
+  _globals['_FORWARDINGHISTORYREQUEST']._serialized_end=1036
+  _globals['_FORWARDINGHISTORYRESPONSE']._serialized_start=1038
+  _globals['_FORWARDINGHISTORYRESPONSE']._serialized_end=1143
+  _globals['_FORWARDINGEVENT']._serialized_start=1146
+  _globals['_FORWARDINGEVENT']._serialized_end=1356
+  _globals['_CHANNELPOINT']._serialized_start=1358
+  _globals['_CHANNELPOINT']._serialized_end=1468
+  _globals['_CHANNELGRAPHREQUEST']._serialized_start=1470
+  _globals['_CHANNELGRAPHREQUEST']._serialized_end=1548
+  _globals['_CHANNELGRAPH']._serialized_start=1550
+  _globals['_CHANNELGRAPH']._serialized_end=1636
+  _globals['_NODEADDRESS']._serialized_start=1638
+  _globals['_NODEADDRESS']._serialized_end=1682
+  _globals['_LIGHTNINGNODE']._serialized_start=1684
+  _globals['_LIGHTNINGNODE']._serialized_end=1806
+  _globals['_ROUTINGPOLICY']._serialized_start=1809
+  _globals['_ROUTINGPOLICY']._serialized_end=1981
+  _globals['_CHANNELEDGE']._serialized_start=1984
+  _globals['_CHANNELEDGE']._serialized_end=2206
+  _globals['_GRAPHTOPOLOGYSUBSCRIPTION']._serialized_start=2208
+  _globals['_GRAPHTOPOLOGYSUBSCRIPTION']._serialized_end=2235
+  _globals['_GRAPHTOPOLOGYUPDATE']._serialized_start=2238
+  _globals['_GRAPHTOPOLOGYUPDATE']._serialized_end=2401
+  _globals['_NODEUPDATE']._serialized_start=2403
+  _globals['_NODEUPDATE']._serialized_end=2511
+  _globals['_CHANNELEDGEUPDATE']._serialized_start=2514
+  _globals['_CHANNELEDGEUPDATE']._serialized_end=2706
+  _globals['_CLOSEDCHANNELUPDATE']._serialized_start=2708
+  _globals['_CLOSEDCHANNELUPDATE']._serialized_end=2828
+  _globals['_CHANNELEVENTSUBSCRIPTION']._serialized_start=2830
+  _globals['_CHANNELEVENTSUBSCRIPTION']._serialized_end=2856
+  _globals['_CHANNELEVENTUPDATE']._serialized_start=2859
+  _globals['_CHANNELEVENTUPDATE']._serialized_end=3390
+  _globals['_CHANNELEVENTUPDATE_UPDATETYPE']._serialized_start=3233
+  _globals['_CHANNELEVENTUPDATE_UPDATETYPE']._serialized_end=3379
+  _globals['_CHANNELCLOSESUMMARY']._serialized_start=3393
+  _globals['_CHANNELCLOSESUMMARY']._serialized_end=3817
+  _globals['_CHANNELCLOSESUMMARY_CLOSURETYPE']._serialized_start=3679
+  _globals['_CHANNELCLOSESUMMARY_CLOSURETYPE']._serialized_end=3817
+  _globals['_PENDINGUPDATE']._serialized_start=3819
+  _globals['_PENDINGUPDATE']._serialized_end=3870
+  _globals['_INVOICESUBSCRIPTION']._serialized_start=3872
+  _globals['_INVOICESUBSCRIPTION']._serialized_end=3934
+  _globals['_INVOICE']._serialized_start=3937
+  _globals['_INVOICE']._serialized_end=4832
+  _globals['_INVOICE_FEATURESENTRY']._serialized_start=4622
+  _globals['_INVOICE_FEATURESENTRY']._serialized_end=4685
+  _globals['_INVOICE_AMPINVOICESTATEENTRY']._serialized_start=4687
+  _globals['_INVOICE_AMPINVOICESTATEENTRY']._serialized_end=4765
+  _globals['_INVOICE_INVOICESTATE']._serialized_start=4767
+  _globals['_INVOICE_INVOICESTATE']._serialized_end=4832
+  _globals['_ROUTEHINT']._serialized_start=4834
+  _globals['_ROUTEHINT']._serialized_end=4880
+  _globals['_HOPHINT']._serialized_start=4883
+  _globals['_HOPHINT']._serialized_end=5013
+  _globals['_INVOICEHTLC']._serialized_start=5016
+  _globals['_INVOICEHTLC']._serialized_end=5358
+  _globals['_INVOICEHTLC_CUSTOMRECORDSENTRY']._serialized_start=5306
+  _globals['_INVOICEHTLC_CUSTOMRECORDSENTRY']._serialized_end=5358
+  _globals['_AMPINVOICESTATE']._serialized_start=5360
+  _globals['_AMPINVOICESTATE']._serialized_end=5483
+  _globals['_FEATURE']._serialized_start=5485
+  _globals['_FEATURE']._serialized_end=5547
+  _globals['_LIGHTNING']._serialized_start=5611
+  _globals['_LIGHTNING']._serialized_end=6165
 # @@protoc_insertion_point(module_scope)
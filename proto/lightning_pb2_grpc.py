@@ -29,6 +29,26 @@ class LightningStub(object):
                 request_serializer=lightning__pb2.ForwardingHistoryRequest.SerializeToString,
                 response_deserializer=lightning__pb2.ForwardingHistoryResponse.FromString,
                 )
+        self.DescribeGraph = channel.unary_unary(
+                '/lnrpc.Lightning/DescribeGraph',
+                request_serializer=lightning__pb2.ChannelGraphRequest.SerializeToString,
+                response_deserializer=lightning__pb2.ChannelGraph.FromString,
+                )
+        self.SubscribeChannelGraph = channel.unary_stream(
+                '/lnrpc.Lightning/SubscribeChannelGraph',
+                request_serializer=lightning__pb2.GraphTopologySubscription.SerializeToString,
+                response_deserializer=lightning__pb2.GraphTopologyUpdate.FromString,
+                )
+        self.SubscribeChannelEvents = channel.unary_stream(
+                '/lnrpc.Lightning/SubscribeChannelEvents',
+                request_serializer=lightning__pb2.ChannelEventSubscription.SerializeToString,
+                response_deserializer=lightning__pb2.ChannelEventUpdate.FromString,
+                )
+        self.SubscribeInvoices = channel.unary_stream(
+                '/lnrpc.Lightning/SubscribeInvoices',
+                request_serializer=lightning__pb2.InvoiceSubscription.SerializeToString,
+                response_deserializer=lightning__pb2.Invoice.FromString,
+                )
 
 
 class LightningServicer(object):
@@ -52,6 +72,30 @@ class LightningServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def DescribeGraph(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SubscribeChannelGraph(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SubscribeChannelEvents(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SubscribeInvoices(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_LightningServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -70,6 +114,26 @@ def add_LightningServicer_to_server(servicer, server):
                     request_deserializer=lightning__pb2.ForwardingHistoryRequest.FromString,
                     response_serializer=lightning__pb2.ForwardingHistoryResponse.SerializeToString,
             ),
+            'DescribeGraph': grpc.unary_unary_rpc_method_handler(
+                    servicer.DescribeGraph,
+                    request_deserializer=lightning__pb2.ChannelGraphRequest.FromString,
+                    response_serializer=lightning__pb2.ChannelGraph.SerializeToString,
+            ),
+            'SubscribeChannelGraph': grpc.unary_stream_rpc_method_handler(
+                    servicer.SubscribeChannelGraph,
+                    request_deserializer=lightning__pb2.GraphTopologySubscription.FromString,
+                    response_serializer=lightning__pb2.GraphTopologyUpdate.SerializeToString,
+            ),
+            'SubscribeChannelEvents': grpc.unary_stream_rpc_method_handler(
+                    servicer.SubscribeChannelEvents,
+                    request_deserializer=lightning__pb2.ChannelEventSubscription.FromString,
+                    response_serializer=lightning__pb2.ChannelEventUpdate.SerializeToString,
+            ),
+            'SubscribeInvoices': grpc.unary_stream_rpc_method_handler(
+                    servicer.SubscribeInvoices,
+                    request_deserializer=lightning__pb2.InvoiceSubscription.FromString,
+                    response_serializer=lightning__pb2.Invoice.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'lnrpc.Lightning', rpc_method_handlers)
@@ -130,3 +194,71 @@ class Lightning(object):
             lightning__pb2.ForwardingHistoryResponse.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def DescribeGraph(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/lnrpc.Lightning/DescribeGraph',
+            lightning__pb2.ChannelGraphRequest.SerializeToString,
+            lightning__pb2.ChannelGraph.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def SubscribeChannelGraph(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/lnrpc.Lightning/SubscribeChannelGraph',
+            lightning__pb2.GraphTopologySubscription.SerializeToString,
+            lightning__pb2.GraphTopologyUpdate.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def SubscribeChannelEvents(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/lnrpc.Lightning/SubscribeChannelEvents',
+            lightning__pb2.ChannelEventSubscription.SerializeToString,
+            lightning__pb2.ChannelEventUpdate.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def SubscribeInvoices(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/lnrpc.Lightning/SubscribeInvoices',
+            lightning__pb2.InvoiceSubscription.SerializeToString,
+            lightning__pb2.Invoice.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -0,0 +1,215 @@
+import asyncio
+import logging
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Fonctions appelées à chaque accès (nom du cache, hit) : MetricsExporter
+# s'y abonne pour les compteurs Prometheus daznode_cache_{hits,misses}_total
+_access_listeners: List[Callable[[str, bool], None]] = []
+
+# Caches existants, pour les statistiques (références faibles)
+_caches: "weakref.WeakSet[AsyncTTLCache]" = weakref.WeakSet()
+
+_MISSING = object()
+
+
+def add_access_listener(listener: Callable[[str, bool], None]) -> None:
+    """Abonne une fonction aux accès de tous les caches"""
+    if listener not in _access_listeners:
+        _access_listeners.append(listener)
+
+
+def remove_access_listener(listener: Callable[[str, bool], None]) -> None:
+    """Désabonne une fonction des accès aux caches"""
+    if listener in _access_listeners:
+        _access_listeners.remove(listener)
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Statistiques de tous les caches, par nom"""
+    return {cache.name: cache.get_stats() for cache in list(_caches)}
+
+
+class AsyncTTLCache:
+    """Cache LRU à durée de vie pour les résultats de coroutines
+
+    Remplace functools.lru_cache, qui sur une méthode async mémorise la
+    coroutine (déjà consommée au second appel) et non son résultat, et
+    retient self indéfiniment. Ici :
+
+    - chaque entrée expire après ttl secondes ; au-delà de maxsize
+      entrées, les moins récemment utilisées sont évincées ;
+    - pendant stale_ttl secondes après son expiration, une entrée est encore
+      servie immédiatement tandis qu'elle est rafraîchie en arrière-plan
+      (stale-while-revalidate) ;
+    - les appels concurrents pour une même clé sont regroupés (single
+      flight) : un seul appel est fait, tous les demandeurs reçoivent son
+      résultat ou son exception ; l'annulation d'un demandeur n'interrompt
+      pas l'appel des autres ;
+    - les exceptions ne sont pas mises en cache.
+    """
+
+    def __init__(self, name: str, maxsize: int = None, ttl: float = None,
+                 stale_ttl: float = 0.0):
+        """Initialise le cache
+
+        Args:
+            name: Nom du cache (statistiques et métriques Prometheus)
+            maxsize: Nombre maximal d'entrées (par défaut API_CACHE_MAXSIZE)
+            ttl: Durée de vie d'une entrée en secondes (par défaut API_CACHE_TTL_SECONDS)
+            stale_ttl: Durée pendant laquelle une entrée expirée est encore servie
+                pendant son rafraîchissement (secondes, 0 pour désactiver)
+        """
+        self.name = name
+        self.maxsize = maxsize or settings.API_CACHE_MAXSIZE
+        self.ttl = ttl or settings.API_CACHE_TTL_SECONDS
+        self.stale_ttl = stale_ttl
+
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+        _caches.add(self)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _record(self, hit: bool) -> None:
+        for listener in list(_access_listeners):
+            try:
+                listener(self.name, hit)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'export des métriques du cache {self.name}: {e}")
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Valeur en cache (non expirée) pour key, sans compter d'accès"""
+        value, stale = self._lookup(key)
+        return default if value is _MISSING or stale else value
+
+    def _lookup(self, key: Hashable) -> Tuple[Any, bool]:
+        """(valeur, expirée) ; _MISSING si absente ou au-delà de la fenêtre stale_ttl"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING, False
+        expires_at, value = entry
+        now = time.monotonic()
+        if expires_at <= now:
+            if now < expires_at + self.stale_ttl:
+                self._entries.move_to_end(key)
+                return value, True
+            del self._entries[key]
+            self.expirations += 1
+            return _MISSING, False
+        self._entries.move_to_end(key)
+        return value, False
+
+    def set(self, key: Hashable, value: Any, ttl: float = None) -> None:
+        """Met une valeur en cache"""
+        self._entries[key] = (time.monotonic() + (ttl or self.ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable = None) -> None:
+        """Retire une entrée, ou toutes les entrées si key est None
+
+        Un appel en cours pour une clé invalidée rend son résultat à ses
+        demandeurs sans le mettre en cache.
+        """
+        if key is None:
+            self._entries.clear()
+            self._inflight.clear()
+        else:
+            self._entries.pop(key, None)
+            self._inflight.pop(key, None)
+
+    def _pending(self, key: Hashable):
+        """Appel en cours pour key dans la boucle d'événements courante"""
+        task = self._inflight.get(key)
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            return task
+        return None
+
+    def _call(self, key: Hashable, func: Callable[[], Awaitable[Any]], ttl) -> asyncio.Future:
+        """Appel en cours pour key, ou nouvel appel de func() mis en cache à sa fin"""
+        task = self._pending(key)
+        if task is not None:
+            return task
+
+        task = asyncio.ensure_future(func())
+        self._inflight[key] = task
+
+        def done(completed: asyncio.Task) -> None:
+            # Lire l'exception même sans demandeur (rafraîchissement en arrière-plan)
+            failed = completed.cancelled() or completed.exception() is not None
+            if self._inflight.get(key) is not completed:
+                # Clé invalidée pendant l'appel : résultat potentiellement périmé
+                return
+            del self._inflight[key]
+            if failed:
+                return
+            result = completed.result()
+            entry_ttl = ttl(result) if callable(ttl) else ttl
+            if entry_ttl is None or entry_ttl > 0:
+                self.set(key, result, entry_ttl)
+
+        task.add_done_callback(done)
+        return task
+
+    async def get_or_call(self, key: Hashable, func: Callable[[], Awaitable[Any]],
+                          ttl: Any = None) -> Any:
+        """Résultat en cache pour key, sinon celui de func() (mis en cache)
+
+        Args:
+            key: Clé du résultat (hashable)
+            func: Fonction sans argument retournant la coroutine à exécuter
+            ttl: Durée de vie de cette entrée (par défaut celle du cache), ou
+                fonction du résultat retournant cette durée (0 : non mis en cache)
+        """
+        value, stale = self._lookup(key)
+        if value is not _MISSING:
+            self.hits += 1
+            self._record(True)
+            if stale:
+                # Servir l'ancienne valeur et la rafraîchir en arrière-plan
+                self.stale_hits += 1
+                self._call(key, func, ttl)
+            return value
+
+        if self._pending(key) is not None:
+            # Même appel déjà en cours : attendre son résultat
+            self.coalesced += 1
+            self._record(True)
+        else:
+            self.misses += 1
+            self._record(False)
+        return await asyncio.shield(self._call(key, func, ttl))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Taille, accès et évictions du cache"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "stale_hits": self.stale_hits,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "inflight": len(self._inflight),
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None
+        }
@@ -0,0 +1,264 @@
+import asyncio
+import inspect
+import grpc
+from typing import Any, Dict, List, Callable, Optional, AsyncGenerator, Tuple
+import logging
+
+from services.lnd_client import LNDClient
+
+# Importer les protobuf générés LND
+try:
+    from proto import lightning_pb2 as ln
+    from proto import lightning_pb2_grpc as lnrpc
+except ImportError:
+    logging.error(
+        "Protobuf LND non trouvés. Générez-les avec la commande : "
+        "python -m grpc_tools.protoc..."
+    )
+
+try:
+    from proto import router_pb2_grpc as routerrpc
+except ImportError:
+    routerrpc = None
+
+logger = logging.getLogger(__name__)
+
+
+async def call_lnd(method: Callable, *args, **kwargs) -> Any:
+    """Appelle une méthode d'un client LND sans bloquer la boucle d'événements
+
+    Les méthodes d'AsyncLNDClient sont attendues directement ; celles de
+    LNDClient (bloquantes) sont exécutées dans un thread.
+    """
+    if inspect.iscoroutinefunction(method):
+        return await method(*args, **kwargs)
+    return await asyncio.to_thread(method, *args, **kwargs)
+
+
+class AsyncLNDClient(LNDClient):
+    """Client LND natif asyncio basé sur grpc.aio
+
+    Expose la même API que LNDClient (mêmes dictionnaires en retour) mais
+    chaque appel est une coroutine : les appels gRPC ne bloquent plus la
+    boucle d'événements de FastAPI pendant qu'LND répond.
+    """
+
+    def _open_channel(self):
+        """Récupère le canal grpc.aio partagé de la boucle d'événements courante"""
+        # Le canal grpc.aio est lié à la boucle d'événements courante :
+        # il doit être demandé depuis une coroutine
+        return self.connection.get_aio_channel()
+
+    def _connection_generation(self) -> int:
+        """Génération du canal grpc.aio partagé"""
+        return self.connection.aio_generation
+
+    def _create_stub(self):
+        """Crée les stubs gRPC asynchrones sur le canal partagé"""
+        channel = self._open_channel()
+        self._channel = channel
+        self._channel_generation = self._connection_generation()
+
+        self._stub = lnrpc.LightningStub(channel)
+        if routerrpc is not None:
+            self._router_stub = routerrpc.RouterStub(channel)
+
+        return self._stub
+
+    async def close(self) -> None:
+        """Libère les références de ce client au canal gRPC asynchrone
+
+        Le canal grpc.aio est partagé avec les autres clients de la boucle :
+        il n'est pas fermé ici mais par le gestionnaire de connexions à l'arrêt.
+        """
+        self._channel = None
+        self._stub = None
+        self._router_stub = None
+        self._channel_generation = None
+
+    async def get_node_info(self) -> Dict:
+        """Récupère les informations sur le nœud local"""
+        try:
+            response = await self.stub.GetInfo(ln.GetInfoRequest())
+            return self._format_node_info(response)
+        except grpc.RpcError as e:
+            logger.error(
+                f"Erreur gRPC lors de la récupération des informations du nœud: {e}"
+            )
+            raise
+
+    async def list_channels(
+        self,
+        active_only: bool = False,
+        inactive_only: bool = False
+    ) -> List[Dict]:
+        """Liste tous les canaux du nœud
+
+        Args:
+            active_only: Ne récupérer que les canaux actifs
+            inactive_only: Ne récupérer que les canaux inactifs
+        """
+        try:
+            request = self._build_list_channels_request(active_only, inactive_only)
+            response = await self.stub.ListChannels(request)
+            return self._format_channels(response, active_only, inactive_only)
+        except grpc.RpcError as e:
+            logger.error(f"Erreur gRPC lors de la récupération des canaux: {e}")
+            raise
+
+    async def open_channel(
+        self,
+        node_pubkey: str,
+        local_amount: int,
+        push_amount: int = 0,
+        private: bool = False,
+        min_htlc_msat: int = 1000,
+        remote_csv_delay: int = 144,
+        spend_unconfirmed: bool = False
+    ) -> str:
+        """Ouvre un nouveau canal avec un nœud distant (voir LNDClient.open_channel)"""
+        try:
+            request = self._build_open_channel_request(
+                node_pubkey, local_amount, push_amount, private,
+                min_htlc_msat, remote_csv_delay, spend_unconfirmed
+            )
+            response = await self.stub.OpenChannelSync(request)
+            return self._format_channel_point(response)
+        except grpc.RpcError as e:
+            logger.error(f"Erreur gRPC lors de l'ouverture du canal: {e}")
+            raise
+
+    async def close_channel(
+        self,
+        channel_point: str,
+        force: bool = False,
+        target_conf: int = 6
+    ) -> Optional[str]:
+        """Ferme un canal existant (voir LNDClient.close_channel)"""
+        try:
+            request = ln.CloseChannelRequest(
+                channel_point=self._parse_channel_point(channel_point),
+                force=force,
+                target_conf=target_conf
+            )
+
+            async for update in self.stub.CloseChannel(request):
+                closing_txid = self._handle_close_update(update)
+                if closing_txid:
+                    return closing_txid
+
+            return None
+        except grpc.RpcError as e:
+            logger.error(f"Erreur gRPC lors de la fermeture du canal: {e}")
+            raise
+
+    async def update_channel_policy(
+        self,
+        channel_point: str,
+        base_fee_msat: int = None,
+        fee_rate: int = None,
+        time_lock_delta: int = None
+    ) -> bool:
+        """Met à jour la politique de frais d'un canal (voir LNDClient.update_channel_policy)"""
+        try:
+            request = self._build_policy_update_request(
+                channel_point, base_fee_msat, fee_rate, time_lock_delta
+            )
+            await self.stub.UpdateChannelPolicy(request)
+            return True
+        except grpc.RpcError as e:
+            logger.error(
+                f"Erreur gRPC lors de la mise à jour de la politique du canal: {e}"
+            )
+            raise
+
+    async def get_forwarding_history(
+        self,
+        start_time: int = None,
+        end_time: int = None,
+        offset: int = 0,
+        limit: int = 100
+    ) -> Dict:
+        """Récupère l'historique de routage pour une période donnée
+
+        Args:
+            start_time: Timestamp UNIX de début
+            end_time: Timestamp UNIX de fin
+            offset: Offset pour la pagination
+            limit: Nombre maximum d'entrées à récupérer
+        """
+        try:
+            request = self._build_forwarding_history_request(
+                start_time, end_time, offset, limit
+            )
+            response = await self.stub.ForwardingHistory(request)
+            return self._format_forwarding_history(response)
+        except grpc.RpcError as e:
+            logger.error(
+                f"Erreur gRPC lors de la récupération de l'historique de transfert: {e}"
+            )
+            raise
+
+    async def _fetch_forwarding_page(self, request):
+        """Exécute un appel ForwardingHistory sur le canal grpc.aio"""
+        return await self.stub.ForwardingHistory(request)
+
+    async def describe_graph(self, include_unannounced: bool = False) -> Dict:
+        """Récupère le graphe complet du réseau (voir LNDClient.describe_graph)"""
+        try:
+            request = ln.ChannelGraphRequest(include_unannounced=include_unannounced)
+            response = await self.stub.DescribeGraph(request)
+            return self._format_graph(response)
+        except grpc.RpcError as e:
+            logger.error(f"Erreur gRPC lors de la récupération du graphe: {e}")
+            raise
+
+    async def stream_graph_updates(self, ready: asyncio.Event = None) -> AsyncGenerator[Dict, None]:
+        """Itère sur les mises à jour de topologie du graphe sur le canal grpc.aio
+
+        Args:
+            ready: Événement signalé une fois l'appel connecté à LND
+        """
+        request = ln.GraphTopologySubscription()
+        call = self.stub.SubscribeChannelGraph(request)
+        await call.wait_for_connection()
+        if ready is not None:
+            ready.set()
+        async for update in call:
+            yield self._format_graph_update(update)
+
+    async def stream_channel_events(self) -> AsyncGenerator[Tuple[str, Dict], None]:
+        """Itère sur les événements de canal sans bloquer la boucle d'événements
+
+        Yields:
+            Tuples (event_type, data)
+        """
+        request = ln.ChannelEventSubscription()
+        async for update in self.stub.SubscribeChannelEvents(request):
+            event_type, data = self._format_channel_event(update)
+            if event_type:
+                yield event_type, data
+
+    async def stream_invoice_events(self) -> AsyncGenerator[Dict, None]:
+        """Itère sur les événements d'invoice sans bloquer la boucle d'événements"""
+        request = ln.InvoiceSubscription(add_index=0, settle_index=0)
+        async for invoice in self.stub.SubscribeInvoices(request):
+            yield self._format_invoice(invoice)
+
+    async def rebalance_channels(
+        self,
+        source_channels: List[str],
+        target_channels: List[str],
+        amount_sat: int,
+        fee_limit_sat: int = 100
+    ) -> Dict:
+        """Rééquilibre les fonds entre les canaux spécifiés (voir LNDClient.rebalance_channels)"""
+        try:
+            request = self._build_send_to_route_request(
+                source_channels, target_channels, amount_sat, fee_limit_sat
+            )
+            response = await self.router_stub.SendToRoute(request)
+            return self._format_send_to_route_response(response)
+        except grpc.RpcError as e:
+            logger.error(f"Erreur gRPC lors du rééquilibrage des canaux: {e}")
+            raise
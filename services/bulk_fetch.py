@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Iterable, List
+
+import httpx
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def fetch_many(fetch: Callable[[Hashable], Awaitable[Any]], ids: Iterable[Hashable],
+                     chunk_size: int = None, concurrency: int = None) -> Dict[Hashable, Any]:
+    """Appelle fetch(id) pour chaque identifiant distinct et regroupe les résultats
+
+    Les API externes n'exposant que des appels unitaires, les identifiants
+    sont traités par lots de chunk_size (pour ne pas créer des milliers de
+    tâches à la fois), avec au plus concurrency requêtes simultanées.
+
+    Args:
+        fetch: Coroutine récupérant une entité
+        ids: Identifiants (les doublons et valeurs vides sont ignorés)
+        chunk_size: Taille des lots (par défaut API_BULK_CHUNK_SIZE)
+        concurrency: Requêtes simultanées maximales (par défaut API_BULK_CONCURRENCY)
+
+    Returns:
+        Dictionnaire identifiant -> résultat, dans l'ordre des identifiants ;
+        None pour une entité introuvable (404) ou en erreur
+    """
+    unique_ids = list(dict.fromkeys(id_ for id_ in ids if id_))
+    chunk_size = chunk_size or settings.API_BULK_CHUNK_SIZE
+    semaphore = asyncio.Semaphore(concurrency or settings.API_BULK_CONCURRENCY)
+
+    async def fetch_one(id_: Hashable) -> Any:
+        async with semaphore:
+            try:
+                return await fetch(id_)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code != 404:
+                    logger.error(f"Erreur lors de la récupération groupée de {id_}: {e}")
+                return None
+            except Exception as e:
+                logger.error(f"Erreur lors de la récupération groupée de {id_}: {e}")
+                return None
+
+    results: Dict[Hashable, Any] = {}
+    for start in range(0, len(unique_ids), chunk_size):
+        chunk = unique_ids[start:start + chunk_size]
+        results.update(zip(chunk, await asyncio.gather(*(fetch_one(id_) for id_ in chunk))))
+    return results
+
+
+async def iter_pages(fetch_page: Callable[..., Awaitable[List[Any]]],
+                     page_size: int = None) -> AsyncIterator[Any]:
+    """Parcourt une liste paginée par limit/offset, élément par élément
+
+    La page suivante est demandée dès la réception de la page courante et
+    se charge pendant que celle-ci est consommée. Le parcours s'arrête à la
+    première page incomplète.
+
+    Args:
+        fetch_page: Coroutine acceptant limit et offset et renvoyant une page
+        page_size: Nombre d'éléments par page (par défaut API_PAGE_SIZE)
+    """
+    page_size = page_size or settings.API_PAGE_SIZE
+    offset = 0
+    next_page = asyncio.ensure_future(fetch_page(limit=page_size, offset=offset))
+    try:
+        while next_page is not None:
+            page = await next_page
+            next_page = None
+            if len(page) >= page_size:
+                offset += page_size
+                next_page = asyncio.ensure_future(fetch_page(limit=page_size, offset=offset))
+            for item in page:
+                yield item
+    finally:
+        if next_page is not None:
+            # Parcours interrompu : abandonner la page préchargée et son éventuelle erreur
+            next_page.cancel()
+            next_page.add_done_callback(lambda task: task.cancelled() or task.exception())
@@ -0,0 +1,250 @@
+import asyncio
+import inspect
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from core.config import settings
+from services.async_cache import AsyncTTLCache
+from services.data_source_interface import DataSourceInterface
+from services.lnd_subscriptions import CHANNEL_EVENTS
+
+logger = logging.getLogger(__name__)
+
+# Politique par méthode : (durée de vie, fenêtre stale-while-revalidate) en secondes
+CACHE_POLICIES: Dict[str, Tuple[float, float]] = {
+    "get_node_info": (300.0, 900.0),
+    "get_node_details": (300.0, 900.0),
+    "get_channel_info": (300.0, 900.0),
+    "get_channel_details": (120.0, 300.0),
+    "get_node_channels": (120.0, 300.0),
+    "get_network_stats": (300.0, 900.0),
+    "get_network_nodes": (600.0, 1800.0),
+    "get_channels_stats": (60.0, 120.0),
+    "get_channels_list": (60.0, 120.0),
+}
+
+# Méthodes dont le résultat dépend de l'état de nos canaux (événements de canal LND)
+CHANNEL_STATE_METHODS = (
+    "get_channels_stats", "get_channels_list", "get_channel_details",
+    "get_channel_info", "get_node_channels", "get_network_stats"
+)
+# Méthodes indexées par nœud ou par canal du graphe (mises à jour GraphSync)
+NODE_METHODS = ("get_node_info", "get_node_details", "get_node_channels")
+CHANNEL_METHODS = ("get_channel_info", "get_channel_details")
+# Méthodes à vider quand GraphSync recharge le graphe complet
+GRAPH_METHODS = NODE_METHODS + CHANNEL_METHODS + ("get_network_nodes", "get_network_stats")
+
+# Signatures de l'interface, pour construire les clés (arguments par défaut inclus)
+_SIGNATURES = {
+    method: inspect.signature(getattr(DataSourceInterface, method)) for method in CACHE_POLICIES
+}
+
+
+class _NotFound:
+    """Réponse 404 mise en cache (cache négatif), relevée à chaque accès"""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class CachedDataSource(DataSourceInterface):
+    """Cache en lecture devant une source de données
+
+    Chaque méthode de DataSourceInterface a son propre AsyncTTLCache (durée
+    de vie et fenêtre stale-while-revalidate de CACHE_POLICIES) : les appels
+    identiques concurrents sont regroupés et une entrée expirée est servie
+    pendant son rafraîchissement en arrière-plan. Les absences (None, liste
+    vide, réponse 404) sont conservées moins longtemps ; les réponses
+    d'erreur ({"error": ...}) et les exceptions ne sont pas mises en cache.
+
+    Les entrées sont invalidées à chaque événement de canal LND
+    (SubscriptionManager) pour les données de nos canaux, et nœud par nœud,
+    canal par canal, pour les modifications du graphe suivies par GraphSync.
+
+    Les attributs de la source enveloppée restent accessibles ; unwrap()
+    renvoie la source elle-même (pour tester son type, par exemple).
+    """
+
+    def __init__(self, source: DataSourceInterface, name: str = None,
+                 policies: Dict[str, Tuple[float, float]] = None, maxsize: int = None,
+                 negative_ttl: float = None):
+        """Initialise le cache
+
+        Args:
+            source: Source de données enveloppée
+            name: Préfixe des noms de caches (statistiques et métriques Prometheus)
+            policies: Politiques (durée de vie, fenêtre de revalidation) remplaçant
+                celles de CACHE_POLICIES pour certaines méthodes
+            maxsize: Nombre maximal d'entrées par méthode (par défaut DATA_SOURCE_CACHE_MAXSIZE)
+            negative_ttl: Durée de vie des absences en secondes
+                (par défaut DATA_SOURCE_CACHE_NEGATIVE_TTL_SECONDS)
+        """
+        self.source = source
+        self.name = name or f"data_source_{type(source).__name__}"
+        self.negative_ttl = negative_ttl or settings.DATA_SOURCE_CACHE_NEGATIVE_TTL_SECONDS
+        maxsize = maxsize or settings.DATA_SOURCE_CACHE_MAXSIZE
+        self.caches: Dict[str, AsyncTTLCache] = {
+            method: AsyncTTLCache(f"{self.name}.{method}", maxsize=maxsize, ttl=ttl, stale_ttl=stale_ttl)
+            for method, (ttl, stale_ttl) in {**CACHE_POLICIES, **(policies or {})}.items()
+        }
+
+        self.graph_sync = None
+        self._graph_version = 0
+        self.subscription_manager = None
+        self._subscription = None
+        self._events_task: Optional[asyncio.Task] = None
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "source":
+            raise AttributeError(name)
+        return getattr(self.source, name)
+
+    def unwrap(self) -> DataSourceInterface:
+        """Renvoie la source de données enveloppée par le cache"""
+        return self.source
+
+    def attach_graph_sync(self, graph_sync) -> None:
+        """Invalide les nœuds et canaux modifiés dans le graphe suivi par GraphSync"""
+        self.graph_sync = graph_sync
+        self._graph_version = graph_sync.version
+
+    def attach_subscription_manager(self, subscription_manager) -> None:
+        """Invalide les données de nos canaux à chaque événement de canal LND
+
+        L'abonnement est ouvert au premier appel (dans la boucle d'événements).
+        """
+        self.subscription_manager = subscription_manager
+
+    def invalidate(self, *methods: str, key: Tuple = None) -> None:
+        """Vide le cache des méthodes données (toutes par défaut), ou seulement l'entrée key"""
+        for method in methods or self.caches:
+            self.caches[method].invalidate(key)
+
+    def _apply_graph_changes(self) -> None:
+        """Invalide les entrées modifiées dans le graphe depuis le dernier appel"""
+        if self.graph_sync is None or self.graph_sync.version == self._graph_version:
+            return
+
+        changes = self.graph_sync.changes_since(self._graph_version)
+        self._graph_version = self.graph_sync.version
+        if changes is None:
+            # Graphe rechargé ou journal dépassé : tout ce qui en dérive est périmé
+            self.invalidate(*GRAPH_METHODS)
+            return
+
+        pubkeys, channel_ids = changes
+        for channel_id in channel_ids:
+            for method in CHANNEL_METHODS:
+                self.caches[method].invalidate((channel_id,))
+            channel = self.graph_sync.channels.get(channel_id)
+            if channel is None:
+                # Canal fermé : ses extrémités ne sont plus connues
+                self.invalidate("get_node_channels")
+            else:
+                pubkeys = pubkeys | {channel["node1_pub"], channel["node2_pub"]}
+        for pubkey in pubkeys:
+            for method in NODE_METHODS:
+                self.caches[method].invalidate((pubkey,))
+
+    def _ensure_channel_events(self) -> None:
+        """Ouvre l'abonnement aux événements de canal si nécessaire"""
+        if self.subscription_manager is None:
+            return
+        if self._events_task is not None and not self._events_task.done():
+            return
+        self._subscription = self.subscription_manager.subscribe(CHANNEL_EVENTS)
+        self._events_task = asyncio.create_task(
+            self._watch_channel_events(self._subscription), name=f"{self.name}-invalidation"
+        )
+
+    async def _watch_channel_events(self, subscription) -> None:
+        async for event in subscription:
+            logger.debug(f"Événement de canal {event.get('type')}: invalidation du cache {self.name}")
+            self.invalidate(*CHANNEL_STATE_METHODS)
+
+    def _entry_ttl(self, result: Any) -> Optional[float]:
+        """Durée de vie d'un résultat : réduite pour une absence, nulle pour une erreur"""
+        if isinstance(result, _NotFound) or result is None or result == []:
+            return self.negative_ttl
+        if isinstance(result, dict) and "error" in result:
+            return 0
+        return None
+
+    async def _cached(self, method: str, *args, **kwargs) -> Any:
+        """Résultat de source.method(*args, **kwargs), via le cache de la méthode"""
+        self._apply_graph_changes()
+        self._ensure_channel_events()
+
+        bound = _SIGNATURES[method].bind(None, *args, **kwargs)
+        bound.apply_defaults()
+        key = tuple(bound.arguments.values())[1:]
+        func = getattr(self.source, method)
+
+        async def call():
+            try:
+                return await func(*args, **kwargs)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 404:
+                    return _NotFound(e)
+                raise
+
+        result = await self.caches[method].get_or_call(key, call, ttl=self._entry_ttl)
+        if isinstance(result, _NotFound):
+            raise result.error
+        return result
+
+    async def get_node_info(self, pubkey: str) -> Dict[str, Any]:
+        """Récupère les informations d'un nœud"""
+        return await self._cached("get_node_info", pubkey)
+
+    async def get_channel_info(self, channel_id: str) -> Dict[str, Any]:
+        """Récupère les informations d'un canal"""
+        return await self._cached("get_channel_info", channel_id)
+
+    async def get_network_stats(self) -> Dict[str, Any]:
+        """Récupère les statistiques du réseau"""
+        return await self._cached("get_network_stats")
+
+    async def get_network_nodes(self, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        """Récupère la liste des nœuds du réseau"""
+        return await self._cached("get_network_nodes", limit=limit, offset=offset)
+
+    async def get_node_details(self, node_id: str) -> Optional[Dict[str, Any]]:
+        """Récupère les détails d'un nœud spécifique"""
+        return await self._cached("get_node_details", node_id)
+
+    async def get_channels_stats(self) -> Dict[str, Any]:
+        """Récupère les statistiques globales des canaux"""
+        return await self._cached("get_channels_stats")
+
+    async def get_channels_list(self, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        """Récupère la liste des canaux"""
+        return await self._cached("get_channels_list", limit=limit, offset=offset)
+
+    async def get_channel_details(self, channel_id: str) -> Optional[Dict[str, Any]]:
+        """Récupère les détails d'un canal spécifique"""
+        return await self._cached("get_channel_details", channel_id)
+
+    async def get_node_channels(self, node_id: str) -> List[Dict[str, Any]]:
+        """Récupère les canaux d'un nœud spécifique"""
+        return await self._cached("get_node_channels", node_id)
+
+    async def close(self) -> None:
+        """Ferme l'abonnement aux événements de canal"""
+        self.subscription_manager = None
+        if self._subscription is not None:
+            self._subscription.close()
+            self._subscription = None
+        if self._events_task is not None:
+            self._events_task.cancel()
+            try:
+                await self._events_task
+            except asyncio.CancelledError:
+                pass
+            self._events_task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques des caches, par méthode"""
+        return {method: cache.get_stats() for method, cache in self.caches.items()}
@@ -3,10 +3,17 @@ import logging
 import asyncio
 
 from core.config import settings
+from services.cached_data_source import CachedDataSource
 from services.data_source_interface import DataSourceInterface
 from services.local_data_source import LocalDataSource
 from services.mcp_data_source import MCPDataSource
 from services.lnd_client import LNDClient
+from services.async_lnd_client import AsyncLNDClient
+from services.http_client import close_all_http_clients
+from services.lnd_connection import close_all_connections
+from services.lnd_subscriptions import SubscriptionManager
+from services.metrics_storage import close_all_metrics_storages
+from services.graph_sync import GraphSync
 from services.lnrouter_client import LNRouterClient
 from services.mcp import MCPService
 from services.health_check_manager import HealthCheckManager
@@ -19,6 +26,9 @@ class DataSourceFactory:
     
     _sources: Dict[str, DataSourceInterface] = {}
     _lnd_client = None
+    _async_lnd_client = None
+    _subscription_manager = None
+    _graph_sync = None
     _lnrouter_client = None
     _mcp_service = None
     _health_manager = None
@@ -36,6 +46,15 @@ class DataSourceFactory:
         cls._lnrouter_client = cls.get_lnrouter_client()
         cls._mcp_service = cls.get_mcp_service()
         
+        # Graphe réseau synchronisé en continu depuis LND
+        if getattr(settings, "GRAPH_SYNC_ENABLED", False):
+            graph_sync = cls.get_graph_sync()
+            graph_sync.start()
+            cls._lnrouter_client.attach_graph_sync(graph_sync)
+            for source in cls._sources.values():
+                if isinstance(source, CachedDataSource):
+                    source.attach_graph_sync(graph_sync)
+        
         # Initialiser le health check manager
         cls._health_manager = HealthCheckManager(
             check_interval_seconds=getattr(settings, "HEALTH_CHECK_INTERVAL", 60)
@@ -62,6 +81,29 @@ class DataSourceFactory:
             cls._lnd_client = LNDClient()
         return cls._lnd_client
     
+    @classmethod
+    def get_async_lnd_client(cls):
+        """Récupère ou crée le client LND asynchrone (grpc.aio) partagé"""
+        if cls._async_lnd_client is None:
+            cls._async_lnd_client = AsyncLNDClient()
+        return cls._async_lnd_client
+    
+    @classmethod
+    def get_subscription_manager(cls) -> SubscriptionManager:
+        """Récupère le bus partagé des événements LND (canaux, invoices)"""
+        if cls._subscription_manager is None:
+            cls._subscription_manager = SubscriptionManager(
+                lnd_client=cls.get_async_lnd_client()
+            )
+        return cls._subscription_manager
+    
+    @classmethod
+    def get_graph_sync(cls) -> GraphSync:
+        """Récupère la synchronisation incrémentale du graphe LND partagée"""
+        if cls._graph_sync is None:
+            cls._graph_sync = GraphSync(lnd_client=cls.get_async_lnd_client())
+        return cls._graph_sync
+    
     @classmethod
     def get_lnrouter_client(cls):
         """Récupère ou crée le client LNRouter partagé"""
@@ -177,6 +219,15 @@ class DataSourceFactory:
                 lnrouter_client=cls._lnrouter_client or cls.get_lnrouter_client()
             )
         
+        # Cache en lecture devant la source, invalidé par les événements LND
+        if settings.DATA_SOURCE_CACHE_ENABLED:
+            is_local = isinstance(source, LocalDataSource)
+            source = CachedDataSource(source, name=f"data_source_{source_type}")
+            if cls._graph_sync is not None:
+                source.attach_graph_sync(cls._graph_sync)
+            if is_local and settings.DATA_SOURCE_CACHE_CHANNEL_EVENTS:
+                source.attach_subscription_manager(cls.get_subscription_manager())
+        
         # Stocker l'instance pour réutilisation
         cls._sources[source_type] = source
         
@@ -188,5 +239,40 @@ class DataSourceFactory:
         if cls._health_manager:
             await cls._health_manager.stop_background_checks()
         
+        if cls._graph_sync is not None:
+            await cls._graph_sync.stop()
+            cls._graph_sync = None
+        
+        for source in cls._sources.values():
+            if isinstance(source, CachedDataSource):
+                await source.close()
+        cls._sources = {}
+        
+        if cls._subscription_manager is not None:
+            await cls._subscription_manager.stop()
+            cls._subscription_manager = None
+        
+        if cls._lnrouter_client is not None:
+            try:
+                await cls._lnrouter_client.topology_analytics.stop()
+            except Exception as e:
+                logger.error(f"Erreur lors de l'arrêt de l'analyse de topologie: {e}")
+        
+        if cls._async_lnd_client is not None:
+            try:
+                await cls._async_lnd_client.close()
+            except Exception as e:
+                logger.error(f"Erreur lors de la fermeture du client LND asynchrone: {e}")
+            cls._async_lnd_client = None
+        
+        # Canaux gRPC partagés par tous les clients LND
+        await close_all_connections()
+        
+        # Pools de connexions HTTP des API externes (MCP, LNRouter, Feustey)
+        await close_all_http_clients()
+        
+        # Pools de connexions MongoDB des collecteurs de métriques
+        close_all_metrics_storages()
+        
         cls._initialized = False
         logger.info("DataSourceFactory arrêté") 
\ No newline at end of file
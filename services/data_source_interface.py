@@ -49,4 +49,8 @@ class DataSourceInterface(ABC):
     @abstractmethod
     async def get_node_channels(self, node_id: str) -> List[Dict[str, Any]]:
         """Récupère les canaux d'un nœud spécifique"""
-        pass 
\ No newline at end of file
+        pass 
+    
+    def unwrap(self) -> "DataSourceInterface":
+        """Renvoie la source de données réelle (elle-même hors enveloppe de cache)"""
+        return self
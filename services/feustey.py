@@ -1,8 +1,9 @@
-import httpx
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
 from app.core.config import settings
+from services.http_client import get_http_client
+from services.forwarding_analytics import ForwardingAnalytics
 
 
 class FeusteyService:
@@ -21,18 +22,17 @@ class FeusteyService:
             
         url = f"{self.base_url}{endpoint}"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.request(
-                method=method,
-                url=url,
-                params=params,
-                json=data,
-                headers=self.headers,
-                timeout=60.0
-            )
-            
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client(self.base_url)
+        response = await client.request(
+            method=method,
+            url=url,
+            params=params,
+            json=data,
+            headers=self.headers
+        )
+        
+        response.raise_for_status()
+        return response.json()
     
     def _get_mock_data(self, endpoint: str, params: Dict[str, Any] = None) -> Any:
         """Génère des données fictives pour le développement"""
@@ -105,24 +105,17 @@ class FeusteyService:
         
         forwards = await self._make_request("GET", "/v1/forwards", params=params)
         
-        # Calculer les métriques
-        total_forwards = len(forwards)
-        total_amount = sum(fw.get("amt_out", 0) for fw in forwards)
-        total_fees = sum(fw.get("fee", 0) for fw in forwards)
+        # Calculer les métriques : dix intervalles pour la tendance des revenus
+        interval = max(1, -(-(end_time - start_time) // 10))
+        analytics = ForwardingAnalytics.from_events(
+            forwards, bucket_seconds=interval, bucket_origin=start_time
+        )
+        total_forwards = analytics.total_forwards
+        total_amount = analytics.total_amount_out
+        total_fees = analytics.total_fees
         
         # Agréger l'activité par canal
-        channel_activity = {}
-        for fw in forwards:
-            chan_id_in = fw.get("chan_id_in", "unknown")
-            chan_id_out = fw.get("chan_id_out", "unknown")
-            
-            if chan_id_in not in channel_activity:
-                channel_activity[chan_id_in] = 0
-            if chan_id_out not in channel_activity:
-                channel_activity[chan_id_out] = 0
-                
-            channel_activity[chan_id_in] += 1
-            channel_activity[chan_id_out] += 1
+        channel_activity = analytics.channel_activity()
         
         # Calculer les échecs de paiement (fictifs pour la démo)
         payment_failures = {
@@ -140,17 +133,17 @@ class FeusteyService:
             "timeout": 2
         }
         
-        # Générer les tendances (fictives pour la démo)
+        # Revenus de frais par intervalle ; nombre de canaux actifs fictif pour la démo
+        fee_buckets = analytics.time_buckets()
         fee_revenue_trend = []
         active_channels_trend = []
         
-        # Diviser l'intervalle en 10 points pour les tendances
-        interval = (end_time - start_time) / 10
         for i in range(10):
-            point_time = datetime.fromtimestamp(start_time + i * interval)
+            bucket_start = start_time + i * interval
+            point_time = datetime.fromtimestamp(bucket_start)
             fee_revenue_trend.append({
                 "time": point_time,
-                "value": 1000 + i * 200
+                "value": fee_buckets.get(bucket_start, {}).get("total_fees", 0)
             })
             active_channels_trend.append({
                 "time": point_time,
@@ -0,0 +1,292 @@
+from typing import Any, AsyncIterable, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Colonnes d'un événement de forwarding utilisées par les agrégations
+ANALYTICS_COLUMNS = ("timestamp", "chan_id_in", "chan_id_out", "amt_in", "amt_out", "fee")
+
+# Nombre d'événements bufferisés avant d'être réduits en agrégats : la
+# mémoire reste bornée quelle que soit la longueur de l'historique
+FLUSH_ROWS = 500_000
+
+
+def _numeric_column(values: List[Any], dtype: type = np.int64) -> np.ndarray:
+    """Colonne numérique ; valeurs absentes ou invalides à 0"""
+    try:
+        return np.array(values, dtype=dtype)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values), errors="coerce").fillna(0).to_numpy(dtype=dtype)
+
+
+def events_to_columns(events: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Convertit des événements de forwarding (dictionnaires) en colonnes
+
+    Accepte le format de LNDClient (timestamp ISO et timestamp_ns) comme
+    celui de l'API REST de LND (nombres éventuellement sérialisés en
+    chaînes). Un identifiant de canal absent vaut "unknown".
+    """
+    timestamps_ns = [event.get("timestamp_ns") for event in events]
+    if None not in timestamps_ns:
+        timestamps = _numeric_column(timestamps_ns) // 1_000_000_000
+    else:
+        seconds = pd.to_numeric(pd.Series([event.get("timestamp") for event in events]), errors="coerce")
+        timestamps = (
+            (pd.to_numeric(pd.Series(timestamps_ns), errors="coerce") // 1_000_000_000)
+            .fillna(seconds).fillna(0).to_numpy(dtype=np.int64)
+        )
+
+    columns = {"timestamp": timestamps}
+    for name in ("chan_id_in", "chan_id_out"):
+        columns[name] = np.array(
+            [event.get(name) or "unknown" for event in events], dtype=object
+        )
+    for name in ("amt_in", "amt_out", "fee"):
+        columns[name] = _numeric_column([event.get(name) for event in events])
+    return columns
+
+
+def _group_sums(codes: np.ndarray, size: int, keys: pd.Index,
+                **columns: np.ndarray) -> pd.DataFrame:
+    """Nombre d'occurrences et sommes des colonnes par code de regroupement
+
+    Les groupes sans occurrence sont retirés.
+    """
+    counts = np.bincount(codes, minlength=size)
+    frame = pd.DataFrame(
+        {
+            "count": counts,
+            **{
+                name: np.bincount(codes, weights=values, minlength=size).astype(np.int64)
+                for name, values in columns.items()
+            }
+        },
+        index=keys
+    )
+    return frame[counts > 0]
+
+
+def _merge(parts: List[pd.DataFrame]) -> pd.DataFrame:
+    """Somme des agrégats partiels de plusieurs lots, par clé"""
+    if len(parts) == 1:
+        return parts[0]
+    return pd.concat(parts).groupby(level=list(range(parts[0].index.nlevels))).sum()
+
+
+def _to_records(frame: pd.DataFrame, key_type: type = str) -> Dict[Any, Dict[str, int]]:
+    """Agrégats indexés par clé -> {clé: {champ: valeur}}"""
+    return {
+        key_type(key): {name: int(value) for name, value in zip(frame.columns, row)}
+        for key, row in zip(frame.index.tolist(), frame.to_numpy().tolist())
+    }
+
+
+class ForwardingAnalytics:
+    """Agrégations vectorisées des événements de forwarding
+
+    Les événements sont ajoutés par lots colonnaires (ceux de
+    LNDClient.iter_forwarding_batches, ou events_to_columns pour une liste
+    de dictionnaires) puis regroupés en une passe (canaux encodés une seule
+    fois par pandas.factorize, sommes par np.bincount) : statistiques par
+    canal entrant et sortant et, sur demande, intervalles de temps, flux par
+    paire de canaux et percentiles du taux de frais. Les lots sont
+    bufferisés puis réduits en agrégats partiels tous les FLUSH_ROWS
+    événements.
+
+    Conventions (identiques aux agrégats stockés) : le montant transféré est
+    le montant sortant, les frais d'un forward sont attribués à son canal
+    entrant.
+    """
+
+    def __init__(self, bucket_seconds: int = None, bucket_origin: int = 0,
+                 pairs: bool = False, fee_rates: bool = False):
+        """Initialise les agrégations
+
+        Args:
+            bucket_seconds: Taille des intervalles de temps (None : pas de
+                regroupement temporel)
+            bucket_origin: Origine des intervalles (timestamp UNIX) ; 0 les
+                aligne sur l'époque, comme les agrégats stockés
+            pairs: Calculer les flux par paire de canaux
+            fee_rates: Conserver le taux de frais de chaque forward pour
+                fee_rate_percentiles (4 octets par événement)
+        """
+        self.bucket_seconds = bucket_seconds
+        self.bucket_origin = bucket_origin
+        self.pairs = pairs
+        self.fee_rates = fee_rates
+
+        self.total_forwards = 0
+        self.total_amount_in = 0
+        self.total_amount_out = 0
+        self.total_fees = 0
+
+        self._pending: List[Dict[str, np.ndarray]] = []
+        self._pending_rows = 0
+        self._parts: Dict[str, List[pd.DataFrame]] = {
+            "in": [], "out": [], "pairs": [], "buckets": []
+        }
+        self._fee_rates: List[np.ndarray] = []
+
+    @classmethod
+    def from_events(cls, events: List[Dict[str, Any]], **kwargs) -> "ForwardingAnalytics":
+        """Agrégations d'une liste d'événements (dictionnaires)"""
+        analytics = cls(**kwargs)
+        if events:
+            analytics.add(events_to_columns(events))
+        return analytics
+
+    @classmethod
+    async def from_batches(cls, batches: AsyncIterable[Mapping[str, np.ndarray]],
+                           **kwargs) -> "ForwardingAnalytics":
+        """Agrégations d'un flux de lots colonnaires"""
+        analytics = cls(**kwargs)
+        async for batch in batches:
+            analytics.add(batch)
+        return analytics
+
+    def add(self, columns: Mapping[str, Sequence]) -> None:
+        """Ajoute un lot d'événements colonnaire ({champ: tableau})"""
+        batch = {name: np.asarray(columns[name]) for name in ANALYTICS_COLUMNS}
+        count = len(batch["fee"])
+        if not count:
+            return
+        self.total_forwards += count
+        self.total_amount_in += int(batch["amt_in"].sum())
+        self.total_amount_out += int(batch["amt_out"].sum())
+        self.total_fees += int(batch["fee"].sum())
+
+        self._pending.append(batch)
+        self._pending_rows += count
+        if self._pending_rows >= FLUSH_ROWS:
+            self._flush()
+
+    def _flush(self) -> None:
+        """Réduit les événements bufferisés en agrégats partiels"""
+        if not self._pending:
+            return
+        columns = self._pending[0] if len(self._pending) == 1 else {
+            name: np.concatenate([batch[name] for batch in self._pending])
+            for name in ANALYTICS_COLUMNS
+        }
+        self._pending, self._pending_rows = [], 0
+        count = len(columns["fee"])
+        amt_in, amt_out, fees = columns["amt_in"], columns["amt_out"], columns["fee"]
+
+        # Un seul encodage des canaux (entrants et sortants) pour tous les regroupements
+        codes, channels = pd.factorize(np.concatenate([columns["chan_id_in"], columns["chan_id_out"]]))
+        codes_in, codes_out = codes[:count], codes[count:]
+        channels = pd.Index(channels)
+        size = len(channels)
+
+        self._parts["in"].append(_group_sums(codes_in, size, channels, amount=amt_in, fees=fees))
+        self._parts["out"].append(_group_sums(codes_out, size, channels, amount=amt_out))
+
+        if self.pairs:
+            pair_codes, pairs = pd.factorize(codes_in.astype(np.int64) * size + codes_out)
+            pair_index = pd.MultiIndex.from_arrays(
+                [channels[pairs // size], channels[pairs % size]], names=["chan_id_in", "chan_id_out"]
+            )
+            self._parts["pairs"].append(
+                _group_sums(pair_codes, len(pairs), pair_index, amount=amt_out, fees=fees)
+            )
+
+        if self.bucket_seconds:
+            offset = columns["timestamp"] - self.bucket_origin
+            bucket_codes, buckets = pd.factorize(self.bucket_origin + offset - offset % self.bucket_seconds)
+            self._parts["buckets"].append(_group_sums(
+                bucket_codes, len(buckets), pd.Index(buckets, name="bucket_start"),
+                total_amount=amt_out, total_fees=fees
+            ))
+
+        if self.fee_rates:
+            routed = amt_out > 0
+            self._fee_rates.append((fees[routed] * 1e6 / amt_out[routed]).astype(np.float32))
+
+    def _aggregate(self, name: str) -> Optional[pd.DataFrame]:
+        self._flush()
+        parts = self._parts[name]
+        if not parts:
+            return None
+        merged = _merge(parts)
+        # Les agrégats fusionnés remplacent les partiels
+        self._parts[name] = [merged]
+        return merged
+
+    def totals(self) -> Dict[str, int]:
+        """Totaux de la période"""
+        return {
+            "total_forwards": self.total_forwards,
+            "total_amount_in": self.total_amount_in,
+            "total_amount_forwarded": self.total_amount_out,
+            "total_fees_earned": self.total_fees
+        }
+
+    def channels_in(self) -> Dict[str, Dict[str, int]]:
+        """Forwards entrés par canal : {canal: {count, amount, fees}}"""
+        frame = self._aggregate("in")
+        return _to_records(frame) if frame is not None else {}
+
+    def channels_out(self) -> Dict[str, Dict[str, int]]:
+        """Forwards sortis par canal : {canal: {count, amount}}"""
+        frame = self._aggregate("out")
+        return _to_records(frame) if frame is not None else {}
+
+    def channel_totals(self) -> Dict[str, Dict[str, int]]:
+        """Forwards par canal, entrées et sorties confondues : {canal: {count, amount, fees}}"""
+        frames = [frame for frame in (self._aggregate("in"), self._aggregate("out")) if frame is not None]
+        if not frames:
+            return {}
+        merged = pd.concat([frame.rename(index=str) for frame in frames]).groupby(level=0).sum()
+        return _to_records(merged[["count", "amount", "fees"]])
+
+    def channel_activity(self) -> Dict[str, int]:
+        """Nombre de forwards (entrants et sortants) par canal"""
+        return {channel: stats["count"] for channel, stats in self.channel_totals().items()}
+
+    def pair_flows(self, limit: int = None) -> List[Dict[str, Any]]:
+        """Flux par paire (canal entrant, canal sortant), du plus fréquent au moins fréquent"""
+        if not self.pairs:
+            raise ValueError("Flux par paire non demandés (pairs)")
+        frame = self._aggregate("pairs")
+        if frame is None:
+            return []
+        frame = frame.sort_values("count", ascending=False, kind="stable")
+        if limit is not None:
+            frame = frame.head(limit)
+        return [
+            {"chan_id_in": str(chan_in), "chan_id_out": str(chan_out),
+             "count": int(count), "amount": int(amount), "fees": int(fees)}
+            for (chan_in, chan_out), (count, amount, fees)
+            in zip(frame.index.tolist(), frame.to_numpy().tolist())
+        ]
+
+    def time_buckets(self) -> Dict[int, Dict[str, int]]:
+        """Forwards par intervalle de temps, triés : {début: {count, total_amount, total_fees}}"""
+        if not self.bucket_seconds:
+            raise ValueError("Regroupement temporel non configuré (bucket_seconds)")
+        frame = self._aggregate("buckets")
+        if frame is None:
+            return {}
+        return _to_records(frame.sort_index(), key_type=int)
+
+    def fee_rate_percentiles(self, percentiles: Sequence[float] = (50, 90, 99)) -> Dict[str, float]:
+        """Percentiles du taux de frais effectif des forwards (ppm du montant sortant)"""
+        if not self.fee_rates:
+            raise ValueError("Taux de frais non conservés (fee_rates)")
+        self._flush()
+        rates = np.concatenate(self._fee_rates) if self._fee_rates else np.empty(0)
+        if len(rates) == 0:
+            return {f"p{p:g}": 0.0 for p in percentiles}
+        values = np.percentile(rates, percentiles)
+        return {f"p{p:g}": round(float(value), 2) for p, value in zip(percentiles, values)}
+
+    def summary(self) -> Dict[str, Any]:
+        """Totaux et détail par canal, au format de MetricsStorage.summarize_forwards"""
+        return {
+            "total_forwards": self.total_forwards,
+            "total_amount_forwarded": self.total_amount_out,
+            "total_fees_earned": self.total_fees,
+            "channels_in": self.channels_in(),
+            "channels_out": self.channels_out()
+        }
@@ -0,0 +1,189 @@
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from services.graph_store import GraphStore
+
+logger = logging.getLogger(__name__)
+
+# Format binaire du cache du graphe :
+#   en-tête fixe | table des matières JSON | tableaux alignés sur 64 octets
+# Les tableaux sont lus directement depuis le fichier mappé en mémoire :
+# aucune désérialisation n'est nécessaire à l'ouverture.
+CACHE_MAGIC = b"DZGRAPH\x00"
+CACHE_FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+# magic, version du format, CRC32 (table des matières + données),
+# horodatage, taille de la table des matières, taille des données
+_HEADER = struct.Struct("<8sIIdQQ")
+
+# Tableaux NumPy du GraphStore sauvegardés tels quels
+ARRAY_FIELDS = (
+    "node_last_update",
+    "channel_node1", "channel_node2", "channel_capacity",
+    "channel_last_update", "channel_alive",
+    "edge_src", "edge_dst", "edge_channel",
+    "fee_base_msat", "fee_rate_ppm", "cltv_delta",
+    "min_htlc_msat", "max_htlc_msat", "disabled", "has_policy",
+    "indptr", "csr_edges", "degree",
+)
+
+# Listes de chaînes stockées en table (décalages + octets UTF-8)
+STRING_FIELDS = ("pubkeys", "aliases", "colors", "channel_ids")
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _encode_strings(values: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Encode une liste de chaînes en (décalages int64, octets UTF-8)"""
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return offsets, blob
+
+
+def _decode_strings(offsets: np.ndarray, blob: np.ndarray) -> List[str]:
+    """Décode une table de chaînes produite par _encode_strings"""
+    data = blob.tobytes()
+    bounds = offsets.tolist()
+    return [data[start:end].decode("utf-8") for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def write_graph_cache(store: GraphStore, path: str, timestamp: datetime = None) -> int:
+    """Écrit un GraphStore dans le cache binaire
+
+    Le fichier est écrit à côté de la destination puis renommé atomiquement :
+    un lecteur voit soit l'ancien cache, soit le nouveau, jamais un fichier partiel.
+
+    Args:
+        store: Graphe à sauvegarder
+        path: Chemin du fichier de cache
+        timestamp: Date des données (par défaut : maintenant)
+
+    Returns:
+        Taille du fichier écrit (octets)
+    """
+    timestamp = timestamp or datetime.now()
+
+    arrays: Dict[str, np.ndarray] = {
+        name: np.ascontiguousarray(getattr(store, name)) for name in ARRAY_FIELDS
+    }
+    for name in STRING_FIELDS:
+        offsets, blob = _encode_strings(getattr(store, name))
+        arrays[f"{name}.offsets"] = offsets
+        arrays[f"{name}.blob"] = blob
+
+    toc_arrays: Dict[str, List[Any]] = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = _align(offset)
+        toc_arrays[name] = [array.dtype.str, len(array), offset]
+        offset += array.nbytes
+    payload_size = offset
+
+    toc = json.dumps({"arrays": toc_arrays}).encode("utf-8")
+    # Les données commencent sur une frontière alignée du fichier
+    toc = toc.ljust(_align(_HEADER.size + len(toc)) - _HEADER.size, b" ")
+
+    payload = bytearray(payload_size)
+    for name, array in arrays.items():
+        start = toc_arrays[name][2]
+        payload[start:start + array.nbytes] = array.tobytes()
+
+    checksum = zlib.crc32(payload, zlib.crc32(toc))
+    header = _HEADER.pack(
+        CACHE_MAGIC, CACHE_FORMAT_VERSION, checksum,
+        timestamp.timestamp(), len(toc), payload_size
+    )
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".graph-cache-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(toc)
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    return _HEADER.size + len(toc) + payload_size
+
+
+def read_graph_cache(path: str, version: Any = None,
+                     verify_checksum: bool = True) -> Tuple[GraphStore, datetime]:
+    """Ouvre le cache binaire et reconstruit un GraphStore sur le fichier mappé
+
+    Les tableaux NumPy pointent directement dans le fichier mappé en mémoire
+    (copie à l'écriture : le store peut être modifié sans altérer le fichier).
+    Seules les tables de chaînes sont décodées.
+
+    Args:
+        path: Chemin du fichier de cache
+        version: Version à attribuer au store
+        verify_checksum: Vérifier le CRC32 des données avant utilisation
+
+    Returns:
+        Tuple (store, date des données)
+
+    Raises:
+        ValueError: Si le fichier est tronqué, d'un autre format ou corrompu
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < _HEADER.size:
+            raise ValueError(f"Cache du graphe tronqué: {path}")
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    magic, format_version, checksum, timestamp, toc_size, payload_size = (
+        _HEADER.unpack_from(buffer, 0)
+    )
+    if magic != CACHE_MAGIC:
+        raise ValueError(f"Fichier de cache du graphe invalide: {path}")
+    if format_version != CACHE_FORMAT_VERSION:
+        raise ValueError(
+            f"Version du cache du graphe non supportée: {format_version} "
+            f"(attendue: {CACHE_FORMAT_VERSION})"
+        )
+
+    data_start = _HEADER.size + toc_size
+    if size != data_start + payload_size:
+        raise ValueError(f"Cache du graphe tronqué: {path}")
+
+    view = memoryview(buffer)
+    toc_bytes = view[_HEADER.size:data_start]
+    if verify_checksum and zlib.crc32(view[data_start:], zlib.crc32(toc_bytes)) != checksum:
+        raise ValueError(f"Somme de contrôle du cache du graphe invalide: {path}")
+
+    toc = json.loads(bytes(toc_bytes))
+    arrays = {
+        name: np.frombuffer(buffer, dtype=np.dtype(dtype), count=length,
+                            offset=data_start + offset)
+        for name, (dtype, length, offset) in toc["arrays"].items()
+    }
+
+    store = GraphStore(version=version)
+    for name in ARRAY_FIELDS:
+        setattr(store, name, arrays[name])
+    for name in STRING_FIELDS:
+        setattr(store, name, _decode_strings(arrays[f"{name}.offsets"], arrays[f"{name}.blob"]))
+    store.index = {pubkey: i for i, pubkey in enumerate(store.pubkeys)}
+
+    return store, datetime.fromtimestamp(timestamp)
@@ -0,0 +1,537 @@
+import copy
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import networkx as nx
+import numpy as np
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+
+def _policy_value(policy: Optional[Dict[str, Any]], key: str, default: int = 0) -> int:
+    """Lit un champ entier d'une politique de routage (None si absente)"""
+    if not policy:
+        return default
+    try:
+        return int(policy.get(key) or default)
+    except (TypeError, ValueError):
+        return default
+
+
+class GraphStore:
+    """Graphe du réseau Lightning stocké en tableaux NumPy
+
+    Les clés publiques sont internées (pubkey -> index entier) et chaque canal
+    n'est stocké qu'une fois dans des tableaux colonnaires. Chaque canal donne
+    deux arêtes orientées (node1 -> node2 avec node1_policy, et l'inverse),
+    indexées en CSR par nœud source. Une vue NetworkX compacte n'est
+    construite qu'à la demande, pour les algorithmes qui en ont besoin.
+
+    Attributs principaux:
+        pubkeys: Liste des clés publiques (index -> pubkey)
+        channel_node1, channel_node2, channel_capacity: Tableaux par canal
+        edge_src, edge_dst, edge_channel: Tableaux par arête orientée (2 par canal)
+        fee_base_msat, fee_rate_ppm, cltv_delta, min_htlc_msat, max_htlc_msat,
+        disabled, has_policy: Politique de routage par arête orientée
+        indptr, csr_edges: Index CSR des arêtes sortantes de chaque nœud
+    """
+
+    def __init__(self, version: Any = None):
+        self.version = version
+        self.built_at = datetime.now()
+
+        self.pubkeys: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.aliases: List[str] = []
+        self.colors: List[str] = []
+        self.node_last_update = np.zeros(0, dtype=np.int64)
+
+        self.channel_ids: List[str] = []
+        self.channel_node1 = np.zeros(0, dtype=np.int32)
+        self.channel_node2 = np.zeros(0, dtype=np.int32)
+        self.channel_capacity = np.zeros(0, dtype=np.int64)
+        self.channel_last_update = np.zeros(0, dtype=np.int64)
+        self.channel_alive = np.zeros(0, dtype=bool)
+
+        self.edge_src = np.zeros(0, dtype=np.int32)
+        self.edge_dst = np.zeros(0, dtype=np.int32)
+        self.edge_channel = np.zeros(0, dtype=np.int32)
+        self.fee_base_msat = np.zeros(0, dtype=np.int64)
+        self.fee_rate_ppm = np.zeros(0, dtype=np.int64)
+        self.cltv_delta = np.zeros(0, dtype=np.int32)
+        self.min_htlc_msat = np.zeros(0, dtype=np.int64)
+        self.max_htlc_msat = np.zeros(0, dtype=np.int64)
+        self.disabled = np.zeros(0, dtype=bool)
+        self.has_policy = np.zeros(0, dtype=bool)
+
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.csr_edges = np.zeros(0, dtype=np.int64)
+        self.degree = np.zeros(0, dtype=np.int64)
+
+        self._channel_index: Optional[Dict[str, int]] = None
+        self._networkx: Optional[nx.Graph] = None
+
+    # CONSTRUCTION
+
+    @classmethod
+    def from_graph_data(cls, graph_data: Dict[str, Any], version: Any = None) -> "GraphStore":
+        """Construit le store depuis un graphe au format LNRouter / DescribeGraph
+
+        Args:
+            graph_data: Dictionnaire {"nodes": [...], "channels": [...]}
+            version: Version du graphe source (pour le partage entre appelants)
+        """
+        store = cls(version=version)
+
+        index = store.index
+        pubkeys = store.pubkeys
+        aliases = store.aliases
+        colors = store.colors
+        node_last_update = []
+
+        def intern(pubkey: str) -> int:
+            idx = index.get(pubkey)
+            if idx is None:
+                idx = len(pubkeys)
+                index[pubkey] = idx
+                pubkeys.append(pubkey)
+                aliases.append("")
+                colors.append("")
+                node_last_update.append(0)
+            return idx
+
+        for node in graph_data.get("nodes", []):
+            pubkey = node.get("pub_key")
+            if not pubkey:
+                continue
+            idx = intern(pubkey)
+            aliases[idx] = node.get("alias", "") or ""
+            colors[idx] = node.get("color", "") or ""
+            node_last_update[idx] = int(node.get("last_update", 0) or 0)
+
+        channels = [
+            c for c in graph_data.get("channels", [])
+            if c.get("channel_id") and c.get("node1_pub") and c.get("node2_pub")
+        ]
+        n_channels = len(channels)
+
+        node1 = np.empty(n_channels, dtype=np.int32)
+        node2 = np.empty(n_channels, dtype=np.int32)
+        capacity = np.empty(n_channels, dtype=np.int64)
+        last_update = np.empty(n_channels, dtype=np.int64)
+        # Politiques : colonne 0 = node1_policy (node1 -> node2), 1 = node2_policy
+        policy_fields = ("fee_base_msat", "fee_rate_milli_msat", "time_lock_delta",
+                         "min_htlc", "max_htlc_msat")
+        policies = np.zeros((len(policy_fields), n_channels, 2), dtype=np.int64)
+        disabled = np.zeros((n_channels, 2), dtype=bool)
+        has_policy = np.zeros((n_channels, 2), dtype=bool)
+
+        for i, channel in enumerate(channels):
+            store.channel_ids.append(str(channel["channel_id"]))
+            node1[i] = intern(channel["node1_pub"])
+            node2[i] = intern(channel["node2_pub"])
+            capacity[i] = int(channel.get("capacity", 0) or 0)
+            last_update[i] = int(channel.get("last_update", 0) or 0)
+            for side, key in ((0, "node1_policy"), (1, "node2_policy")):
+                policy = channel.get(key)
+                if policy:
+                    has_policy[i, side] = True
+                    disabled[i, side] = bool(policy.get("disabled", False))
+                    for f, field in enumerate(policy_fields):
+                        policies[f, i, side] = _policy_value(policy, field)
+
+        store.node_last_update = np.asarray(node_last_update, dtype=np.int64)
+        store.channel_node1 = node1
+        store.channel_node2 = node2
+        store.channel_capacity = capacity
+        store.channel_last_update = last_update
+        store.channel_alive = np.ones(n_channels, dtype=bool)
+
+        # Arêtes orientées : [0, n) = node1 -> node2, [n, 2n) = node2 -> node1
+        store.edge_src = np.concatenate([node1, node2])
+        store.edge_dst = np.concatenate([node2, node1])
+        store.edge_channel = np.concatenate([np.arange(n_channels, dtype=np.int32)] * 2)
+        store.fee_base_msat = np.concatenate([policies[0, :, 0], policies[0, :, 1]])
+        store.fee_rate_ppm = np.concatenate([policies[1, :, 0], policies[1, :, 1]])
+        store.cltv_delta = np.concatenate(
+            [policies[2, :, 0], policies[2, :, 1]]
+        ).astype(np.int32)
+        store.min_htlc_msat = np.concatenate([policies[3, :, 0], policies[3, :, 1]])
+        store.max_htlc_msat = np.concatenate([policies[4, :, 0], policies[4, :, 1]])
+        store.disabled = np.concatenate([disabled[:, 0], disabled[:, 1]])
+        store.has_policy = np.concatenate([has_policy[:, 0], has_policy[:, 1]])
+
+        store._build_csr()
+        return store
+
+    def _build_csr(self) -> None:
+        """Construit l'index CSR des arêtes sortantes et les degrés"""
+        n_nodes = len(self.pubkeys)
+        self.csr_edges = np.argsort(self.edge_src, kind="stable")
+        counts = np.bincount(self.edge_src, minlength=n_nodes)
+        self.indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.indptr[1:])
+        alive = self.channel_alive
+        self.degree = (
+            np.bincount(self.channel_node1[alive], minlength=n_nodes)
+            + np.bincount(self.channel_node2[alive], minlength=n_nodes)
+        )
+
+    # MISE À JOUR INCRÉMENTALE
+
+    def _set_edge_policy(self, edge: int, policy: Optional[Dict[str, Any]]) -> None:
+        self.has_policy[edge] = bool(policy)
+        self.disabled[edge] = bool(policy.get("disabled", False)) if policy else False
+        self.fee_base_msat[edge] = _policy_value(policy, "fee_base_msat")
+        self.fee_rate_ppm[edge] = _policy_value(policy, "fee_rate_milli_msat")
+        self.cltv_delta[edge] = _policy_value(policy, "time_lock_delta")
+        self.min_htlc_msat[edge] = _policy_value(policy, "min_htlc")
+        self.max_htlc_msat[edge] = _policy_value(policy, "max_htlc_msat")
+
+    def with_changes(self, graph_sync, node_ids: Iterable[str],
+                     channel_ids: Iterable[str], version: Any) -> "GraphStore":
+        """Nouveau store intégrant les modifications d'un GraphSync
+
+        Les tableaux du store courant ne sont jamais modifiés : les lecteurs
+        qui l'utilisent dans un thread (recherche de routes, arbres de routes,
+        topologie) gardent une vue cohérente. Seuls les tableaux concernés sont copiés ;
+        les nœuds et canaux inconnus sont ajoutés en fin de tableaux, si bien
+        que les index existants restent valides. La vue NetworkX éventuelle
+        est copiée puis mise à jour pour le nouveau store ; celle du store
+        courant reste inchangée.
+        """
+        store = copy.copy(self)
+        store.version = version
+        store.built_at = datetime.now()
+
+        channel_index = self._get_channel_index()
+        node_ids = list(node_ids)
+        channel_ids = list(channel_ids)
+        new_channels = [
+            graph_sync.channels[channel_id] for channel_id in channel_ids
+            if channel_id not in channel_index and channel_id in graph_sync.channels
+            and graph_sync.channels[channel_id].get("node1_pub")
+            and graph_sync.channels[channel_id].get("node2_pub")
+        ]
+
+        # Nœuds : nouveaux nœuds (y compris les extrémités des nouveaux canaux) en fin de liste
+        new_nodes = list(dict.fromkeys(
+            pubkey for pubkey in node_ids
+            + [c[key] for c in new_channels for key in ("node1_pub", "node2_pub")]
+            if pubkey not in self.index
+        ))
+        if node_ids or new_nodes:
+            store.pubkeys = self.pubkeys + new_nodes
+            store.index = dict(self.index)
+            store.index.update((pubkey, len(self.pubkeys) + i) for i, pubkey in enumerate(new_nodes))
+            store.aliases = self.aliases + [""] * len(new_nodes)
+            store.colors = self.colors + [""] * len(new_nodes)
+            store.node_last_update = np.concatenate(
+                [self.node_last_update, np.zeros(len(new_nodes), dtype=np.int64)]
+            )
+            for pubkey in dict.fromkeys(node_ids + new_nodes):
+                node = graph_sync.nodes.get(pubkey, {})
+                idx = store.index[pubkey]
+                store.aliases[idx] = node.get("alias", "") or ""
+                store.colors[idx] = node.get("color", "") or ""
+                store.node_last_update[idx] = int(node.get("last_update", 0) or 0)
+
+        # Canaux : [0, n) = node1 -> node2, [n, 2n) = node2 -> node1 ; les
+        # nouveaux canaux sont insérés à la fin de chaque moitié
+        closed_pairs: Set[frozenset] = set()
+        if channel_ids:
+            n_old = len(self.channel_ids)
+            n_new = len(new_channels)
+            n_channels = n_old + n_new
+
+            def extend(values: np.ndarray, fill: Any = 0) -> np.ndarray:
+                return np.concatenate([values, np.full(n_new, fill, dtype=values.dtype)])
+
+            def extend_edges(values: np.ndarray) -> np.ndarray:
+                padding = np.zeros(n_new, dtype=values.dtype)
+                return np.concatenate([values[:n_old], padding, values[n_old:], padding])
+
+            if n_new:
+                store.channel_ids = self.channel_ids + [str(c["channel_id"]) for c in new_channels]
+                store._channel_index = dict(channel_index)
+                store._channel_index.update(
+                    (channel_id, n_old + i) for i, channel_id in enumerate(store.channel_ids[n_old:])
+                )
+                store.channel_node1 = np.concatenate([self.channel_node1, np.array(
+                    [store.index[c["node1_pub"]] for c in new_channels], dtype=np.int32
+                )])
+                store.channel_node2 = np.concatenate([self.channel_node2, np.array(
+                    [store.index[c["node2_pub"]] for c in new_channels], dtype=np.int32
+                )])
+                store.channel_last_update = np.concatenate([self.channel_last_update, np.array(
+                    [int(c.get("last_update", 0) or 0) for c in new_channels], dtype=np.int64
+                )])
+                store.edge_src = np.concatenate([store.channel_node1, store.channel_node2])
+                store.edge_dst = np.concatenate([store.channel_node2, store.channel_node1])
+                store.edge_channel = np.concatenate([np.arange(n_channels, dtype=np.int32)] * 2)
+            store.channel_capacity = extend(self.channel_capacity)
+            store.channel_alive = extend(self.channel_alive, True)
+            store.fee_base_msat = extend_edges(self.fee_base_msat)
+            store.fee_rate_ppm = extend_edges(self.fee_rate_ppm)
+            store.cltv_delta = extend_edges(self.cltv_delta)
+            store.min_htlc_msat = extend_edges(self.min_htlc_msat)
+            store.max_htlc_msat = extend_edges(self.max_htlc_msat)
+            store.disabled = extend_edges(self.disabled)
+            store.has_policy = extend_edges(self.has_policy)
+
+            for channel_id in channel_ids:
+                ch = store._get_channel_index().get(channel_id)
+                if ch is None:
+                    continue
+                channel = graph_sync.channels.get(channel_id)
+                if channel is None:
+                    if store.channel_alive[ch]:
+                        store.channel_alive[ch] = False
+                        closed_pairs.add(frozenset(
+                            (int(store.channel_node1[ch]), int(store.channel_node2[ch]))
+                        ))
+                    continue
+
+                store.channel_capacity[ch] = int(channel.get("capacity", 0) or 0)
+                store._set_edge_policy(ch, channel.get("node1_policy"))
+                store._set_edge_policy(ch + n_channels, channel.get("node2_policy"))
+
+        if new_nodes or new_channels:
+            store._build_csr()
+        elif closed_pairs:
+            alive = store.channel_alive
+            store.degree = (
+                np.bincount(store.channel_node1[alive], minlength=store.num_nodes)
+                + np.bincount(store.channel_node2[alive], minlength=store.num_nodes)
+            )
+
+        if self._networkx is not None:
+            store._networkx = self._networkx.copy()
+            store._patch_networkx(
+                node_ids + new_nodes, channel_ids, closed_pairs,
+                {str(c["channel_id"]) for c in new_channels}
+            )
+        return store
+
+    def _patch_networkx(self, node_ids: List[str], channel_ids: List[str],
+                        closed_pairs: Set[frozenset], new_channel_ids: Set[str]) -> None:
+        """Répercute les modifications sur la vue NetworkX déjà construite"""
+        G = self._networkx
+        for pubkey in node_ids:
+            G.add_node(pubkey, **self.node(pubkey))
+
+        channel_index = self._get_channel_index()
+        for channel_id in channel_ids:
+            ch = channel_index.get(channel_id)
+            if ch is not None and self.channel_alive[ch]:
+                u = self.pubkeys[self.channel_node1[ch]]
+                v = self.pubkeys[self.channel_node2[ch]]
+                if channel_id in new_channel_ids:
+                    # Dernier canal ajouté : il porte l'arête, comme dans to_networkx
+                    G.add_edge(u, v, **self._edge_attributes(ch))
+                elif G.has_edge(u, v) and G[u][v].get("channel_id") == channel_id:
+                    G[u][v]["capacity"] = int(self.channel_capacity[ch])
+
+        # Une paire dont le canal affiché a été fermé reprend un canal restant
+        for pair in closed_pairs:
+            a, b = tuple(pair) if len(pair) == 2 else (next(iter(pair)),) * 2
+            u, v = self.pubkeys[a], self.pubkeys[b]
+            if G.has_edge(u, v):
+                G.remove_edge(u, v)
+            remaining = np.flatnonzero(
+                self.channel_alive
+                & (((self.channel_node1 == a) & (self.channel_node2 == b))
+                   | ((self.channel_node1 == b) & (self.channel_node2 == a)))
+            )
+            if len(remaining):
+                G.add_edge(u, v, **self._edge_attributes(int(remaining[-1])))
+
+    # ACCÈS
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.pubkeys)
+
+    @property
+    def num_channels(self) -> int:
+        return int(self.channel_alive.sum())
+
+    @property
+    def total_capacity(self) -> int:
+        return int(self.channel_capacity[self.channel_alive].sum())
+
+    def _get_channel_index(self) -> Dict[str, int]:
+        if self._channel_index is None:
+            self._channel_index = {cid: i for i, cid in enumerate(self.channel_ids)}
+        return self._channel_index
+
+    def node(self, pubkey: str) -> Optional[Dict[str, Any]]:
+        """Attributs d'un nœud, ou None s'il est inconnu"""
+        idx = self.index.get(pubkey)
+        if idx is None:
+            return None
+        return {
+            "pub_key": pubkey,
+            "alias": self.aliases[idx],
+            "color": self.colors[idx],
+            "last_update": int(self.node_last_update[idx]),
+        }
+
+    def _channel_dict(self, ch: int) -> Dict[str, Any]:
+        return {
+            "channel_id": self.channel_ids[ch],
+            "node1_pub": self.pubkeys[self.channel_node1[ch]],
+            "node2_pub": self.pubkeys[self.channel_node2[ch]],
+            "capacity": int(self.channel_capacity[ch]),
+            "last_update": int(self.channel_last_update[ch]),
+        }
+
+    def channel(self, channel_id: str) -> Optional[Dict[str, Any]]:
+        """Attributs d'un canal, ou None s'il est inconnu ou fermé"""
+        ch = self._get_channel_index().get(str(channel_id))
+        if ch is None or not self.channel_alive[ch]:
+            return None
+        return self._channel_dict(ch)
+
+    def node_channels(self, pubkey: str) -> List[Dict[str, Any]]:
+        """Canaux ouverts d'un nœud, orientés depuis ce nœud"""
+        idx = self.index.get(pubkey)
+        if idx is None:
+            return []
+        edges = self.out_edges(idx)
+        result = []
+        for edge in edges:
+            ch = int(self.edge_channel[edge])
+            if not self.channel_alive[ch]:
+                continue
+            result.append({
+                "channel_id": self.channel_ids[ch],
+                "node1_pub": pubkey,
+                "node2_pub": self.pubkeys[self.edge_dst[edge]],
+                "capacity": int(self.channel_capacity[ch]),
+                "last_update": int(self.channel_last_update[ch]),
+            })
+        return result
+
+    def out_edges(self, idx: int) -> np.ndarray:
+        """Indices des arêtes orientées sortant du nœud idx"""
+        return self.csr_edges[self.indptr[idx]:self.indptr[idx + 1]]
+
+    def usable_edges(self) -> np.ndarray:
+        """Masque des arêtes orientées utilisables (canal ouvert, politique connue et active)"""
+        return self.channel_alive[self.edge_channel] & self.has_policy & ~self.disabled
+
+    def to_sparse(self, weights: np.ndarray, mask: np.ndarray = None) -> sparse.csr_matrix:
+        """Matrice d'adjacence orientée (scipy) pondérée par arête
+
+        Les arêtes parallèles sont réduites à la plus petite pondération.
+
+        Args:
+            weights: Poids de chaque arête orientée
+            mask: Masque des arêtes à inclure (par défaut : toutes les arêtes utilisables)
+        """
+        if mask is None:
+            mask = self.usable_edges()
+        src = self.edge_src[mask]
+        dst = self.edge_dst[mask]
+        w = np.asarray(weights)[mask]
+
+        # Garder le poids minimal par paire orientée (csr_matrix additionnerait les doublons)
+        order = np.lexsort((w, dst, src))
+        src, dst, w = src[order], dst[order], w[order]
+        first = np.ones(len(src), dtype=bool)
+        first[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+
+        n = self.num_nodes
+        return sparse.csr_matrix((w[first], (src[first], dst[first])), shape=(n, n))
+
+    def adjacency(self) -> sparse.csr_matrix:
+        """Matrice d'adjacence non orientée et non pondérée des canaux ouverts
+
+        Les canaux parallèles et les boucles sont ignorés : chaque paire de
+        voisins apparaît une fois dans chaque sens.
+        """
+        alive = self.channel_alive & (self.channel_node1 != self.channel_node2)
+        a = self.channel_node1[alive]
+        b = self.channel_node2[alive]
+        n = self.num_nodes
+        matrix = sparse.csr_matrix(
+            (np.ones(2 * len(a), dtype=np.int8), (np.concatenate([a, b]), np.concatenate([b, a]))),
+            shape=(n, n)
+        )
+        matrix.sum_duplicates()
+        matrix.data[:] = 1
+        return matrix
+
+    # VUE NETWORKX
+
+    def _edge_attributes(self, ch: int) -> Dict[str, Any]:
+        return {
+            "channel_id": self.channel_ids[ch],
+            "capacity": int(self.channel_capacity[ch]),
+            "last_update": int(self.channel_last_update[ch]),
+        }
+
+    def to_networkx(self) -> nx.Graph:
+        """Vue NetworkX non orientée, construite une seule fois à la demande
+
+        Les nœuds portent alias/couleur/last_update et les arêtes
+        channel_id/capacité/last_update ; entre deux nœuds reliés par plusieurs
+        canaux, une seule arête est conservée (le dernier canal).
+        """
+        if self._networkx is None:
+            G = nx.Graph()
+            G.add_nodes_from(
+                (pubkey, {
+                    "pub_key": pubkey,
+                    "alias": self.aliases[i],
+                    "color": self.colors[i],
+                    "last_update": int(self.node_last_update[i]),
+                })
+                for i, pubkey in enumerate(self.pubkeys)
+            )
+            G.add_edges_from(
+                (self.pubkeys[self.channel_node1[ch]],
+                 self.pubkeys[self.channel_node2[ch]],
+                 self._edge_attributes(ch))
+                for ch in np.flatnonzero(self.channel_alive).tolist()
+            )
+            self._networkx = G
+        return self._networkx
+
+    def to_graph_data(self) -> Dict[str, Any]:
+        """Reconstruit le graphe au format LNRouter ({"nodes": [...], "channels": [...]})
+
+        Utilisé uniquement par les appelants qui ont besoin des dictionnaires
+        (par exemple un store chargé depuis le cache binaire).
+        """
+        nodes = [self.node(pubkey) for pubkey in self.pubkeys]
+        n_channels = len(self.channel_ids)
+        channels = []
+        for ch in np.flatnonzero(self.channel_alive).tolist():
+            channel = self._channel_dict(ch)
+            for edge, key in ((ch, "node1_policy"), (ch + n_channels, "node2_policy")):
+                channel[key] = {
+                    "fee_base_msat": int(self.fee_base_msat[edge]),
+                    "fee_rate_milli_msat": int(self.fee_rate_ppm[edge]),
+                    "time_lock_delta": int(self.cltv_delta[edge]),
+                    "min_htlc": int(self.min_htlc_msat[edge]),
+                    "max_htlc_msat": int(self.max_htlc_msat[edge]),
+                    "disabled": bool(self.disabled[edge]),
+                } if self.has_policy[edge] else None
+            channels.append(channel)
+        return {"nodes": nodes, "channels": channels}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques de taille du store"""
+        arrays = [value for value in vars(self).values() if isinstance(value, np.ndarray)]
+        return {
+            "version": self.version,
+            "built_at": self.built_at.isoformat(),
+            "nodes": self.num_nodes,
+            "channels": self.num_channels,
+            "array_bytes": int(sum(a.nbytes for a in arrays)),
+            "networkx_view": self._networkx is not None
+        }
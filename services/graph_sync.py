@@ -0,0 +1,254 @@
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+
+import grpc
+
+from services.lnd_client import LNDClient
+from services.async_lnd_client import call_lnd
+
+logger = logging.getLogger(__name__)
+
+
+class GraphSync:
+    """Graphe Lightning en mémoire maintenu à jour de façon incrémentale
+
+    Le graphe est initialisé une fois avec DescribeGraph, puis les mises à jour
+    de SubscribeChannelGraph (nœuds, politiques de canaux, fermetures) y sont
+    appliquées au fil de l'eau. Chaque modification incrémente `version` et
+    est consignée dans un journal borné, ce qui permet aux consommateurs de ne
+    retraiter que ce qui a changé depuis la version qu'ils connaissent.
+    """
+
+    def __init__(self, lnd_client: LNDClient = None, reconnect_delay: float = 1.0,
+                 max_reconnect_delay: float = 60.0, change_log_size: int = 100000):
+        """Initialise la synchronisation du graphe
+
+        Args:
+            lnd_client: Client LND (synchrone ou asynchrone)
+            reconnect_delay: Délai initial avant reconnexion au flux (secondes)
+            max_reconnect_delay: Délai maximal entre deux reconnexions (secondes)
+            change_log_size: Nombre maximal de modifications conservées dans le journal
+        """
+        self.lnd_client = lnd_client or LNDClient()
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.channels: Dict[str, Dict[str, Any]] = {}
+        self.version = 0
+        self.synced_at: Optional[datetime] = None
+        self.updates_applied = 0
+
+        # Journal des modifications : (version, "node" | "channel", identifiant)
+        self._change_log: deque = deque(maxlen=change_log_size)
+        # Version du dernier chargement complet : le journal ne remonte pas avant
+        self._seed_version = 0
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_version = -1
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_synced(self) -> bool:
+        """Indique si le graphe a été initialisé"""
+        return self.synced_at is not None
+
+    async def seed(self) -> None:
+        """Charge le graphe complet depuis LND (DescribeGraph)"""
+        graph = await call_lnd(self.lnd_client.describe_graph)
+
+        self.nodes = {node["pub_key"]: node for node in graph.get("nodes", [])}
+        self.channels = {
+            channel["channel_id"]: channel for channel in graph.get("channels", [])
+        }
+        self.version += 1
+        self._seed_version = self.version
+        self._change_log.clear()
+        self.synced_at = datetime.now()
+        logger.info(
+            f"Graphe LND chargé: {len(self.nodes)} nœuds, {len(self.channels)} canaux "
+            f"(version {self.version})"
+        )
+
+    def apply_update(self, update: Dict[str, Any]) -> bool:
+        """Applique une mise à jour de topologie formatée par LNDClient
+
+        Returns:
+            True si le graphe a été modifié
+        """
+        changes = []
+
+        for node_update in update.get("node_updates", []):
+            pub_key = node_update.get("pub_key")
+            if not pub_key:
+                continue
+            node = self.nodes.setdefault(pub_key, {"pub_key": pub_key})
+            node.update({k: v for k, v in node_update.items() if k != "pub_key"})
+            node["last_update"] = int(datetime.now().timestamp())
+            changes.append(("node", pub_key))
+
+        for channel_update in update.get("channel_updates", []):
+            channel_id = channel_update.get("channel_id")
+            advertising = channel_update.get("advertising_node")
+            connecting = channel_update.get("connecting_node")
+            if not channel_id or not advertising or not connecting:
+                continue
+
+            channel = self.channels.get(channel_id)
+            if channel is None:
+                # LND ordonne les extrémités d'un canal par clé publique croissante
+                node1, node2 = sorted((advertising, connecting))
+                channel = {
+                    "channel_id": channel_id,
+                    "chan_point": "",
+                    "node1_pub": node1,
+                    "node2_pub": node2,
+                    "capacity": channel_update.get("capacity", 0),
+                    "node1_policy": None,
+                    "node2_policy": None,
+                }
+                self.channels[channel_id] = channel
+
+            policy_key = (
+                "node1_policy" if advertising == channel["node1_pub"] else "node2_policy"
+            )
+            channel[policy_key] = channel_update.get("routing_policy")
+            if channel_update.get("capacity"):
+                channel["capacity"] = channel_update["capacity"]
+            changes.append(("channel", channel_id))
+
+        for closed in update.get("closed_chans", []):
+            channel_id = closed.get("channel_id")
+            if self.channels.pop(channel_id, None) is not None:
+                changes.append(("channel", channel_id))
+
+        if not changes:
+            return False
+
+        self.version += 1
+        self.updates_applied += 1
+        for kind, key in changes:
+            self._change_log.append((self.version, kind, key))
+        return True
+
+    def changes_since(self, version: int) -> Optional[Tuple[Set[str], Set[str]]]:
+        """Liste les nœuds et canaux modifiés depuis une version donnée
+
+        Returns:
+            Tuple (pubkeys, channel_ids), ou None si le journal ne remonte pas
+            jusqu'à cette version (un rechargement complet est alors nécessaire)
+        """
+        if version < self._seed_version:
+            return None
+        log_truncated = len(self._change_log) == self._change_log.maxlen
+        if log_truncated and version < self._change_log[0][0]:
+            return None
+
+        nodes: Set[str] = set()
+        channels: Set[str] = set()
+        for change_version, kind, key in reversed(self._change_log):
+            if change_version <= version:
+                break
+            (nodes if kind == "node" else channels).add(key)
+        return nodes, channels
+
+    def get_graph(self) -> Dict[str, Any]:
+        """Renvoie le graphe au format LNRouter ({"nodes": [...], "channels": [...]})
+
+        Les listes ne sont reconstruites qu'une fois par version.
+        """
+        if self._snapshot_version != self.version:
+            self._snapshot = {
+                "nodes": list(self.nodes.values()),
+                "channels": list(self.channels.values()),
+                "version": self.version,
+                "synced_at": self.synced_at.isoformat() if self.synced_at else None,
+                "source": "lnd"
+            }
+            self._snapshot_version = self.version
+        return self._snapshot
+
+    async def _buffer_updates(self, queue: asyncio.Queue, ready: asyncio.Event) -> None:
+        """Place les mises à jour du flux dans une file (None en fin de flux)
+
+        ready est signalé une fois l'abonnement établi, ou à la fin du flux
+        s'il n'a jamais pu l'être.
+        """
+        try:
+            async for update in self.lnd_client.stream_graph_updates(ready=ready):
+                queue.put_nowait(update)
+        finally:
+            queue.put_nowait(None)
+            ready.set()
+
+    async def run(self) -> None:
+        """Initialise le graphe puis suit les mises à jour jusqu'à l'arrêt
+
+        DescribeGraph n'est appelé qu'une fois l'abonnement établi ; les mises
+        à jour reçues pendant le chargement sont mises en attente, puis
+        rejouées : aucune modification émise entre l'abonnement et l'instantané
+        n'est perdue. Après chaque coupure du flux, le graphe est rechargé de
+        la même façon.
+        """
+        delay = self.reconnect_delay
+        while True:
+            queue: asyncio.Queue = asyncio.Queue()
+            ready = asyncio.Event()
+            reader = asyncio.create_task(self._buffer_updates(queue, ready))
+            try:
+                # L'instantané n'est demandé qu'une fois l'abonnement établi
+                await ready.wait()
+                if reader.done():
+                    # Abonnement refusé : l'erreur est traitée comme une coupure
+                    await reader
+                await self.seed()
+                while (update := await queue.get()) is not None:
+                    delay = self.reconnect_delay
+                    self.apply_update(update)
+                await reader
+                logger.warning("Flux de mises à jour du graphe terminé, resynchronisation")
+            except asyncio.CancelledError:
+                raise
+            except grpc.RpcError as e:
+                logger.error(f"Erreur gRPC lors de la synchronisation du graphe: {e}")
+            except Exception as e:
+                logger.error(f"Erreur lors de la synchronisation du graphe: {e}")
+            finally:
+                if not reader.done():
+                    reader.cancel()
+                    try:
+                        await reader
+                    except (asyncio.CancelledError, Exception):
+                        pass
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def start(self) -> None:
+        """Démarre la synchronisation en tâche de fond"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run(), name="lnd-graph-sync")
+
+    async def stop(self) -> None:
+        """Arrête la synchronisation"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques de synchronisation"""
+        return {
+            "synced": self.is_synced,
+            "synced_at": self.synced_at.isoformat() if self.synced_at else None,
+            "version": self.version,
+            "nodes": len(self.nodes),
+            "channels": len(self.channels),
+            "updates_applied": self.updates_applied,
+            "running": self._task is not None and not self._task.done()
+        }
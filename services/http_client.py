@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401 - requis par httpx pour HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def _origin(base_url: str) -> str:
+    """Schéma, hôte et port d'une URL (clé du pool de connexions)"""
+    url = httpx.URL(base_url)
+    port = url.port or {"http": 80, "https": 443}.get(url.scheme)
+    return f"{url.scheme}://{url.host}:{port}"
+
+
+class HTTPClientManager:
+    """Clients HTTP partagés par tous les services du processus
+
+    Un httpx.AsyncClient (donc un pool de connexions) est conservé par hôte
+    et par boucle d'événements : les appels successifs à une même API
+    réutilisent les connexions ouvertes (keepalive) au lieu de refaire une
+    poignée de main TCP + TLS à chaque requête, et sont multiplexés sur une
+    seule connexion en HTTP/2 si le paquet h2 est installé. Un client fermé,
+    ou créé dans une autre boucle (asyncio.run successifs de la CLI), est
+    recréé au prochain accès.
+    """
+
+    def __init__(self, http2: bool = None, max_connections: int = None,
+                 max_keepalive_connections: int = None, keepalive_expiry: float = None,
+                 timeout: float = None, connect_timeout: float = None):
+        """Initialise le gestionnaire
+
+        Args:
+            http2: Activer HTTP/2 (ignoré si h2 n'est pas installé)
+            max_connections: Connexions simultanées maximales par hôte
+            max_keepalive_connections: Connexions inactives conservées par hôte
+            keepalive_expiry: Durée de conservation d'une connexion inactive (secondes)
+            timeout: Délai maximal de lecture, d'écriture et d'attente du pool (secondes)
+            connect_timeout: Délai maximal d'établissement d'une connexion (secondes)
+        """
+        http2 = settings.HTTP_CLIENT_HTTP2 if http2 is None else http2
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("Paquet h2 absent (pip install 'httpx[http2]'), clients HTTP en HTTP/1.1")
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.limits = httpx.Limits(
+            max_connections=max_connections or settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=(
+                max_keepalive_connections or settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS
+            ),
+            keepalive_expiry=keepalive_expiry or settings.HTTP_CLIENT_KEEPALIVE_EXPIRY
+        )
+        self.timeout = httpx.Timeout(
+            timeout or settings.HTTP_CLIENT_TIMEOUT,
+            connect=connect_timeout or settings.HTTP_CLIENT_CONNECT_TIMEOUT
+        )
+
+        self._lock = threading.Lock()
+        self._clients: Dict[str, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+        self.clients_created = 0
+
+    def get_client(self, base_url: str) -> httpx.AsyncClient:
+        """Client partagé pour l'hôte de base_url (à appeler depuis une coroutine)
+
+        Le client ne doit pas être fermé par l'appelant.
+        """
+        origin = _origin(base_url)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._clients.get(origin)
+            if entry is not None and entry[0] is loop and not entry[1].is_closed:
+                return entry[1]
+            client = httpx.AsyncClient(http2=self.http2, limits=self.limits, timeout=self.timeout)
+            self._clients[origin] = (loop, client)
+            self.clients_created += 1
+        logger.debug(f"Client HTTP créé pour {origin} (HTTP/2: {self.http2})")
+        return client
+
+    async def close(self) -> None:
+        """Ferme les clients de la boucle courante et oublie les autres"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entries = list(self._clients.values())
+            self._clients.clear()
+        for client_loop, client in entries:
+            if client_loop is not loop or client_loop.is_closed():
+                continue
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.error(f"Erreur lors de la fermeture d'un client HTTP: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Configuration et clients ouverts"""
+        with self._lock:
+            hosts = [origin for origin, (_, client) in self._clients.items() if not client.is_closed]
+        return {
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "timeout": self.timeout.read,
+            "clients_created": self.clients_created,
+            "hosts": hosts
+        }
+
+
+_manager: Optional[HTTPClientManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_http_client_manager() -> HTTPClientManager:
+    """Gestionnaire de clients HTTP du processus"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = HTTPClientManager()
+        return _manager
+
+
+def get_http_client(base_url: str) -> httpx.AsyncClient:
+    """Client HTTP partagé pour l'hôte de base_url"""
+    return get_http_client_manager().get_client(base_url)
+
+
+async def close_all_http_clients() -> None:
+    """Ferme les clients HTTP partagés"""
+    with _manager_lock:
+        manager = _manager
+    if manager is not None:
+        await manager.close()
@@ -1,12 +1,15 @@
 import os
-import codecs
 import grpc
-from typing import Dict, List, Any, Callable, Optional, AsyncGenerator
+from typing import Dict, List, Any, Callable, Optional, AsyncGenerator, Iterator
 import asyncio
 import logging
+import threading
 from datetime import datetime, timedelta
 
+import numpy as np
+
 from core.config import settings
+from services.lnd_connection import LNDConnectionManager, get_connection_manager
 
 # Importer les protobuf générés LND
 try:
@@ -22,6 +25,60 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Taille de page par défaut des parcours paginés de ForwardingHistory
+FORWARDING_PAGE_SIZE = 10000
+
+# Champs extraits par iter_forwarding_batches
+FORWARDING_COLUMNS = (
+    "timestamp", "chan_id_in", "chan_id_out", "amt_in", "amt_out",
+    "fee", "fee_msat", "amt_in_msat", "amt_out_msat"
+)
+
+
+async def iterate_in_thread(stream_factory: Callable[[], Iterator]) -> AsyncGenerator[Any, None]:
+    """Consomme un itérateur bloquant (flux gRPC synchrone) dans un thread dédié
+    
+    Les éléments sont remis à la boucle d'événements via call_soon_threadsafe.
+    À la fermeture du générateur, le flux est annulé s'il expose cancel().
+    
+    Args:
+        stream_factory: Fonction créant l'itérateur bloquant
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    end_of_stream = object()
+    stream = stream_factory()
+    
+    def deliver(item, error=None):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, (item, error))
+        except RuntimeError:
+            # La boucle a été fermée entre-temps
+            pass
+    
+    def pump():
+        try:
+            for item in stream:
+                deliver(item)
+        except Exception as e:
+            deliver(end_of_stream, e)
+        else:
+            deliver(end_of_stream)
+    
+    threading.Thread(target=pump, name="lnd-stream", daemon=True).start()
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is end_of_stream:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        cancel = getattr(stream, "cancel", None)
+        if callable(cancel):
+            cancel()
+
 
 class LNDClient:
     """Client pour interagir avec un nœud LND via gRPC"""
@@ -30,7 +87,8 @@ class LNDClient:
         self, 
         cert_path: str = None, 
         macaroon_path: str = None, 
-        grpc_host: str = None
+        grpc_host: str = None,
+        connection: LNDConnectionManager = None
     ):
         """Initialise le client LND
         
@@ -38,6 +96,8 @@ class LNDClient:
             cert_path: Chemin vers le certificat TLS de LND
             macaroon_path: Chemin vers le macaroon admin de LND
             grpc_host: Hôte gRPC de LND (ex: localhost:10009)
+            connection: Gestionnaire de connexions (par défaut : celui partagé
+                par tous les clients du même nœud)
         """
         self.cert_path = cert_path or settings.LND_TLS_CERT_PATH
         self.macaroon_path = macaroon_path or settings.LND_MACAROON_PATH
@@ -49,42 +109,35 @@ class LNDClient:
                 "Certaines fonctionnalités seront désactivées."
             )
         
+        self._connection = connection
         self._stub = None
         self._router_stub = None
         self._channel = None
+        # Génération du canal partagé sur lequel les stubs ont été créés
+        self._channel_generation = None
     
-    def _get_credentials(self) -> grpc.ChannelCredentials:
-        """Récupère les credentials pour la connexion gRPC"""
-        cert = open(self.cert_path, 'rb').read()
-        ssl_creds = grpc.ssl_channel_credentials(cert)
-        return ssl_creds
-    
-    def _get_auth_metadata(self) -> grpc.CallCredentials:
-        """Récupère les métadonnées d'authentification"""
-        with open(self.macaroon_path, 'rb') as f:
-            macaroon_bytes = f.read()
-        macaroon = codecs.encode(macaroon_bytes, 'hex')
-        auth_credentials = grpc.metadata_call_credentials(
-            lambda context, callback: callback([('macaroon', macaroon)], None)
-        )
-        return auth_credentials
+    @property
+    def connection(self) -> LNDConnectionManager:
+        """Gestionnaire de connexions partagé (canaux gRPC, credentials)"""
+        if self._connection is None:
+            self._connection = get_connection_manager(
+                self.grpc_host, self.cert_path, self.macaroon_path
+            )
+        return self._connection
+    
+    def _get_combined_credentials(self) -> grpc.ChannelCredentials:
+        """Credentials TLS + macaroon, lus une seule fois par le gestionnaire de connexions"""
+        return self.connection.get_credentials()
+    
+    def _open_channel(self):
+        """Récupère le canal gRPC partagé"""
+        return self.connection.get_channel()
     
     def _create_stub(self):
-        """Crée le stub gRPC pour LND"""
-        if not self.cert_path or not os.path.exists(self.cert_path):
-            raise ValueError(f"Certificat TLS non trouvé: {self.cert_path}")
-            
-        if not self.macaroon_path or not os.path.exists(self.macaroon_path):
-            raise ValueError(f"Macaroon non trouvé: {self.macaroon_path}")
-        
-        # Combiner les credentials SSL et les métadonnées d'authentification
-        ssl_creds = self._get_credentials()
-        auth_creds = self._get_auth_metadata()
-        combined_creds = grpc.composite_channel_credentials(ssl_creds, auth_creds)
-        
-        # Créer le canal gRPC
-        channel = grpc.secure_channel(self.grpc_host, combined_creds)
+        """Crée les stubs gRPC sur le canal partagé"""
+        channel = self._open_channel()
         self._channel = channel
+        self._channel_generation = self._connection_generation()
         
         # Créer les stubs
         self._stub = lnrpc.LightningStub(channel)
@@ -92,17 +145,28 @@ class LNDClient:
         
         return self._stub
     
+    def _connection_generation(self) -> int:
+        """Génération du canal partagé utilisé par ce client (synchrone)"""
+        return self.connection.generation
+    
+    def _stub_is_stale(self) -> bool:
+        """Indique si le canal partagé a été recréé depuis la création des stubs"""
+        return (
+            self._channel_generation is not None
+            and self._channel_generation != self._connection_generation()
+        )
+    
     @property
     def stub(self):
         """Récupère le stub gRPC, en le créant si nécessaire"""
-        if self._stub is None:
+        if self._stub is None or self._stub_is_stale():
             self._create_stub()
         return self._stub
     
     @property
     def router_stub(self):
         """Récupère le stub du router, en le créant si nécessaire"""
-        if self._router_stub is None:
+        if self._router_stub is None or self._stub_is_stale():
             self._create_stub()
         return self._router_stub
     
@@ -110,67 +174,71 @@ class LNDClient:
         """Récupère les informations sur le nœud local"""
         try:
             response = self.stub.GetInfo(ln.GetInfoRequest())
-            # Gérer le cas où best_header_timestamp est un mock
-            best_header_timestamp = None
-            if hasattr(response, 'best_header_timestamp'):
+            return self._format_node_info(response)
+        except grpc.RpcError as e:
+            logger.error(
+                f"Erreur gRPC lors de la récupération des informations du nœud: {e}"
+            )
+            raise
+    
+    def _format_node_info(self, response) -> Dict:
+        """Formate une réponse GetInfo en dictionnaire"""
+        # Gérer le cas où best_header_timestamp est un mock
+        best_header_timestamp = None
+        if hasattr(response, 'best_header_timestamp'):
+            try:
+                best_header_timestamp = datetime.fromtimestamp(
+                    int(response.best_header_timestamp)
+                ).isoformat()
+            except (TypeError, ValueError):
+                pass
+
+        # Gérer les chaînes de manière sécurisée
+        chains = []
+        if hasattr(response, 'chains'):
+            for c in response.chains:
                 try:
-                    best_header_timestamp = datetime.fromtimestamp(
-                        int(response.best_header_timestamp)
-                    ).isoformat()
-                except (TypeError, ValueError):
+                    if isinstance(c, str):
+                        chains.append(c)
+                    else:
+                        chains.append(c.chain)
+                except AttributeError:
                     pass
 
-            # Gérer les chaînes de manière sécurisée
-            chains = []
-            if hasattr(response, 'chains'):
-                for c in response.chains:
+        # Gérer les features de manière sécurisée
+        features = {}
+        if hasattr(response, 'features') and response.features:
+            try:
+                for k, v in response.features.items():
                     try:
-                        if isinstance(c, str):
-                            chains.append(c)
-                        else:
-                            chains.append(c.chain)
+                        features[k] = {
+                            "name": str(v.name) if hasattr(v, 'name') else '',
+                            "is_required": bool(v.is_required) 
+                            if hasattr(v, 'is_required') else False,
+                            "is_known": bool(v.is_known) 
+                            if hasattr(v, 'is_known') else False
+                        }
                     except AttributeError:
                         pass
+            except (TypeError, AttributeError):
+                pass
 
-            # Gérer les features de manière sécurisée
-            features = {}
-            if hasattr(response, 'features') and response.features:
-                try:
-                    for k, v in response.features.items():
-                        try:
-                            features[k] = {
-                                "name": str(v.name) if hasattr(v, 'name') else '',
-                                "is_required": bool(v.is_required) 
-                                if hasattr(v, 'is_required') else False,
-                                "is_known": bool(v.is_known) 
-                                if hasattr(v, 'is_known') else False
-                            }
-                        except AttributeError:
-                            pass
-                except (TypeError, AttributeError):
-                    pass
-
-            return {
-                "pubkey": response.identity_pubkey,
-                "alias": response.alias,
-                "color": response.color,
-                "version": response.version,
-                "num_active_channels": response.num_active_channels,
-                "num_inactive_channels": response.num_inactive_channels,
-                "num_pending_channels": response.num_pending_channels,
-                "block_height": response.block_height,
-                "synced_to_chain": response.synced_to_chain,
-                "synced_to_graph": response.synced_to_graph,
-                "uris": response.uris,
-                "best_header_timestamp": best_header_timestamp,
-                "chains": chains,
-                "features": features
-            }
-        except grpc.RpcError as e:
-            logger.error(
-                f"Erreur gRPC lors de la récupération des informations du nœud: {e}"
-            )
-            raise
+        return {
+            "pubkey": response.identity_pubkey,
+            "alias": response.alias,
+            "color": response.color,
+            "version": response.version,
+            "num_active_channels": response.num_active_channels,
+            "num_inactive_channels": response.num_inactive_channels,
+            "num_pending_channels": response.num_pending_channels,
+            "block_height": response.block_height,
+            "synced_to_chain": response.synced_to_chain,
+            "synced_to_graph": response.synced_to_graph,
+            "uris": response.uris,
+            "best_header_timestamp": best_header_timestamp,
+            "chains": chains,
+            "features": features
+        }
     
     def list_channels(
         self, 
@@ -184,78 +252,95 @@ class LNDClient:
             inactive_only: Ne récupérer que les canaux inactifs
         """
         try:
-            request = ln.ListChannelsRequest()
-            if active_only:
-                request.active_only = True
-            elif inactive_only:
-                request.inactive_only = True
+            request = self._build_list_channels_request(active_only, inactive_only)
             response = self.stub.ListChannels(request)
-            
-            channels = []
-            for channel in response.channels:
-                if active_only and not channel.active:
-                    continue
-                if inactive_only and channel.active:
-                    continue
-                # Gérer les HTLCs de manière sécurisée
-                pending_htlcs = []
-                if hasattr(channel, 'pending_htlcs'):
-                    try:
-                        for h in channel.pending_htlcs:
-                            htlc = {
-                                "incoming": h.incoming,
-                                "amount": h.amount,
-                                "expiration_height": h.expiration_height,
-                                "htlc_index": h.htlc_index
-                            }
-                            if hasattr(h, 'hash_lock') and h.hash_lock:
-                                try:
-                                    htlc["hash_lock"] = h.hash_lock.hex()
-                                except AttributeError:
-                                    htlc["hash_lock"] = str(h.hash_lock)
-                            pending_htlcs.append(htlc)
-                    except (TypeError, AttributeError):
-                        pass
-
-                # Convertir les IDs en chaînes
-                try:
-                    channel_id = str(
-                        channel.channel_id 
-                        if hasattr(channel, 'channel_id') 
-                        else channel.chan_id
-                    )
-                except (TypeError, AttributeError):
-                    channel_id = ''
-
-                channels.append({
-                    "channel_id": channel_id,
-                    "remote_pubkey": channel.remote_pubkey,
-                    "capacity": channel.capacity,
-                    "local_balance": channel.local_balance,
-                    "remote_balance": channel.remote_balance,
-                    "unsettled_balance": channel.unsettled_balance,
-                    "active": channel.active,
-                    "private": channel.private,
-                    "initiator": channel.initiator,
-                    "total_satoshis_sent": channel.total_satoshis_sent,
-                    "total_satoshis_received": channel.total_satoshis_received,
-                    "num_updates": channel.num_updates,
-                    "commit_fee": channel.commit_fee,
-                    "commit_weight": channel.commit_weight,
-                    "fee_per_kw": channel.fee_per_kw,
-                    "chan_status_flags": channel.chan_status_flags,
-                    "local_chan_reserve_sat": channel.local_chan_reserve_sat,
-                    "remote_chan_reserve_sat": channel.remote_chan_reserve_sat,
-                    "local_balance_msat": channel.local_balance_msat,
-                    "remote_balance_msat": channel.remote_balance_msat,
-                    "pending_htlcs": pending_htlcs
-                })
-            
-            return channels
+            return self._format_channels(response, active_only, inactive_only)
         except grpc.RpcError as e:
             logger.error(f"Erreur gRPC lors de la récupération des canaux: {e}")
             raise
     
+    def _build_list_channels_request(
+        self, 
+        active_only: bool = False, 
+        inactive_only: bool = False
+    ):
+        """Construit la requête ListChannels"""
+        request = ln.ListChannelsRequest()
+        if active_only:
+            request.active_only = True
+        elif inactive_only:
+            request.inactive_only = True
+        return request
+    
+    def _format_channels(
+        self, 
+        response, 
+        active_only: bool = False, 
+        inactive_only: bool = False
+    ) -> List[Dict]:
+        """Formate une réponse ListChannels en liste de dictionnaires"""
+        channels = []
+        for channel in response.channels:
+            if active_only and not channel.active:
+                continue
+            if inactive_only and channel.active:
+                continue
+            # Gérer les HTLCs de manière sécurisée
+            pending_htlcs = []
+            if hasattr(channel, 'pending_htlcs'):
+                try:
+                    for h in channel.pending_htlcs:
+                        htlc = {
+                            "incoming": h.incoming,
+                            "amount": h.amount,
+                            "expiration_height": h.expiration_height,
+                            "htlc_index": h.htlc_index
+                        }
+                        if hasattr(h, 'hash_lock') and h.hash_lock:
+                            try:
+                                htlc["hash_lock"] = h.hash_lock.hex()
+                            except AttributeError:
+                                htlc["hash_lock"] = str(h.hash_lock)
+                        pending_htlcs.append(htlc)
+                except (TypeError, AttributeError):
+                    pass
+
+            # Convertir les IDs en chaînes
+            try:
+                channel_id = str(
+                    channel.channel_id 
+                    if hasattr(channel, 'channel_id') 
+                    else channel.chan_id
+                )
+            except (TypeError, AttributeError):
+                channel_id = ''
+
+            channels.append({
+                "channel_id": channel_id,
+                "remote_pubkey": channel.remote_pubkey,
+                "capacity": channel.capacity,
+                "local_balance": channel.local_balance,
+                "remote_balance": channel.remote_balance,
+                "unsettled_balance": channel.unsettled_balance,
+                "active": channel.active,
+                "private": channel.private,
+                "initiator": channel.initiator,
+                "total_satoshis_sent": channel.total_satoshis_sent,
+                "total_satoshis_received": channel.total_satoshis_received,
+                "num_updates": channel.num_updates,
+                "commit_fee": channel.commit_fee,
+                "commit_weight": channel.commit_weight,
+                "fee_per_kw": channel.fee_per_kw,
+                "chan_status_flags": channel.chan_status_flags,
+                "local_chan_reserve_sat": channel.local_chan_reserve_sat,
+                "remote_chan_reserve_sat": channel.remote_chan_reserve_sat,
+                "local_balance_msat": channel.local_balance_msat,
+                "remote_balance_msat": channel.remote_balance_msat,
+                "pending_htlcs": pending_htlcs
+            })
+        
+        return channels
+    
     def open_channel(
         self, 
         node_pubkey: str, 
@@ -281,30 +366,53 @@ class LNDClient:
             Channel point (outpoint) sous forme txid:output_index
         """
         try:
-            # Convertir la clé publique de hex à bytes
-            pubkey_bytes = bytes.fromhex(node_pubkey)
-            
-            request = ln.OpenChannelRequest(
-                node_pubkey=pubkey_bytes,
-                local_funding_amount=local_amount,
-                push_sat=push_amount,
-                private=private,
-                min_htlc_msat=min_htlc_msat,
-                remote_csv_delay=remote_csv_delay,
-                spend_unconfirmed=spend_unconfirmed
+            request = self._build_open_channel_request(
+                node_pubkey, local_amount, push_amount, private,
+                min_htlc_msat, remote_csv_delay, spend_unconfirmed
             )
-            
             response = self.stub.OpenChannelSync(request)
-            
-            # Le channel point est sous la forme txid:output_index
-            funding_txid_bytes = response.funding_txid_bytes[::-1].hex()
-            channel_point = f"{funding_txid_bytes}:{response.output_index}"
-            
-            return channel_point
+            return self._format_channel_point(response)
         except grpc.RpcError as e:
             logger.error(f"Erreur gRPC lors de l'ouverture du canal: {e}")
             raise
     
+    def _build_open_channel_request(
+        self, 
+        node_pubkey: str, 
+        local_amount: int, 
+        push_amount: int, 
+        private: bool, 
+        min_htlc_msat: int, 
+        remote_csv_delay: int, 
+        spend_unconfirmed: bool
+    ):
+        """Construit la requête OpenChannel"""
+        # Convertir la clé publique de hex à bytes
+        pubkey_bytes = bytes.fromhex(node_pubkey)
+        
+        return ln.OpenChannelRequest(
+            node_pubkey=pubkey_bytes,
+            local_funding_amount=local_amount,
+            push_sat=push_amount,
+            private=private,
+            min_htlc_msat=min_htlc_msat,
+            remote_csv_delay=remote_csv_delay,
+            spend_unconfirmed=spend_unconfirmed
+        )
+    
+    def _format_channel_point(self, response) -> str:
+        """Formate la réponse OpenChannelSync en channel point txid:output_index"""
+        funding_txid_bytes = response.funding_txid_bytes[::-1].hex()
+        return f"{funding_txid_bytes}:{response.output_index}"
+    
+    def _parse_channel_point(self, channel_point: str):
+        """Construit un ChannelPoint à partir de sa forme txid:output_index"""
+        txid, output_index = channel_point.split(':')
+        return ln.ChannelPoint(
+            funding_txid_str=txid,
+            output_index=int(output_index)
+        )
+    
     def close_channel(
         self, 
         channel_point: str, 
@@ -322,43 +430,45 @@ class LNDClient:
             Transaction ID de la transaction de fermeture
         """
         try:
-            # Parser le channel point
-            txid, output_index = channel_point.split(':')
-            
-            # Construire le ChannelPoint
-            cp = ln.ChannelPoint(
-                funding_txid_str=txid,
-                output_index=int(output_index)
-            )
-            
             request = ln.CloseChannelRequest(
-                channel_point=cp,
+                channel_point=self._parse_channel_point(channel_point),
                 force=force,
                 target_conf=target_conf
             )
             
             # CloseChannel est un stream RPC
             for update in self.stub.CloseChannel(request):
-                if update.HasField('close_pending'):
-                    logger.info(
-                        f"Fermeture du canal en attente. Txid: {update.close_pending.txid.hex()}"
-                    )
-                elif update.HasField('chan_close'):
-                    close_type = [
-                        "COOPERATIVE", "LOCAL_FORCE", "REMOTE_FORCE", 
-                        "BREACH", "FUNDING_CANCELED", "ABANDONED"
-                    ][update.chan_close.close_type]
-                    logger.info(
-                        f"Canal fermé. Type: {close_type}. "
-                        f"Txid: {update.chan_close.closing_txid.hex()}"
-                    )
-                    return update.chan_close.closing_txid.hex()
+                closing_txid = self._handle_close_update(update)
+                if closing_txid:
+                    return closing_txid
             
             return None
         except grpc.RpcError as e:
             logger.error(f"Erreur gRPC lors de la fermeture du canal: {e}")
             raise
     
+    def _handle_close_update(self, update) -> Optional[str]:
+        """Traite une mise à jour du stream CloseChannel
+        
+        Returns:
+            Txid de fermeture si le canal est fermé, None sinon
+        """
+        if update.HasField('close_pending'):
+            logger.info(
+                f"Fermeture du canal en attente. Txid: {update.close_pending.txid.hex()}"
+            )
+        elif update.HasField('chan_close'):
+            close_type = [
+                "COOPERATIVE", "LOCAL_FORCE", "REMOTE_FORCE", 
+                "BREACH", "FUNDING_CANCELED", "ABANDONED"
+            ][update.chan_close.close_type]
+            logger.info(
+                f"Canal fermé. Type: {close_type}. "
+                f"Txid: {update.chan_close.closing_txid.hex()}"
+            )
+            return update.chan_close.closing_txid.hex()
+        return None
+    
     def update_channel_policy(
         self, 
         channel_point: str, 
@@ -378,36 +488,9 @@ class LNDClient:
             True si la mise à jour a réussi
         """
         try:
-            # Parser le channel point
-            txid, output_index = channel_point.split(':')
-            
-            # Construire le ChannelPoint
-            cp = ln.ChannelPoint(
-                funding_txid_str=txid,
-                output_index=int(output_index)
-            )
-            
-            # Créer un masque pour les champs à mettre à jour
-            update_mask = 0
-            if base_fee_msat is not None:
-                update_mask |= 1
-            if fee_rate is not None:
-                update_mask |= 2
-            if time_lock_delta is not None:
-                update_mask |= 4
-            
-            request = ln.PolicyUpdateRequest(
-                chan_point=cp,
-                base_fee_msat=base_fee_msat if base_fee_msat is not None else 0,
-                fee_rate=fee_rate / 1000000 if fee_rate is not None else 0,  # Convertir ppm en valeur décimale
-                time_lock_delta=time_lock_delta if time_lock_delta is not None else 0,
-                max_htlc_msat=0,  # Non mis à jour
-                min_htlc_msat=0,  # Non mis à jour
-                min_htlc_msat_specified=False,
-                max_htlc_msat_specified=False,
-                fee_rate_ppm=fee_rate if fee_rate is not None else 0
+            request = self._build_policy_update_request(
+                channel_point, base_fee_msat, fee_rate, time_lock_delta
             )
-            
             self.stub.UpdateChannelPolicy(request)
             return True
         except grpc.RpcError as e:
@@ -416,6 +499,37 @@ class LNDClient:
             )
             raise
     
+    def _build_policy_update_request(
+        self, 
+        channel_point: str, 
+        base_fee_msat: int = None, 
+        fee_rate: int = None, 
+        time_lock_delta: int = None
+    ):
+        """Construit la requête PolicyUpdate"""
+        cp = self._parse_channel_point(channel_point)
+        
+        # Créer un masque pour les champs à mettre à jour
+        update_mask = 0
+        if base_fee_msat is not None:
+            update_mask |= 1
+        if fee_rate is not None:
+            update_mask |= 2
+        if time_lock_delta is not None:
+            update_mask |= 4
+        
+        return ln.PolicyUpdateRequest(
+            chan_point=cp,
+            base_fee_msat=base_fee_msat if base_fee_msat is not None else 0,
+            fee_rate=fee_rate / 1000000 if fee_rate is not None else 0,  # Convertir ppm en valeur décimale
+            time_lock_delta=time_lock_delta if time_lock_delta is not None else 0,
+            max_htlc_msat=0,  # Non mis à jour
+            min_htlc_msat=0,  # Non mis à jour
+            min_htlc_msat_specified=False,
+            max_htlc_msat_specified=False,
+            fee_rate_ppm=fee_rate if fee_rate is not None else 0
+        )
+    
     def get_forwarding_history(
         self, 
         start_time: int = None, 
@@ -435,46 +549,322 @@ class LNDClient:
             Historique des transferts avec les détails
         """
         try:
-            # Si les timestamps ne sont pas spécifiés, utiliser une période par défaut (1 semaine)
-            now = int(datetime.now().timestamp())
-            if end_time is None:
-                end_time = now
-            if start_time is None:
-                start_time = now - 7 * 24 * 60 * 60  # 7 jours
-            
-            request = ln.ForwardingHistoryRequest(
-                start_time=start_time,
-                end_time=end_time,
-                limit=limit
+            request = self._build_forwarding_history_request(
+                start_time, end_time, offset, limit
             )
-            
             response = self.stub.ForwardingHistory(request)
-            
-            forwarding_events = []
-            for event in response.forwarding_events:
-                forwarding_events.append({
-                    "timestamp": datetime.fromtimestamp(event.timestamp).isoformat(),
-                    "chan_id_in": str(event.chan_id_in),
-                    "chan_id_out": str(event.chan_id_out),
-                    "amt_in": event.amt_in,
-                    "amt_out": event.amt_out,
-                    "fee": event.fee,
-                    "fee_msat": event.fee_msat,
-                    "amt_in_msat": event.amt_in_msat,
-                    "amt_out_msat": event.amt_out_msat,
-                })
-            
-            return {
-                "forwarding_events": forwarding_events,
-                "last_offset_index": response.last_offset_index,
-                "total_count": len(forwarding_events)
-            }
+            return self._format_forwarding_history(response)
         except grpc.RpcError as e:
             logger.error(
                 f"Erreur gRPC lors de la récupération de l'historique de transfert: {e}"
             )
             raise
     
+    def _build_forwarding_history_request(
+        self, 
+        start_time: int = None, 
+        end_time: int = None, 
+        offset: int = 0, 
+        limit: int = 100
+    ):
+        """Construit la requête ForwardingHistory"""
+        # Si les timestamps ne sont pas spécifiés, utiliser une période par défaut (1 semaine)
+        now = int(datetime.now().timestamp())
+        if end_time is None:
+            end_time = now
+        if start_time is None:
+            start_time = now - 7 * 24 * 60 * 60  # 7 jours
+        
+        return ln.ForwardingHistoryRequest(
+            start_time=start_time,
+            end_time=end_time,
+            index_offset=offset,
+            num_max_events=limit
+        )
+    
+    def _format_forwarding_event(self, event) -> Dict:
+        """Formate un ForwardingEvent en dictionnaire"""
+        return {
+            "timestamp": datetime.fromtimestamp(event.timestamp).isoformat(),
+            # Horodatage précis : distingue deux forwards de la même seconde
+            "timestamp_ns": event.timestamp_ns or event.timestamp * 1_000_000_000,
+            "chan_id_in": str(event.chan_id_in),
+            "chan_id_out": str(event.chan_id_out),
+            "amt_in": event.amt_in,
+            "amt_out": event.amt_out,
+            "fee": event.fee,
+            "fee_msat": event.fee_msat,
+            "amt_in_msat": event.amt_in_msat,
+            "amt_out_msat": event.amt_out_msat,
+        }
+    
+    def _format_forwarding_history(self, response) -> Dict:
+        """Formate une réponse ForwardingHistory en dictionnaire"""
+        forwarding_events = [
+            self._format_forwarding_event(event)
+            for event in response.forwarding_events
+        ]
+        
+        return {
+            "forwarding_events": forwarding_events,
+            "last_offset_index": response.last_offset_index,
+            "total_count": len(forwarding_events)
+        }
+    
+    async def _fetch_forwarding_page(self, request):
+        """Exécute un appel ForwardingHistory sans bloquer la boucle d'événements"""
+        return await asyncio.to_thread(self.stub.ForwardingHistory, request)
+    
+    async def _iter_forwarding_pages(
+        self,
+        start_time: int = None,
+        end_time: int = None,
+        page_size: int = FORWARDING_PAGE_SIZE,
+        index_offset: int = 0
+    ) -> AsyncGenerator[Any, None]:
+        """Parcourt les réponses ForwardingHistory brutes page par page
+        
+        La page suivante démarre au last_offset_index renvoyé par LND ; le
+        parcours s'arrête sur une page incomplète ou si l'offset n'avance plus.
+        """
+        offset = index_offset
+        while True:
+            request = self._build_forwarding_history_request(
+                start_time, end_time, offset, page_size
+            )
+            try:
+                response = await self._fetch_forwarding_page(request)
+            except grpc.RpcError as e:
+                logger.error(
+                    f"Erreur gRPC lors de la récupération de l'historique de transfert "
+                    f"(offset {offset}): {e}"
+                )
+                raise
+            
+            yield response
+            
+            next_offset = response.last_offset_index
+            if len(response.forwarding_events) < page_size or next_offset <= offset:
+                break
+            offset = next_offset
+    
+    async def iter_forwarding_history(
+        self,
+        start_time: int = None,
+        end_time: int = None,
+        page_size: int = FORWARDING_PAGE_SIZE,
+        index_offset: int = 0
+    ) -> AsyncGenerator[Dict, None]:
+        """Itère sur tout l'historique de routage de la période, sans limite
+        
+        Contrairement à get_forwarding_history, toutes les pages sont
+        parcourues : les événements sont produits au fil de leur arrivée.
+        
+        Args:
+            start_time: Timestamp UNIX de début
+            end_time: Timestamp UNIX de fin
+            page_size: Nombre d'événements demandés par appel à LND
+            index_offset: Index de départ (last_offset_index d'un parcours précédent)
+        
+        Yields:
+            Événements de forwarding au format de get_forwarding_history
+        """
+        async for response in self._iter_forwarding_pages(
+            start_time, end_time, page_size, index_offset
+        ):
+            for event in response.forwarding_events:
+                yield self._format_forwarding_event(event)
+    
+    async def iter_forwarding_pages(
+        self,
+        start_time: int = None,
+        end_time: int = None,
+        page_size: int = FORWARDING_PAGE_SIZE,
+        index_offset: int = 0
+    ) -> AsyncGenerator[Dict, None]:
+        """Itère sur l'historique de routage page par page
+        
+        Chaque page a le format de get_forwarding_history ; son
+        last_offset_index permet de reprendre le parcours plus tard
+        (ingestion incrémentale).
+        
+        Yields:
+            Dictionnaires {"forwarding_events", "last_offset_index", "total_count"}
+        """
+        async for response in self._iter_forwarding_pages(
+            start_time, end_time, page_size, index_offset
+        ):
+            yield self._format_forwarding_history(response)
+    
+    async def iter_forwarding_batches(
+        self,
+        start_time: int = None,
+        end_time: int = None,
+        page_size: int = FORWARDING_PAGE_SIZE,
+        index_offset: int = 0
+    ) -> AsyncGenerator[Dict[str, np.ndarray], None]:
+        """Itère sur l'historique de routage en lots colonnaires
+        
+        Chaque page est convertie en tableaux numpy (un par champ) sans passer
+        par des dictionnaires : la mémoire utilisée reste bornée par page_size,
+        quelle que soit la profondeur de l'historique.
+        
+        Yields:
+            Dictionnaires {champ: np.ndarray} ; "timestamp" est en secondes UNIX
+            et "last_offset_index" contient l'offset de fin de la page
+        """
+        async for response in self._iter_forwarding_pages(
+            start_time, end_time, page_size, index_offset
+        ):
+            if not response.forwarding_events:
+                continue
+            batch = self._forwarding_events_to_columns(response.forwarding_events)
+            batch["last_offset_index"] = response.last_offset_index
+            yield batch
+    
+    @staticmethod
+    def _forwarding_events_to_columns(events) -> Dict[str, np.ndarray]:
+        """Convertit une liste de ForwardingEvent en tableaux colonnaires"""
+        count = len(events)
+        columns = {
+            field: np.fromiter(
+                (getattr(event, field) for event in events),
+                dtype=np.uint64 if field.startswith("chan_id") else np.int64,
+                count=count
+            )
+            for field in FORWARDING_COLUMNS
+        }
+        return columns
+    
+    def describe_graph(self, include_unannounced: bool = False) -> Dict:
+        """Récupère le graphe complet du réseau tel que vu par LND
+        
+        Args:
+            include_unannounced: Inclure les canaux privés du nœud
+        
+        Returns:
+            Dictionnaire {"nodes": [...], "channels": [...]} au format LNRouter
+        """
+        try:
+            request = ln.ChannelGraphRequest(include_unannounced=include_unannounced)
+            response = self.stub.DescribeGraph(request)
+            return self._format_graph(response)
+        except grpc.RpcError as e:
+            logger.error(f"Erreur gRPC lors de la récupération du graphe: {e}")
+            raise
+    
+    def _format_routing_policy(self, policy) -> Dict:
+        """Formate une RoutingPolicy en dictionnaire"""
+        return {
+            "time_lock_delta": policy.time_lock_delta,
+            "min_htlc": policy.min_htlc,
+            "fee_base_msat": policy.fee_base_msat,
+            "fee_rate_milli_msat": policy.fee_rate_milli_msat,
+            "disabled": policy.disabled,
+            "max_htlc_msat": policy.max_htlc_msat,
+            "last_update": policy.last_update,
+        }
+    
+    def _format_graph_node(self, node) -> Dict:
+        """Formate un LightningNode en dictionnaire"""
+        return {
+            "pub_key": node.pub_key,
+            "alias": node.alias,
+            "color": node.color,
+            "last_update": node.last_update,
+            "addresses": [
+                {"network": a.network, "addr": a.addr} for a in node.addresses
+            ],
+        }
+    
+    def _format_graph_edge(self, edge) -> Dict:
+        """Formate un ChannelEdge en dictionnaire"""
+        return {
+            "channel_id": str(edge.channel_id),
+            "chan_point": edge.chan_point,
+            "node1_pub": edge.node1_pub,
+            "node2_pub": edge.node2_pub,
+            "capacity": edge.capacity,
+            "node1_policy": self._format_routing_policy(edge.node1_policy)
+            if edge.HasField("node1_policy") else None,
+            "node2_policy": self._format_routing_policy(edge.node2_policy)
+            if edge.HasField("node2_policy") else None,
+        }
+    
+    def _format_graph(self, response) -> Dict:
+        """Formate une réponse DescribeGraph en dictionnaire"""
+        return {
+            "nodes": [self._format_graph_node(node) for node in response.nodes],
+            "channels": [self._format_graph_edge(edge) for edge in response.edges],
+        }
+    
+    def _format_graph_update(self, update) -> Dict:
+        """Formate une mise à jour GraphTopologyUpdate en dictionnaire"""
+        return {
+            "node_updates": [
+                {
+                    "pub_key": node.identity_key,
+                    "alias": node.alias,
+                    "color": node.color,
+                    "addresses": [
+                        {"network": a.network, "addr": a.addr}
+                        for a in node.node_addresses
+                    ],
+                }
+                for node in update.node_updates
+            ],
+            "channel_updates": [
+                {
+                    "channel_id": str(channel.chan_id),
+                    "capacity": channel.capacity,
+                    "advertising_node": channel.advertising_node,
+                    "connecting_node": channel.connecting_node,
+                    "routing_policy": self._format_routing_policy(channel.routing_policy),
+                }
+                for channel in update.channel_updates
+            ],
+            "closed_chans": [
+                {
+                    "channel_id": str(closed.chan_id),
+                    "capacity": closed.capacity,
+                    "closed_height": closed.closed_height,
+                }
+                for closed in update.closed_chans
+            ],
+        }
+    
+    async def stream_graph_updates(self, ready: asyncio.Event = None) -> AsyncGenerator[Dict, None]:
+        """Itère sur les mises à jour de topologie du graphe (SubscribeChannelGraph)
+        
+        Le flux gRPC synchrone est consommé dans un thread dédié.
+        
+        Args:
+            ready: Événement signalé dès que l'appel est lancé sur le canal
+                (les appels suivants sur ce canal partent après lui)
+        """
+        request = ln.GraphTopologySubscription()
+        stream = self.stub.SubscribeChannelGraph(request)
+        if ready is not None:
+            ready.set()
+        async for update in iterate_in_thread(lambda: stream):
+            yield self._format_graph_update(update)
+    
+    async def stream_channel_events(self) -> AsyncGenerator[tuple, None]:
+        """Itère sur les événements de canal sans bloquer la boucle d'événements
+        
+        Le flux gRPC synchrone est consommé dans un thread dédié.
+        
+        Yields:
+            Tuples (event_type, data)
+        """
+        request = ln.ChannelEventSubscription()
+        async for update in iterate_in_thread(
+            lambda: self.stub.SubscribeChannelEvents(request)
+        ):
+            event_type, data = self._format_channel_event(update)
+            if event_type:
+                yield event_type, data
+    
     async def subscribe_channel_events(self, callback: Callable) -> None:
         """Souscrit aux événements de canal (ouverture, fermeture, etc.)
         
@@ -482,59 +872,71 @@ class LNDClient:
             callback: Fonction appelée pour chaque événement avec les arguments (event_type, data)
         """
         try:
-            request = ln.ChannelEventSubscription()
-            
-            for update in self.stub.SubscribeChannelEvents(request):
-                event_type = None
-                data = {}
-                
-                if update.HasField('open_channel'):
-                    event_type = "open_channel"
-                    channel = update.open_channel
-                    data = {
-                        "channel_id": channel.chan_id,
-                        "remote_pubkey": channel.remote_pubkey,
-                        "capacity": channel.capacity,
-                    }
-                elif update.HasField('closed_channel'):
-                    event_type = "closed_channel"
-                    channel = update.closed_channel
-                    data = {
-                        "channel_id": channel.chan_id,
-                        "remote_pubkey": channel.remote_pubkey,
-                        "capacity": channel.capacity,
-                        "close_type": channel.close_type,
-                    }
-                elif update.HasField('active_channel'):
-                    event_type = "active_channel"
-                    channel = update.active_channel
-                    data = {
-                        "channel_id": channel.chan_id,
-                        "remote_pubkey": channel.remote_pubkey,
-                    }
-                elif update.HasField('inactive_channel'):
-                    event_type = "inactive_channel"
-                    channel = update.inactive_channel
-                    data = {
-                        "channel_id": channel.chan_id,
-                        "remote_pubkey": channel.remote_pubkey,
-                    }
-                elif update.HasField('pending_open_channel'):
-                    event_type = "pending_open_channel"
-                    channel = update.pending_open_channel
-                    data = {
-                        "channel_id": channel.channel.chan_id,
-                        "remote_pubkey": channel.channel.remote_pubkey,
-                    }
-                
-                if event_type:
-                    await callback(event_type, data)
+            async for event_type, data in self.stream_channel_events():
+                await callback(event_type, data)
         except grpc.RpcError as e:
             logger.error(
                 f"Erreur gRPC lors de l'abonnement aux événements de canal: {e}"
             )
             raise
     
+    def _format_channel_event(self, update):
+        """Formate une mise à jour SubscribeChannelEvents
+        
+        Returns:
+            Tuple (event_type, data), event_type valant None si l'événement est ignoré
+        """
+        event_type = None
+        data = {}
+        
+        if update.HasField('open_channel'):
+            event_type = "open_channel"
+            channel = update.open_channel
+            data = {
+                "channel_id": channel.channel_id,
+                "remote_pubkey": channel.remote_pubkey,
+                "capacity": channel.capacity,
+            }
+        elif update.HasField('closed_channel'):
+            event_type = "closed_channel"
+            channel = update.closed_channel
+            data = {
+                "channel_id": channel.chan_id,
+                "remote_pubkey": channel.remote_pubkey,
+                "capacity": channel.capacity,
+                "close_type": ln.ChannelCloseSummary.ClosureType.Name(channel.close_type),
+            }
+        elif update.HasField('active_channel'):
+            # LND ne transmet que le channel point des canaux (dés)activés
+            event_type = "active_channel"
+            data = {"channel_point": self._format_event_channel_point(update.active_channel)}
+        elif update.HasField('inactive_channel'):
+            event_type = "inactive_channel"
+            data = {"channel_point": self._format_event_channel_point(update.inactive_channel)}
+        elif update.HasField('pending_open_channel'):
+            event_type = "pending_open_channel"
+            pending = update.pending_open_channel
+            data = {"channel_point": f"{pending.txid[::-1].hex()}:{pending.output_index}"}
+        elif update.HasField('fully_resolved_channel'):
+            event_type = "fully_resolved_channel"
+            data = {"channel_point": self._format_event_channel_point(update.fully_resolved_channel)}
+        
+        return event_type, data
+    
+    def _format_event_channel_point(self, channel_point) -> str:
+        """Formate un ChannelPoint (txid en octets ou en chaîne) en txid:output_index"""
+        if channel_point.HasField('funding_txid_str'):
+            return f"{channel_point.funding_txid_str}:{channel_point.output_index}"
+        return self._format_channel_point(channel_point)
+    
+    async def stream_invoice_events(self) -> AsyncGenerator[Dict, None]:
+        """Itère sur les événements d'invoice sans bloquer la boucle d'événements"""
+        request = ln.InvoiceSubscription(add_index=0, settle_index=0)
+        async for invoice in iterate_in_thread(
+            lambda: self.stub.SubscribeInvoices(request)
+        ):
+            yield self._format_invoice(invoice)
+    
     async def subscribe_invoice_events(self, callback: Callable) -> None:
         """Souscrit aux événements d'invoice
         
@@ -542,10 +944,8 @@ class LNDClient:
             callback: Fonction appelée pour chaque événement avec l'argument (invoice)
         """
         try:
-            request = ln.InvoiceSubscription(add_index=0, settle_index=0)
-            
-            for invoice in self.stub.SubscribeInvoices(request):
-                await callback(self._format_invoice(invoice))
+            async for invoice in self.stream_invoice_events():
+                await callback(invoice)
         except grpc.RpcError as e:
             logger.error(
                 f"Erreur gRPC lors de l'abonnement aux événements d'invoice: {e}"
@@ -573,12 +973,12 @@ class LNDClient:
                 {
                     "hop_hints": [
                         {
-                            "node_id": hint.node_id.hex(),
+                            "node_id": hint.node_id,
                             "chan_id": hint.chan_id,
                             "fee_base_msat": hint.fee_base_msat,
                             "fee_proportional_millionths": hint.fee_proportional_millionths,
                             "cltv_expiry_delta": hint.cltv_expiry_delta
-                        } for hint in router.hop_hints
+                        } for hint in route.hop_hints
                     ]
                 } for route in invoice.route_hints
             ],
@@ -642,96 +1042,107 @@ class LNDClient:
             Résultat du rééquilibrage
         """
         try:
-            if not source_channels or not target_channels:
-                raise ValueError("Les canaux source et cible sont requis")
-                
-            source_channels_int = [int(c) for c in source_channels]
-            target_channels_int = [int(c) for c in target_channels]
-            
-            # Construire la requête SendToRouteRequest
-            request = router.SendToRouteRequest(
-                payment_hash=os.urandom(32),  # Hash aléatoire
-                amt_msat=amount_sat * 1000,
-                outgoing_chan_id=source_channels_int[0],  # Utiliser le premier canal source
-                fee_limit_sat=fee_limit_sat
+            request = self._build_send_to_route_request(
+                source_channels, target_channels, amount_sat, fee_limit_sat
             )
             
-            # Intégrer les restrictions de canal dans les hints
-            outgoing_chan_ids = source_channels_int
-            last_hop_channel_ids = target_channels_int
-            
             # Exécuter le rééquilibrage
             response = self.router_stub.SendToRoute(request)
+            return self._format_send_to_route_response(response)
+        except grpc.RpcError as e:
+            logger.error(f"Erreur gRPC lors du rééquilibrage des canaux: {e}")
+            raise
+    
+    def _build_send_to_route_request(
+        self, 
+        source_channels: List[str], 
+        target_channels: List[str], 
+        amount_sat: int, 
+        fee_limit_sat: int
+    ):
+        """Construit la requête SendToRoute utilisée pour le rééquilibrage"""
+        if not source_channels or not target_channels:
+            raise ValueError("Les canaux source et cible sont requis")
             
-            if response.failure:
-                return {
-                    "success": False,
-                    "error": {
-                        "code": response.failure.code,
-                        "channel_update": {
-                            "signature": response.failure.channel_update.signature.hex(),
-                            "chain_hash": response.failure.channel_update.chain_hash.hex(),
-                            "chan_id": response.failure.channel_update.chan_id,
-                            "timestamp": response.failure.channel_update.timestamp,
-                            "message_flags": response.failure.channel_update.message_flags,
-                            "channel_flags": response.failure.channel_update.channel_flags,
-                            "time_lock_delta": response.failure.channel_update.time_lock_delta,
-                            "htlc_minimum_msat": response.failure.channel_update.htlc_minimum_msat,
-                            "base_fee": response.failure.channel_update.base_fee,
-                            "fee_rate": response.failure.channel_update.fee_rate,
-                            "htlc_maximum_msat": response.failure.channel_update.htlc_maximum_msat,
-                            "extra_opaque_data": response.failure.channel_update.extra_opaque_data.hex()
-                        },
-                        "htlc_msat": response.failure.htlc_msat,
-                        "onion_sha_256": response.failure.onion_sha_256.hex(),
-                        "cltv_expiry": response.failure.cltv_expiry,
-                        "flags": response.failure.flags,
-                        "failure_source_index": response.failure.failure_source_index,
-                        "height": response.failure.height
-                    }
+        source_channels_int = [int(c) for c in source_channels]
+        target_channels_int = [int(c) for c in target_channels]
+        
+        # Construire la requête SendToRouteRequest
+        return router.SendToRouteRequest(
+            payment_hash=os.urandom(32),  # Hash aléatoire
+            amt_msat=amount_sat * 1000,
+            outgoing_chan_id=source_channels_int[0],  # Utiliser le premier canal source
+            fee_limit_sat=fee_limit_sat
+        )
+    
+    def _format_send_to_route_response(self, response) -> Dict:
+        """Formate la réponse SendToRoute en dictionnaire"""
+        if response.failure:
+            return {
+                "success": False,
+                "error": {
+                    "code": response.failure.code,
+                    "channel_update": {
+                        "signature": response.failure.channel_update.signature.hex(),
+                        "chain_hash": response.failure.channel_update.chain_hash.hex(),
+                        "chan_id": response.failure.channel_update.chan_id,
+                        "timestamp": response.failure.channel_update.timestamp,
+                        "message_flags": response.failure.channel_update.message_flags,
+                        "channel_flags": response.failure.channel_update.channel_flags,
+                        "time_lock_delta": response.failure.channel_update.time_lock_delta,
+                        "htlc_minimum_msat": response.failure.channel_update.htlc_minimum_msat,
+                        "base_fee": response.failure.channel_update.base_fee,
+                        "fee_rate": response.failure.channel_update.fee_rate,
+                        "htlc_maximum_msat": response.failure.channel_update.htlc_maximum_msat,
+                        "extra_opaque_data": response.failure.channel_update.extra_opaque_data.hex()
+                    },
+                    "htlc_msat": response.failure.htlc_msat,
+                    "onion_sha_256": response.failure.onion_sha_256.hex(),
+                    "cltv_expiry": response.failure.cltv_expiry,
+                    "flags": response.failure.flags,
+                    "failure_source_index": response.failure.failure_source_index,
+                    "height": response.failure.height
                 }
-            else:
-                return {
-                    "success": True,
-                    "preimage": response.preimage.hex(),
-                    "route": {
-                        "total_time_lock": response.route.total_time_lock,
-                        "total_fees": response.route.total_fees,
-                        "total_amt": response.route.total_amt,
-                        "hops": [
-                            {
-                                "chan_id": hop.chan_id,
-                                "chan_capacity": hop.chan_capacity,
-                                "amt_to_forward": hop.amt_to_forward,
-                                "fee": hop.fee,
-                                "expiry": hop.expiry,
-                                "amt_to_forward_msat": hop.amt_to_forward_msat,
-                                "fee_msat": hop.fee_msat,
-                                "pub_key": hop.pub_key,
-                                "tlv_payload": hop.tlv_payload,
-                                "mpp_record": {
-                                    "payment_addr": hop.mpp_record.payment_addr.hex() 
-                                        if hop.mpp_record else None,
-                                    "total_amt_msat": hop.mpp_record.total_amt_msat 
-                                        if hop.mpp_record else None
-                                } if hop.HasField('mpp_record') else None,
-                                "amp_record": {
-                                    "root_share": hop.amp_record.root_share.hex() 
-                                        if hop.amp_record else None,
-                                    "set_id": hop.amp_record.set_id.hex() 
-                                        if hop.amp_record else None,
-                                    "child_index": hop.amp_record.child_index 
-                                        if hop.amp_record else None
-                                } if hop.HasField('amp_record') else None,
-                                "custom_records": {
-                                    k: v.hex() for k, v in hop.custom_records.items()
-                                }
-                            } for hop in response.route.hops
-                        ],
-                        "total_fees_msat": response.route.total_fees_msat,
-                        "total_amt_msat": response.route.total_amt_msat
-                    }
+            }
+        else:
+            return {
+                "success": True,
+                "preimage": response.preimage.hex(),
+                "route": {
+                    "total_time_lock": response.route.total_time_lock,
+                    "total_fees": response.route.total_fees,
+                    "total_amt": response.route.total_amt,
+                    "hops": [
+                        {
+                            "chan_id": hop.chan_id,
+                            "chan_capacity": hop.chan_capacity,
+                            "amt_to_forward": hop.amt_to_forward,
+                            "fee": hop.fee,
+                            "expiry": hop.expiry,
+                            "amt_to_forward_msat": hop.amt_to_forward_msat,
+                            "fee_msat": hop.fee_msat,
+                            "pub_key": hop.pub_key,
+                            "tlv_payload": hop.tlv_payload,
+                            "mpp_record": {
+                                "payment_addr": hop.mpp_record.payment_addr.hex() 
+                                    if hop.mpp_record else None,
+                                "total_amt_msat": hop.mpp_record.total_amt_msat 
+                                    if hop.mpp_record else None
+                            } if hop.HasField('mpp_record') else None,
+                            "amp_record": {
+                                "root_share": hop.amp_record.root_share.hex() 
+                                    if hop.amp_record else None,
+                                "set_id": hop.amp_record.set_id.hex() 
+                                    if hop.amp_record else None,
+                                "child_index": hop.amp_record.child_index 
+                                    if hop.amp_record else None
+                            } if hop.HasField('amp_record') else None,
+                            "custom_records": {
+                                k: v.hex() for k, v in hop.custom_records.items()
+                            }
+                        } for hop in response.route.hops
+                    ],
+                    "total_fees_msat": response.route.total_fees_msat,
+                    "total_amt_msat": response.route.total_amt_msat
                 }
-        except grpc.RpcError as e:
-            logger.error(f"Erreur gRPC lors du rééquilibrage des canaux: {e}")
-            raise 
\ No newline at end of file
+            }
@@ -0,0 +1,233 @@
+import asyncio
+import codecs
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import grpc
+from grpc import aio
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LNDConnectionManager:
+    """Canaux gRPC vers LND partagés par tous les clients du processus
+
+    Le certificat TLS et le macaroon ne sont lus qu'une fois (relus si les
+    fichiers changent sur disque). Un seul canal synchrone et un canal
+    grpc.aio par boucle d'événements sont ouverts, avec pings keepalive,
+    reconnexion automatique à backoff exponentiel et taille maximale des
+    messages configurable (DescribeGraph dépasse la limite par défaut de 4 Mo).
+    Un canal fermé ou arrêté est recréé au prochain accès ; `generation`
+    est alors incrémenté pour que les clients reconstruisent leurs stubs.
+    """
+
+    def __init__(
+        self,
+        grpc_host: str = None,
+        cert_path: str = None,
+        macaroon_path: str = None,
+        keepalive_time_ms: int = None,
+        keepalive_timeout_ms: int = None,
+        max_message_length: int = None,
+        reconnect_backoff_ms: int = None,
+        max_reconnect_backoff_ms: int = None
+    ):
+        """Initialise le gestionnaire de connexions
+
+        Args:
+            grpc_host: Hôte gRPC de LND (ex: localhost:10009)
+            cert_path: Chemin vers le certificat TLS de LND
+            macaroon_path: Chemin vers le macaroon de LND
+            keepalive_time_ms: Intervalle entre deux pings keepalive
+            keepalive_timeout_ms: Délai de réponse à un ping avant coupure
+            max_message_length: Taille maximale des messages reçus et envoyés (octets)
+            reconnect_backoff_ms: Délai initial de reconnexion
+            max_reconnect_backoff_ms: Délai maximal de reconnexion
+        """
+        self.grpc_host = grpc_host or settings.LND_GRPC_HOST
+        self.cert_path = cert_path or settings.LND_TLS_CERT_PATH
+        self.macaroon_path = macaroon_path or settings.LND_MACAROON_PATH
+        self.keepalive_time_ms = keepalive_time_ms or settings.LND_KEEPALIVE_TIME_MS
+        self.keepalive_timeout_ms = keepalive_timeout_ms or settings.LND_KEEPALIVE_TIMEOUT_MS
+        self.max_message_length = max_message_length or settings.LND_MAX_MESSAGE_LENGTH
+        self.reconnect_backoff_ms = reconnect_backoff_ms or settings.LND_RECONNECT_BACKOFF_MS
+        self.max_reconnect_backoff_ms = (
+            max_reconnect_backoff_ms or settings.LND_MAX_RECONNECT_BACKOFF_MS
+        )
+
+        # Générations distinctes : recréer un canal ne périme que les stubs de ce type
+        self.generation = 0
+        self.aio_generation = 0
+        self._lock = threading.Lock()
+        self._credentials: Optional[grpc.ChannelCredentials] = None
+        self._credentials_key: Optional[Tuple[float, float]] = None
+        self._channel: Optional[grpc.Channel] = None
+        self._channel_state: Optional[grpc.ChannelConnectivity] = None
+        self._aio_channel: Optional[aio.Channel] = None
+        self._aio_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.channels_created = 0
+        self.credentials_loaded = 0
+
+    # OPTIONS ET CREDENTIALS
+
+    def channel_options(self) -> List[Tuple[str, Any]]:
+        """Options gRPC communes aux canaux synchrones et asynchrones"""
+        return [
+            ("grpc.keepalive_time_ms", self.keepalive_time_ms),
+            ("grpc.keepalive_timeout_ms", self.keepalive_timeout_ms),
+            ("grpc.keepalive_permit_without_calls", 1),
+            ("grpc.http2.max_pings_without_data", 0),
+            ("grpc.max_receive_message_length", self.max_message_length),
+            ("grpc.max_send_message_length", self.max_message_length),
+            ("grpc.initial_reconnect_backoff_ms", self.reconnect_backoff_ms),
+            ("grpc.min_reconnect_backoff_ms", self.reconnect_backoff_ms),
+            ("grpc.max_reconnect_backoff_ms", self.max_reconnect_backoff_ms),
+        ]
+
+    def _read_credentials(self) -> grpc.ChannelCredentials:
+        """Lit le certificat et le macaroon et construit les credentials combinés"""
+        with open(self.cert_path, 'rb') as f:
+            cert = f.read()
+        with open(self.macaroon_path, 'rb') as f:
+            macaroon = codecs.encode(f.read(), 'hex')
+
+        ssl_creds = grpc.ssl_channel_credentials(cert)
+        auth_creds = grpc.metadata_call_credentials(
+            lambda context, callback: callback([('macaroon', macaroon)], None)
+        )
+        self.credentials_loaded += 1
+        return grpc.composite_channel_credentials(ssl_creds, auth_creds)
+
+    def get_credentials(self) -> grpc.ChannelCredentials:
+        """Credentials combinés (TLS + macaroon), mis en cache tant que les fichiers ne changent pas"""
+        if not self.cert_path or not os.path.exists(self.cert_path):
+            raise ValueError(f"Certificat TLS non trouvé: {self.cert_path}")
+
+        if not self.macaroon_path or not os.path.exists(self.macaroon_path):
+            raise ValueError(f"Macaroon non trouvé: {self.macaroon_path}")
+
+        key = (os.path.getmtime(self.cert_path), os.path.getmtime(self.macaroon_path))
+        if self._credentials is None or key != self._credentials_key:
+            self._credentials = self._read_credentials()
+            self._credentials_key = key
+        return self._credentials
+
+    # CANAUX
+
+    def _on_state_change(self, state: grpc.ChannelConnectivity) -> None:
+        if state != self._channel_state:
+            logger.debug(f"Canal LND {self.grpc_host}: {state.name}")
+        self._channel_state = state
+
+    def get_channel(self) -> grpc.Channel:
+        """Canal gRPC synchrone partagé, recréé s'il a été fermé"""
+        with self._lock:
+            if self._channel is None or self._channel_state == grpc.ChannelConnectivity.SHUTDOWN:
+                credentials = self.get_credentials()
+                self._channel = grpc.secure_channel(
+                    self.grpc_host, credentials, options=self.channel_options()
+                )
+                self._channel_state = None
+                self._channel.subscribe(self._on_state_change, try_to_connect=False)
+                self.generation += 1
+                self.channels_created += 1
+                logger.info(f"Canal gRPC LND ouvert vers {self.grpc_host}")
+            return self._channel
+
+    def get_aio_channel(self) -> aio.Channel:
+        """Canal grpc.aio partagé pour la boucle d'événements courante
+
+        Un canal grpc.aio est lié à sa boucle : il doit être demandé depuis
+        une coroutine et est recréé si la boucle change.
+        """
+        loop = asyncio.get_running_loop()
+        channel = self._aio_channel
+        if (channel is None or self._aio_loop is not loop
+                or channel.get_state() == grpc.ChannelConnectivity.SHUTDOWN):
+            self._aio_channel = aio.secure_channel(
+                self.grpc_host, self.get_credentials(), options=self.channel_options()
+            )
+            self._aio_loop = loop
+            self.aio_generation += 1
+            self.channels_created += 1
+            logger.info(f"Canal grpc.aio LND ouvert vers {self.grpc_host}")
+        return self._aio_channel
+
+    def reset(self) -> None:
+        """Ferme le canal synchrone : il sera recréé au prochain accès"""
+        with self._lock:
+            if self._channel is not None:
+                self._channel.unsubscribe(self._on_state_change)
+                self._channel.close()
+            self._channel = None
+            self._channel_state = None
+            self.generation += 1
+
+    async def close_aio(self) -> None:
+        """Ferme le canal grpc.aio : il sera recréé au prochain accès"""
+        channel = self._aio_channel
+        self._aio_channel = None
+        self._aio_loop = None
+        if channel is not None:
+            self.aio_generation += 1
+            await channel.close()
+
+    async def close(self) -> None:
+        """Ferme tous les canaux"""
+        self.reset()
+        await self.close_aio()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """État des connexions"""
+        aio_state = None
+        if self._aio_channel is not None:
+            aio_state = self._aio_channel.get_state().name
+        return {
+            "grpc_host": self.grpc_host,
+            "generation": self.generation,
+            "aio_generation": self.aio_generation,
+            "channel_state": self._channel_state.name if self._channel_state else None,
+            "aio_channel_state": aio_state,
+            "channels_created": self.channels_created,
+            "credentials_loaded": self.credentials_loaded,
+            "max_message_length": self.max_message_length
+        }
+
+
+_managers: Dict[Tuple[str, str, str], LNDConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_connection_manager(grpc_host: str = None, cert_path: str = None,
+                           macaroon_path: str = None) -> LNDConnectionManager:
+    """Gestionnaire de connexions partagé pour un nœud LND donné
+
+    Tous les clients configurés avec le même hôte, certificat et macaroon
+    partagent les mêmes canaux gRPC.
+    """
+    key = (
+        grpc_host or settings.LND_GRPC_HOST,
+        cert_path or settings.LND_TLS_CERT_PATH,
+        macaroon_path or settings.LND_MACAROON_PATH,
+    )
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = LNDConnectionManager(*key)
+            _managers[key] = manager
+        return manager
+
+
+async def close_all_connections() -> None:
+    """Ferme les canaux de tous les gestionnaires de connexions"""
+    with _managers_lock:
+        managers = list(_managers.values())
+    for manager in managers:
+        try:
+            await manager.close()
+        except Exception as e:
+            logger.error(f"Erreur lors de la fermeture des connexions LND: {e}")
@@ -0,0 +1,257 @@
+import asyncio
+import logging
+import random
+from datetime import datetime
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+import grpc
+
+from services.lnd_client import LNDClient
+
+logger = logging.getLogger(__name__)
+
+# Politiques appliquées quand la file d'un consommateur est pleine
+DROP_OLDEST = "drop_oldest"   # retirer l'événement le plus ancien de la file
+DROP_NEWEST = "drop_newest"   # ignorer le nouvel événement
+BLOCK = "block"               # attendre le consommateur (ralentit tout le topic)
+DROP_POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+# Topics disponibles : un seul flux LND par topic
+CHANNEL_EVENTS = "channel"
+INVOICE_EVENTS = "invoice"
+TOPICS = (CHANNEL_EVENTS, INVOICE_EVENTS)
+
+# Intervalle de vérification de fermeture pour un producteur bloqué (politique BLOCK)
+BLOCK_CHECK_INTERVAL = 1.0
+
+_CLOSED = object()
+
+
+class Subscription:
+    """Abonnement d'un consommateur à un topic du SubscriptionManager
+
+    Les événements sont reçus via une file asyncio bornée ; l'abonnement
+    s'utilise avec `await subscription.get()` ou `async for event in subscription`.
+    """
+
+    def __init__(self, manager: "SubscriptionManager", topic: str,
+                 maxsize: int = 100, policy: str = DROP_OLDEST):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Politique de saturation inconnue: {policy}")
+
+        self.manager = manager
+        self.topic = topic
+        self.policy = policy
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.delivered = 0
+        self.dropped = 0
+        self.closed = False
+
+    async def put(self, event: Dict[str, Any]) -> None:
+        """Dépose un événement dans la file en appliquant la politique de saturation"""
+        if self.closed:
+            return
+
+        if self.policy == BLOCK:
+            while True:
+                try:
+                    await asyncio.wait_for(self.queue.put(event), BLOCK_CHECK_INTERVAL)
+                    break
+                except asyncio.TimeoutError:
+                    if self.closed:
+                        return
+        elif self.queue.full():
+            self.dropped += 1
+            if self.policy == DROP_NEWEST:
+                return
+            self.queue.get_nowait()
+            self.queue.put_nowait(event)
+        else:
+            self.queue.put_nowait(event)
+        self.delivered += 1
+
+    async def get(self) -> Optional[Dict[str, Any]]:
+        """Attend le prochain événement ; renvoie None une fois l'abonnement fermé"""
+        if self.closed and self.queue.empty():
+            return None
+        event = await self.queue.get()
+        if event is _CLOSED:
+            return None
+        return event
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        event = await self.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+    def close(self) -> None:
+        """Se désabonne du topic"""
+        self.manager.unsubscribe(self)
+
+    def _mark_closed(self) -> None:
+        """Ferme la file et réveille un consommateur en attente"""
+        if self.closed:
+            return
+        self.closed = True
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(_CLOSED)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques de l'abonnement"""
+        return {
+            "topic": self.topic,
+            "policy": self.policy,
+            "queued": self.queue.qsize(),
+            "maxsize": self.queue.maxsize,
+            "delivered": self.delivered,
+            "dropped": self.dropped
+        }
+
+
+class SubscriptionManager:
+    """Bus de diffusion des événements LND vers les consommateurs internes
+
+    Un seul flux gRPC est ouvert par topic (événements de canal, invoices),
+    quel que soit le nombre de consommateurs. Le flux tourne sur grpc.aio avec
+    AsyncLNDClient, ou dans un thread dédié avec LNDClient : la boucle
+    d'événements n'est jamais bloquée. En cas de coupure, le flux est rouvert
+    avec un backoff exponentiel.
+    """
+
+    def __init__(self, lnd_client: LNDClient = None,
+                 reconnect_delay: float = 1.0, max_reconnect_delay: float = 60.0):
+        """Initialise le gestionnaire d'abonnements
+
+        Args:
+            lnd_client: Client LND (synchrone ou asynchrone) fournissant les flux
+            reconnect_delay: Délai initial avant reconnexion (secondes)
+            max_reconnect_delay: Délai maximal entre deux reconnexions (secondes)
+        """
+        self.lnd_client = lnd_client or LNDClient()
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self._subscribers: Dict[str, List[Subscription]] = {topic: [] for topic in TOPICS}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._published: Dict[str, int] = {topic: 0 for topic in TOPICS}
+        self._reconnects: Dict[str, int] = {topic: 0 for topic in TOPICS}
+        self._last_event_at: Dict[str, Optional[str]] = {topic: None for topic in TOPICS}
+
+    def subscribe(self, topic: str, maxsize: int = 100,
+                  policy: str = DROP_OLDEST) -> Subscription:
+        """Abonne un nouveau consommateur à un topic
+
+        Le flux LND du topic est démarré au premier abonnement.
+
+        Args:
+            topic: 'channel' ou 'invoice'
+            maxsize: Taille maximale de la file du consommateur
+            policy: Politique quand la file est pleine ('drop_oldest', 'drop_newest', 'block')
+        """
+        if topic not in TOPICS:
+            raise ValueError(f"Topic inconnu: {topic}")
+
+        subscription = Subscription(self, topic, maxsize=maxsize, policy=policy)
+        self._subscribers[topic].append(subscription)
+        self._ensure_stream(topic)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Retire un consommateur ; le flux du topic s'arrête s'il n'en reste aucun"""
+        subscription._mark_closed()
+        subscribers = self._subscribers.get(subscription.topic, [])
+        if subscription in subscribers:
+            subscribers.remove(subscription)
+
+        if not subscribers:
+            task = self._tasks.pop(subscription.topic, None)
+            if task is not None:
+                task.cancel()
+
+    def _ensure_stream(self, topic: str) -> None:
+        """Démarre la tâche de lecture du flux du topic si nécessaire"""
+        task = self._tasks.get(topic)
+        if task is None or task.done():
+            self._tasks[topic] = asyncio.create_task(
+                self._run_stream(topic), name=f"lnd-subscription-{topic}"
+            )
+
+    def _open_stream(self, topic: str) -> AsyncGenerator[Dict[str, Any], None]:
+        """Ouvre le flux LND d'un topic sous forme d'événements normalisés"""
+        if topic == CHANNEL_EVENTS:
+            return self._channel_events()
+        return self._invoice_events()
+
+    async def _channel_events(self) -> AsyncGenerator[Dict[str, Any], None]:
+        async for event_type, data in self.lnd_client.stream_channel_events():
+            yield {"topic": CHANNEL_EVENTS, "type": event_type, "data": data}
+
+    async def _invoice_events(self) -> AsyncGenerator[Dict[str, Any], None]:
+        async for invoice in self.lnd_client.stream_invoice_events():
+            event_type = "settled_invoice" if invoice.get("settled") else "invoice"
+            yield {"topic": INVOICE_EVENTS, "type": event_type, "data": invoice}
+
+    async def _run_stream(self, topic: str) -> None:
+        """Lit le flux d'un topic et le rouvre après chaque coupure"""
+        delay = self.reconnect_delay
+        while self._subscribers[topic]:
+            stream = self._open_stream(topic)
+            try:
+                async for event in stream:
+                    delay = self.reconnect_delay
+                    await self.publish(topic, event)
+                logger.warning(f"Flux LND '{topic}' terminé par le serveur, reconnexion")
+            except asyncio.CancelledError:
+                raise
+            except grpc.RpcError as e:
+                logger.error(f"Erreur gRPC sur le flux LND '{topic}': {e}")
+            except Exception as e:
+                logger.error(f"Erreur lors de la lecture du flux LND '{topic}': {e}")
+            finally:
+                await stream.aclose()
+
+            self._reconnects[topic] += 1
+            # Backoff exponentiel avec gigue pour éviter les reconnexions synchronisées
+            await asyncio.sleep(delay * (1 + random.random() * 0.1))
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def publish(self, topic: str, event: Dict[str, Any]) -> None:
+        """Diffuse un événement à tous les consommateurs du topic"""
+        event.setdefault("received_at", datetime.now().isoformat())
+        self._published[topic] += 1
+        self._last_event_at[topic] = event["received_at"]
+
+        for subscription in list(self._subscribers[topic]):
+            await subscription.put(event)
+
+    async def stop(self) -> None:
+        """Arrête tous les flux et ferme les abonnements"""
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        for subscribers in self._subscribers.values():
+            for subscription in subscribers:
+                subscription._mark_closed()
+            subscribers.clear()
+        logger.info("Gestionnaire d'abonnements LND arrêté")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques par topic (flux actif, consommateurs, événements perdus)"""
+        return {
+            topic: {
+                "stream_active": topic in self._tasks and not self._tasks[topic].done(),
+                "published": self._published[topic],
+                "reconnects": self._reconnects[topic],
+                "last_event_at": self._last_event_at[topic],
+                "subscribers": [s.get_stats() for s in self._subscribers[topic]]
+            }
+            for topic in TOPICS
+        }
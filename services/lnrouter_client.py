@@ -3,10 +3,17 @@ import networkx as nx
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 import logging
-import json
-from functools import lru_cache
+import os
+import asyncio
 
 from core.config import settings
+from services.async_cache import AsyncTTLCache
+from services.graph_cache import read_graph_cache, write_graph_cache
+from services.graph_store import GraphStore
+from services.http_client import get_http_client
+from services.routing_engine import RoutingEngine
+from services.self_routes import SelfRoutes
+from services.topology_analytics import TopologyAnalytics
 
 logger = logging.getLogger(__name__)
 
@@ -17,10 +24,39 @@ class LNRouterClient:
         self.base_url = settings.LNROUTER_API_URL or "https://lnrouter.app/api/v1"
         self.api_key = settings.LNROUTER_API_KEY
         self.headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
-        self.graph_cache_file = "data/lnrouter_graph_cache.json"
+        self.graph_cache_file = "data/lnrouter_graph_cache.bin"
         self.graph_cache_duration = timedelta(hours=6)  # Mettre à jour le graphe toutes les 6 heures
+        self.graph_cache_max_age = timedelta(days=1)  # Repli sur le cache si l'API est indisponible
         self.last_graph_update = None
-        self.graph = None
+        self._graph = None
+        # Synchronisation incrémentale du graphe via LND (optionnelle)
+        self.graph_sync = None
+        # Graphe en tableaux partagé par tous les appelants, reconstruit par version
+        self._graph_store: Optional[GraphStore] = None
+        self._graph_store_lock: Optional[asyncio.Lock] = None
+        self._routing_engine: Optional[RoutingEngine] = None
+        # Arbres de routes de notre nœud pour le montant de référence
+        self._self_routes: Optional[SelfRoutes] = None
+        self._self_routes_lock: Optional[asyncio.Lock] = None
+        # Analyse de topologie calculée en arrière-plan, par version du graphe
+        self.topology_analytics = TopologyAnalytics(
+            sample_size=settings.TOPOLOGY_BETWEENNESS_SAMPLES,
+            seed=settings.TOPOLOGY_SEED,
+            workers=settings.TOPOLOGY_WORKERS,
+            refresh_interval=settings.TOPOLOGY_REFRESH_INTERVAL
+        )
+        # Réponses de l'API mises en cache (durée de vie, éviction LRU, appels
+        # concurrents regroupés)
+        self.node_cache = AsyncTTLCache("lnrouter_nodes")
+        self.channel_cache = AsyncTTLCache("lnrouter_channels")
+        self.key_nodes_cache = AsyncTTLCache(
+            "lnrouter_key_nodes", maxsize=32, ttl=settings.LNROUTER_KEY_NODES_CACHE_TTL_SECONDS
+        )
+    
+    def attach_graph_sync(self, graph_sync) -> None:
+        """Utilise un GraphSync (graphe LND tenu à jour) à la place des téléchargements complets"""
+        self.graph_sync = graph_sync
+        self._graph_store = None
     
     async def _make_request(self, method: str, endpoint: str, params: Dict[str, Any] = None, data: Dict[str, Any] = None) -> Any:
         """Effectue une requête à l'API LNRouter"""
@@ -30,18 +66,17 @@ class LNRouterClient:
         url = f"{self.base_url}{endpoint}"
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.request(
-                    method=method,
-                    url=url,
-                    params=params,
-                    json=data,
-                    headers=self.headers,
-                    timeout=60.0
-                )
-                
-                response.raise_for_status()
-                return response.json()
+            client = get_http_client(self.base_url)
+            response = await client.request(
+                method=method,
+                url=url,
+                params=params,
+                json=data,
+                headers=self.headers
+            )
+            
+            response.raise_for_status()
+            return response.json()
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error occurred: {e.response.status_code} - {e.response.text}")
             raise
@@ -52,74 +87,104 @@ class LNRouterClient:
             logger.error(f"Unexpected error when calling LNRouter API: {e}")
             raise
     
+    @property
+    def graph(self) -> Optional[Dict]:
+        """Graphe LNRouter au format dictionnaire
+        
+        Un graphe chargé depuis le cache binaire n'est converti en
+        dictionnaires qu'au premier accès : les analyses lisent le GraphStore.
+        """
+        if (self._graph is None and self._graph_store is not None
+                and self._graph_store.version[0] == "lnrouter"):
+            self._graph = self._graph_store.to_graph_data()
+        return self._graph
+    
+    @graph.setter
+    def graph(self, value: Optional[Dict]) -> None:
+        self._graph = value
+    
     async def get_graph(self, force_refresh: bool = False) -> Dict:
         """Récupère la structure complète du graphe Lightning Network"""
+        # Graphe LND synchronisé en continu : toujours frais, aucun téléchargement
+        if self.graph_sync is not None and self.graph_sync.is_synced:
+            return self.graph_sync.get_graph()
+        
+        await self._refresh_graph(force_refresh)
+        return self.graph
+    
+    async def _refresh_graph(self, force_refresh: bool = False) -> None:
+        """Télécharge le graphe LNRouter si nécessaire
+        
+        Au démarrage, un cache binaire récent est ouvert à la place du
+        téléchargement ; en cas d'échec de l'API, un cache plus ancien sert
+        de repli.
+        """
         now = datetime.now()
         
         # Vérifier si nous devons recharger le graphe
-        if (force_refresh or 
-            self.graph is None or 
-            self.last_graph_update is None or 
-            (now - self.last_graph_update) > self.graph_cache_duration):
-            
-            try:
-                logger.info("Récupération du graphe Lightning Network depuis LNRouter.app")
-                graph_data = await self._make_request("GET", "/graph")
-                
-                # Mettre à jour le cache
-                self.graph = graph_data
-                self.last_graph_update = now
-                
-                # Sauvegarder le graphe en cache sur disque
-                self._save_graph_to_cache()
-                
-                return graph_data
-            except Exception as e:
-                logger.error(f"Erreur lors de la récupération du graphe LN: {e}")
-                
-                # Essayer de charger depuis le cache sur disque
-                if self._load_graph_from_cache():
-                    logger.info("Graphe chargé depuis le cache local")
-                    return self.graph
-                
-                raise
-        else:
+        if not (force_refresh or 
+                self.last_graph_update is None or 
+                (now - self.last_graph_update) > self.graph_cache_duration):
             logger.debug("Utilisation du graphe LN en cache")
-            return self.graph
-    
-    def _save_graph_to_cache(self) -> None:
-        """Sauvegarde le graphe en cache sur disque"""
+            return
+        
+        if (not force_refresh and self.last_graph_update is None
+                and await asyncio.to_thread(self._load_graph_from_cache, self.graph_cache_duration)):
+            logger.info("Graphe chargé depuis le cache local")
+            return
+        
         try:
-            import os
-            os.makedirs(os.path.dirname(self.graph_cache_file), exist_ok=True)
+            logger.info("Récupération du graphe Lightning Network depuis LNRouter.app")
+            graph_data = await self._make_request("GET", "/graph")
+            
+            # Mettre à jour le cache
+            self.graph = graph_data
+            self.last_graph_update = now
             
-            with open(self.graph_cache_file, 'w') as f:
-                cache_data = {
-                    "timestamp": datetime.now().isoformat(),
-                    "graph": self.graph
-                }
-                json.dump(cache_data, f)
-            logger.info(f"Graphe LN sauvegardé dans {self.graph_cache_file}")
+            # Construire le GraphStore et le sauvegarder en cache sur disque
+            store = await asyncio.to_thread(
+                GraphStore.from_graph_data, graph_data, ("lnrouter", now)
+            )
+            self._graph_store = store
+            await asyncio.to_thread(self._save_graph_to_cache, store, now)
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération du graphe LN: {e}")
+            
+            # Essayer de charger depuis le cache sur disque
+            if await asyncio.to_thread(self._load_graph_from_cache, self.graph_cache_max_age):
+                logger.info("Graphe chargé depuis le cache local")
+                return
+            
+            raise
+    
+    def _save_graph_to_cache(self, store: GraphStore, timestamp: datetime) -> None:
+        """Sauvegarde le graphe dans le cache binaire (écriture atomique)"""
+        try:
+            size = write_graph_cache(store, self.graph_cache_file, timestamp)
+            logger.info(f"Graphe LN sauvegardé dans {self.graph_cache_file} ({size} octets)")
         except Exception as e:
             logger.error(f"Erreur lors de la sauvegarde du graphe en cache: {e}")
     
-    def _load_graph_from_cache(self) -> bool:
-        """Charge le graphe depuis le cache sur disque"""
+    def _load_graph_from_cache(self, max_age: timedelta) -> bool:
+        """Ouvre le cache binaire du graphe (fichier mappé en mémoire)
+        
+        Args:
+            max_age: Âge maximal accepté pour les données du cache
+        """
         try:
-            import os
             if not os.path.exists(self.graph_cache_file):
                 return False
-                
-            with open(self.graph_cache_file, 'r') as f:
-                cache_data = json.load(f)
-                
+            
+            store, cache_time = read_graph_cache(self.graph_cache_file)
+            
             # Vérifier si le cache n'est pas trop ancien
-            cache_time = datetime.fromisoformat(cache_data["timestamp"])
-            if (datetime.now() - cache_time) > timedelta(days=1):
+            if (datetime.now() - cache_time) > max_age:
                 logger.warning("Le cache du graphe LN est trop ancien")
                 return False
-                
-            self.graph = cache_data["graph"]
+            
+            store.version = ("lnrouter", cache_time)
+            self._graph_store = store
+            self.graph = None
             self.last_graph_update = cache_time
             return True
         except Exception as e:
@@ -131,14 +196,18 @@ class LNRouterClient:
         if not pubkey:
             raise ValueError("Le pubkey du nœud est requis")
             
-        return await self._make_request("GET", f"/nodes/{pubkey}")
+        return await self.node_cache.get_or_call(
+            pubkey, lambda: self._make_request("GET", f"/nodes/{pubkey}")
+        )
     
     async def get_channel_info(self, channel_id: str) -> Dict:
         """Récupère les informations détaillées d'un canal"""
         if not channel_id:
             raise ValueError("L'ID du canal est requis")
             
-        return await self._make_request("GET", f"/channels/{channel_id}")
+        return await self.channel_cache.get_or_call(
+            str(channel_id), lambda: self._make_request("GET", f"/channels/{channel_id}")
+        )
     
     async def get_optimal_routes(self, source_pubkey: str, target_pubkey: str, amount_sats: int = 0) -> List[Dict]:
         """Calcule les routes optimales entre deux nœuds"""
@@ -155,7 +224,6 @@ class LNRouterClient:
             
         return await self._make_request("GET", "/routes", params=params)
     
-    @lru_cache(maxsize=100)
     async def get_key_nodes(self, limit: int = 100, metric: str = "betweenness") -> List[Dict]:
         """Identifie les nœuds clés du réseau basés sur différentes métriques de centralité
         
@@ -172,112 +240,156 @@ class LNRouterClient:
             "metric": metric
         }
         
-        return await self._make_request("GET", "/nodes/key", params=params)
+        return await self.key_nodes_cache.get_or_call(
+            (limit, metric), lambda: self._make_request("GET", "/nodes/key", params=params)
+        )
     
-    async def convert_to_networkx(self) -> nx.Graph:
-        """Convertit le graphe Lightning Network en graphe NetworkX pour analyse avancée"""
-        graph_data = await self.get_graph()
-        
-        G = nx.Graph()
+    async def get_graph_store(self) -> GraphStore:
+        """Récupère le graphe sous forme de GraphStore (tableaux NumPy + CSR)
         
-        # Ajouter les nœuds
-        for node in graph_data.get("nodes", []):
-            node_id = node.get("pub_key")
-            if node_id:
-                G.add_node(node_id, **node)
+        Le store est construit une seule fois par version du graphe et partagé
+        par tous les appelants. Avec un GraphSync attaché, les modifications
+        (politiques, nouveaux canaux, fermetures) donnent un nouveau store sans
+        reconstruction complète ni modification de celui en cours d'utilisation.
+        """
+        if self._graph_store_lock is None:
+            self._graph_store_lock = asyncio.Lock()
         
-        # Ajouter les arêtes (canaux)
-        for channel in graph_data.get("channels", []):
-            channel_id = channel.get("channel_id")
-            node1 = channel.get("node1_pub")
-            node2 = channel.get("node2_pub")
-            capacity = int(channel.get("capacity", 0))
+        async with self._graph_store_lock:
+            store = self._graph_store
+            
+            if self.graph_sync is not None and self.graph_sync.is_synced:
+                version = ("lnd", self.graph_sync.version)
+                if store is not None and store.version == version:
+                    return store
+                
+                if store is not None and store.version[0] == "lnd":
+                    changes = self.graph_sync.changes_since(store.version[1])
+                    if changes is not None:
+                        store = store.with_changes(self.graph_sync, *changes, version=version)
+                        self._graph_store = store
+                        return store
+                
+                graph_data = self.graph_sync.get_graph()
+            else:
+                await self._refresh_graph()
+                version = ("lnrouter", self.last_graph_update)
+                store = self._graph_store
+                if store is not None and store.version == version:
+                    return store
+                graph_data = self.graph
             
-            if channel_id and node1 and node2:
-                G.add_edge(node1, node2, channel_id=channel_id, capacity=capacity, **channel)
+            # Construction hors de la boucle d'événements (plusieurs dizaines de milliers de canaux)
+            store = await asyncio.to_thread(GraphStore.from_graph_data, graph_data, version)
+            self._graph_store = store
+            logger.info(
+                f"GraphStore construit: {store.num_nodes} nœuds, "
+                f"{store.num_channels} canaux"
+            )
+            return store
+    
+    async def convert_to_networkx(self) -> nx.Graph:
+        """Convertit le graphe Lightning Network en graphe NetworkX pour analyse avancée
         
-        return G
+        La vue NetworkX est issue du GraphStore partagé et n'est construite
+        qu'une fois par version du graphe.
+        """
+        store = await self.get_graph_store()
+        return store.to_networkx()
     
     async def analyze_network_topology(self) -> Dict:
-        """Analyse la topologie du réseau pour identifier les clusters et goulots d'étranglement"""
-        G = await self.convert_to_networkx()
+        """Analyse la topologie du réseau pour identifier les clusters et goulots d'étranglement
         
-        # Calculer des statistiques de base
-        num_nodes = G.number_of_nodes()
-        num_edges = G.number_of_edges()
-        avg_degree = sum(dict(G.degree()).values()) / num_nodes if num_nodes > 0 else 0
+        Le calcul (centralité échantillonnée avec graine fixe, diamètre par
+        double balayage) s'exécute en tâche de fond dans un pool de processus ;
+        le dernier résultat terminé est renvoyé immédiatement. Seul le tout
+        premier appel attend la fin du calcul.
+        """
+        store = await self.get_graph_store()
+        return await self.topology_analytics.get(store)
+    
+    async def get_routing_engine(self) -> RoutingEngine:
+        """Moteur de routage lié au GraphStore courant"""
+        store = await self.get_graph_store()
+        if self._routing_engine is None or self._routing_engine.store is not store:
+            self._routing_engine = RoutingEngine(store)
+        return self._routing_engine
+    
+    async def get_self_routes(self) -> Optional[SelfRoutes]:
+        """Arbres de routes précalculés depuis et vers notre nœud (settings.NODE_PUBKEY)
         
-        # Identifier les composantes connectées
-        connected_components = list(nx.connected_components(G))
-        largest_component = max(connected_components, key=len)
-        largest_component_size = len(largest_component)
+        Les arbres sont calculés pour le montant de référence
+        SELF_ROUTES_AMOUNT_SATS et mis à jour à chaque nouvelle version du
+        graphe ; les appels concurrents attendent le même calcul.
         
-        # Calculer le diamètre du réseau (peut être coûteux en calcul)
-        diameter = -1
-        if len(largest_component) > 1:
-            try:
-                # Utiliser un sous-ensemble pour une estimation plus rapide
-                largest_component_subgraph = G.subgraph(list(largest_component)[:1000])
-                diameter = nx.diameter(largest_component_subgraph)
-            except Exception as e:
-                logger.warning(f"Impossible de calculer le diamètre: {e}")
+        Returns:
+            SelfRoutes, ou None si notre nœud n'est pas configuré ou absent du graphe
+        """
+        node_pubkey = settings.NODE_PUBKEY
+        engine = await self.get_routing_engine()
+        if not node_pubkey or node_pubkey not in engine.store.index:
+            return None
         
-        # Calculer la centralité de betweenness pour les 20 principaux nœuds
-        try:
-            betweenness = nx.betweenness_centrality(G, k=100, normalized=True)
-            top_betweenness = sorted(betweenness.items(), key=lambda x: x[1], reverse=True)[:20]
-        except Exception:
-            top_betweenness = []
-            
-        # Calculer la densité du graphe
-        density = nx.density(G)
+        if self._self_routes_lock is None:
+            self._self_routes_lock = asyncio.Lock()
         
-        return {
-            "num_nodes": num_nodes,
-            "num_channels": num_edges,
-            "avg_degree": avg_degree,
-            "network_diameter": diameter,
-            "largest_component_size": largest_component_size,
-            "largest_component_ratio": largest_component_size / num_nodes if num_nodes > 0 else 0,
-            "density": density,
-            "top_betweenness_nodes": [{"pubkey": node, "centrality": value} for node, value in top_betweenness],
-            "timestamp": datetime.now().isoformat()
-        }
+        async with self._self_routes_lock:
+            amount_msat = settings.SELF_ROUTES_AMOUNT_SATS * 1000
+            self_routes = self._self_routes
+            if (self_routes is None or self_routes.node_pubkey != node_pubkey
+                    or self_routes.amount_msat != amount_msat):
+                self_routes = await asyncio.to_thread(SelfRoutes, engine, node_pubkey, amount_msat)
+            elif self_routes.engine is not engine:
+                self_routes = await asyncio.to_thread(self_routes.updated, engine)
+            self._self_routes = self_routes
+            return self_routes
     
     async def find_path(self, source_pubkey: str, target_pubkey: str, amount_sats: int = 0) -> List[Dict]:
-        """Trouve un chemin optimal entre deux nœuds en utilisant l'algorithme de Dijkstra"""
-        G = await self.convert_to_networkx()
+        """Trouve la route la moins coûteuse entre deux nœuds pour un montant donné
         
-        if source_pubkey not in G or target_pubkey not in G:
-            raise ValueError("Les nœuds source ou destination n'existent pas dans le graphe")
-            
-        try:
-            # Utiliser la capacité comme poids (inverse)
-            def weight_function(u, v, edge_data):
-                capacity = edge_data.get('capacity', 1)
-                return 1000000000 / capacity if capacity > 0 else float('inf')
-                
-            path = nx.dijkstra_path(G, source_pubkey, target_pubkey, weight=weight_function)
-            
-            # Construire le résultat avec les détails des canaux
-            result = []
-            for i in range(len(path) - 1):
-                node1 = path[i]
-                node2 = path[i + 1]
-                
-                # Récupérer les détails du canal
-                edge_data = G.get_edge_data(node1, node2)
-                
-                result.append({
-                    "from_node": node1,
-                    "to_node": node2,
-                    "channel_id": edge_data.get("channel_id"),
-                    "capacity": edge_data.get("capacity")
-                })
-                
-            return result
-        except nx.NetworkXNoPath:
-            return []
+        Le coût tient compte des frais, du CLTV et de la probabilité de succès ;
+        les canaux désactivés ou trop petits pour le montant sont ignorés.
+        Depuis notre propre nœud, pour le montant de référence
+        SELF_ROUTES_AMOUNT_SATS, la route est lue dans l'arbre précalculé. Pour
+        un montant inférieur, la route de l'arbre n'est reprise que si tous ses
+        canaux peuvent transporter ce montant (elle est alors valide mais pas
+        nécessairement la moins coûteuse) ; sinon la route est recherchée.
+        
+        Returns:
+            Liste des sauts (from_node, to_node, channel_id, capacity, frais...),
+            vide si aucune route ne peut transporter le montant
+        
+        Raises:
+            ValueError: Si la source ou la destination n'existe pas dans le graphe
+        """
+        amount_msat = amount_sats * 1000
+        if (source_pubkey and source_pubkey == settings.NODE_PUBKEY
+                and amount_sats <= settings.SELF_ROUTES_AMOUNT_SATS):
+            self_routes = await self.get_self_routes()
+            if self_routes is not None:
+                route = self_routes.route_to(target_pubkey, amount_msat)
+                if route is not None:
+                    return route["hops"]
+                if amount_msat == self_routes.amount_msat:
+                    return []
+        
+        engine = await self.get_routing_engine()
+        route = await asyncio.to_thread(
+            engine.find_route, source_pubkey, target_pubkey, amount_msat
+        )
+        return route["hops"] if route else []
+    
+    async def find_routes(self, source_pubkey: str, target_pubkey: str,
+                          amount_sats: int = 0, k: int = 3) -> List[Dict]:
+        """Trouve les k routes les moins coûteuses entre deux nœuds (algorithme de Yen)
+        
+        Returns:
+            Routes triées par coût croissant, avec frais totaux, CLTV et probabilité
+        """
+        engine = await self.get_routing_engine()
+        return await asyncio.to_thread(
+            engine.find_routes, source_pubkey, target_pubkey, amount_sats * 1000, k
+        )
     
     async def get_network_stats(self) -> Dict:
         """Récupère des statistiques globales sur le réseau Lightning"""
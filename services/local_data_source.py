@@ -1,11 +1,12 @@
-import networkx as nx
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 import logging
 
+from services.async_lnd_client import call_lnd
 from services.data_source_interface import DataSourceInterface
 from services.lnd_client import LNDClient
 from services.lnrouter_client import LNRouterClient
+from services.graph_store import GraphStore
 
 logger = logging.getLogger(__name__)
 
@@ -21,18 +22,36 @@ class LocalDataSource(DataSourceInterface):
         """
         self.lnd_client = lnd_client or LNDClient()
         self.lnrouter_client = lnrouter_client or LNRouterClient()
-        self.graph = None
+        self.graph: Optional[GraphStore] = None
+        self._own_pubkey: Optional[str] = None
+    
+    async def _get_own_pubkey(self) -> Optional[str]:
+        """Clé publique de notre nœud (immuable : lue une seule fois via LND)"""
+        if self._own_pubkey is None:
+            self._own_pubkey = (await call_lnd(self.lnd_client.get_node_info)).get("pubkey")
+        return self._own_pubkey
+    
+    async def _own_node_info(self, pubkey: str) -> Optional[Dict[str, Any]]:
+        """Infos LND de notre nœud si pubkey est la sienne, None sinon
+        
+        Une fois notre clé publique connue, les autres nœuds sont écartés
+        sans interroger LND.
+        """
+        if self._own_pubkey is not None and pubkey != self._own_pubkey:
+            return None
+        node_info = await call_lnd(self.lnd_client.get_node_info)
+        self._own_pubkey = node_info.get("pubkey")
+        return node_info if self._own_pubkey == pubkey else None
         
     async def _ensure_graph_loaded(self):
-        """S'assure que le graphe est chargé"""
-        if self.graph is None:
-            self.graph = await self.lnrouter_client.convert_to_networkx()
+        """S'assure que le graphe est chargé (GraphStore partagé, à jour par version)"""
+        self.graph = await self.lnrouter_client.get_graph_store()
     
     async def get_network_stats(self) -> Dict[str, Any]:
         """Récupère les statistiques du réseau"""
         try:
             # Obtenir les statistiques basiques du nœud
-            node_info = self.lnd_client.get_node_info()
+            node_info = await call_lnd(self.lnd_client.get_node_info)
             
             # Obtenir des informations du graphe via LNRouter (qui peut être en cache local)
             graph_stats = await self.lnrouter_client.analyze_network_topology()
@@ -63,22 +82,20 @@ class LocalDataSource(DataSourceInterface):
         try:
             await self._ensure_graph_loaded()
             
-            # Récupérer tous les nœuds du graphe
-            nodes = list(self.graph.nodes(data=True))
-            
-            # Appliquer limit et offset
-            paginated_nodes = nodes[offset:offset+limit]
+            # Appliquer limit et offset directement sur les index du graphe
+            store = self.graph
+            indices = range(offset, min(offset + limit, store.num_nodes))
             
             return [
                 {
-                    "pubkey": node_id,
-                    "alias": node_data.get("alias", ""),
-                    "last_update": node_data.get("last_update", 0),
-                    "color": node_data.get("color", "#000000"),
-                    "degree": self.graph.degree(node_id),
+                    "pubkey": store.pubkeys[i],
+                    "alias": store.aliases[i],
+                    "last_update": int(store.node_last_update[i]),
+                    "color": store.colors[i] or "#000000",
+                    "degree": int(store.degree[i]),
                     "source": "local"
                 }
-                for node_id, node_data in paginated_nodes
+                for i in indices
             ]
             
         except Exception as e:
@@ -89,8 +106,8 @@ class LocalDataSource(DataSourceInterface):
         """Récupère les détails d'un nœud spécifique"""
         try:
             # Vérifier si c'est notre propre nœud
-            node_info = self.lnd_client.get_node_info()
-            if node_info.get("pubkey") == node_id:
+            node_info = await self._own_node_info(node_id)
+            if node_info is not None:
                 return {**node_info, "source": "local"}
             
             # Sinon, essayer de récupérer depuis LNRouter/cache local
@@ -101,16 +118,14 @@ class LocalDataSource(DataSourceInterface):
                 # Si pas trouvé dans le cache, récupérer depuis le graphe
                 await self._ensure_graph_loaded()
                 
-                if node_id in self.graph.nodes:
-                    node_data = self.graph.nodes[node_id]
-                    channels = self.graph.edges(node_id, data=True)
-                    
+                node_data = self.graph.node(node_id)
+                if node_data is not None:
                     return {
                         "pubkey": node_id,
                         "alias": node_data.get("alias", ""),
                         "color": node_data.get("color", ""),
                         "last_update": node_data.get("last_update", 0),
-                        "num_channels": len(list(channels)),
+                        "num_channels": int(self.graph.degree[self.graph.index[node_id]]),
                         "source": "local_graph"
                     }
                 
@@ -124,7 +139,7 @@ class LocalDataSource(DataSourceInterface):
         """Récupère les statistiques globales des canaux"""
         try:
             # Récupérer tous les canaux de notre nœud
-            channels = self.lnd_client.list_channels()
+            channels = await call_lnd(self.lnd_client.list_channels)
             
             # Calculer des statistiques
             total_capacity = sum(c["capacity"] for c in channels)
@@ -133,8 +148,8 @@ class LocalDataSource(DataSourceInterface):
             
             # Obtenir des statistiques globales via le graphe
             await self._ensure_graph_loaded()
-            all_edges = self.graph.edges(data=True)
-            network_capacity = sum(edge_data.get("capacity", 0) for _, _, edge_data in all_edges)
+            network_channels = self.graph.num_channels
+            network_capacity = self.graph.total_capacity
             
             return {
                 "timestamp": datetime.now().isoformat(),
@@ -146,9 +161,9 @@ class LocalDataSource(DataSourceInterface):
                     "avg_capacity": total_capacity / len(channels) if channels else 0
                 },
                 "network_stats": {
-                    "total_channels": len(list(all_edges)),
+                    "total_channels": network_channels,
                     "total_capacity": network_capacity,
-                    "avg_capacity": network_capacity / len(list(all_edges)) if all_edges else 0
+                    "avg_capacity": network_capacity / network_channels if network_channels else 0
                 },
                 "source": "local"
             }
@@ -165,7 +180,8 @@ class LocalDataSource(DataSourceInterface):
         """Récupère la liste des canaux"""
         try:
             # Récupérer les canaux de notre nœud
-            channels = self.lnd_client.list_channels()
+            channels = await call_lnd(self.lnd_client.list_channels)
+            own_pubkey = await self._get_own_pubkey() or ""
             
             # Appliquer limit et offset
             paginated_channels = channels[offset:offset+limit]
@@ -173,7 +189,7 @@ class LocalDataSource(DataSourceInterface):
             return [
                 {
                     "channel_id": str(c["channel_id"]),
-                    "node1_pub": self.lnd_client.get_node_info().get("pubkey", ""),
+                    "node1_pub": own_pubkey,
                     "node2_pub": c["remote_pubkey"],
                     "capacity": c["capacity"],
                     "active": c["active"],
@@ -192,7 +208,7 @@ class LocalDataSource(DataSourceInterface):
         """Récupère les détails d'un canal spécifique"""
         try:
             # Récupérer tous les canaux
-            channels = self.lnd_client.list_channels()
+            channels = await call_lnd(self.lnd_client.list_channels)
             
             # Chercher le canal spécifique
             for channel in channels:
@@ -216,11 +232,11 @@ class LocalDataSource(DataSourceInterface):
         """Récupère les canaux d'un nœud spécifique"""
         try:
             # Vérifier si c'est notre propre nœud
-            node_info = self.lnd_client.get_node_info()
+            node_info = await call_lnd(self.lnd_client.get_node_info)
             
             if node_info.get("pubkey") == node_id:
                 # C'est notre nœud, récupérer nos canaux
-                channels = self.lnd_client.list_channels()
+                channels = await call_lnd(self.lnd_client.list_channels)
                 return [
                     {
                         "channel_id": str(c["channel_id"]),
@@ -238,20 +254,16 @@ class LocalDataSource(DataSourceInterface):
             # Sinon, essayer de récupérer depuis le graphe
             await self._ensure_graph_loaded()
             
-            if node_id in self.graph.nodes:
-                channels = self.graph.edges(node_id, data=True)
-                return [
-                    {
-                        "channel_id": str(edge_data.get("channel_id", "")),
-                        "node1_pub": u,
-                        "node2_pub": v,
-                        "capacity": edge_data.get("capacity", 0),
-                        "source": "local_graph"
-                    }
-                    for u, v, edge_data in channels
-                ]
-            
-            return []
+            return [
+                {
+                    "channel_id": channel["channel_id"],
+                    "node1_pub": channel["node1_pub"],
+                    "node2_pub": channel["node2_pub"],
+                    "capacity": channel["capacity"],
+                    "source": "local_graph"
+                }
+                for channel in self.graph.node_channels(node_id)
+            ]
             
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des canaux du nœud {node_id}: {e}")
@@ -269,8 +281,8 @@ class LocalDataSource(DataSourceInterface):
         try:
             # Essayer d'abord via LND
             try:
-                node_info = self.lnd_client.get_node_info()
-                if node_info.get("pubkey") == pubkey:
+                node_info = await self._own_node_info(pubkey)
+                if node_info is not None:
                     return {
                         "node": {
                             "pubkey": node_info.get("pubkey"),
@@ -301,8 +313,8 @@ class LocalDataSource(DataSourceInterface):
                 
             # Si toujours pas trouvé, essayer via le graphe
             await self._ensure_graph_loaded()
-            if pubkey in self.graph.nodes:
-                node_data = self.graph.nodes[pubkey]
+            node_data = self.graph.node(pubkey)
+            if node_data is not None:
                 return {
                     "node": {
                         "pubkey": pubkey,
@@ -330,13 +342,13 @@ class LocalDataSource(DataSourceInterface):
         """
         try:
             # Essayer d'abord via LND
-            channels = self.lnd_client.list_channels()
+            channels = await call_lnd(self.lnd_client.list_channels)
             for channel in channels:
                 if str(channel["channel_id"]) == channel_id:
                     return {
                         "channel": {
                             "channel_id": str(channel["channel_id"]),
-                            "node1_pub": self.lnd_client.get_node_info().get("pubkey", ""),
+                            "node1_pub": await self._get_own_pubkey() or "",
                             "node2_pub": channel["remote_pubkey"],
                             "capacity": channel["capacity"],
                             "local_balance": channel["local_balance"],
@@ -365,18 +377,18 @@ class LocalDataSource(DataSourceInterface):
                 
             # Si toujours pas trouvé, essayer via le graphe
             await self._ensure_graph_loaded()
-            for u, v, edge_data in self.graph.edges(data=True):
-                if str(edge_data.get("channel_id")) == channel_id:
-                    return {
-                        "channel": {
-                            "channel_id": channel_id,
-                            "node1_pub": u,
-                            "node2_pub": v,
-                            "capacity": edge_data.get("capacity", 0),
-                            "last_update": edge_data.get("last_update", 0)
-                        },
-                        "source": "local_graph"
-                    }
+            channel_data = self.graph.channel(channel_id)
+            if channel_data is not None:
+                return {
+                    "channel": {
+                        "channel_id": channel_id,
+                        "node1_pub": channel_data["node1_pub"],
+                        "node2_pub": channel_data["node2_pub"],
+                        "capacity": channel_data["capacity"],
+                        "last_update": channel_data["last_update"]
+                    },
+                    "source": "local_graph"
+                }
                     
             return None
             
@@ -1,8 +1,10 @@
-import httpx
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
 
 from app.core.config import settings
+from services.async_cache import AsyncTTLCache
+from services.bulk_fetch import fetch_many, iter_pages
+from services.http_client import get_http_client
 
 
 class MCPService:
@@ -12,23 +14,24 @@ class MCPService:
         self.base_url = settings.MCP_API_URL
         self.api_key = settings.MCP_API_KEY
         self.headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        # Détails des nœuds et canaux mis en cache (clé : type de ressource, identifiant)
+        self.cache = AsyncTTLCache("mcp")
     
     async def _make_request(self, method: str, endpoint: str, params: Dict[str, Any] = None, data: Dict[str, Any] = None) -> Any:
         """Effectue une requête à l'API MCP"""
         url = f"{self.base_url}{endpoint}"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.request(
-                method=method,
-                url=url,
-                params=params,
-                json=data,
-                headers=self.headers,
-                timeout=60.0
-            )
-            
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client(self.base_url)
+        response = await client.request(
+            method=method,
+            url=url,
+            params=params,
+            json=data,
+            headers=self.headers
+        )
+        
+        response.raise_for_status()
+        return response.json()
     
     # Méthodes pour les données du réseau
     
@@ -47,7 +50,9 @@ class MCPService:
     
     async def get_node_details(self, node_id: str) -> Optional[Dict[str, Any]]:
         """Récupère les détails d'un nœud spécifique"""
-        return await self._make_request("GET", f"/network/nodes/{node_id}")
+        return await self.cache.get_or_call(
+            ("node", node_id), lambda: self._make_request("GET", f"/network/nodes/{node_id}")
+        )
     
     async def get_network_growth_trends(self) -> Dict[str, Any]:
         """Récupère les tendances de croissance du réseau"""
@@ -66,11 +71,15 @@ class MCPService:
     
     async def get_channel_details(self, channel_id: str) -> Optional[Dict[str, Any]]:
         """Récupère les détails d'un canal spécifique"""
-        return await self._make_request("GET", f"/channels/{channel_id}")
+        return await self.cache.get_or_call(
+            ("channel", channel_id), lambda: self._make_request("GET", f"/channels/{channel_id}")
+        )
     
     async def get_node_channels(self, node_id: str) -> List[Dict[str, Any]]:
         """Récupère les canaux d'un nœud spécifique"""
-        return await self._make_request("GET", f"/network/nodes/{node_id}/channels")
+        return await self.cache.get_or_call(
+            ("node_channels", node_id), lambda: self._make_request("GET", f"/network/nodes/{node_id}/channels")
+        )
     
     async def get_channels_performance(self, timeframe: str = "week") -> Dict[str, Any]:
         """Récupère les données de performance des canaux pour une période donnée"""
@@ -81,8 +90,34 @@ class MCPService:
     
     async def get_node_ranking(self, node_id: str) -> Dict[str, Any]:
         """Récupère le classement d'un nœud dans le réseau"""
-        return await self._make_request("GET", f"/network/nodes/{node_id}/ranking")
+        return await self.cache.get_or_call(
+            ("node_ranking", node_id), lambda: self._make_request("GET", f"/network/nodes/{node_id}/ranking")
+        )
     
     async def get_node_network_context(self, node_id: str) -> Dict[str, Any]:
         """Récupère le contexte réseau d'un nœud spécifique"""
-        return await self._make_request("GET", f"/network/nodes/{node_id}/context") 
\ No newline at end of file
+        return await self.cache.get_or_call(
+            ("node_context", node_id), lambda: self._make_request("GET", f"/network/nodes/{node_id}/context")
+        )
+    
+    # Méthodes groupées : plusieurs identifiants, requêtes unitaires parallélisées
+    
+    async def get_nodes_details(self, node_ids: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Récupère les détails de plusieurs nœuds (None pour un nœud introuvable)"""
+        return await fetch_many(self.get_node_details, node_ids)
+    
+    async def get_channels_details(self, channel_ids: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Récupère les détails de plusieurs canaux (None pour un canal introuvable)"""
+        return await fetch_many(self.get_channel_details, channel_ids)
+    
+    async def get_nodes_channels(self, node_ids: Iterable[str]) -> Dict[str, Optional[List[Dict[str, Any]]]]:
+        """Récupère les canaux de plusieurs nœuds (None pour un nœud introuvable)"""
+        return await fetch_many(self.get_node_channels, node_ids)
+    
+    def iter_network_nodes(self, page_size: int = None) -> AsyncIterator[Dict[str, Any]]:
+        """Parcourt tous les nœuds du réseau, la page suivante étant préchargée"""
+        return iter_pages(self.get_network_nodes, page_size)
+    
+    def iter_channels_list(self, page_size: int = None) -> AsyncIterator[Dict[str, Any]]:
+        """Parcourt tous les canaux, la page suivante étant préchargée"""
+        return iter_pages(self.get_channels_list, page_size)
@@ -1,4 +1,4 @@
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, Iterable, List, Any, Optional
 import logging
 
 from services.data_source_interface import DataSourceInterface
@@ -106,4 +106,38 @@ class MCPDataSource(DataSourceInterface):
             return channels
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des canaux du nœud {node_id} depuis MCP: {e}")
-            return [] 
\ No newline at end of file
+            return []
+    
+    async def get_nodes_details(self, node_ids: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Récupère les détails de plusieurs nœuds depuis MCP (None si introuvable)"""
+        nodes = await self.mcp_service.get_nodes_details(node_ids)
+        return {
+            node_id: {**node, "source": "mcp"} if node else None
+            for node_id, node in nodes.items()
+        }
+    
+    async def get_channels_details(self, channel_ids: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Récupère les détails de plusieurs canaux depuis MCP (None si introuvable)"""
+        channels = await self.mcp_service.get_channels_details(channel_ids)
+        return {
+            channel_id: {**channel, "source": "mcp"} if channel else None
+            for channel_id, channel in channels.items()
+        }
+    
+    async def get_nodes_channels(self, node_ids: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Récupère les canaux de plusieurs nœuds depuis MCP"""
+        nodes_channels = await self.mcp_service.get_nodes_channels(node_ids)
+        return {
+            node_id: [{**channel, "source": "mcp"} for channel in channels or []]
+            for node_id, channels in nodes_channels.items()
+        }
+    
+    async def iter_network_nodes(self, page_size: int = None) -> AsyncIterator[Dict[str, Any]]:
+        """Parcourt tous les nœuds du réseau depuis MCP, page par page"""
+        async for node in self.mcp_service.iter_network_nodes(page_size):
+            yield {**node, "source": "mcp"}
+    
+    async def iter_channels_list(self, page_size: int = None) -> AsyncIterator[Dict[str, Any]]:
+        """Parcourt tous les canaux depuis MCP, page par page"""
+        async for channel in self.mcp_service.iter_channels_list(page_size):
+            yield {**channel, "source": "mcp"}
@@ -1,77 +1,96 @@
 import os
 import json
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
 import asyncio
-
-from pymongo import MongoClient
-from pymongo.database import Database
-from pymongo.collection import Collection
+import time
 
 from core.config import settings
 from services.lnd_client import LNDClient
+from services.async_lnd_client import call_lnd
+from services.forwarding_analytics import ForwardingAnalytics
 from services.mcp import MCPService
 from services.lnrouter_client import LNRouterClient
+from services.metrics_storage import get_metrics_storage
+from services.metrics_storage_interface import MetricsStorageInterface
 
 logger = logging.getLogger(__name__)
 
+# Alias des métriques de tendance vers leur chemin dans les snapshots
+METRIC_PATHS = {
+    "total_capacity": "node_metrics.total_capacity",
+    "num_active_channels": "node_metrics.num_active_channels",
+    "local_balance": "node_metrics.total_local_balance",
+    "remote_balance": "node_metrics.total_remote_balance",
+    "total_forwards": "forwarding_metrics.total_forwards",
+    "total_fees": "forwarding_metrics.total_fees_earned",
+    "avg_fee_rate": "forwarding_metrics.avg_fee_rate_ppm"
+}
+
+# Chemin explicite d'un champ des snapshots (sans opérateur MongoDB)
+METRIC_PATH_PATTERN = re.compile(
+    r"^(node_metrics|forwarding_metrics|network_context)(\.[A-Za-z_][A-Za-z0-9_]*)+$"
+)
+
 class MetricsCollector:
     """Collecteur de métriques pour le nœud LN et le réseau"""
     
-    def __init__(self, db_connection_string: str = None, lnd_client: LNDClient = None):
+    def __init__(self, db_connection_string: str = None, lnd_client: LNDClient = None,
+                 storage: MetricsStorageInterface = None):
         """Initialise le collecteur de métriques
         
         Args:
             db_connection_string: Chaîne de connexion à la base de données
             lnd_client: Client LND à utiliser
+            storage: Stockage des métriques (par défaut : celui partagé pour
+                db_connection_string)
         """
         self.db_connection_string = db_connection_string or settings.DATABASE_URL
         self.lnd_client = lnd_client or LNDClient()
         self.mcp_service = MCPService()
         self.lnrouter_client = LNRouterClient()
-        self.db = self._init_database()
+        self.storage = storage or self._init_storage()
+        self._last_balance_sample: Optional[float] = None
+        self._ingest_lock = asyncio.Lock()
+        self._network_context: Optional[Dict[str, Any]] = None
+        self._network_context_at: Optional[float] = None
         
-    def _init_database(self) -> Optional[Database]:
-        """Initialise la connexion à la base de données"""
-        if not self.db_connection_string:
-            logger.warning("Chaîne de connexion à la base de données non configurée. Les métriques ne seront pas stockées.")
-            return None
-            
+    def _init_storage(self) -> Optional[MetricsStorageInterface]:
+        """Récupère le stockage partagé (la connexion est ouverte au premier appel)
+        
+        Sans chaîne de connexion, les métriques sont stockées dans le fichier
+        SQLite local METRICS_LOCAL_DB_PATH.
+        """
         try:
-            client = MongoClient(self.db_connection_string)
-            db = client.get_database()
-            
-            # Créer les collections si elles n'existent pas
-            if "daily_snapshots" not in db.list_collection_names():
-                db.create_collection("daily_snapshots")
-                db["daily_snapshots"].create_index([("timestamp", 1)], unique=True)
-                
-            if "channel_metrics" not in db.list_collection_names():
-                db.create_collection("channel_metrics")
-                db["channel_metrics"].create_index([("timestamp", 1), ("channel_id", 1)], unique=True)
-                
-            if "forwarding_events" not in db.list_collection_names():
-                db.create_collection("forwarding_events")
-                db["forwarding_events"].create_index([("timestamp", 1), ("chan_id_in", 1), ("chan_id_out", 1)], unique=True)
-                
-            return db
+            storage = get_metrics_storage(self.db_connection_string)
         except Exception as e:
             logger.error(f"Erreur lors de l'initialisation de la base de données: {e}")
             return None
+        
+        if storage is None:
+            logger.warning("Aucune base de données configurée. Les métriques ne seront pas stockées.")
+        return storage
     
-    async def collect_node_metrics(self) -> Dict[str, Any]:
+    async def collect_node_metrics(self, channels: List[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Collecte les métriques du nœud local
         
+        Args:
+            channels: Résultat de list_channels déjà récupéré (sinon demandé à LND)
+        
         Returns:
             Dictionnaire des métriques du nœud
         """
         try:
-            # Récupérer les informations du nœud
-            node_info = self.lnd_client.get_node_info()
-            
-            # Récupérer les informations de balance
-            channels = self.lnd_client.list_channels()
+            if channels is None:
+                # Informations du nœud et balances demandées en parallèle
+                node_info, channels = await asyncio.gather(
+                    call_lnd(self.lnd_client.get_node_info),
+                    call_lnd(self.lnd_client.list_channels)
+                )
+            else:
+                node_info = await call_lnd(self.lnd_client.get_node_info)
             
             total_capacity = sum(c["capacity"] for c in channels)
             total_local_balance = sum(c["local_balance"] for c in channels)
@@ -123,14 +142,18 @@ class MetricsCollector:
                 "error": str(e)
             }
     
-    async def collect_channel_metrics(self) -> List[Dict[str, Any]]:
+    async def collect_channel_metrics(self, channels: List[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Collecte les métriques de tous les canaux
         
+        Args:
+            channels: Résultat de list_channels déjà récupéré (sinon demandé à LND)
+        
         Returns:
             Liste des métriques des canaux
         """
         try:
-            channels = self.lnd_client.list_channels()
+            if channels is None:
+                channels = await call_lnd(self.lnd_client.list_channels)
             channel_metrics = []
             
             for channel in channels:
@@ -173,14 +196,177 @@ class MetricsCollector:
                     "channel_point": channel_point
                 })
             
+            await self._record_channel_balances(channel_metrics)
+            
             return channel_metrics
         except Exception as e:
             logger.error(f"Erreur lors de la collecte des métriques des canaux: {e}")
             return []
     
+    async def _record_channel_balances(self, channel_metrics: List[Dict[str, Any]],
+                                       force: bool = False) -> bool:
+        """Enregistre la balance des canaux dans la série temporelle par canal
+        
+        Au plus un échantillon par intervalle CHANNEL_BALANCE_SAMPLE_INTERVAL :
+        les appels fréquents de l'API n'ajoutent pas de points.
+        
+        Args:
+            channel_metrics: Métriques des canaux (ou résultat de list_channels)
+            force: Enregistrer sans tenir compte de l'intervalle (échantillonnage planifié)
+        
+        Returns:
+            True si un échantillon a été enregistré
+        """
+        if self.storage is None or not channel_metrics:
+            return False
+        
+        now = time.monotonic()
+        if (not force and self._last_balance_sample is not None
+                and now - self._last_balance_sample < settings.CHANNEL_BALANCE_SAMPLE_INTERVAL):
+            return False
+        
+        try:
+            await self.storage.write_channel_balances([
+                {
+                    "channel_id": channel["channel_id"],
+                    "local": channel["local_balance"],
+                    "remote": channel["remote_balance"],
+                    "active": channel["active"]
+                }
+                for channel in channel_metrics
+            ])
+            self._last_balance_sample = now
+            return True
+        except Exception as e:
+            logger.error(f"Erreur lors de l'enregistrement des balances des canaux: {e}")
+            return False
+    
+    async def sample_channel_balances(self) -> int:
+        """Échantillonne la balance de tous les canaux (tâche planifiée)
+        
+        Un seul ListChannels, sans calcul des métriques détaillées des canaux.
+        
+        Returns:
+            Nombre de canaux échantillonnés
+        """
+        channels = await call_lnd(self.lnd_client.list_channels)
+        if not await self._record_channel_balances(channels, force=True):
+            return 0
+        return len(channels)
+    
+    async def get_channel_balance_history(
+        self,
+        channel_ids: List[str],
+        days: int = 30,
+        max_points: int = 240
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Historique des balances de plusieurs canaux en une seule requête indexée
+        
+        Args:
+            channel_ids: Canaux concernés
+            days: Nombre de jours d'historique
+            max_points: Nombre maximal de points par canal (sous-échantillonnage)
+            
+        Returns:
+            Points {"timestamp", "local_balance", "remote_balance", "local_ratio", "active"}
+            par identifiant de canal, triés par date
+        """
+        if self.storage is None or not channel_ids:
+            return {}
+        
+        end_date = datetime.now(timezone.utc)
+        start_date = end_date - timedelta(days=days)
+        bucket_seconds = max(settings.CHANNEL_BALANCE_SAMPLE_INTERVAL, -(-days * 86400 // max_points))
+        
+        series = await self.storage.get_channel_balances(
+            channel_ids, start_date, end_date, bucket_seconds
+        )
+        return {
+            channel_id: [
+                {
+                    "timestamp": point["ts"],
+                    "local_balance": point["local"],
+                    "remote_balance": point["remote"],
+                    "local_ratio": point["local"] / (point["local"] + point["remote"])
+                    if point["local"] + point["remote"] > 0 else 0,
+                    "active": point["active"]
+                }
+                for point in points
+            ]
+            for channel_id, points in series.items()
+        }
+    
+    async def ingest_forwarding_events(self, page_size: int = None) -> Dict[str, Any]:
+        """Ingère les événements de forwarding apparus depuis la dernière ingestion
+        
+        Seuls les événements au-delà du dernier offset LND enregistré sont
+        demandés, puis écrits par lots avec leurs agrégats horaires, journaliers
+        et hebdomadaires. L'offset est enregistré après chaque lot : une
+        ingestion interrompue reprend là où elle s'est arrêtée.
+        
+        Args:
+            page_size: Nombre d'événements demandés à LND et écrits par lot
+            
+        Returns:
+            Statistiques de l'ingestion
+        """
+        # Une seule ingestion à la fois (tâche planifiée et snapshot)
+        async with self._ingest_lock:
+            if self.storage is None:
+                return {"ingested": 0, "duplicates": 0, "last_offset_index": None}
+            
+            page_size = page_size or settings.METRICS_FORWARDING_BATCH_SIZE
+            started = time.perf_counter()
+            db_time = 0.0
+            stats = {"ingested": 0, "duplicates": 0}
+            
+            await self.storage.ensure_forwarding_rollups()
+            watermark = await self.storage.get_forwarding_watermark()
+            offset = watermark
+            # L'offset de LND est compté depuis start_time : la requête part
+            # toujours de l'origine pour qu'il reste un index global
+            async for page in self.lnd_client.iter_forwarding_pages(
+                start_time=0, end_time=int(datetime.now().timestamp()),
+                page_size=page_size, index_offset=watermark
+            ):
+                events = page["forwarding_events"]
+                for position, event in enumerate(events, start=offset + 1):
+                    event["offset_index"] = position
+                
+                write_started = time.perf_counter()
+                written = await self.storage.write_forwarding_events(events)
+                offset = max(offset, page["last_offset_index"])
+                await self.storage.set_forwarding_watermark(offset)
+                db_time += time.perf_counter() - write_started
+                
+                stats["ingested"] += written["inserted"]
+                stats["duplicates"] += written["duplicates"]
+            
+            stats.update({
+                "last_offset_index": offset,
+                "previous_offset_index": watermark,
+                "db_time": round(db_time, 4),
+                "duration": round(time.perf_counter() - started, 4)
+            })
+            if stats["ingested"] or stats["duplicates"]:
+                logger.info(
+                    f"{stats['ingested']} événements de forwarding ingérés "
+                    f"(offset {watermark} -> {offset}, {stats['duplicates']} doublons)"
+                )
+            return stats
+    
+    @staticmethod
+    def _summarize_forwards(forwarding_events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Agrège une liste d'événements de forwarding (totaux et par canal)"""
+        return ForwardingAnalytics.from_events(forwarding_events).summary()
+    
     async def collect_forwarding_metrics(self, time_window_hours: int = 24) -> Dict[str, Any]:
         """Collecte les métriques de routage sur une période donnée
         
+        Avec une base de données, seuls les nouveaux événements sont demandés
+        à LND (ingestion incrémentale) et l'agrégation est faite par MongoDB ;
+        sans base, tout l'historique de la période est lu depuis LND par lots.
+        
         Args:
             time_window_hours: Nombre d'heures à considérer
             
@@ -192,52 +378,21 @@ class MetricsCollector:
             end_time = int(datetime.now().timestamp())
             start_time = end_time - time_window_hours * 3600
             
-            # Récupérer l'historique des forwards
-            forwards = self.lnd_client.get_forwarding_history(start_time=start_time, end_time=end_time, limit=1000)
-            
-            forwarding_events = forwards.get("forwarding_events", [])
-            
-            # Stocker les événements si la base de données est configurée
-            if self.db:
-                collection = self.db["forwarding_events"]
-                for event in forwarding_events:
-                    try:
-                        collection.update_one(
-                            {"timestamp": event["timestamp"], "chan_id_in": event["chan_id_in"], "chan_id_out": event["chan_id_out"]},
-                            {"$set": event},
-                            upsert=True
-                        )
-                    except Exception as e:
-                        logger.error(f"Erreur lors du stockage de l'événement de forwarding: {e}")
-            
-            # Agréger les données
-            total_forwards = len(forwarding_events)
-            total_amount_forwarded = sum(event["amt_out"] for event in forwarding_events)
-            total_fees_earned = sum(event["fee"] for event in forwarding_events)
-            
-            # Agréger par canal
-            channels_in = {}
-            channels_out = {}
-            
-            for event in forwarding_events:
-                chan_id_in = event["chan_id_in"]
-                chan_id_out = event["chan_id_out"]
-                amt_in = event["amt_in"]
-                amt_out = event["amt_out"]
-                fee = event["fee"]
-                
-                # Canal entrant
-                if chan_id_in not in channels_in:
-                    channels_in[chan_id_in] = {"count": 0, "amount": 0, "fees": 0}
-                channels_in[chan_id_in]["count"] += 1
-                channels_in[chan_id_in]["amount"] += amt_in
-                channels_in[chan_id_in]["fees"] += fee
-                
-                # Canal sortant
-                if chan_id_out not in channels_out:
-                    channels_out[chan_id_out] = {"count": 0, "amount": 0}
-                channels_out[chan_id_out]["count"] += 1
-                channels_out[chan_id_out]["amount"] += amt_out
+            if self.storage is not None:
+                await self.ingest_forwarding_events()
+                summary = await self.storage.summarize_forwards(start_time, end_time)
+            else:
+                # Parcourir tout l'historique de la période par lots colonnaires
+                analytics = await ForwardingAnalytics.from_batches(
+                    self.lnd_client.iter_forwarding_batches(
+                        start_time=start_time, end_time=end_time
+                    )
+                )
+                summary = analytics.summary()
+            
+            total_forwards = summary["total_forwards"]
+            total_amount_forwarded = summary["total_amount_forwarded"]
+            total_fees_earned = summary["total_fees_earned"]
             
             # Calculer le taux moyen de frais
             avg_fee_rate = total_fees_earned / total_amount_forwarded * 1000000 if total_amount_forwarded > 0 else 0
@@ -252,8 +407,8 @@ class MetricsCollector:
                 "total_amount_forwarded": total_amount_forwarded,
                 "total_fees_earned": total_fees_earned,
                 "avg_fee_rate_ppm": avg_fee_rate,
-                "channels_in": channels_in,
-                "channels_out": channels_out,
+                "channels_in": summary["channels_in"],
+                "channels_out": summary["channels_out"],
                 "forwards_per_hour": total_forwards / time_window_hours if time_window_hours > 0 else 0,
                 "amount_per_hour": total_amount_forwarded / time_window_hours if time_window_hours > 0 else 0,
                 "fees_per_hour": total_fees_earned / time_window_hours if time_window_hours > 0 else 0
@@ -268,6 +423,38 @@ class MetricsCollector:
                 "error": str(e)
             }
     
+    async def _gather_sources(self, sources: Dict[str, Awaitable],
+                              timeout: float = None) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Exécute des collectes indépendantes en parallèle, chacune avec un délai maximal
+        
+        Une source en erreur ou trop lente est annulée sans bloquer les autres.
+        
+        Args:
+            sources: Coroutines de collecte par nom de source
+            timeout: Délai maximal par source (secondes)
+            
+        Returns:
+            Tuple (résultats par source, message d'erreur par source en échec)
+        """
+        timeout = timeout or settings.SNAPSHOT_SOURCE_TIMEOUT
+        names = list(sources)
+        outcomes = await asyncio.gather(
+            *(asyncio.wait_for(sources[name], timeout) for name in names),
+            return_exceptions=True
+        )
+        
+        results, errors = {}, {}
+        for name, outcome in zip(names, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                errors[name] = f"Délai dépassé ({timeout}s)"
+                logger.warning(f"Collecte de {name} interrompue après {timeout}s")
+            elif isinstance(outcome, BaseException):
+                errors[name] = str(outcome) or type(outcome).__name__
+                logger.error(f"Erreur lors de la collecte de {name}: {outcome}")
+            else:
+                results[name] = outcome
+        return results, errors
+    
     async def collect_network_context(self) -> Dict[str, Any]:
         """Collecte le contexte global du réseau Lightning
         
@@ -275,11 +462,14 @@ class MetricsCollector:
             Contexte du réseau
         """
         try:
-            # Récupérer les informations MCP
-            network_stats = await self.mcp_service.get_network_stats()
-            
-            # Récupérer les informations LNRouter
-            lnrouter_stats = await self.lnrouter_client.get_network_stats()
+            # Interroger MCP et LNRouter en parallèle ; une source lente ou en
+            # erreur laisse ses valeurs à 0
+            results, errors = await self._gather_sources({
+                "mcp": self.mcp_service.get_network_stats(),
+                "lnrouter": self.lnrouter_client.get_network_stats()
+            })
+            network_stats = results.get("mcp") or {}
+            lnrouter_stats = results.get("lnrouter") or {}
             
             # Combiner les données
             network_context = {
@@ -299,6 +489,8 @@ class MetricsCollector:
                     "avg_node_degree": lnrouter_stats.get("avg_node_degree", 0),
                 }
             }
+            if errors:
+                network_context["errors"] = errors
             
             return network_context
         except Exception as e:
@@ -308,6 +500,35 @@ class MetricsCollector:
                 "error": str(e)
             }
     
+    async def refresh_network_context(self) -> Dict[str, Any]:
+        """Collecte le contexte du réseau et le garde en cache s'il est complet
+        
+        Returns:
+            Contexte du réseau
+        """
+        network_context = await self.collect_network_context()
+        if "error" not in network_context and "errors" not in network_context:
+            self._network_context = network_context
+            self._network_context_at = time.monotonic()
+        return network_context
+    
+    async def get_network_context(self, max_age: float = None) -> Dict[str, Any]:
+        """Contexte du réseau, recollecté seulement si le dernier est trop ancien
+        
+        La tâche planifiée le rafraîchit toutes les heures : les snapshots
+        réutilisent ce résultat au lieu d'interroger à nouveau MCP et LNRouter.
+        
+        Args:
+            max_age: Âge maximal du contexte en cache (secondes, par défaut
+                METRICS_NETWORK_CONTEXT_INTERVAL_SECONDS)
+        """
+        if max_age is None:
+            max_age = settings.METRICS_NETWORK_CONTEXT_INTERVAL_SECONDS
+        if (self._network_context is not None
+                and time.monotonic() - self._network_context_at < max_age):
+            return self._network_context
+        return await self.refresh_network_context()
+    
     async def create_daily_snapshot(self) -> str:
         """Crée un snapshot complet des métriques du jour
         
@@ -315,36 +536,47 @@ class MetricsCollector:
             ID du snapshot créé
         """
         try:
-            # Collecter toutes les métriques
-            node_metrics = await self.collect_node_metrics()
-            channel_metrics = await self.collect_channel_metrics()
-            forwarding_metrics = await self.collect_forwarding_metrics(time_window_hours=24)
-            network_context = await self.collect_network_context()
+            started = time.perf_counter()
+            
+            # Un seul ListChannels, partagé par les métriques du nœud et des canaux
+            channels_task = asyncio.ensure_future(call_lnd(self.lnd_client.list_channels))
+            
+            async def with_channels(collect):
+                return await collect(channels=await asyncio.shield(channels_task))
+            
+            # Collecter toutes les sources en parallèle, chacune avec son délai maximal
+            try:
+                results, errors = await self._gather_sources({
+                    "node_metrics": with_channels(self.collect_node_metrics),
+                    "channel_metrics": with_channels(self.collect_channel_metrics),
+                    "forwarding_metrics": self.collect_forwarding_metrics(time_window_hours=24),
+                    "network_context": self.get_network_context()
+                })
+            finally:
+                channels_task.cancel()
             
-            # Construire le snapshot
+            # Construire le snapshot (les sources manquantes sont signalées)
             snapshot = {
                 "timestamp": datetime.now().isoformat(),
-                "node_metrics": node_metrics,
-                "channel_metrics": channel_metrics,
-                "forwarding_metrics": forwarding_metrics,
-                "network_context": network_context
+                "node_metrics": results.get("node_metrics", {"error": errors.get("node_metrics")}),
+                "channel_metrics": results.get("channel_metrics", []),
+                "forwarding_metrics": results.get("forwarding_metrics", {"error": errors.get("forwarding_metrics")}),
+                "network_context": results.get("network_context", {"error": errors.get("network_context")}),
+                "partial": bool(errors),
+                "collection_time": round(time.perf_counter() - started, 3)
             }
+            if errors:
+                snapshot["errors"] = errors
+                logger.warning(f"Snapshot partiel, sources manquantes: {', '.join(errors)}")
             
             # Stocker dans la base de données si configurée
             snapshot_id = None
-            if self.db:
-                collection = self.db["daily_snapshots"]
-                result = collection.insert_one(snapshot)
-                snapshot_id = str(result.inserted_id)
+            if self.storage is not None:
+                snapshot_id = await self.storage.insert_snapshot(snapshot)
                 logger.info(f"Snapshot quotidien créé avec ID: {snapshot_id}")
             
-            # Sauvegarder dans un fichier JSON aussi
-            snapshot_dir = "data/snapshots"
-            os.makedirs(snapshot_dir, exist_ok=True)
-            
-            snapshot_file = os.path.join(snapshot_dir, f"snapshot_{datetime.now().strftime('%Y-%m-%d')}.json")
-            with open(snapshot_file, 'w') as f:
-                json.dump(snapshot, f, indent=2)
+            # Sauvegarder dans un fichier JSON aussi (hors de la boucle d'événements)
+            snapshot_file = await asyncio.to_thread(self._write_snapshot_file, snapshot)
             
             logger.info(f"Snapshot quotidien sauvegardé dans: {snapshot_file}")
             
@@ -353,6 +585,17 @@ class MetricsCollector:
             logger.error(f"Erreur lors de la création du snapshot quotidien: {e}")
             return f"Erreur: {str(e)}"
     
+    @staticmethod
+    def _write_snapshot_file(snapshot: Dict[str, Any]) -> str:
+        """Écrit le snapshot dans data/snapshots et retourne le chemin du fichier"""
+        snapshot_dir = "data/snapshots"
+        os.makedirs(snapshot_dir, exist_ok=True)
+        
+        snapshot_file = os.path.join(snapshot_dir, f"snapshot_{datetime.now().strftime('%Y-%m-%d')}.json")
+        with open(snapshot_file, 'w') as f:
+            json.dump(snapshot, f, indent=2)
+        return snapshot_file
+    
     async def export_metrics_to_prometheus(self) -> bool:
         """Exporte les métriques au format Prometheus
         
@@ -369,97 +612,97 @@ class MetricsCollector:
             logger.error(f"Erreur lors de l'export Prometheus: {e}")
             return False
     
-    async def generate_historical_trends(self, metric_name: str, days: int = 30) -> List[Dict]:
-        """Génère des données de tendance pour une métrique spécifique
+    @staticmethod
+    def _resolve_metric_path(metric: str) -> str:
+        """Chemin d'une métrique dans les snapshots (alias de METRIC_PATHS ou chemin explicite)
+        
+        Raises:
+            ValueError: Si la métrique n'est ni un alias ni un chemin de snapshot
+        """
+        if metric in METRIC_PATHS:
+            return METRIC_PATHS[metric]
+        if METRIC_PATH_PATTERN.match(metric):
+            return metric
+        raise ValueError(f"Métrique inconnue: {metric}")
+    
+    async def query_trends(
+        self,
+        metrics: List[str],
+        days: int = 30,
+        bucket_seconds: int = None,
+        aggregation: str = "avg",
+        max_points: int = 500
+    ) -> List[Dict[str, Any]]:
+        """Séries historiques de plusieurs métriques en une seule requête
         
         Args:
-            metric_name: Nom de la métrique à analyser
+            metrics: Alias (voir METRIC_PATHS) ou chemins de champs des snapshots
+                (ex: node_metrics.total_capacity)
             days: Nombre de jours d'historique à considérer
+            bucket_seconds: Taille d'un point ; par défaut la période est
+                découpée en au plus max_points points
+            aggregation: Agrégation des snapshots d'un même point (avg, min, max, sum, first, last)
+            max_points: Nombre maximal de points quand bucket_seconds n'est pas fourni
             
         Returns:
-            Liste de points de données pour la tendance
+            Points {"timestamp": ISO UTC, métrique: valeur, ...} triés par date
+            
+        Raises:
+            ValueError: Si une métrique ou l'agrégation est inconnue
         """
-        if not self.db:
+        if self.storage is None:
             logger.warning("Base de données non configurée, impossible de générer des tendances historiques")
             return []
+        
+        paths = {metric: self._resolve_metric_path(metric) for metric in metrics}
+        
+        end_date = datetime.now(timezone.utc)
+        start_date = end_date - timedelta(days=days)
+        if not bucket_seconds:
+            bucket_seconds = max(60, -(-days * 86400 // max_points))
+        
+        rows = await self.storage.query_snapshot_trends(
+            list(dict.fromkeys(paths.values())), start_date, end_date, bucket_seconds, aggregation
+        )
+        return [
+            {"timestamp": row["timestamp"], **{metric: row[path] for metric, path in paths.items()}}
+            for row in rows
+        ]
+    
+    async def generate_historical_trends(self, metric_name: str, days: int = 30) -> List[Dict]:
+        """Génère des données de tendance journalière pour une métrique spécifique
+        
+        Args:
+            metric_name: Nom de la métrique à analyser (alias ou chemin de champ)
+            days: Nombre de jours d'historique à considérer
             
+        Returns:
+            Liste de points {"date", "value"} (un par jour UTC)
+        """
         try:
-            # Calculer la période
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
-            
-            # Mapper les noms de métriques aux chemins dans le document
-            metric_paths = {
-                "total_capacity": "node_metrics.total_capacity",
-                "num_active_channels": "node_metrics.num_active_channels",
-                "local_balance": "node_metrics.total_local_balance",
-                "remote_balance": "node_metrics.total_remote_balance",
-                "total_forwards": "forwarding_metrics.total_forwards",
-                "total_fees": "forwarding_metrics.total_fees_earned",
-                "avg_fee_rate": "forwarding_metrics.avg_fee_rate_ppm"
-            }
-            
-            if metric_name not in metric_paths:
-                logger.error(f"Métrique inconnue: {metric_name}")
-                return []
-                
-            metric_path = metric_paths[metric_name]
-            
-            # Agréger par jour
-            collection = self.db["daily_snapshots"]
-            pipeline = [
-                {
-                    "$match": {
-                        "timestamp": {
-                            "$gte": start_date.isoformat(),
-                            "$lte": end_date.isoformat()
-                        }
-                    }
-                },
-                {
-                    "$project": {
-                        "date": {"$substr": ["$timestamp", 0, 10]},
-                        "value": f"${metric_path}"
-                    }
-                },
-                {
-                    "$group": {
-                        "_id": "$date",
-                        "value": {"$avg": "$value"}
-                    }
-                },
-                {
-                    "$sort": {"_id": 1}
-                }
+            points = await self.query_trends([metric_name], days=days, bucket_seconds=86400)
+            return [
+                {"date": point["timestamp"][:10], "value": point[metric_name]}
+                for point in points
             ]
-            
-            results = list(collection.aggregate(pipeline))
-            
-            # Formater les résultats
-            trend_data = [{"date": item["_id"], "value": item["value"]} for item in results]
-            
-            return trend_data
         except Exception as e:
             logger.error(f"Erreur lors de la génération des tendances historiques: {e}")
             return []
     
     async def run_periodic_collection(self, interval_hours: int = None):
-        """Exécute la collecte périodique des métriques
+        """Exécute la collecte périodique des métriques jusqu'à l'annulation
+        
+        Les balances, les forwards, le contexte réseau et les snapshots complets
+        sont collectés chacun à son rythme par MetricsScheduler.
         
         Args:
-            interval_hours: Intervalle en heures entre les collectes
+            interval_hours: Intervalle en heures entre deux snapshots complets
         """
-        interval = interval_hours or settings.METRICS_COLLECTION_INTERVAL_HOURS or 24
+        from services.metrics_scheduler import MetricsScheduler
         
-        while True:
-            try:
-                logger.info(f"Démarrage de la collecte périodique des métriques (intervalle: {interval}h)")
-                await self.create_daily_snapshot()
-                logger.info(f"Collecte terminée, prochaine exécution dans {interval} heures")
-                
-                # Attendre l'intervalle spécifié
-                await asyncio.sleep(interval * 3600)
-            except Exception as e:
-                logger.error(f"Erreur lors de la collecte périodique: {e}")
-                # Attendre 10 minutes avant de réessayer en cas d'erreur
-                await asyncio.sleep(600) 
\ No newline at end of file
+        scheduler = MetricsScheduler(self, snapshot_interval_hours=interval_hours)
+        await scheduler.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await scheduler.stop()
@@ -4,6 +4,8 @@ import logging
 from typing import Dict, Any
 from datetime import datetime
 
+from services.async_cache import add_access_listener
+
 logger = logging.getLogger(__name__)
 
 class MetricsExporter:
@@ -68,6 +70,8 @@ class MetricsExporter:
             'Nombre total de misses du cache',
             ['cache_type']
         )
+        # Accès aux caches des clients d'API (AsyncTTLCache), par nom de cache
+        add_access_listener(self.record_cache_access)
         
         # Métriques système
         self.memory_usage = Gauge(
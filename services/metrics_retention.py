@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from core.config import settings
+from services.metrics_storage_interface import MetricsStorageInterface
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsRetention:
+    """Rétention, sous-échantillonnage et compaction des métriques stockées
+
+    Chaque donnée passe par des étapes à horizon configurable :
+
+    - événements de forwarding bruts supprimés après
+      METRICS_FORWARDING_RETENTION_DAYS (les agrégats horaires, journaliers
+      et hebdomadaires, tenus à jour à l'ingestion, restent), puis agrégats
+      horaires et journaliers supprimés à leur tour ;
+    - points de balance par canal réduits à un par heure, puis à un par
+      jour, puis supprimés ;
+    - snapshots privés de leur détail par canal après METRICS_HISTORY_DAYS,
+      puis supprimés.
+
+    Les étapes travaillent par lots de taille bornée et rendent la main à la
+    boucle d'événements entre deux lots ; le nombre de lots par exécution
+    est limité, le reste est traité à l'exécution suivante.
+    """
+
+    def __init__(self, storage: MetricsStorageInterface, batch_size: int = None,
+                 max_batches: int = None):
+        """Initialise la rétention
+
+        Args:
+            storage: Stockage des métriques
+            batch_size: Nombre maximal de documents par lot
+            max_batches: Nombre maximal de lots par étape et par exécution
+        """
+        self.storage = storage
+        self.batch_size = batch_size or settings.METRICS_RETENTION_BATCH_SIZE
+        self.max_batches = max_batches or settings.METRICS_RETENTION_MAX_BATCHES
+
+        self.last_run: Optional[datetime] = None
+        self.last_result: Dict[str, int] = {}
+        self.totals: Dict[str, int] = {}
+
+    def _stages(self, now: datetime) -> List[Tuple[str, Callable[[], Awaitable[int]]]]:
+        """Étapes actives (horizon non nul) avec la fonction qui traite un lot"""
+        storage, batch_size = self.storage, self.batch_size
+
+        def horizon(days: int) -> Optional[datetime]:
+            return now - timedelta(days=days) if days > 0 else None
+
+        # Les données les plus anciennes sont supprimées avant d'être
+        # sous-échantillonnées ou compactées inutilement
+        stages = []
+        for name, days, batch in (
+            ("forwarding_events", settings.METRICS_FORWARDING_RETENTION_DAYS,
+             lambda before: storage.purge_forwarding_events(int(before.timestamp()), batch_size)),
+            ("hourly_rollups", settings.METRICS_HOURLY_ROLLUP_RETENTION_DAYS,
+             lambda before: storage.purge_forwarding_rollups("hour", int(before.timestamp()), batch_size)),
+            ("daily_rollups", settings.METRICS_DAILY_ROLLUP_RETENTION_DAYS,
+             lambda before: storage.purge_forwarding_rollups("day", int(before.timestamp()), batch_size)),
+            ("channel_balances", settings.METRICS_BALANCE_RETENTION_DAYS,
+             lambda before: storage.purge_channel_balances(before, batch_size)),
+            ("daily_balances", settings.METRICS_BALANCE_HOURLY_RETENTION_DAYS,
+             lambda before: storage.downsample_channel_balances(before, 86400, batch_size)),
+            ("hourly_balances", settings.METRICS_BALANCE_RAW_RETENTION_DAYS,
+             lambda before: storage.downsample_channel_balances(before, 3600, batch_size)),
+            ("snapshots", settings.METRICS_SNAPSHOT_RETENTION_DAYS,
+             lambda before: storage.purge_snapshots(before, batch_size)),
+            ("compacted_snapshots", settings.METRICS_HISTORY_DAYS,
+             lambda before: storage.compact_snapshots(before, batch_size)),
+        ):
+            before = horizon(days)
+            if before is not None:
+                stages.append((name, lambda batch=batch, before=before: batch(before)))
+        return stages
+
+    async def _run_stage(self, batch: Callable[[], Awaitable[int]]) -> int:
+        """Enchaîne les lots d'une étape jusqu'au premier lot incomplet"""
+        processed = 0
+        for _ in range(self.max_batches):
+            count = await batch()
+            processed += count
+            if count < self.batch_size:
+                break
+            await asyncio.sleep(0)
+        return processed
+
+    async def run(self) -> Dict[str, int]:
+        """Exécute toutes les étapes de rétention
+
+        Une étape en erreur n'empêche pas les suivantes.
+
+        Returns:
+            Nombre de documents traités par étape
+        """
+        started = time.perf_counter()
+        result = {}
+        for name, batch in self._stages(datetime.now(timezone.utc)):
+            try:
+                result[name] = await self._run_stage(batch)
+            except Exception as e:
+                logger.error(f"Erreur lors de la rétention des métriques ({name}): {e}")
+                continue
+            self.totals[name] = self.totals.get(name, 0) + result[name]
+
+        self.last_run = datetime.now()
+        self.last_result = result
+        processed = {name: count for name, count in result.items() if count}
+        if processed:
+            logger.info(
+                f"Rétention des métriques en {time.perf_counter() - started:.1f}s: "
+                + ", ".join(f"{name} {count}" for name, count in processed.items())
+            )
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Résultat de la dernière exécution et cumul par étape"""
+        return {
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_result": dict(self.last_result),
+            "totals": dict(self.totals),
+            "batch_size": self.batch_size,
+            "max_batches": self.max_batches
+        }
@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from core.config import settings
+from services.metrics_collector import MetricsCollector
+from services.metrics_retention import MetricsRetention
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduledJob:
+    """Tâche périodique du planificateur de collecte
+
+    Les échéances suivent un calendrier fixe (la durée des exécutions ne
+    fait pas dériver les suivantes), décalé d'une gigue aléatoire pour que
+    les tâches ne sollicitent pas LND au même instant. Des échéances
+    manquées (boucle bloquée, mise en veille, exécution plus longue que
+    l'intervalle) donnent lieu à une seule exécution de rattrapage, pas à
+    une rafale. Une exécution n'est jamais lancée tant que la précédente
+    est en cours.
+    """
+
+    def __init__(self, name: str, func: Callable[[], Awaitable[Any]], interval: float,
+                 jitter: float = 0.0):
+        """Initialise la tâche
+
+        Args:
+            name: Nom de la tâche
+            func: Fonction de collecte (coroutine sans argument)
+            interval: Intervalle entre deux exécutions (secondes)
+            jitter: Décalage aléatoire maximal, en fraction de l'intervalle
+        """
+        if interval <= 0:
+            raise ValueError(f"Intervalle invalide pour la tâche {name}: {interval}")
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+
+        self.next_run: Optional[float] = None
+        self.last_run: Optional[float] = None
+        self._planned: Optional[float] = None
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.missed = 0
+        self.last_duration: Optional[float] = None
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+        self.last_error: Optional[str] = None
+
+    def _jitter_delay(self) -> float:
+        return random.uniform(0, self.jitter * self.interval) if self.jitter > 0 else 0.0
+
+    def schedule(self, now: float, last_run: float = None) -> float:
+        """Fixe la première échéance
+
+        Args:
+            now: Instant courant (timestamp UNIX)
+            last_run: Dernière exécution réussie connue (avant un redémarrage) ;
+                une échéance dépassée est rattrapée immédiatement
+
+        Returns:
+            Instant de la première exécution
+        """
+        planned = now if last_run is None else last_run + self.interval
+        if planned < now:
+            self.missed += int((now - planned) // self.interval)
+            planned = now
+        self._planned = planned
+        self.next_run = planned + self._jitter_delay()
+        return self.next_run
+
+    def advance(self, now: float) -> float:
+        """Passe à l'échéance suivante du calendrier après une exécution
+
+        Returns:
+            Instant de la prochaine exécution
+        """
+        planned = self._planned + self.interval
+        if planned < now:
+            # Échéances dépassées : une seule exécution de rattrapage
+            self.missed += int((now - planned) // self.interval)
+            planned = now
+        self._planned = planned
+        self.next_run = planned + self._jitter_delay()
+        return self.next_run
+
+    async def run(self) -> bool:
+        """Exécute la tâche, sauf si l'exécution précédente n'est pas terminée
+
+        Returns:
+            True si la tâche s'est exécutée sans erreur
+        """
+        if self.running:
+            self.skipped += 1
+            logger.warning(f"Tâche {self.name} toujours en cours, exécution ignorée")
+            return False
+
+        self.running = True
+        self.last_run = time.time()
+        started = time.perf_counter()
+        try:
+            await self.func()
+            self.last_error = None
+            return True
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e) or type(e).__name__
+            logger.error(f"Erreur lors de l'exécution de la tâche {self.name}: {e}")
+            return False
+        finally:
+            duration = time.perf_counter() - started
+            self.runs += 1
+            self.last_duration = duration
+            self.max_duration = max(self.max_duration, duration)
+            self.total_duration += duration
+            self.running = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Exécutions et durées de la tâche"""
+        def isoformat(timestamp: Optional[float]) -> Optional[str]:
+            return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+        return {
+            "interval": self.interval,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "missed": self.missed,
+            "last_run": isoformat(self.last_run),
+            "next_run": isoformat(self.next_run),
+            "last_duration": round(self.last_duration, 3) if self.last_duration is not None else None,
+            "avg_duration": round(self.total_duration / self.runs, 3) if self.runs else None,
+            "max_duration": round(self.max_duration, 3),
+            "last_error": self.last_error
+        }
+
+
+class MetricsScheduler:
+    """Planificateur de la collecte des métriques
+
+    Remplace la boucle de snapshots quotidiens par des tâches indépendantes,
+    chacune à son rythme : balances des canaux chaque minute, ingestion des
+    forwards toutes les quelques minutes, contexte réseau chaque heure et
+    snapshot complet chaque jour, plus la rétention des données stockées
+    (voir MetricsRetention). Les données fines sont ainsi collectées
+    sans refaire les collectes coûteuses. La dernière exécution réussie de
+    chaque tâche est enregistrée en base : après un redémarrage, une
+    échéance dépassée est rattrapée et une tâche récente n'est pas relancée.
+    """
+
+    def __init__(self, collector: MetricsCollector, jitter: float = None,
+                 snapshot_interval_hours: int = None):
+        """Initialise le planificateur avec les tâches de collecte par défaut
+
+        Args:
+            collector: Collecteur de métriques
+            jitter: Gigue maximale en fraction de l'intervalle (par défaut
+                METRICS_SCHEDULER_JITTER)
+            snapshot_interval_hours: Intervalle entre deux snapshots complets
+                (par défaut METRICS_COLLECTION_INTERVAL_HOURS)
+        """
+        self.collector = collector
+        self.jitter = settings.METRICS_SCHEDULER_JITTER if jitter is None else jitter
+        self.jobs: Dict[str, ScheduledJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+        self.add_job("channel_balances", collector.sample_channel_balances,
+                     settings.METRICS_BALANCE_INTERVAL_SECONDS)
+        self.add_job("forwarding_events", collector.ingest_forwarding_events,
+                     settings.METRICS_FORWARDING_INTERVAL_SECONDS)
+        self.add_job("network_context", collector.refresh_network_context,
+                     settings.METRICS_NETWORK_CONTEXT_INTERVAL_SECONDS)
+        snapshot_interval_hours = (
+            snapshot_interval_hours or settings.METRICS_COLLECTION_INTERVAL_HOURS or 24
+        )
+        self.add_job("daily_snapshot", self._create_snapshot, snapshot_interval_hours * 3600)
+
+        self.retention: Optional[MetricsRetention] = None
+        if collector.storage is not None:
+            self.retention = MetricsRetention(collector.storage)
+            self.add_job("retention", self.retention.run,
+                         settings.METRICS_RETENTION_INTERVAL_SECONDS)
+
+    async def _create_snapshot(self) -> str:
+        # create_daily_snapshot signale ses erreurs dans sa valeur de retour :
+        # un échec ne doit pas être enregistré comme dernière exécution réussie
+        result = await self.collector.create_daily_snapshot()
+        if result.startswith("Erreur"):
+            raise RuntimeError(result)
+        return result
+
+    def add_job(self, name: str, func: Callable[[], Awaitable[Any]], interval: float,
+                jitter: float = None) -> ScheduledJob:
+        """Ajoute (ou remplace) une tâche ; à appeler avant start()"""
+        job = ScheduledJob(name, func, interval, self.jitter if jitter is None else jitter)
+        self.jobs[name] = job
+        return job
+
+    def remove_job(self, name: str) -> None:
+        """Retire une tâche ; à appeler avant start()"""
+        self.jobs.pop(name, None)
+
+    @property
+    def is_running(self) -> bool:
+        return any(not task.done() for task in self._tasks.values())
+
+    async def _load_last_run(self, job: ScheduledJob) -> Optional[float]:
+        storage = self.collector.storage
+        if storage is None:
+            return None
+        try:
+            last_run = await storage.get_job_last_run(job.name)
+            return last_run.timestamp() if last_run else None
+        except Exception as e:
+            logger.error(f"Erreur lors de la lecture de la dernière exécution de {job.name}: {e}")
+            return None
+
+    async def _save_last_run(self, job: ScheduledJob) -> None:
+        storage = self.collector.storage
+        if storage is None:
+            return
+        try:
+            await storage.set_job_last_run(
+                job.name, datetime.fromtimestamp(job.last_run, timezone.utc)
+            )
+        except Exception as e:
+            logger.error(f"Erreur lors de l'enregistrement de l'exécution de {job.name}: {e}")
+
+    async def _run_job(self, job: ScheduledJob) -> None:
+        """Boucle d'une tâche : attend son échéance, l'exécute puis planifie la suivante"""
+        while True:
+            await asyncio.sleep(max(0.0, job.next_run - time.time()))
+            if await job.run():
+                await self._save_last_run(job)
+            job.advance(time.time())
+
+    async def start(self) -> None:
+        """Planifie les tâches et les démarre en tâche de fond"""
+        if self.is_running:
+            return
+        now = time.time()
+        for job in self.jobs.values():
+            job.schedule(now, await self._load_last_run(job))
+            self._tasks[job.name] = asyncio.create_task(
+                self._run_job(job), name=f"metrics-{job.name}"
+            )
+            logger.info(
+                f"Tâche {job.name} planifiée toutes les {job.interval}s, "
+                f"première exécution à {datetime.fromtimestamp(job.next_run).isoformat()}"
+            )
+
+    async def run_now(self, name: str) -> bool:
+        """Exécute immédiatement une tâche (ignorée si elle est déjà en cours)
+
+        Returns:
+            True si la tâche s'est exécutée sans erreur
+        """
+        job = self.jobs[name]
+        if await job.run():
+            await self._save_last_run(job)
+            return True
+        return False
+
+    async def stop(self) -> None:
+        """Arrête toutes les tâches"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """État et durées d'exécution de chaque tâche"""
+        return {
+            "running": self.is_running,
+            "jitter": self.jitter,
+            "jobs": {name: job.get_stats() for name, job in self.jobs.items()},
+            "retention": self.retention.get_stats() if self.retention else None
+        }
@@ -0,0 +1,775 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from core.config import settings
+from services.metrics_storage_interface import (
+    ROLLUP_FIELDS, ROLLUP_GRANULARITIES, TREND_AGGREGATIONS, MetricsStorageInterface,
+    forwarding_rollup_increments, plan_downsample
+)
+from services.sqlite_metrics_storage import SQLiteMetricsStorage
+
+logger = logging.getLogger(__name__)
+
+# Clé unique d'un événement de forwarding ; timestamp_ns en tête sert
+# aussi aux requêtes par période
+FORWARDING_EVENT_KEY = [("timestamp_ns", 1), ("chan_id_in", 1), ("chan_id_out", 1)]
+# Ancien index unique à la seconde près (deux forwards de la même seconde
+# sur les mêmes canaux entraient en collision)
+LEGACY_FORWARDING_INDEX = "timestamp_1_chan_id_in_1_chan_id_out_1"
+# Code d'erreur MongoDB d'une clé dupliquée
+DUPLICATE_KEY_ERROR = 11000
+# Taille des lots de mise à jour des anciens événements de forwarding
+LEGACY_BACKFILL_BATCH_SIZE = 1000
+
+# Clé unique d'un agrégat de forwarding
+ROLLUP_KEY = [("granularity", 1), ("channel_id", 1), ("bucket_start", 1)]
+
+
+class MongoMetricsStorage(MetricsStorageInterface):
+    """Stockage asynchrone des métriques dans MongoDB (motor)
+
+    Toutes les opérations sont des coroutines : aucun aller-retour vers la
+    base ne bloque la boucle d'événements de l'API. Le client motor (et son
+    pool de connexions) est partagé par tous les collecteurs configurés avec
+    la même URL, voir get_metrics_storage.
+    """
+
+    def __init__(
+        self,
+        connection_string: str = None,
+        database: AsyncIOMotorDatabase = None,
+        pool_size: int = None,
+        min_pool_size: int = None,
+        server_selection_timeout_ms: int = None,
+        connect_timeout_ms: int = None,
+        socket_timeout_ms: int = None,
+        retry_writes: bool = None
+    ):
+        """Initialise le stockage (la connexion est ouverte au premier appel)
+
+        Args:
+            connection_string: URL MongoDB (la base par défaut de l'URL est utilisée)
+            database: Base déjà ouverte (remplace connection_string)
+            pool_size: Nombre maximal de connexions du pool
+            min_pool_size: Nombre de connexions gardées ouvertes
+            server_selection_timeout_ms: Délai maximal de sélection d'un serveur
+            connect_timeout_ms: Délai maximal d'ouverture d'une connexion
+            socket_timeout_ms: Délai maximal d'une opération
+            retry_writes: Rejouer une fois les écritures en cas d'erreur réseau
+        """
+        self.connection_string = connection_string or settings.DATABASE_URL
+        self.client: Optional[AsyncIOMotorClient] = None
+
+        if database is None:
+            self.client = AsyncIOMotorClient(
+                self.connection_string,
+                maxPoolSize=pool_size or settings.DATABASE_POOL_SIZE,
+                minPoolSize=min_pool_size if min_pool_size is not None else settings.DATABASE_MIN_POOL_SIZE,
+                serverSelectionTimeoutMS=(
+                    server_selection_timeout_ms or settings.DATABASE_SERVER_SELECTION_TIMEOUT_MS
+                ),
+                connectTimeoutMS=connect_timeout_ms or settings.DATABASE_CONNECT_TIMEOUT_MS,
+                socketTimeoutMS=socket_timeout_ms or settings.DATABASE_SOCKET_TIMEOUT_MS,
+                retryWrites=retry_writes if retry_writes is not None else settings.DATABASE_RETRY_WRITES
+            )
+            database = self.client.get_default_database()
+        self.db = database
+
+        self._indexes_ready = False
+        self._indexes_lock: Optional[asyncio.Lock] = None
+        # Des événements antérieurs à l'ingestion incrémentale restent à remplacer
+        self._legacy_forwards = False
+
+    # INDEX
+
+    async def ensure_indexes(self) -> None:
+        """Crée les index des collections de métriques (une fois par processus)"""
+        if self._indexes_ready:
+            return
+        if self._indexes_lock is None:
+            self._indexes_lock = asyncio.Lock()
+
+        async with self._indexes_lock:
+            if self._indexes_ready:
+                return
+            snapshots = self.db["daily_snapshots"]
+            await snapshots.create_index([("timestamp", 1)], unique=True)
+            # Date réelle (UTC) des snapshots : requêtes de tendances par période
+            await snapshots.create_index([("ts", 1)], name="snapshot_ts")
+            await self._backfill_snapshot_dates()
+            await self.db["channel_balances"].create_index(
+                [("channel_id", 1), ("ts", 1)], name="channel_balance_key"
+            )
+            # Parcours chronologique de la rétention, tous canaux confondus
+            await self.db["channel_balances"].create_index([("ts", 1)], name="channel_balance_ts")
+            await self.db["channel_metrics"].create_index(
+                [("timestamp", 1), ("channel_id", 1)], unique=True
+            )
+
+            forwarding_events = self.db["forwarding_events"]
+            if LEGACY_FORWARDING_INDEX in await forwarding_events.index_information():
+                logger.info("Remplacement de l'ancien index unique des événements de forwarding")
+                await forwarding_events.drop_index(LEGACY_FORWARDING_INDEX)
+            # Sans timestamp_ns, les anciens événements entreraient en collision dans l'index
+            await self._backfill_forwarding_timestamps()
+            await forwarding_events.create_index(
+                FORWARDING_EVENT_KEY, unique=True, name="forwarding_event_key"
+            )
+            await self.db["forwarding_rollups"].create_index(
+                ROLLUP_KEY, unique=True, name="forwarding_rollup_key"
+            )
+            self._indexes_ready = True
+
+    async def _backfill_snapshot_dates(self) -> None:
+        """Ajoute la date réelle aux snapshots qui n'ont que l'horodatage ISO
+
+        Les anciens horodatages sont en heure locale sans fuseau : ils sont
+        interprétés avec le décalage UTC courant du serveur.
+        """
+        offset = datetime.now().astimezone().strftime("%z")
+        result = await self.db["daily_snapshots"].update_many(
+            {"ts": {"$exists": False}},
+            [{"$set": {"ts": {"$dateFromString": {
+                "dateString": {"$substrBytes": ["$timestamp", 0, 19]},
+                "timezone": offset
+            }}}}]
+        )
+        if result.modified_count:
+            logger.info(f"Date ajoutée à {result.modified_count} snapshots existants")
+
+    async def _backfill_forwarding_timestamps(self) -> None:
+        """Ajoute timestamp_ns aux événements stockés avant l'ingestion incrémentale
+
+        Ces documents n'ont qu'un horodatage ISO à la seconde, en heure locale
+        sans fuseau (interprété avec le fuseau du serveur). Ils sont marqués
+        legacy : l'ingestion les remplace par les événements exacts de LND.
+        """
+        forwarding_events = self.db["forwarding_events"]
+        requests = []
+        backfilled = 0
+        async for document in forwarding_events.find(
+            {"timestamp_ns": {"$exists": False}}, {"timestamp": 1}
+        ):
+            try:
+                seconds = int(datetime.fromisoformat(str(document["timestamp"])[:19]).timestamp())
+            except (KeyError, ValueError) as e:
+                logger.error(
+                    f"Erreur lors de la conversion de l'horodatage de l'événement {document['_id']}: {e}"
+                )
+                continue
+            requests.append(UpdateOne(
+                {"_id": document["_id"]},
+                {"$set": {"timestamp_ns": seconds * 1_000_000_000, "legacy": True}}
+            ))
+            if len(requests) >= LEGACY_BACKFILL_BATCH_SIZE:
+                await forwarding_events.bulk_write(requests, ordered=False)
+                backfilled += len(requests)
+                requests = []
+        if requests:
+            await forwarding_events.bulk_write(requests, ordered=False)
+            backfilled += len(requests)
+        if backfilled:
+            logger.info(f"Horodatage ajouté à {backfilled} événements de forwarding existants")
+
+        self._legacy_forwards = await forwarding_events.find_one({"legacy": True}) is not None
+
+    async def _supersede_legacy_forwards(self, until_ns: int) -> None:
+        """Retire les anciens événements couverts par les événements exacts ingérés
+
+        L'ingestion parcourt l'historique de LND dans l'ordre : les anciens
+        documents antérieurs au dernier événement ingéré y ont leur équivalent
+        exact. Ils sont retirés des événements et de leurs agrégats.
+        """
+        forwarding_events = self.db["forwarding_events"]
+        legacy = await forwarding_events.find(
+            {"legacy": True, "timestamp_ns": {"$lte": until_ns}}
+        ).to_list(length=None)
+        if legacy:
+            await forwarding_events.delete_many({"_id": {"$in": [event["_id"] for event in legacy]}})
+            await self._apply_rollup_increments(forwarding_rollup_increments(legacy), sign=-1)
+            logger.info(f"{len(legacy)} anciens événements de forwarding remplacés")
+        self._legacy_forwards = await forwarding_events.find_one({"legacy": True}) is not None
+
+    # SNAPSHOTS
+
+    async def insert_snapshot(self, snapshot: Dict[str, Any]) -> str:
+        """Enregistre un snapshot de métriques
+
+        Le document reçoit un champ ts (datetime UTC) indexé, utilisé par les
+        requêtes de tendances ; l'horodatage ISO est conservé tel quel.
+
+        Returns:
+            ID du document créé
+        """
+        await self.ensure_indexes()
+        # insert_one ajoute _id au document : on insère une copie
+        document = dict(snapshot)
+        document.setdefault("ts", datetime.now(timezone.utc))
+        result = await self.db["daily_snapshots"].insert_one(document)
+        return str(result.inserted_id)
+
+    async def query_snapshot_trends(self, paths: List[str], start: datetime, end: datetime,
+                                    bucket_seconds: int,
+                                    aggregation: str = "avg") -> List[Dict[str, Any]]:
+        """Séries sous-échantillonnées de plusieurs champs des snapshots
+
+        Les snapshots de la période sont sélectionnés par l'index sur ts puis
+        regroupés par intervalles de bucket_seconds (alignés sur l'époque UNIX,
+        en UTC) ; seuls les champs demandés sont lus.
+
+        Args:
+            paths: Chemins des champs (ex: node_metrics.total_capacity)
+            start: Début de la période (inclus)
+            end: Fin de la période (exclue)
+            bucket_seconds: Taille d'un intervalle
+            aggregation: Fonction d'agrégation par intervalle (voir TREND_AGGREGATIONS)
+
+        Returns:
+            Points {"timestamp": début de l'intervalle (ISO, UTC), chemin: valeur, ...}
+        """
+        if aggregation not in TREND_AGGREGATIONS:
+            raise ValueError(f"Agrégation inconnue: {aggregation}")
+        if bucket_seconds <= 0:
+            raise ValueError(f"Taille d'intervalle invalide: {bucket_seconds}")
+
+        await self.ensure_indexes()
+        # Noms internes : un chemin contient des points, interdits comme nom de champ
+        fields = {f"m{i}": path for i, path in enumerate(paths)}
+        millis = {"$toLong": "$ts"}
+        pipeline = [
+            {"$match": {"ts": {"$gte": start, "$lt": end}}},
+            {"$sort": {"ts": 1}},
+            {"$project": {
+                "_id": 0,
+                "bucket": {"$subtract": [millis, {"$mod": [millis, bucket_seconds * 1000]}]},
+                **{name: f"${path}" for name, path in fields.items()}
+            }},
+            {"$group": {
+                "_id": "$bucket",
+                **{name: {f"${aggregation}": f"${name}"} for name in fields}
+            }},
+            {"$sort": {"_id": 1}}
+        ]
+        rows = await self.db["daily_snapshots"].aggregate(pipeline).to_list(length=None)
+        return [
+            {
+                "timestamp": datetime.fromtimestamp(row["_id"] / 1000, tz=timezone.utc).isoformat(),
+                **{path: row.get(name) for name, path in fields.items()}
+            }
+            for row in rows
+        ]
+
+    # BALANCES DES CANAUX
+
+    async def write_channel_balances(self, samples: List[Dict[str, Any]],
+                                     ts: datetime = None) -> int:
+        """Ajoute un échantillon de balance par canal à la série temporelle
+
+        Args:
+            samples: Dictionnaires {"channel_id", "local", "remote", "active"}
+            ts: Date de l'échantillon (par défaut : maintenant, UTC)
+
+        Returns:
+            Nombre de points écrits
+        """
+        if not samples:
+            return 0
+        await self.ensure_indexes()
+        ts = ts or datetime.now(timezone.utc)
+        result = await self.db["channel_balances"].insert_many(
+            [{**sample, "ts": ts} for sample in samples], ordered=False
+        )
+        return len(result.inserted_ids)
+
+    async def get_channel_balances(self, channel_ids: List[str], start: datetime, end: datetime,
+                                   bucket_seconds: int = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Séries de balance de plusieurs canaux en une seule requête
+
+        La requête suit l'index (channel_id, ts). Avec bucket_seconds, seul le
+        dernier point de chaque intervalle est conservé.
+
+        Args:
+            channel_ids: Canaux concernés
+            start: Début de la période (incluse)
+            end: Fin de la période (exclue)
+            bucket_seconds: Taille des intervalles de sous-échantillonnage
+
+        Returns:
+            Points {"ts" (ISO, UTC), "local", "remote", "active"} par canal, triés par date
+        """
+        await self.ensure_indexes()
+        pipeline = [
+            {"$match": {"channel_id": {"$in": list(channel_ids)}, "ts": {"$gte": start, "$lt": end}}},
+            {"$sort": {"channel_id": 1, "ts": 1}},
+        ]
+        if bucket_seconds:
+            millis = {"$toLong": "$ts"}
+            pipeline += [
+                {"$group": {
+                    "_id": {
+                        "channel_id": "$channel_id",
+                        "bucket": {"$subtract": [millis, {"$mod": [millis, bucket_seconds * 1000]}]}
+                    },
+                    "ts": {"$last": "$ts"},
+                    "local": {"$last": "$local"},
+                    "remote": {"$last": "$remote"},
+                    "active": {"$last": "$active"}
+                }},
+                {"$project": {
+                    "_id": 0, "channel_id": "$_id.channel_id",
+                    "ts": 1, "local": 1, "remote": 1, "active": 1
+                }},
+                {"$sort": {"channel_id": 1, "ts": 1}}
+            ]
+        else:
+            pipeline.append({"$project": {"_id": 0, "channel_id": 1, "ts": 1, "local": 1, "remote": 1, "active": 1}})
+
+        series: Dict[str, List[Dict[str, Any]]] = {}
+        async for point in self.db["channel_balances"].aggregate(pipeline):
+            ts = point["ts"]
+            if ts.tzinfo is None:
+                ts = ts.replace(tzinfo=timezone.utc)
+            series.setdefault(point.pop("channel_id"), []).append({**point, "ts": ts.isoformat()})
+        return series
+
+    # ÉVÉNEMENTS DE FORWARDING
+
+    async def get_forwarding_watermark(self) -> int:
+        """Dernier offset LND ingéré (0 si aucune ingestion)"""
+        state = await self.db["ingestion_state"].find_one({"_id": "forwarding_events"})
+        return state["last_offset_index"] if state else 0
+
+    async def set_forwarding_watermark(self, last_offset_index: int) -> None:
+        """Enregistre le dernier offset LND ingéré"""
+        await self.db["ingestion_state"].update_one(
+            {"_id": "forwarding_events"},
+            {"$set": {"last_offset_index": last_offset_index, "updated_at": datetime.now()}},
+            upsert=True
+        )
+
+    async def write_forwarding_events(self, events: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Insère un lot d'événements en une seule requête bulk_write non ordonnée
+
+        Les doublons (déjà ingérés) sont rejetés par l'index unique sans
+        interrompre le reste du lot.
+
+        Returns:
+            Nombre d'événements insérés et de doublons ignorés
+        """
+        if not events:
+            return {"inserted": 0, "duplicates": 0}
+
+        await self.ensure_indexes()
+        duplicates = set()
+        try:
+            await self.db["forwarding_events"].bulk_write(
+                [InsertOne(event) for event in events], ordered=False
+            )
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != DUPLICATE_KEY_ERROR for error in errors):
+                raise
+            duplicates = {error["index"] for error in errors}
+
+        # Seuls les événements réellement insérés alimentent les agrégats
+        inserted = [event for i, event in enumerate(events) if i not in duplicates]
+        await self.update_forwarding_rollups(inserted)
+        if self._legacy_forwards:
+            await self._supersede_legacy_forwards(max(event["timestamp_ns"] for event in events))
+        return {"inserted": len(inserted), "duplicates": len(duplicates)}
+
+    async def summarize_forwards(self, start_time: int, end_time: int) -> Dict[str, Any]:
+        """Agrège les événements stockés de la période côté MongoDB
+
+        Même résultat que MetricsCollector._summarize_forwards, sans rapatrier
+        les événements.
+
+        Args:
+            start_time: Timestamp UNIX de début (inclus)
+            end_time: Timestamp UNIX de fin (exclu)
+        """
+        pipeline = [
+            {"$match": {"timestamp_ns": {
+                "$gte": start_time * 1_000_000_000, "$lt": end_time * 1_000_000_000
+            }}},
+            {"$facet": {
+                "totals": [{"$group": {
+                    "_id": None, "count": {"$sum": 1},
+                    "amount": {"$sum": "$amt_out"}, "fees": {"$sum": "$fee"}
+                }}],
+                "channels_in": [{"$group": {
+                    "_id": "$chan_id_in", "count": {"$sum": 1},
+                    "amount": {"$sum": "$amt_in"}, "fees": {"$sum": "$fee"}
+                }}],
+                "channels_out": [{"$group": {
+                    "_id": "$chan_id_out", "count": {"$sum": 1},
+                    "amount": {"$sum": "$amt_out"}
+                }}]
+            }}
+        ]
+        results = await self.db["forwarding_events"].aggregate(pipeline).to_list(length=1)
+        result = results[0] if results else {}
+        totals = (result.get("totals") or [{}])[0]
+
+        return {
+            "total_forwards": totals.get("count", 0),
+            "total_amount_forwarded": totals.get("amount", 0),
+            "total_fees_earned": totals.get("fees", 0),
+            "channels_in": {
+                item["_id"]: {"count": item["count"], "amount": item["amount"], "fees": item["fees"]}
+                for item in result.get("channels_in", [])
+            },
+            "channels_out": {
+                item["_id"]: {"count": item["count"], "amount": item["amount"]}
+                for item in result.get("channels_out", [])
+            }
+        }
+
+    # AGRÉGATS DE FORWARDING
+
+    async def update_forwarding_rollups(self, events: List[Dict[str, Any]]) -> int:
+        """Ajoute des événements aux agrégats horaires, journaliers et hebdomadaires
+
+        Chaque événement compte comme forward entrant de chan_id_in et sortant
+        de chan_id_out. Les compteurs sont incrémentés ($inc) par une seule
+        requête bulk_write : quelques centaines de lignes par lot d'événements.
+
+        Returns:
+            Nombre de lignes d'agrégat modifiées ou créées
+        """
+        return await self._apply_rollup_increments(forwarding_rollup_increments(events))
+
+    async def _apply_rollup_increments(self, increments: Dict[tuple, Dict[str, int]],
+                                       sign: int = 1) -> int:
+        """Ajoute (sign=1) ou retire (sign=-1) des incréments aux agrégats"""
+        if not increments:
+            return 0
+
+        await self.db["forwarding_rollups"].bulk_write([
+            UpdateOne(
+                {"granularity": granularity, "channel_id": channel_id, "bucket_start": bucket_start},
+                {"$inc": {field: sign * value for field, value in values.items()}},
+                upsert=True
+            )
+            for (granularity, channel_id, bucket_start), values in increments.items()
+        ], ordered=False)
+        return len(increments)
+
+    async def rebuild_forwarding_rollups(self, since: int = 0) -> None:
+        """Recalcule les agrégats à partir des événements stockés
+
+        Sert à initialiser les agrégats d'une base existante et à les
+        réparer ; le calcul est fait par MongoDB ($group puis $merge).
+
+        Les agrégats antérieurs aux événements purgés par la rétention ne
+        sont jamais recalculés.
+
+        Args:
+            since: Timestamp UNIX à partir duquel recalculer (aligné sur la semaine)
+        """
+        await self.ensure_indexes()
+        week = ROLLUP_GRANULARITIES["week"]
+        since -= since % week
+        retention = await self.db["ingestion_state"].find_one({"_id": "forwarding_retention"})
+        if retention:
+            # Les événements purgés ne sont plus en base : les agrégats de
+            # cette période (jusqu'à la semaine suivante) sont conservés
+            purged_before = retention["purged_before"]
+            since = max(since, purged_before + (-purged_before % week))
+        rollups = self.db["forwarding_rollups"]
+        await rollups.delete_many({"bucket_start": {"$gte": since}})
+
+        seconds = {"$toLong": {"$floor": {"$divide": ["$timestamp_ns", 1_000_000_000]}}}
+        for granularity, size in ROLLUP_GRANULARITIES.items():
+            for side, channel_field, amount_field in (
+                ("in", "$chan_id_in", "$amt_in"), ("out", "$chan_id_out", "$amt_out")
+            ):
+                pipeline = [
+                    {"$match": {"timestamp_ns": {"$gte": since * 1_000_000_000}}},
+                    {"$set": {"seconds": seconds}},
+                    {"$group": {
+                        "_id": {
+                            "channel_id": channel_field,
+                            "bucket_start": {"$subtract": ["$seconds", {"$mod": ["$seconds", size]}]}
+                        },
+                        f"forwards_{side}": {"$sum": 1},
+                        f"amount_{side}": {"$sum": amount_field},
+                        f"fees_{side}": {"$sum": "$fee"}
+                    }},
+                    {"$project": {
+                        "_id": 0,
+                        "granularity": granularity,
+                        "channel_id": "$_id.channel_id",
+                        "bucket_start": "$_id.bucket_start",
+                        f"forwards_{side}": 1,
+                        f"amount_{side}": 1,
+                        f"fees_{side}": 1
+                    }},
+                    {"$merge": {
+                        "into": "forwarding_rollups",
+                        "on": [field for field, _ in ROLLUP_KEY],
+                        "whenMatched": "merge",
+                        "whenNotMatched": "insert"
+                    }}
+                ]
+                await self.db["forwarding_events"].aggregate(pipeline).to_list(length=None)
+
+        logger.info(f"Agrégats de forwarding recalculés depuis {datetime.fromtimestamp(since).isoformat()}")
+
+    async def ensure_forwarding_rollups(self) -> None:
+        """Construit les agrégats des événements ingérés avant leur mise en place"""
+        state = await self.db["ingestion_state"].find_one({"_id": "forwarding_rollups"})
+        if state is not None:
+            return
+        await self.rebuild_forwarding_rollups()
+        await self.db["ingestion_state"].update_one(
+            {"_id": "forwarding_rollups"},
+            {"$set": {"built_at": datetime.now()}},
+            upsert=True
+        )
+
+    async def get_forwarding_rollups(self, granularity: str, start_time: int, end_time: int,
+                                     group_by: str = "bucket_start") -> List[Dict[str, Any]]:
+        """Somme des agrégats d'une période, par intervalle ou par canal
+
+        Args:
+            granularity: 'hour', 'day' ou 'week'
+            start_time: Timestamp UNIX de début (aligné sur l'intervalle)
+            end_time: Timestamp UNIX de fin (exclu)
+            group_by: 'bucket_start' ou 'channel_id'
+
+        Returns:
+            Lignes {group_by: valeur, forwards_in, forwards_out, amount_in, ...}
+            triées par valeur de regroupement
+        """
+        if granularity not in ROLLUP_GRANULARITIES:
+            raise ValueError(f"Granularité inconnue: {granularity}")
+        if group_by not in ("bucket_start", "channel_id"):
+            raise ValueError(f"Regroupement inconnu: {group_by}")
+
+        start_time -= start_time % ROLLUP_GRANULARITIES[granularity]
+        pipeline = [
+            {"$match": {
+                "granularity": granularity,
+                "bucket_start": {"$gte": start_time, "$lt": end_time}
+            }},
+            {"$group": {
+                "_id": f"${group_by}",
+                **{field: {"$sum": f"${field}"} for field in ROLLUP_FIELDS}
+            }},
+            {"$sort": {"_id": 1}}
+        ]
+        rows = await self.db["forwarding_rollups"].aggregate(pipeline).to_list(length=None)
+        for row in rows:
+            row[group_by] = row.pop("_id")
+        return rows
+
+    # RÉTENTION
+    # Chaque opération traite un seul lot d'au plus batch_size documents,
+    # voir MetricsRetention pour l'enchaînement des lots.
+
+    async def _find_ids(self, collection: str, query: Dict[str, Any], batch_size: int) -> List[Any]:
+        cursor = self.db[collection].find(query, {"_id": 1}).limit(batch_size)
+        return [document["_id"] for document in await cursor.to_list(length=batch_size)]
+
+    async def _delete_batch(self, collection: str, query: Dict[str, Any], batch_size: int) -> int:
+        ids = await self._find_ids(collection, query, batch_size)
+        if not ids:
+            return 0
+        result = await self.db[collection].delete_many({"_id": {"$in": ids}})
+        return result.deleted_count
+
+    async def purge_forwarding_events(self, before: int, batch_size: int) -> int:
+        """Supprime un lot d'événements de forwarding bruts antérieurs à before
+
+        Les agrégats, tenus à jour à l'ingestion, conservent ces événements.
+        La date de purge est enregistrée pour que rebuild_forwarding_rollups
+        ne recalcule pas les agrégats de la période purgée.
+
+        Args:
+            before: Timestamp UNIX limite (exclu)
+            batch_size: Nombre maximal d'événements supprimés
+
+        Returns:
+            Nombre d'événements supprimés
+        """
+        deleted = await self._delete_batch(
+            "forwarding_events", {"timestamp_ns": {"$lt": before * 1_000_000_000}}, batch_size
+        )
+        if deleted:
+            await self.db["ingestion_state"].update_one(
+                {"_id": "forwarding_retention"},
+                {"$max": {"purged_before": before}, "$set": {"updated_at": datetime.now()}},
+                upsert=True
+            )
+        return deleted
+
+    async def purge_forwarding_rollups(self, granularity: str, before: int, batch_size: int) -> int:
+        """Supprime un lot d'agrégats d'une granularité antérieurs à before (timestamp UNIX)"""
+        if granularity not in ROLLUP_GRANULARITIES:
+            raise ValueError(f"Granularité inconnue: {granularity}")
+        return await self._delete_batch(
+            "forwarding_rollups",
+            {"granularity": granularity, "bucket_start": {"$lt": before}},
+            batch_size
+        )
+
+    async def compact_snapshots(self, before: datetime, batch_size: int) -> int:
+        """Retire le détail par canal d'un lot de snapshots antérieurs à before
+
+        channel_metrics représente l'essentiel de la taille d'un snapshot ;
+        les métriques du nœud, de forwarding et le contexte réseau restent
+        disponibles pour les tendances, et l'historique par canal est conservé
+        par la série channel_balances.
+
+        Returns:
+            Nombre de snapshots compactés
+        """
+        ids = await self._find_ids(
+            "daily_snapshots", {"ts": {"$lt": before}, "compacted": {"$exists": False}}, batch_size
+        )
+        if not ids:
+            return 0
+        await self.db["daily_snapshots"].update_many(
+            {"_id": {"$in": ids}},
+            {"$unset": {"channel_metrics": ""}, "$set": {"compacted": True}}
+        )
+        return len(ids)
+
+    async def purge_snapshots(self, before: datetime, batch_size: int) -> int:
+        """Supprime un lot de snapshots antérieurs à before"""
+        return await self._delete_batch("daily_snapshots", {"ts": {"$lt": before}}, batch_size)
+
+    async def downsample_channel_balances(self, before: datetime, bucket_seconds: int,
+                                          batch_size: int) -> int:
+        """Sous-échantillonne un lot de points de balance antérieurs à before
+
+        Seul le dernier point de chaque canal et de chaque intervalle est
+        conservé ; il est marqué de sa résolution et n'est plus examiné à ce
+        niveau. get_channel_balances renvoie les mêmes séries pour des
+        intervalles au moins aussi grands.
+
+        Args:
+            before: Date limite (exclue)
+            bucket_seconds: Taille des intervalles conservés
+            batch_size: Nombre maximal de points examinés
+
+        Returns:
+            Nombre de points examinés
+        """
+        balances = self.db["channel_balances"]
+        samples = await balances.find(
+            {"ts": {"$lt": before}, "resolution": {"$not": {"$gte": bucket_seconds}}},
+            {"channel_id": 1, "ts": 1}
+        ).sort([("ts", 1)]).limit(batch_size).to_list(length=batch_size)
+        if not samples:
+            return 0
+
+        def timestamp(sample: Dict[str, Any]) -> float:
+            ts = sample["ts"]
+            if ts.tzinfo is None:
+                ts = ts.replace(tzinfo=timezone.utc)
+            return ts.timestamp()
+
+        kept, removed = plan_downsample(
+            [(sample["_id"], sample["channel_id"], timestamp(sample)) for sample in samples],
+            bucket_seconds, batch_full=len(samples) == batch_size
+        )
+        if removed:
+            await balances.delete_many({"_id": {"$in": removed}})
+        await balances.update_many({"_id": {"$in": kept}}, {"$set": {"resolution": bucket_seconds}})
+        return len(samples)
+
+    async def purge_channel_balances(self, before: datetime, batch_size: int) -> int:
+        """Supprime un lot de points de balance antérieurs à before"""
+        return await self._delete_batch("channel_balances", {"ts": {"$lt": before}}, batch_size)
+
+    # PLANIFICATION
+
+    async def get_job_last_run(self, name: str) -> Optional[datetime]:
+        """Dernière exécution réussie d'une tâche planifiée (UTC), None si jamais exécutée"""
+        state = await self.db["ingestion_state"].find_one({"_id": f"scheduler:{name}"})
+        if not state:
+            return None
+        last_run = state["last_run"]
+        # motor renvoie des dates naïves (UTC)
+        return last_run if last_run.tzinfo else last_run.replace(tzinfo=timezone.utc)
+
+    async def set_job_last_run(self, name: str, last_run: datetime) -> None:
+        """Enregistre la dernière exécution réussie d'une tâche planifiée"""
+        await self.db["ingestion_state"].update_one(
+            {"_id": f"scheduler:{name}"},
+            {"$set": {"last_run": last_run}},
+            upsert=True
+        )
+
+    # CYCLE DE VIE
+
+    def close(self) -> None:
+        """Ferme le client et son pool de connexions"""
+        if self.client is not None:
+            self.client.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Configuration du pool de connexions"""
+        stats = {"backend": "mongodb", "database": self.db.name, "indexes_ready": self._indexes_ready}
+        if self.client is not None:
+            options = self.client.options.pool_options
+            stats.update({
+                "max_pool_size": options.max_pool_size,
+                "min_pool_size": options.min_pool_size,
+                "retry_writes": self.client.options.retry_writes
+            })
+        return stats
+
+
+_storages: Dict[str, MetricsStorageInterface] = {}
+
+
+def get_metrics_storage(connection_string: str = None) -> Optional[MetricsStorageInterface]:
+    """Stockage des métriques partagé pour une URL
+
+    - mongodb:// ou mongodb+srv:// : MongoMetricsStorage ; tous les
+      collecteurs configurés avec la même URL partagent le même client motor
+      et donc le même pool de connexions ;
+    - sqlite:///chemin : SQLiteMetricsStorage (fichier local) ;
+    - sans URL : fichier SQLite METRICS_LOCAL_DB_PATH.
+
+    Returns:
+        Le stockage, ou None si aucune base n'est configurée
+
+    Raises:
+        ValueError: URL d'un type de base non supporté
+    """
+    connection_string = connection_string or settings.DATABASE_URL
+    if not connection_string:
+        if not settings.METRICS_LOCAL_DB_PATH:
+            return None
+        connection_string = f"sqlite:///{settings.METRICS_LOCAL_DB_PATH}"
+
+    storage = _storages.get(connection_string)
+    if storage is None:
+        if connection_string.startswith("sqlite:///"):
+            storage = SQLiteMetricsStorage(connection_string[len("sqlite:///"):])
+        elif connection_string.startswith(("mongodb://", "mongodb+srv://")):
+            storage = MongoMetricsStorage(connection_string)
+        else:
+            raise ValueError(f"Base de données non supportée pour les métriques: {connection_string.split(':')[0]}")
+        _storages[connection_string] = storage
+    return storage
+
+
+def close_all_metrics_storages() -> None:
+    """Ferme les connexions de tous les stockages partagés"""
+    for storage in list(_storages.values()):
+        try:
+            storage.close()
+        except Exception as e:
+            logger.error(f"Erreur lors de la fermeture du stockage des métriques: {e}")
+    _storages.clear()
@@ -0,0 +1,210 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+# Granularités des agrégats de forwarding (durée d'un intervalle en secondes).
+# Les intervalles sont alignés sur l'époque UNIX, comme la heatmap de routage.
+ROLLUP_GRANULARITIES = {"hour": 3600, "day": 86400, "week": 604800}
+# Compteurs d'un agrégat : forwards entrés / sortis par le canal
+ROLLUP_FIELDS = ("forwards_in", "forwards_out", "amount_in", "amount_out", "fees_in", "fees_out")
+
+# Fonctions d'agrégation acceptées pour les séries de tendances
+TREND_AGGREGATIONS = ("avg", "min", "max", "sum", "first", "last")
+
+
+def forwarding_rollup_increments(events: List[Dict[str, Any]]) -> Dict[tuple, Dict[str, int]]:
+    """Incréments des agrégats (granularité, canal, début d'intervalle) d'un lot d'événements
+
+    Chaque événement compte comme forward entrant de chan_id_in et sortant
+    de chan_id_out.
+    """
+    increments: Dict[tuple, Dict[str, int]] = {}
+    for event in events:
+        timestamp = event["timestamp_ns"] // 1_000_000_000
+        for granularity, size in ROLLUP_GRANULARITIES.items():
+            bucket_start = timestamp - timestamp % size
+            entry = increments.setdefault(
+                (granularity, event["chan_id_in"], bucket_start), dict.fromkeys(ROLLUP_FIELDS, 0)
+            )
+            entry["forwards_in"] += 1
+            entry["amount_in"] += event["amt_in"]
+            entry["fees_in"] += event["fee"]
+
+            entry = increments.setdefault(
+                (granularity, event["chan_id_out"], bucket_start), dict.fromkeys(ROLLUP_FIELDS, 0)
+            )
+            entry["forwards_out"] += 1
+            entry["amount_out"] += event["amt_out"]
+            entry["fees_out"] += event["fee"]
+    return increments
+
+
+def plan_downsample(samples: Sequence[Tuple[Hashable, str, float]], bucket_seconds: int,
+                    batch_full: bool) -> Tuple[List[Hashable], List[Hashable]]:
+    """Points à conserver et à supprimer d'un lot de points de balance
+
+    Seul le dernier point de chaque canal et de chaque intervalle est
+    conservé. Si le lot est complet, le dernier intervalle se poursuit
+    peut-être au lot suivant : il est laissé intact et traité avec lui.
+
+    Args:
+        samples: Points (identifiant, canal, timestamp UNIX) triés par date
+        bucket_seconds: Taille des intervalles conservés
+        batch_full: Le lot a atteint sa taille maximale
+
+    Returns:
+        Tuple (identifiants conservés, identifiants à supprimer)
+    """
+    if not samples:
+        return [], []
+    first_bucket = int(samples[0][2]) // bucket_seconds
+    last_bucket = int(samples[-1][2]) // bucket_seconds
+    incomplete = last_bucket if batch_full and first_bucket != last_bucket else None
+
+    groups: Dict[tuple, List[Hashable]] = {}
+    for sample_id, channel_id, timestamp in samples:
+        bucket = int(timestamp) // bucket_seconds
+        if bucket != incomplete:
+            groups.setdefault((channel_id, bucket), []).append(sample_id)
+
+    kept = [ids[-1] for ids in groups.values()]
+    removed = [sample_id for ids in groups.values() for sample_id in ids[:-1]]
+    return kept, removed
+
+
+class MetricsStorageInterface(ABC):
+    """Interface des stockages de métriques (MongoDB, fichier SQLite local)
+
+    Toutes les opérations sont des coroutines et renvoient les mêmes
+    structures quel que soit le stockage.
+    """
+
+    @abstractmethod
+    async def ensure_indexes(self) -> None:
+        """Crée les index (ou le schéma) du stockage"""
+        pass
+
+    # SNAPSHOTS
+
+    @abstractmethod
+    async def insert_snapshot(self, snapshot: Dict[str, Any]) -> str:
+        """Enregistre un snapshot de métriques et retourne son identifiant"""
+        pass
+
+    @abstractmethod
+    async def query_snapshot_trends(self, paths: List[str], start: datetime, end: datetime,
+                                    bucket_seconds: int,
+                                    aggregation: str = "avg") -> List[Dict[str, Any]]:
+        """Séries sous-échantillonnées de plusieurs champs des snapshots"""
+        pass
+
+    # BALANCES DES CANAUX
+
+    @abstractmethod
+    async def write_channel_balances(self, samples: List[Dict[str, Any]],
+                                     ts: datetime = None) -> int:
+        """Ajoute un échantillon de balance par canal à la série temporelle"""
+        pass
+
+    @abstractmethod
+    async def get_channel_balances(self, channel_ids: List[str], start: datetime, end: datetime,
+                                   bucket_seconds: int = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Séries de balance de plusieurs canaux"""
+        pass
+
+    # ÉVÉNEMENTS DE FORWARDING
+
+    @abstractmethod
+    async def get_forwarding_watermark(self) -> int:
+        """Dernier offset LND ingéré (0 si aucune ingestion)"""
+        pass
+
+    @abstractmethod
+    async def set_forwarding_watermark(self, last_offset_index: int) -> None:
+        """Enregistre le dernier offset LND ingéré"""
+        pass
+
+    @abstractmethod
+    async def write_forwarding_events(self, events: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Insère un lot d'événements en ignorant les doublons et met à jour les agrégats"""
+        pass
+
+    @abstractmethod
+    async def summarize_forwards(self, start_time: int, end_time: int) -> Dict[str, Any]:
+        """Totaux et détail par canal des événements d'une période"""
+        pass
+
+    # AGRÉGATS DE FORWARDING
+
+    @abstractmethod
+    async def rebuild_forwarding_rollups(self, since: int = 0) -> None:
+        """Recalcule les agrégats à partir des événements stockés"""
+        pass
+
+    @abstractmethod
+    async def ensure_forwarding_rollups(self) -> None:
+        """Construit les agrégats des événements ingérés avant leur mise en place"""
+        pass
+
+    @abstractmethod
+    async def get_forwarding_rollups(self, granularity: str, start_time: int, end_time: int,
+                                     group_by: str = "bucket_start") -> List[Dict[str, Any]]:
+        """Somme des agrégats d'une période, par intervalle ou par canal"""
+        pass
+
+    # RÉTENTION
+
+    @abstractmethod
+    async def purge_forwarding_events(self, before: int, batch_size: int) -> int:
+        """Supprime un lot d'événements de forwarding bruts antérieurs à before"""
+        pass
+
+    @abstractmethod
+    async def purge_forwarding_rollups(self, granularity: str, before: int, batch_size: int) -> int:
+        """Supprime un lot d'agrégats d'une granularité antérieurs à before"""
+        pass
+
+    @abstractmethod
+    async def compact_snapshots(self, before: datetime, batch_size: int) -> int:
+        """Retire le détail par canal d'un lot de snapshots antérieurs à before"""
+        pass
+
+    @abstractmethod
+    async def purge_snapshots(self, before: datetime, batch_size: int) -> int:
+        """Supprime un lot de snapshots antérieurs à before"""
+        pass
+
+    @abstractmethod
+    async def downsample_channel_balances(self, before: datetime, bucket_seconds: int,
+                                          batch_size: int) -> int:
+        """Sous-échantillonne un lot de points de balance antérieurs à before"""
+        pass
+
+    @abstractmethod
+    async def purge_channel_balances(self, before: datetime, batch_size: int) -> int:
+        """Supprime un lot de points de balance antérieurs à before"""
+        pass
+
+    # PLANIFICATION
+
+    @abstractmethod
+    async def get_job_last_run(self, name: str) -> Optional[datetime]:
+        """Dernière exécution réussie d'une tâche planifiée (UTC)"""
+        pass
+
+    @abstractmethod
+    async def set_job_last_run(self, name: str, last_run: datetime) -> None:
+        """Enregistre la dernière exécution réussie d'une tâche planifiée"""
+        pass
+
+    # CYCLE DE VIE
+
+    @abstractmethod
+    def close(self) -> None:
+        """Ferme les connexions du stockage"""
+        pass
+
+    @abstractmethod
+    def get_stats(self) -> Dict[str, Any]:
+        """Configuration et état du stockage"""
+        pass
@@ -10,6 +10,8 @@ from services.lnrouter_client import LNRouterClient
 from services.mcp import MCPService
 from services.feustey import FeusteyService
 from services.data_source_factory import DataSourceFactory
+from services.async_cache import AsyncTTLCache
+from services.async_lnd_client import call_lnd
 
 logger = logging.getLogger(__name__)
 
@@ -224,6 +226,12 @@ class NodeAggregator:
         self.lnd_client = lnd_client or DataSourceFactory.get_lnd_client()
         self.lnrouter_client = lnrouter_client or DataSourceFactory.get_lnrouter_client()
         self.data_source = DataSourceFactory.get_data_source()
+        # Nœuds enrichis par get_enriched_nodes (les absences ne sont pas conservées)
+        self.enriched_nodes_cache = AsyncTTLCache(
+            "enriched_nodes", ttl=settings.NODE_ENRICHMENT_CACHE_TTL_SECONDS
+        )
+        # Limite commune à tous les appels de get_enriched_nodes
+        self.enrichment_semaphore = asyncio.Semaphore(settings.NODE_ENRICHMENT_CONCURRENCY)
     
     async def get_enriched_node(self, pubkey: str) -> Optional[Dict[str, Any]]:
         """Récupère les informations enrichies d'un nœud"""
@@ -262,6 +270,44 @@ class NodeAggregator:
             logger.error(f"Erreur lors de la récupération des informations enrichies du nœud {pubkey}: {e}")
             return None
     
+    async def get_enriched_nodes(self, pubkeys: List[str],
+                                 timeout: float = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Récupère en parallèle les informations enrichies de plusieurs nœuds
+        
+        Les pubkeys en double ne sont enrichies qu'une fois ; tous appels
+        confondus, au plus NODE_ENRICHMENT_CONCURRENCY nœuds sont enrichis à
+        la fois. Les résultats sont mis en cache et les lots concurrents
+        partagent les enrichissements en cours. Les dictionnaires renvoyés
+        sont partagés par le cache et ne doivent pas être modifiés.
+        
+        Args:
+            pubkeys: Clés publiques des nœuds
+            timeout: Délai maximal par nœud en secondes (par défaut NODE_ENRICHMENT_TIMEOUT_SECONDS)
+            
+        Returns:
+            Dictionnaire pubkey -> nœud enrichi, None si introuvable, en erreur ou hors délai
+        """
+        unique_pubkeys = list(dict.fromkeys(pubkey for pubkey in pubkeys if pubkey))
+        semaphore = self.enrichment_semaphore
+        timeout = timeout or settings.NODE_ENRICHMENT_TIMEOUT_SECONDS
+        
+        async def enrich(pubkey: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(self.get_enriched_node(pubkey), timeout)
+                except asyncio.TimeoutError:
+                    logger.warning(f"Délai dépassé pour l'enrichissement du nœud {pubkey} ({timeout}s)")
+                    return None
+        
+        results = await asyncio.gather(*(
+            self.enriched_nodes_cache.get_or_call(
+                pubkey, lambda pubkey=pubkey: enrich(pubkey),
+                ttl=lambda node: None if node is not None else 0
+            )
+            for pubkey in unique_pubkeys
+        ))
+        return dict(zip(unique_pubkeys, results))
+    
     async def get_enriched_channel(self, channel_id: str) -> Optional[Dict[str, Any]]:
         """Récupère les informations enrichies d'un canal"""
         try:
@@ -323,7 +369,7 @@ class NodeAggregator:
             channels_stats = await self.data_source.get_channels_stats()
             
             # Récupérer les informations du nœud local
-            node_info = self.lnd_client.get_node_info()
+            node_info = await call_lnd(self.lnd_client.get_node_info)
             
             # Agréger les informations
             context = {
@@ -0,0 +1,320 @@
+import heapq
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import dijkstra
+
+from services.graph_store import GraphStore
+
+logger = logging.getLogger(__name__)
+
+# Pénalité de verrouillage : coût (msat) par bloc de CLTV et par msat bloqué
+RISK_FACTOR = 15e-9
+# Coût d'une tentative de paiement, pondéré par -ln(probabilité de succès)
+ATTEMPT_COST_MSAT = 100000
+ATTEMPT_COST_PPM = 1000
+# Coût fixe par saut : garde des poids strictement positifs et favorise les routes courtes
+HOP_COST_MSAT = 1.0
+# Probabilité minimale retenue pour une arête (évite -ln(0))
+MIN_PROBABILITY = 1e-6
+
+
+class RoutingEngine:
+    """Recherche de routes sur un GraphStore avec des coûts réalistes
+
+    Le coût d'une arête pour un montant donné combine les frais réellement
+    facturés (frais de base + taux proportionnel), une pénalité de CLTV et une
+    pénalité de probabilité de succès estimée à partir de la capacité
+    (liquidité supposée uniforme). Les arêtes désactivées, sans politique ou
+    incapables de transporter le montant sont écartées avant la recherche.
+
+    Les coûts sont calculés en une passe vectorisée sur toutes les arêtes, puis
+    le plus court chemin est calculé par scipy (Dijkstra en C) sur la matrice
+    CSR du store. Le moteur est lié à un store : chaque nouvelle version du
+    graphe donne un nouveau store, et donc un nouveau moteur.
+    """
+
+    def __init__(self, store: GraphStore, risk_factor: float = RISK_FACTOR,
+                 attempt_cost_msat: int = ATTEMPT_COST_MSAT,
+                 attempt_cost_ppm: int = ATTEMPT_COST_PPM):
+        """Initialise le moteur de routage
+
+        Args:
+            store: Graphe du réseau
+            risk_factor: Coût par bloc de CLTV et par msat transporté
+            attempt_cost_msat: Coût fixe d'une tentative de paiement (msat)
+            attempt_cost_ppm: Coût proportionnel d'une tentative (ppm du montant)
+        """
+        self.store = store
+        self.risk_factor = risk_factor
+        self.attempt_cost_msat = attempt_cost_msat
+        self.attempt_cost_ppm = attempt_cost_ppm
+
+        # Ordre CSR des arêtes (par nœud source), fixe pour un store donné
+        self._order = store.csr_edges
+        self._dst_sorted = store.edge_dst[self._order]
+
+    # COÛTS
+
+    def _capacity_msat(self) -> np.ndarray:
+        """Capacité (msat) du canal de chaque arête orientée"""
+        return self.store.channel_capacity[self.store.edge_channel] * 1000.0
+
+    def edge_mask(self, amount_msat: int) -> np.ndarray:
+        """Arêtes capables de transporter le montant (capacité et bornes HTLC)"""
+        store = self.store
+        mask = store.usable_edges()
+        if amount_msat > 0:
+            mask &= self._capacity_msat() >= amount_msat
+            mask &= store.min_htlc_msat <= amount_msat
+            mask &= (store.max_htlc_msat == 0) | (store.max_htlc_msat >= amount_msat)
+        return mask
+
+    def can_carry(self, edges: List[int], amount_msat: int) -> bool:
+        """Indique si toutes les arêtes d'un chemin peuvent transporter le montant (voir edge_mask)"""
+        store = self.store
+        edges = np.asarray(edges, dtype=np.int64)
+        channels = store.edge_channel[edges]
+        usable = store.channel_alive[channels] & store.has_policy[edges] & ~store.disabled[edges]
+        if amount_msat > 0:
+            max_htlc = store.max_htlc_msat[edges]
+            usable &= store.channel_capacity[channels] * 1000.0 >= amount_msat
+            usable &= store.min_htlc_msat[edges] <= amount_msat
+            usable &= (max_htlc == 0) | (max_htlc >= amount_msat)
+        return bool(usable.all())
+
+    def edge_probabilities(self, amount_msat: int) -> np.ndarray:
+        """Probabilité de succès estimée de chaque arête pour le montant"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            probability = 1.0 - amount_msat / self._capacity_msat()
+        return np.clip(np.nan_to_num(probability, nan=0.0), MIN_PROBABILITY, 1.0)
+
+    def edge_fees(self, amount_msat: int) -> np.ndarray:
+        """Frais (msat) facturés par chaque arête pour transférer le montant"""
+        store = self.store
+        return store.fee_base_msat + amount_msat * store.fee_rate_ppm / 1_000_000
+
+    def edge_costs(self, amount_msat: int, source: int = None) -> np.ndarray:
+        """Coût de chaque arête orientée pour router le montant
+
+        Les canaux du nœud source ne facturent ni frais ni CLTV et leur
+        liquidité est connue : seul le coût fixe par saut s'applique.
+        """
+        store = self.store
+        attempt_cost = self.attempt_cost_msat + amount_msat * self.attempt_cost_ppm / 1_000_000
+        costs = (
+            self.edge_fees(amount_msat)
+            + store.cltv_delta * amount_msat * self.risk_factor
+            - attempt_cost * np.log(self.edge_probabilities(amount_msat))
+            + HOP_COST_MSAT
+        )
+        if source is not None:
+            costs[store.out_edges(source)] = HOP_COST_MSAT
+        return costs
+
+    # RECHERCHE
+
+    def _matrix(self, costs: np.ndarray, mask: np.ndarray) -> sparse.csr_matrix:
+        """Matrice CSR des arêtes (ordre CSR du store, sans tri)
+
+        Les arêtes écartées gardent leur place avec un coût infini : la
+        structure de la matrice ne dépend pas de la requête.
+        """
+        weights = np.where(mask, costs, np.inf)[self._order]
+        n = self.store.num_nodes
+        return sparse.csr_matrix((weights, self._dst_sorted, self.store.indptr), shape=(n, n))
+
+    def _best_edge(self, u: int, v: int, costs: np.ndarray, mask: np.ndarray) -> int:
+        """Arête retenue la moins chère de u vers v (canaux parallèles)"""
+        edges = self.store.out_edges(u)
+        candidates = edges[(self.store.edge_dst[edges] == v) & mask[edges]]
+        return int(candidates[np.argmin(costs[candidates])])
+
+    def _shortest_edges(self, source: int, target: int, costs: np.ndarray,
+                        mask: np.ndarray) -> Optional[List[int]]:
+        """Plus court chemin (liste d'arêtes) de source à target, ou None"""
+        distances, predecessors = dijkstra(
+            self._matrix(costs, mask), directed=True, indices=source,
+            return_predecessors=True
+        )
+        if not np.isfinite(distances[target]):
+            return None
+        return self._edges_to(source, target, predecessors, costs, mask)
+
+    def _edges_to(self, source: int, target: int, predecessors: np.ndarray,
+                  costs: np.ndarray, mask: np.ndarray) -> List[int]:
+        nodes = [target]
+        while nodes[-1] != source:
+            nodes.append(int(predecessors[nodes[-1]]))
+        nodes.reverse()
+        return [self._best_edge(u, v, costs, mask) for u, v in zip(nodes[:-1], nodes[1:])]
+
+    def _resolve(self, source_pubkey: str, target_pubkey: str) -> Tuple[int, int]:
+        index = self.store.index
+        if source_pubkey not in index or target_pubkey not in index:
+            raise ValueError("Les nœuds source ou destination n'existent pas dans le graphe")
+        return index[source_pubkey], index[target_pubkey]
+
+    def find_route(self, source_pubkey: str, target_pubkey: str,
+                   amount_msat: int = 0) -> Optional[Dict[str, Any]]:
+        """Route de coût minimal pour envoyer un montant
+
+        Returns:
+            Route (voir build_route), ou None si aucune route ne peut transporter le montant
+        """
+        source, target = self._resolve(source_pubkey, target_pubkey)
+        if source == target:
+            return None
+        costs = self.edge_costs(amount_msat, source)
+        mask = self.edge_mask(amount_msat)
+        edges = self._shortest_edges(source, target, costs, mask)
+        return self.build_route(edges, amount_msat, costs) if edges else None
+
+    def find_routes(self, source_pubkey: str, target_pubkey: str,
+                    amount_msat: int = 0, k: int = 3) -> List[Dict[str, Any]]:
+        """Les k routes de coût minimal (algorithme de Yen), par coût croissant"""
+        source, target = self._resolve(source_pubkey, target_pubkey)
+        if source == target or k <= 0:
+            return []
+        store = self.store
+        costs = self.edge_costs(amount_msat, source)
+        mask = self.edge_mask(amount_msat)
+
+        first = self._shortest_edges(source, target, costs, mask)
+        if first is None:
+            return []
+
+        paths: List[List[int]] = [first]
+        seen = {tuple(first)}
+        candidates: List[Tuple[float, List[int]]] = []
+
+        while len(paths) < k:
+            previous = paths[-1]
+            for i in range(len(previous)):
+                root = previous[:i]
+                spur_node = int(store.edge_src[previous[i]])
+
+                spur_mask = mask.copy()
+                # Écarter l'arête suivante des chemins déjà trouvés partageant la même racine
+                for path in paths:
+                    if len(path) > i and path[:i] == root:
+                        spur_mask[path[i]] = False
+                # Écarter les nœuds de la racine pour garder des chemins simples
+                root_nodes = [int(store.edge_src[edge]) for edge in root]
+                if root_nodes:
+                    removed = np.isin(store.edge_src, root_nodes) | np.isin(store.edge_dst, root_nodes)
+                    spur_mask &= ~removed
+
+                spur = self._shortest_edges(spur_node, target, costs, spur_mask)
+                if spur is None:
+                    continue
+                candidate = root + spur
+                if tuple(candidate) not in seen:
+                    seen.add(tuple(candidate))
+                    heapq.heappush(candidates, (float(costs[candidate].sum()), candidate))
+
+            if not candidates:
+                break
+            paths.append(heapq.heappop(candidates)[1])
+
+        return [self.build_route(path, amount_msat, costs) for path in paths]
+
+    def routes_from(self, source_pubkey: str, amount_msat: int = 0,
+                    targets: List[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Routes de coût minimal depuis un nœud vers plusieurs destinations
+
+        Un seul calcul de plus courts chemins sert toutes les destinations :
+        c'est la forme à privilégier pour les traitements en masse.
+
+        Args:
+            source_pubkey: Nœud émetteur
+            amount_msat: Montant à router
+            targets: Destinations (par défaut : tous les nœuds atteignables)
+
+        Returns:
+            Dictionnaire pubkey de destination -> route
+        """
+        index = self.store.index
+        if source_pubkey not in index:
+            raise ValueError("Le nœud source n'existe pas dans le graphe")
+        source = index[source_pubkey]
+        costs = self.edge_costs(amount_msat, source)
+        mask = self.edge_mask(amount_msat)
+        distances, predecessors = dijkstra(
+            self._matrix(costs, mask), directed=True, indices=source,
+            return_predecessors=True
+        )
+
+        if targets is None:
+            target_ids = np.flatnonzero(np.isfinite(distances)).tolist()
+        else:
+            target_ids = [index[pubkey] for pubkey in targets if pubkey in index]
+
+        routes = {}
+        for target in target_ids:
+            if target == source or not np.isfinite(distances[target]):
+                continue
+            edges = self._edges_to(source, target, predecessors, costs, mask)
+            routes[self.store.pubkeys[target]] = self.build_route(edges, amount_msat, costs)
+        return routes
+
+    # CONSTRUCTION DES ROUTES
+
+    def build_route(self, edges: List[int], amount_msat: int,
+                    costs: np.ndarray = None) -> Dict[str, Any]:
+        """Calcule montants, frais et CLTV exacts le long d'un chemin
+
+        Les frais sont recalculés en partant de la destination : chaque nœud
+        intermédiaire facture ses frais sur le montant qu'il transfère
+        réellement (montant final + frais des sauts suivants).
+
+        Returns:
+            Dictionnaire avec 'hops' (du nœud source vers la destination),
+            'amount_msat', 'total_fee_msat', 'total_cltv_delta', 'probability'
+            et 'cost'
+        """
+        store = self.store
+        hops: List[Dict[str, Any]] = []
+        forward_msat = amount_msat
+        total_cltv = 0
+        probability = 1.0
+
+        for position in range(len(edges) - 1, -1, -1):
+            edge = edges[position]
+            ch = int(store.edge_channel[edge])
+            capacity = int(store.channel_capacity[ch])
+            # Le premier saut part du nœud source : ni frais ni CLTV
+            if position > 0:
+                fee_msat = int(store.fee_base_msat[edge]) + (
+                    forward_msat * int(store.fee_rate_ppm[edge]) // 1_000_000
+                )
+                cltv_delta = int(store.cltv_delta[edge])
+                if capacity > 0:
+                    probability *= max(1.0 - forward_msat / (capacity * 1000), 0.0)
+            else:
+                fee_msat = 0
+                cltv_delta = 0
+
+            hops.append({
+                "from_node": store.pubkeys[store.edge_src[edge]],
+                "to_node": store.pubkeys[store.edge_dst[edge]],
+                "channel_id": store.channel_ids[ch],
+                "capacity": capacity,
+                "amount_to_forward_msat": forward_msat,
+                "fee_msat": fee_msat,
+                "cltv_delta": cltv_delta,
+            })
+            forward_msat += fee_msat
+            total_cltv += cltv_delta
+
+        hops.reverse()
+        return {
+            "hops": hops,
+            "amount_msat": amount_msat,
+            "total_fee_msat": forward_msat - amount_msat,
+            "total_cltv_delta": total_cltv,
+            "probability": probability,
+            "cost": float(costs[edges].sum()) if costs is not None else None,
+        }
@@ -0,0 +1,234 @@
+import copy
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from scipy.sparse.csgraph import dijkstra
+
+from services.routing_engine import RoutingEngine
+
+logger = logging.getLogger(__name__)
+
+# Tolérance sur les comparaisons de coûts (flottants)
+COST_EPSILON = 1e-9
+
+
+class SelfRoutes:
+    """Arbres de plus courts chemins précalculés depuis et vers notre nœud
+
+    L'arbre sortant donne la route la moins coûteuse de notre nœud vers
+    chaque nœud du réseau, l'arbre entrant celle de chaque nœud vers le
+    nôtre, pour un montant de référence. Une fois calculés, coût et route
+    s'obtiennent en O(longueur du chemin) sans nouvelle recherche.
+
+    Quand le graphe change, seules les arêtes dont le coût a changé sont
+    examinées : l'arbre n'est recalculé que si l'une d'elles appartient à
+    l'arbre ou offrirait un chemin plus court. Si des nœuds ou canaux ont été
+    ajoutés, les arbres sont recalculés.
+    """
+
+    def __init__(self, engine: RoutingEngine, node_pubkey: str, amount_msat: int):
+        """Initialise les arbres de routes de notre nœud
+
+        Args:
+            engine: Moteur de routage (lié au GraphStore courant)
+            node_pubkey: Clé publique de notre nœud
+            amount_msat: Montant de référence pour le calcul des coûts
+        """
+        if node_pubkey not in engine.store.index:
+            raise ValueError("Le nœud local n'existe pas dans le graphe")
+
+        self.engine = engine
+        self.node_pubkey = node_pubkey
+        self.node = engine.store.index[node_pubkey]
+        self.amount_msat = amount_msat
+
+        self.version: Any = None
+        self.computed_at: Optional[datetime] = None
+        self.full_recomputations = 0
+        self.skipped_updates = 0
+
+        # Arbre sortant (notre nœud -> X) et entrant (X -> notre nœud)
+        self._out_weights: Optional[np.ndarray] = None
+        self._out_distances: Optional[np.ndarray] = None
+        self._out_predecessors: Optional[np.ndarray] = None
+        self._in_weights: Optional[np.ndarray] = None
+        self._in_distances: Optional[np.ndarray] = None
+        self._in_successors: Optional[np.ndarray] = None
+
+        self.refresh()
+
+    @property
+    def store(self):
+        return self.engine.store
+
+    # CALCUL ET MISE À JOUR
+
+    def _weights(self, outbound: bool) -> np.ndarray:
+        """Coût de chaque arête (infini pour les arêtes inutilisables)"""
+        costs = self.engine.edge_costs(self.amount_msat, self.node if outbound else None)
+        return np.where(self.engine.edge_mask(self.amount_msat), costs, np.inf)
+
+    def _compute_outbound(self, weights: np.ndarray) -> None:
+        matrix = self.engine._matrix(weights, np.isfinite(weights))
+        self._out_distances, self._out_predecessors = dijkstra(
+            matrix, directed=True, indices=self.node, return_predecessors=True
+        )
+        self._out_weights = weights
+
+    def _compute_inbound(self, weights: np.ndarray) -> None:
+        # Plus courts chemins vers notre nœud = depuis notre nœud sur le graphe transposé
+        matrix = self.engine._matrix(weights, np.isfinite(weights)).T.tocsr()
+        self._in_distances, self._in_successors = dijkstra(
+            matrix, directed=True, indices=self.node, return_predecessors=True
+        )
+        self._in_weights = weights
+
+    def _outbound_affected(self, weights: np.ndarray) -> bool:
+        """Indique si des arêtes modifiées invalident l'arbre sortant"""
+        if len(weights) != len(self._out_weights) or len(self._out_distances) != self.store.num_nodes:
+            return True
+        changed = np.flatnonzero(weights != self._out_weights)
+        if len(changed) == 0:
+            return False
+        src = self.store.edge_src[changed]
+        dst = self.store.edge_dst[changed]
+        in_tree = self._out_predecessors[dst] == src
+        shorter = self._out_distances[src] + weights[changed] < self._out_distances[dst] - COST_EPSILON
+        return bool(in_tree.any() or shorter.any())
+
+    def _inbound_affected(self, weights: np.ndarray) -> bool:
+        """Indique si des arêtes modifiées invalident l'arbre entrant"""
+        if len(weights) != len(self._in_weights) or len(self._in_distances) != self.store.num_nodes:
+            return True
+        changed = np.flatnonzero(weights != self._in_weights)
+        if len(changed) == 0:
+            return False
+        src = self.store.edge_src[changed]
+        dst = self.store.edge_dst[changed]
+        in_tree = self._in_successors[src] == dst
+        shorter = weights[changed] + self._in_distances[dst] < self._in_distances[src] - COST_EPSILON
+        return bool(in_tree.any() or shorter.any())
+
+    def refresh(self) -> bool:
+        """Met les arbres à jour avec la version courante du graphe
+
+        Returns:
+            True si au moins un arbre a été recalculé
+        """
+        if self.computed_at is not None and self.store.version == self.version:
+            return False
+
+        out_weights = self._weights(outbound=True)
+        in_weights = self._weights(outbound=False)
+        recomputed = False
+
+        if self._out_weights is None or self._outbound_affected(out_weights):
+            self._compute_outbound(out_weights)
+            recomputed = True
+        else:
+            self._out_weights = out_weights
+
+        if self._in_weights is None or self._inbound_affected(in_weights):
+            self._compute_inbound(in_weights)
+            recomputed = True
+        else:
+            self._in_weights = in_weights
+
+        if recomputed:
+            self.full_recomputations += 1
+        else:
+            self.skipped_updates += 1
+        self.version = self.store.version
+        self.computed_at = datetime.now()
+        return recomputed
+
+    def updated(self, engine: RoutingEngine) -> "SelfRoutes":
+        """Arbres mis à jour pour le moteur d'une nouvelle version du graphe
+
+        La mise à jour est faite sur une copie : les appelants qui lisent
+        encore ces arbres ne voient jamais un état intermédiaire.
+        """
+        self_routes = copy.copy(self)
+        self_routes.engine = engine
+        self_routes.refresh()
+        return self_routes
+
+    # REQUÊTES
+
+    def _index(self, pubkey: str) -> int:
+        idx = self.store.index.get(pubkey)
+        if idx is None:
+            raise ValueError(f"Nœud inconnu dans le graphe: {pubkey}")
+        return idx
+
+    def _tree_edges(self, nodes: List[int], weights: np.ndarray) -> List[int]:
+        mask = np.isfinite(weights)
+        return [
+            self.engine._best_edge(u, v, weights, mask) for u, v in zip(nodes[:-1], nodes[1:])
+        ]
+
+    def _outbound_nodes(self, target: int) -> List[int]:
+        nodes = [target]
+        while nodes[-1] != self.node:
+            nodes.append(int(self._out_predecessors[nodes[-1]]))
+        nodes.reverse()
+        return nodes
+
+    def _inbound_nodes(self, source: int) -> List[int]:
+        nodes = [source]
+        while nodes[-1] != self.node:
+            nodes.append(int(self._in_successors[nodes[-1]]))
+        return nodes
+
+    def cost_to(self, pubkey: str) -> float:
+        """Coût de la meilleure route de notre nœud vers un nœud (inf si inatteignable)"""
+        return float(self._out_distances[self._index(pubkey)])
+
+    def cost_from(self, pubkey: str) -> float:
+        """Coût de la meilleure route d'un nœud vers le nôtre (inf si inatteignable)"""
+        return float(self._in_distances[self._index(pubkey)])
+
+    def route_to(self, pubkey: str, amount_msat: int = None) -> Optional[Dict[str, Any]]:
+        """Route de notre nœud vers un nœud (voir RoutingEngine.build_route)
+
+        Les frais sont calculés pour amount_msat (par défaut le montant de
+        référence). L'arbre n'est optimal que pour le montant de référence :
+        pour un autre montant, la route n'est renvoyée que si chacun de ses
+        canaux peut le transporter (capacité, bornes HTLC), sinon None.
+        """
+        target = self._index(pubkey)
+        if target == self.node or not np.isfinite(self._out_distances[target]):
+            return None
+        edges = self._tree_edges(self._outbound_nodes(target), self._out_weights)
+        return self._build_route(edges, amount_msat, self._out_weights)
+
+    def route_from(self, pubkey: str, amount_msat: int = None) -> Optional[Dict[str, Any]]:
+        """Route d'un nœud vers le nôtre (voir route_to)"""
+        source = self._index(pubkey)
+        if source == self.node or not np.isfinite(self._in_distances[source]):
+            return None
+        edges = self._tree_edges(self._inbound_nodes(source), self._in_weights)
+        return self._build_route(edges, amount_msat, self._in_weights)
+
+    def _build_route(self, edges: List[int], amount_msat: Optional[int],
+                     weights: np.ndarray) -> Optional[Dict[str, Any]]:
+        if amount_msat is None or amount_msat == self.amount_msat:
+            return self.engine.build_route(edges, self.amount_msat, weights)
+        if not self.engine.can_carry(edges, amount_msat):
+            return None
+        return self.engine.build_route(edges, amount_msat, weights)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques des arbres précalculés"""
+        return {
+            "node": self.node_pubkey,
+            "amount_msat": self.amount_msat,
+            "version": str(self.version),
+            "computed_at": self.computed_at.isoformat() if self.computed_at else None,
+            "reachable_outbound": int(np.isfinite(self._out_distances).sum()) - 1,
+            "reachable_inbound": int(np.isfinite(self._in_distances).sum()) - 1,
+            "full_recomputations": self.full_recomputations,
+            "skipped_updates": self.skipped_updates
+        }
@@ -0,0 +1,571 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from core.config import settings
+from services.metrics_storage_interface import (
+    ROLLUP_FIELDS, ROLLUP_GRANULARITIES, TREND_AGGREGATIONS, MetricsStorageInterface,
+    forwarding_rollup_increments, plan_downsample
+)
+
+logger = logging.getLogger(__name__)
+
+# Colonnes conservées des événements de forwarding (format de LNDClient)
+FORWARDING_EVENT_COLUMNS = (
+    "timestamp_ns", "chan_id_in", "chan_id_out", "amt_in", "amt_out", "fee",
+    "fee_msat", "amt_in_msat", "amt_out_msat", "offset_index"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL UNIQUE,
+    ts REAL NOT NULL,
+    compacted INTEGER NOT NULL DEFAULT 0,
+    document TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshot_ts ON snapshots (ts);
+
+CREATE TABLE IF NOT EXISTS channel_balances (
+    id INTEGER PRIMARY KEY,
+    channel_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    local INTEGER,
+    remote INTEGER,
+    active INTEGER,
+    resolution INTEGER
+);
+CREATE INDEX IF NOT EXISTS channel_balance_key ON channel_balances (channel_id, ts);
+CREATE INDEX IF NOT EXISTS channel_balance_ts ON channel_balances (ts);
+
+-- Table organisée par la clé (WITHOUT ROWID) : les événements d'une période
+-- sont contigus sur disque et lus dans l'ordre de l'index
+CREATE TABLE IF NOT EXISTS forwarding_events (
+    timestamp_ns INTEGER NOT NULL,
+    chan_id_in TEXT NOT NULL,
+    chan_id_out TEXT NOT NULL,
+    amt_in INTEGER NOT NULL DEFAULT 0,
+    amt_out INTEGER NOT NULL DEFAULT 0,
+    fee INTEGER NOT NULL DEFAULT 0,
+    fee_msat INTEGER,
+    amt_in_msat INTEGER,
+    amt_out_msat INTEGER,
+    offset_index INTEGER,
+    PRIMARY KEY (timestamp_ns, chan_id_in, chan_id_out)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS forwarding_rollups (
+    granularity TEXT NOT NULL,
+    bucket_start INTEGER NOT NULL,
+    channel_id TEXT NOT NULL,
+    forwards_in INTEGER NOT NULL DEFAULT 0,
+    forwards_out INTEGER NOT NULL DEFAULT 0,
+    amount_in INTEGER NOT NULL DEFAULT 0,
+    amount_out INTEGER NOT NULL DEFAULT 0,
+    fees_in INTEGER NOT NULL DEFAULT 0,
+    fees_out INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (granularity, bucket_start, channel_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _epoch(ts: datetime) -> float:
+    """Timestamp UNIX d'une date (naïve : UTC)"""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+def _isoformat(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+class SQLiteMetricsStorage(MetricsStorageInterface):
+    """Stockage des métriques dans un fichier SQLite local
+
+    Pour les installations sans serveur MongoDB (Umbrel) : un seul fichier,
+    aucune dépendance hors de la bibliothèque standard. Les requêtes de
+    tendances, de forwarding et d'agrégats renvoient les mêmes résultats que
+    MongoMetricsStorage ; les agrégations sont calculées par SQLite (GROUP BY
+    sur des index couvrants, fonctions de fenêtre) sans rapatrier les lignes.
+
+    La connexion est ouverte au premier appel, en mode WAL (les lectures ne
+    bloquent pas l'écriture). Les requêtes s'exécutent dans un thread pour ne
+    pas bloquer la boucle d'événements, une à la fois.
+    """
+
+    def __init__(self, path: str = None):
+        """Initialise le stockage (le fichier est créé au premier appel)
+
+        Args:
+            path: Chemin du fichier SQLite (":memory:" pour une base en mémoire)
+        """
+        self.path = path or settings.METRICS_LOCAL_DB_PATH
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    # CONNEXION
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if self.path != ":memory:":
+                directory = os.path.dirname(os.path.abspath(self.path))
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self._connection = connection
+            logger.info(f"Stockage local des métriques ouvert: {self.path}")
+        return self._connection
+
+    def _transaction(self, operation: Callable[[sqlite3.Connection], Any]) -> Any:
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                return operation(connection)
+
+    async def _run(self, operation: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Exécute une opération dans une transaction, hors de la boucle d'événements"""
+        return await asyncio.to_thread(self._transaction, operation)
+
+    async def ensure_indexes(self) -> None:
+        """Crée le fichier et le schéma"""
+        await self._run(lambda connection: None)
+
+    # ÉTAT
+
+    @staticmethod
+    def _get_state(connection: sqlite3.Connection, key: str) -> Optional[Any]:
+        row = connection.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row["value"]) if row else None
+
+    @staticmethod
+    def _set_state(connection: sqlite3.Connection, key: str, value: Any) -> None:
+        connection.execute(
+            "INSERT INTO state (key, value) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value))
+        )
+
+    # SNAPSHOTS
+
+    async def insert_snapshot(self, snapshot: Dict[str, Any]) -> str:
+        """Enregistre un snapshot de métriques
+
+        Returns:
+            ID du snapshot créé
+        """
+        document = dict(snapshot)
+        ts = document.pop("ts", None) or datetime.now(timezone.utc)
+
+        def insert(connection: sqlite3.Connection) -> str:
+            cursor = connection.execute(
+                "INSERT INTO snapshots (timestamp, ts, document) VALUES (?, ?, ?)",
+                (document["timestamp"], _epoch(ts), json.dumps(document, default=str))
+            )
+            return str(cursor.lastrowid)
+
+        return await self._run(insert)
+
+    async def query_snapshot_trends(self, paths: List[str], start: datetime, end: datetime,
+                                    bucket_seconds: int,
+                                    aggregation: str = "avg") -> List[Dict[str, Any]]:
+        """Séries sous-échantillonnées de plusieurs champs des snapshots
+
+        Même résultat que MongoMetricsStorage.query_snapshot_trends : un point
+        par intervalle de bucket_seconds (aligné sur l'époque UNIX, en UTC).
+        """
+        if aggregation not in TREND_AGGREGATIONS:
+            raise ValueError(f"Agrégation inconnue: {aggregation}")
+        if bucket_seconds <= 0:
+            raise ValueError(f"Taille d'intervalle invalide: {bucket_seconds}")
+
+        # Les chemins sont passés en paramètres de json_extract, jamais dans le SQL
+        params: Dict[str, Any] = {
+            "bucket": bucket_seconds, "start": _epoch(start), "end": _epoch(end),
+            **{f"p{i}": f"$.{path}" for i, path in enumerate(paths)}
+        }
+        bucket = "CAST(ts / :bucket AS INTEGER) * :bucket"
+        values = [f"json_extract(document, :p{i})" for i in range(len(paths))]
+        columns = ", ".join(f"m{i}" for i in range(len(paths)))
+
+        if aggregation in ("first", "last"):
+            order = "ts" if aggregation == "first" else "ts DESC"
+            sql = (
+                f"SELECT bucket, {columns} FROM ("
+                f"SELECT {bucket} AS bucket, "
+                + "".join(f"{value} AS m{i}, " for i, value in enumerate(values))
+                + f"ROW_NUMBER() OVER (PARTITION BY {bucket} ORDER BY {order}) AS position "
+                "FROM snapshots WHERE ts >= :start AND ts < :end"
+                ") WHERE position = 1 ORDER BY bucket"
+            )
+        else:
+            sql = (
+                f"SELECT {bucket} AS bucket, "
+                + ", ".join(f"{aggregation.upper()}({value}) AS m{i}" for i, value in enumerate(values))
+                + " FROM snapshots WHERE ts >= :start AND ts < :end GROUP BY bucket ORDER BY bucket"
+            )
+
+        rows = await self._run(lambda connection: connection.execute(sql, params).fetchall())
+        return [
+            {
+                "timestamp": _isoformat(row["bucket"]),
+                **{path: row[f"m{i}"] for i, path in enumerate(paths)}
+            }
+            for row in rows
+        ]
+
+    # BALANCES DES CANAUX
+
+    async def write_channel_balances(self, samples: List[Dict[str, Any]],
+                                     ts: datetime = None) -> int:
+        """Ajoute un échantillon de balance par canal à la série temporelle"""
+        if not samples:
+            return 0
+        timestamp = _epoch(ts or datetime.now(timezone.utc))
+        rows = [
+            (sample["channel_id"], timestamp, sample["local"], sample["remote"], sample["active"])
+            for sample in samples
+        ]
+        await self._run(lambda connection: connection.executemany(
+            "INSERT INTO channel_balances (channel_id, ts, local, remote, active) VALUES (?, ?, ?, ?, ?)",
+            rows
+        ))
+        return len(rows)
+
+    async def get_channel_balances(self, channel_ids: List[str], start: datetime, end: datetime,
+                                   bucket_seconds: int = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Séries de balance de plusieurs canaux en une seule requête
+
+        Avec bucket_seconds, seul le dernier point de chaque intervalle est conservé.
+        """
+        channel_ids = list(channel_ids)
+        if not channel_ids:
+            return {}
+        placeholders = ", ".join("?" * len(channel_ids))
+        where = f"channel_id IN ({placeholders}) AND ts >= ? AND ts < ?"
+        params = [*channel_ids, _epoch(start), _epoch(end)]
+        if bucket_seconds:
+            sql = (
+                "SELECT channel_id, ts, local, remote, active FROM ("
+                "SELECT *, ROW_NUMBER() OVER ("
+                "PARTITION BY channel_id, CAST(ts / ? AS INTEGER) ORDER BY ts DESC"
+                f") AS position FROM channel_balances WHERE {where}"
+                ") WHERE position = 1 ORDER BY channel_id, ts"
+            )
+            params.insert(0, bucket_seconds)
+        else:
+            sql = (
+                "SELECT channel_id, ts, local, remote, active FROM channel_balances "
+                f"WHERE {where} ORDER BY channel_id, ts"
+            )
+
+        rows = await self._run(lambda connection: connection.execute(sql, params).fetchall())
+        series: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            series.setdefault(row["channel_id"], []).append({
+                "ts": _isoformat(row["ts"]),
+                "local": row["local"],
+                "remote": row["remote"],
+                "active": bool(row["active"])
+            })
+        return series
+
+    # ÉVÉNEMENTS DE FORWARDING
+
+    async def get_forwarding_watermark(self) -> int:
+        """Dernier offset LND ingéré (0 si aucune ingestion)"""
+        state = await self._run(lambda connection: self._get_state(connection, "forwarding_events"))
+        return state["last_offset_index"] if state else 0
+
+    async def set_forwarding_watermark(self, last_offset_index: int) -> None:
+        """Enregistre le dernier offset LND ingéré"""
+        await self._run(lambda connection: self._set_state(
+            connection, "forwarding_events", {"last_offset_index": last_offset_index}
+        ))
+
+    @staticmethod
+    def _apply_rollup_increments(connection: sqlite3.Connection,
+                                 increments: Dict[tuple, Dict[str, int]]) -> None:
+        updates = ", ".join(f"{field} = {field} + excluded.{field}" for field in ROLLUP_FIELDS)
+        connection.executemany(
+            f"INSERT INTO forwarding_rollups (granularity, channel_id, bucket_start, "
+            f"{', '.join(ROLLUP_FIELDS)}) VALUES (?, ?, ?, {', '.join('?' * len(ROLLUP_FIELDS))}) "
+            f"ON CONFLICT (granularity, bucket_start, channel_id) DO UPDATE SET {updates}",
+            [
+                (granularity, channel_id, bucket_start, *(values[field] for field in ROLLUP_FIELDS))
+                for (granularity, channel_id, bucket_start), values in increments.items()
+            ]
+        )
+
+    async def write_forwarding_events(self, events: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Insère un lot d'événements et met à jour leurs agrégats dans une même transaction
+
+        Les doublons (déjà ingérés) sont ignorés par la clé primaire et
+        n'alimentent pas les agrégats.
+
+        Returns:
+            Nombre d'événements insérés et de doublons ignorés
+        """
+        if not events:
+            return {"inserted": 0, "duplicates": 0}
+
+        sql = (
+            f"INSERT OR IGNORE INTO forwarding_events ({', '.join(FORWARDING_EVENT_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(FORWARDING_EVENT_COLUMNS))})"
+        )
+
+        def write(connection: sqlite3.Connection) -> Dict[str, int]:
+            inserted = []
+            for event in events:
+                cursor = connection.execute(
+                    sql, [event.get(column) for column in FORWARDING_EVENT_COLUMNS]
+                )
+                if cursor.rowcount:
+                    inserted.append(event)
+            self._apply_rollup_increments(connection, forwarding_rollup_increments(inserted))
+            return {"inserted": len(inserted), "duplicates": len(events) - len(inserted)}
+
+        return await self._run(write)
+
+    async def summarize_forwards(self, start_time: int, end_time: int) -> Dict[str, Any]:
+        """Agrège les événements stockés de la période (même résultat que MongoDB)"""
+        params = (start_time * 1_000_000_000, end_time * 1_000_000_000)
+        where = "WHERE timestamp_ns >= ? AND timestamp_ns < ?"
+
+        def summarize(connection: sqlite3.Connection) -> Dict[str, Any]:
+            totals = connection.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(amt_out), 0), COALESCE(SUM(fee), 0) "
+                f"FROM forwarding_events {where}", params
+            ).fetchone()
+            channels_in = connection.execute(
+                f"SELECT chan_id_in, COUNT(*), SUM(amt_in), SUM(fee) FROM forwarding_events "
+                f"{where} GROUP BY chan_id_in", params
+            ).fetchall()
+            channels_out = connection.execute(
+                f"SELECT chan_id_out, COUNT(*), SUM(amt_out) FROM forwarding_events "
+                f"{where} GROUP BY chan_id_out", params
+            ).fetchall()
+            return {
+                "total_forwards": totals[0],
+                "total_amount_forwarded": totals[1],
+                "total_fees_earned": totals[2],
+                "channels_in": {
+                    row[0]: {"count": row[1], "amount": row[2], "fees": row[3]} for row in channels_in
+                },
+                "channels_out": {
+                    row[0]: {"count": row[1], "amount": row[2]} for row in channels_out
+                }
+            }
+
+        return await self._run(summarize)
+
+    # AGRÉGATS DE FORWARDING
+
+    async def rebuild_forwarding_rollups(self, since: int = 0) -> None:
+        """Recalcule les agrégats à partir des événements stockés
+
+        Les agrégats antérieurs aux événements purgés par la rétention ne
+        sont jamais recalculés.
+
+        Args:
+            since: Timestamp UNIX à partir duquel recalculer (aligné sur la semaine)
+        """
+        week = ROLLUP_GRANULARITIES["week"]
+        since -= since % week
+        fields = ", ".join(ROLLUP_FIELDS)
+        sums = ", ".join(f"SUM({field})" for field in ROLLUP_FIELDS)
+
+        def rebuild(connection: sqlite3.Connection) -> int:
+            retention = self._get_state(connection, "forwarding_retention")
+            start = since
+            if retention:
+                purged_before = retention["purged_before"]
+                start = max(start, purged_before + (-purged_before % week))
+            connection.execute("DELETE FROM forwarding_rollups WHERE bucket_start >= ?", (start,))
+            for granularity, size in ROLLUP_GRANULARITIES.items():
+                bucket = f"(timestamp_ns / 1000000000) - (timestamp_ns / 1000000000) % {size}"
+                connection.execute(
+                    f"INSERT INTO forwarding_rollups (granularity, channel_id, bucket_start, {fields}) "
+                    f"SELECT ?, channel_id, bucket_start, {sums} FROM ("
+                    f"SELECT chan_id_in AS channel_id, {bucket} AS bucket_start, "
+                    "1 AS forwards_in, 0 AS forwards_out, amt_in AS amount_in, 0 AS amount_out, "
+                    "fee AS fees_in, 0 AS fees_out FROM forwarding_events WHERE timestamp_ns >= ? "
+                    "UNION ALL "
+                    f"SELECT chan_id_out, {bucket}, 0, 1, 0, amt_out, 0, fee "
+                    "FROM forwarding_events WHERE timestamp_ns >= ?"
+                    ") GROUP BY channel_id, bucket_start",
+                    (granularity, start * 1_000_000_000, start * 1_000_000_000)
+                )
+            return start
+
+        start = await self._run(rebuild)
+        logger.info(f"Agrégats de forwarding recalculés depuis {datetime.fromtimestamp(start).isoformat()}")
+
+    async def ensure_forwarding_rollups(self) -> None:
+        """Construit les agrégats des événements ingérés avant leur mise en place"""
+        state = await self._run(lambda connection: self._get_state(connection, "forwarding_rollups"))
+        if state is not None:
+            return
+        await self.rebuild_forwarding_rollups()
+        await self._run(lambda connection: self._set_state(
+            connection, "forwarding_rollups", {"built_at": datetime.now().isoformat()}
+        ))
+
+    async def get_forwarding_rollups(self, granularity: str, start_time: int, end_time: int,
+                                     group_by: str = "bucket_start") -> List[Dict[str, Any]]:
+        """Somme des agrégats d'une période, par intervalle ou par canal
+
+        Returns:
+            Lignes {group_by: valeur, forwards_in, forwards_out, amount_in, ...}
+            triées par valeur de regroupement
+        """
+        if granularity not in ROLLUP_GRANULARITIES:
+            raise ValueError(f"Granularité inconnue: {granularity}")
+        if group_by not in ("bucket_start", "channel_id"):
+            raise ValueError(f"Regroupement inconnu: {group_by}")
+
+        start_time -= start_time % ROLLUP_GRANULARITIES[granularity]
+        sql = (
+            f"SELECT {group_by}, "
+            + ", ".join(f"SUM({field}) AS {field}" for field in ROLLUP_FIELDS)
+            + " FROM forwarding_rollups WHERE granularity = ? AND bucket_start >= ? "
+            f"AND bucket_start < ? GROUP BY {group_by} ORDER BY {group_by}"
+        )
+        rows = await self._run(lambda connection: connection.execute(
+            sql, (granularity, start_time, end_time)
+        ).fetchall())
+        return [dict(row) for row in rows]
+
+    # RÉTENTION
+
+    async def purge_forwarding_events(self, before: int, batch_size: int) -> int:
+        """Supprime un lot d'événements de forwarding bruts antérieurs à before
+
+        La date de purge est enregistrée pour que rebuild_forwarding_rollups
+        ne recalcule pas les agrégats de la période purgée.
+        """
+        def purge(connection: sqlite3.Connection) -> int:
+            deleted = connection.execute(
+                "DELETE FROM forwarding_events WHERE (timestamp_ns, chan_id_in, chan_id_out) IN ("
+                "SELECT timestamp_ns, chan_id_in, chan_id_out FROM forwarding_events "
+                "WHERE timestamp_ns < ? LIMIT ?)",
+                (before * 1_000_000_000, batch_size)
+            ).rowcount
+            if deleted:
+                retention = self._get_state(connection, "forwarding_retention") or {}
+                self._set_state(connection, "forwarding_retention", {
+                    "purged_before": max(retention.get("purged_before", before), before)
+                })
+            return deleted
+
+        return await self._run(purge)
+
+    async def purge_forwarding_rollups(self, granularity: str, before: int, batch_size: int) -> int:
+        """Supprime un lot d'agrégats d'une granularité antérieurs à before (timestamp UNIX)"""
+        if granularity not in ROLLUP_GRANULARITIES:
+            raise ValueError(f"Granularité inconnue: {granularity}")
+        return await self._run(lambda connection: connection.execute(
+            "DELETE FROM forwarding_rollups WHERE (granularity, bucket_start, channel_id) IN ("
+            "SELECT granularity, bucket_start, channel_id FROM forwarding_rollups "
+            "WHERE granularity = ? AND bucket_start < ? LIMIT ?)",
+            (granularity, before, batch_size)
+        ).rowcount)
+
+    async def compact_snapshots(self, before: datetime, batch_size: int) -> int:
+        """Retire le détail par canal (channel_metrics) d'un lot de snapshots antérieurs à before"""
+        return await self._run(lambda connection: connection.execute(
+            "UPDATE snapshots SET compacted = 1, document = json_set("
+            "json_remove(document, '$.channel_metrics'), '$.compacted', json('true')) "
+            "WHERE id IN (SELECT id FROM snapshots WHERE ts < ? AND compacted = 0 LIMIT ?)",
+            (_epoch(before), batch_size)
+        ).rowcount)
+
+    async def purge_snapshots(self, before: datetime, batch_size: int) -> int:
+        """Supprime un lot de snapshots antérieurs à before"""
+        return await self._run(lambda connection: connection.execute(
+            "DELETE FROM snapshots WHERE id IN (SELECT id FROM snapshots WHERE ts < ? LIMIT ?)",
+            (_epoch(before), batch_size)
+        ).rowcount)
+
+    async def downsample_channel_balances(self, before: datetime, bucket_seconds: int,
+                                          batch_size: int) -> int:
+        """Sous-échantillonne un lot de points de balance antérieurs à before
+
+        Returns:
+            Nombre de points examinés
+        """
+        def downsample(connection: sqlite3.Connection) -> int:
+            samples = connection.execute(
+                "SELECT id, channel_id, ts FROM channel_balances "
+                "WHERE ts < ? AND (resolution IS NULL OR resolution < ?) ORDER BY ts LIMIT ?",
+                (_epoch(before), bucket_seconds, batch_size)
+            ).fetchall()
+            kept, removed = plan_downsample(
+                [tuple(sample) for sample in samples], bucket_seconds,
+                batch_full=len(samples) == batch_size
+            )
+            connection.executemany(
+                "DELETE FROM channel_balances WHERE id = ?", [(sample_id,) for sample_id in removed]
+            )
+            connection.executemany(
+                "UPDATE channel_balances SET resolution = ? WHERE id = ?",
+                [(bucket_seconds, sample_id) for sample_id in kept]
+            )
+            return len(samples)
+
+        return await self._run(downsample)
+
+    async def purge_channel_balances(self, before: datetime, batch_size: int) -> int:
+        """Supprime un lot de points de balance antérieurs à before"""
+        return await self._run(lambda connection: connection.execute(
+            "DELETE FROM channel_balances WHERE id IN ("
+            "SELECT id FROM channel_balances WHERE ts < ? LIMIT ?)",
+            (_epoch(before), batch_size)
+        ).rowcount)
+
+    # PLANIFICATION
+
+    async def get_job_last_run(self, name: str) -> Optional[datetime]:
+        """Dernière exécution réussie d'une tâche planifiée (UTC), None si jamais exécutée"""
+        state = await self._run(lambda connection: self._get_state(connection, f"scheduler:{name}"))
+        return datetime.fromtimestamp(state["last_run"], tz=timezone.utc) if state else None
+
+    async def set_job_last_run(self, name: str, last_run: datetime) -> None:
+        """Enregistre la dernière exécution réussie d'une tâche planifiée"""
+        await self._run(lambda connection: self._set_state(
+            connection, f"scheduler:{name}", {"last_run": _epoch(last_run)}
+        ))
+
+    # CYCLE DE VIE
+
+    def close(self) -> None:
+        """Ferme la connexion au fichier"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Fichier utilisé et sa taille"""
+        size = None
+        if self.path != ":memory:" and os.path.exists(self.path):
+            size = os.path.getsize(self.path)
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "size_bytes": size,
+            "connected": self._connection is not None
+        }
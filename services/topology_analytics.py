@@ -0,0 +1,285 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from services.graph_store import GraphStore
+
+logger = logging.getLogger(__name__)
+
+
+def _betweenness_from_sources(indptr: np.ndarray, indices: np.ndarray,
+                              sources: List[int]) -> np.ndarray:
+    """Contributions de Brandes (graphe non pondéré) d'un lot de sources
+
+    Les parcours en largeur et l'accumulation des dépendances sont faits
+    niveau par niveau avec des produits matrice creuse / vecteur. Fonction
+    de module : elle est exécutée dans les processus du pool.
+    """
+    n = len(indptr) - 1
+    adjacency = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.float64), indices, indptr), shape=(n, n)
+    )
+    betweenness = np.zeros(n, dtype=np.float64)
+
+    for source in sources:
+        distance = np.full(n, -1, dtype=np.int64)
+        sigma = np.zeros(n, dtype=np.float64)
+        distance[source] = 0
+        sigma[source] = 1.0
+        levels = [np.array([source])]
+
+        # Parcours en largeur : nombre de plus courts chemins par nœud
+        while True:
+            frontier = levels[-1]
+            x = np.zeros(n, dtype=np.float64)
+            x[frontier] = sigma[frontier]
+            paths = adjacency @ x
+            reached = (distance < 0) & (paths > 0)
+            if not reached.any():
+                break
+            distance[reached] = len(levels)
+            sigma[reached] = paths[reached]
+            levels.append(np.flatnonzero(reached))
+
+        # Accumulation des dépendances du niveau le plus profond vers la source
+        delta = np.zeros(n, dtype=np.float64)
+        for depth in range(len(levels) - 1, 0, -1):
+            level = levels[depth]
+            x = np.zeros(n, dtype=np.float64)
+            x[level] = (1.0 + delta[level]) / sigma[level]
+            parents = levels[depth - 1]
+            delta[parents] += sigma[parents] * (adjacency @ x)[parents]
+
+        delta[source] = 0.0
+        betweenness += delta
+
+    return betweenness
+
+
+def sampled_betweenness(adjacency: sparse.csr_matrix, sample_size: int,
+                        seed: int = 42, workers: int = 1) -> np.ndarray:
+    """Centralité d'intermédiarité normalisée estimée sur un échantillon de sources
+
+    Les sources sont tirées avec une graine fixe : le résultat est
+    reproductible. La normalisation suit celle de NetworkX
+    (betweenness_centrality(G, k, normalized=True)).
+
+    Args:
+        adjacency: Matrice d'adjacence symétrique non pondérée
+        sample_size: Nombre de sources échantillonnées
+        seed: Graine du tirage des sources
+        workers: Nombre de processus (1 : calcul dans le processus courant)
+    """
+    n = adjacency.shape[0]
+    if n < 3:
+        return np.zeros(n, dtype=np.float64)
+
+    k = min(sample_size, n)
+    sources = np.random.default_rng(seed).choice(n, size=k, replace=False).tolist()
+    indptr, indices = adjacency.indptr, adjacency.indices
+
+    if workers <= 1:
+        betweenness = _betweenness_from_sources(indptr, indices, sources)
+    else:
+        chunks = [sources[i::workers] for i in range(workers) if sources[i::workers]]
+        # "spawn" : pas de fork d'un processus multi-thread (boucle asyncio, gRPC)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=len(chunks), mp_context=context) as pool:
+            results = pool.map(
+                _betweenness_from_sources,
+                [indptr] * len(chunks), [indices] * len(chunks), chunks
+            )
+            betweenness = np.sum(list(results), axis=0)
+
+    return betweenness * n / (k * (n - 1) * (n - 2))
+
+
+def _bfs_distances(adjacency: sparse.csr_matrix, start: int) -> np.ndarray:
+    """Distances en nombre de sauts depuis un nœud (-1 si inatteignable)"""
+    n = adjacency.shape[0]
+    distance = np.full(n, -1, dtype=np.int64)
+    distance[start] = 0
+    frontier = np.zeros(n, dtype=np.float64)
+    frontier[start] = 1.0
+    depth = 0
+    while True:
+        reached = (distance < 0) & ((adjacency @ frontier) > 0)
+        if not reached.any():
+            return distance
+        depth += 1
+        distance[reached] = depth
+        frontier = reached.astype(np.float64)
+
+
+def double_sweep_diameter(adjacency: sparse.csr_matrix, nodes: np.ndarray,
+                          sweeps: int = 2) -> int:
+    """Estimation (borne inférieure) du diamètre d'une composante connexe
+
+    Un parcours en largeur depuis un nœud de la composante donne le nœud le
+    plus éloigné, depuis lequel un nouveau parcours est lancé ; l'excentricité
+    la plus grande observée est une borne inférieure du diamètre, exacte sur
+    la plupart des graphes réels.
+
+    Args:
+        adjacency: Matrice d'adjacence symétrique non pondérée
+        nodes: Nœuds de la composante connexe
+        sweeps: Nombre de parcours
+    """
+    if len(nodes) < 2:
+        return 0
+    # Départ déterministe : le nœud de plus haut degré de la composante
+    degrees = np.diff(adjacency.indptr)[nodes]
+    start = int(nodes[np.argmax(degrees)])
+    diameter = 0
+    for _ in range(sweeps):
+        distances = _bfs_distances(adjacency, start)
+        farthest = int(np.argmax(distances))
+        diameter = max(diameter, int(distances[farthest]))
+        start = farthest
+    return diameter
+
+
+def compute_topology(store: GraphStore, sample_size: int = 256, seed: int = 42,
+                     workers: int = 1, top: int = 20) -> Dict[str, Any]:
+    """Analyse complète de la topologie d'un GraphStore
+
+    Returns:
+        Statistiques au format de LNRouterClient.analyze_network_topology
+    """
+    started = time.perf_counter()
+    adjacency = store.adjacency()
+    num_nodes = store.num_nodes
+    num_pairs = adjacency.nnz // 2
+
+    # Composantes connexes
+    _, labels = connected_components(adjacency, directed=False)
+    if num_nodes > 0:
+        largest_label = np.bincount(labels).argmax()
+        largest_component = np.flatnonzero(labels == largest_label)
+    else:
+        largest_component = np.zeros(0, dtype=np.int64)
+
+    diameter = double_sweep_diameter(adjacency, largest_component)
+
+    betweenness = sampled_betweenness(adjacency, sample_size, seed=seed, workers=workers)
+    top_nodes = np.argsort(-betweenness, kind="stable")[:top]
+
+    return {
+        "num_nodes": num_nodes,
+        "num_channels": store.num_channels,
+        "avg_degree": adjacency.nnz / num_nodes if num_nodes > 0 else 0,
+        "network_diameter": diameter,
+        "largest_component_size": len(largest_component),
+        "largest_component_ratio": len(largest_component) / num_nodes if num_nodes > 0 else 0,
+        "density": 2 * num_pairs / (num_nodes * (num_nodes - 1)) if num_nodes > 1 else 0,
+        "top_betweenness_nodes": [
+            {"pubkey": store.pubkeys[i], "centrality": float(betweenness[i])}
+            for i in top_nodes.tolist()
+        ],
+        "betweenness_sample_size": min(sample_size, num_nodes),
+        "seed": seed,
+        "computation_time": round(time.perf_counter() - started, 3),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+class TopologyAnalytics:
+    """Calcul en tâche de fond de l'analyse de topologie, mis en cache par version du graphe
+
+    L'analyse n'est jamais recalculée pendant une requête : l'API renvoie le
+    dernier résultat terminé et un nouveau calcul est lancé en arrière-plan
+    quand la version du graphe a changé (au plus une fois par intervalle).
+    """
+
+    def __init__(self, sample_size: int = 256, seed: int = 42, workers: int = 0,
+                 refresh_interval: float = 600):
+        """Initialise le calcul de topologie
+
+        Args:
+            sample_size: Nombre de sources échantillonnées pour la centralité
+            seed: Graine du tirage des sources
+            workers: Nombre de processus (0 : tous les cœurs)
+            refresh_interval: Délai minimal entre deux calculs (secondes)
+        """
+        self.sample_size = sample_size
+        self.seed = seed
+        self.workers = workers or os.cpu_count() or 1
+        self.refresh_interval = timedelta(seconds=refresh_interval)
+
+        self.latest: Optional[Dict[str, Any]] = None
+        self.version: Any = None
+        self.computed_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def is_stale(self, store: GraphStore) -> bool:
+        """Indique si un nouveau calcul doit être lancé pour ce store"""
+        if self.latest is None:
+            return True
+        if store.version == self.version:
+            return False
+        return datetime.now() - self.computed_at >= self.refresh_interval
+
+    def schedule(self, store: GraphStore) -> Optional[asyncio.Task]:
+        """Lance un calcul en tâche de fond si nécessaire et qu'aucun n'est en cours"""
+        if self._task is not None and not self._task.done():
+            return self._task
+        if not self.is_stale(store):
+            return None
+        self._task = asyncio.create_task(self._run(store), name="topology-analytics")
+        return self._task
+
+    async def _run(self, store: GraphStore) -> Dict[str, Any]:
+        version = store.version
+        try:
+            result = await asyncio.to_thread(
+                compute_topology, store, self.sample_size, self.seed, self.workers
+            )
+        except Exception as e:
+            logger.error(f"Erreur lors de l'analyse de la topologie: {e}")
+            raise
+
+        result["graph_version"] = str(version)
+        self.latest = result
+        self.version = version
+        self.computed_at = datetime.now()
+        logger.info(
+            f"Analyse de topologie terminée en {result['computation_time']}s "
+            f"(version {version})"
+        )
+        return result
+
+    async def get(self, store: GraphStore) -> Dict[str, Any]:
+        """Dernier résultat disponible ; n'attend le calcul que s'il n'y en a aucun"""
+        task = self.schedule(store)
+        if self.latest is None and task is not None:
+            return await asyncio.shield(task)
+        return self.latest
+
+    async def stop(self) -> None:
+        """Annule le calcul en cours"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """État du calcul de topologie"""
+        return {
+            "version": str(self.version) if self.version is not None else None,
+            "computed_at": self.computed_at.isoformat() if self.computed_at else None,
+            "running": self._task is not None and not self._task.done(),
+            "sample_size": self.sample_size,
+            "workers": self.workers
+        }
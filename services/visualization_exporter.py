@@ -13,9 +13,12 @@ from core.config import settings
 from services.metrics_collector import MetricsCollector
 from services.node_aggregator import NodeAggregator, EnrichedNode, EnrichedChannel
 from services.data_source_factory import DataSourceFactory
+from services.async_lnd_client import call_lnd
+from services.forwarding_analytics import ForwardingAnalytics
 
 logger = logging.getLogger(__name__)
 
+
 class VisualizationExporter:
     """Exportateur de datasets pour visualisations et dashboards"""
     
@@ -45,13 +48,28 @@ class VisualizationExporter:
         
         self.data_source = DataSourceFactory.get_data_source()
     
+    async def _get_forwarding_rollups(self, granularity: str, start_time: int, end_time: int,
+                                      group_by: str) -> Optional[List[Dict[str, Any]]]:
+        """Agrégats de forwarding pré-calculés de la période
+        
+        Les nouveaux événements sont d'abord ingérés (incrémentalement).
+        
+        Returns:
+            Lignes d'agrégat, ou None si aucun stockage n'est configuré
+        """
+        storage = self.metrics_collector.storage if self.metrics_collector else None
+        if storage is None:
+            return None
+        await self.metrics_collector.ingest_forwarding_events()
+        return await storage.get_forwarding_rollups(granularity, start_time, end_time, group_by)
+    
     # MÉTHODES DE GÉNÉRATION DE DATASETS
     
     async def generate_network_graph_dataset(self) -> Dict[str, Any]:
         """Génère les données pour un graphe du réseau local"""
         try:
             # Récupérer les informations du nœud local
-            node_info = self.node_aggregator.lnd_client.get_node_info()
+            node_info = await call_lnd(self.node_aggregator.lnd_client.get_node_info)
             pubkey = node_info.get("pubkey")
             
             # Récupérer tous les canaux du nœud local
@@ -77,10 +95,11 @@ class VisualizationExporter:
                 "group": "local"
             })
             
-            # Récupérer les données de chaque pair et ajouter aux graphes
+            # Enrichir tous les pairs en parallèle puis les ajouter aux graphes
+            peer_nodes = await self.node_aggregator.get_enriched_nodes(list(peers))
             for peer_pubkey in peers:
                 try:
-                    peer_data = await self.node_aggregator.get_enriched_node(peer_pubkey)
+                    peer_data = peer_nodes.get(peer_pubkey)
                     
                     if peer_data:
                         # Ajouter le nœud
@@ -141,42 +160,34 @@ class VisualizationExporter:
             # Récupérer les métriques des canaux
             channels = await self.metrics_collector.collect_channel_metrics()
             
-            # Si disponible, récupérer l'historique des métriques
-            historical_metrics = []
+            # Si disponible, récupérer l'historique des balances (une requête pour tous les canaux)
+            balance_history = {}
             try:
-                # Récupérer les tendances historiques
-                historical_metrics = await self.metrics_collector.generate_historical_trends("channel_balance", days=days)
+                balance_history = await self.metrics_collector.get_channel_balance_history(
+                    [channel.get("channel_id") for channel in channels], days=days
+                )
             except Exception as e:
                 logger.error(f"Erreur lors de la récupération des tendances historiques: {e}")
             
+            # Enrichir tous les pairs en parallèle
+            peers = await self.node_aggregator.get_enriched_nodes(
+                [channel.get("remote_pubkey") for channel in channels]
+            )
+            
             # Agréger les données par canal
             channel_performance = []
             
             for channel in channels:
                 channel_id = channel.get("channel_id")
-                
-                # Chercher ce canal dans l'historique
-                historical_data = []
-                for entry in historical_metrics:
-                    for ch in entry.get("channels", []):
-                        if ch.get("channel_id") == channel_id:
-                            historical_data.append({
-                                "timestamp": entry.get("timestamp"),
-                                "local_balance": ch.get("local_balance", 0),
-                                "remote_balance": ch.get("remote_balance", 0),
-                                "local_ratio": ch.get("local_ratio", 0)
-                            })
+                historical_data = balance_history.get(channel_id, [])
                 
                 # Inclure les détails du pair
                 peer_alias = "Inconnu"
                 peer_pubkey = channel.get("remote_pubkey")
                 
-                try:
-                    peer = await self.node_aggregator.get_enriched_node(peer_pubkey)
-                    if peer:
-                        peer_alias = peer.get("alias", "Inconnu")
-                except Exception:
-                    pass
+                peer = peers.get(peer_pubkey)
+                if peer:
+                    peer_alias = peer.get("alias", "Inconnu")
                 
                 channel_performance.append({
                     "channel_id": channel_id,
@@ -233,47 +244,41 @@ class VisualizationExporter:
                 start_time = now - timedelta(days=365)
                 interval_seconds = 604800  # 1 semaine
             
-            # Récupérer l'historique de forwarding
-            forwarding_history = self.node_aggregator.lnd_client.get_forwarding_history(
-                start_time=int(start_time.timestamp()),
-                end_time=int(now.timestamp()),
-                limit=10000
-            )
-            
-            # Organiser les données pour la heatmap
-            events = forwarding_history.get("forwarding_events", [])
-            
-            # Grouper par intervalle de temps
             time_buckets = {}
+            rollups = await self._get_forwarding_rollups(
+                time_resolution, int(start_time.timestamp()), int(now.timestamp()), "bucket_start"
+            )
             
-            for event in events:
-                timestamp = event.get("timestamp", 0)
-                if not timestamp:
-                    continue
-                    
-                # Calculer l'intervalle de temps
-                bucket_timestamp = timestamp - (timestamp % interval_seconds)
-                bucket_key = str(bucket_timestamp)
-                
-                # Initialiser le bucket si nécessaire
-                if bucket_key not in time_buckets:
-                    time_buckets[bucket_key] = {
-                        "timestamp": bucket_key,
-                        "count": 0,
-                        "total_amount": 0,
-                        "total_fees": 0
+            if rollups is not None:
+                # Agrégats pré-calculés : chaque forward compte une fois côté sortant
+                for row in rollups:
+                    time_buckets[row["bucket_start"]] = {
+                        "count": row["forwards_out"],
+                        "total_amount": row["amount_out"],
+                        "total_fees": row["fees_out"]
                     }
-                
-                # Mettre à jour les statistiques
-                time_buckets[bucket_key]["count"] += 1
-                time_buckets[bucket_key]["total_amount"] += event.get("amt_out", 0)
-                time_buckets[bucket_key]["total_fees"] += event.get("fee", 0)
-            
-            # Convertir en liste pour la sortie
-            heatmap_data = list(time_buckets.values())
-            
-            # Trier par timestamp
-            heatmap_data.sort(key=lambda x: int(x["timestamp"]))
+            else:
+                # Parcourir tout l'historique de forwarding par lots colonnaires
+                # et grouper par intervalle de temps
+                analytics = await ForwardingAnalytics.from_batches(
+                    self.node_aggregator.lnd_client.iter_forwarding_batches(
+                        start_time=int(start_time.timestamp()),
+                        end_time=int(now.timestamp())
+                    ),
+                    bucket_seconds=interval_seconds
+                )
+                time_buckets = analytics.time_buckets()
+            
+            # Convertir en liste triée par timestamp pour la sortie
+            heatmap_data = [
+                {
+                    "timestamp": str(bucket_timestamp),
+                    "count": bucket["count"],
+                    "total_amount": bucket["total_amount"],
+                    "total_fees": bucket["total_fees"]
+                }
+                for bucket_timestamp, bucket in sorted(time_buckets.items())
+            ]
             
             return {
                 "timestamp": datetime.now().isoformat(),
@@ -298,7 +303,7 @@ class VisualizationExporter:
                 channels = await self.metrics_collector.collect_channel_metrics()
             else:
                 # Si metrics_collector n'est pas disponible, récupérer les canaux depuis le client LND
-                channels_raw = self.node_aggregator.lnd_client.list_channels()
+                channels_raw = await call_lnd(self.node_aggregator.lnd_client.list_channels)
                 channels = []
                 
                 for c in channels_raw:
@@ -327,26 +332,37 @@ class VisualizationExporter:
             end_time = int(datetime.now().timestamp())
             start_time = end_time - 30 * 24 * 3600  # 30 jours
             
-            forwards = self.node_aggregator.lnd_client.get_forwarding_history(
-                start_time=start_time,
-                end_time=end_time,
-                limit=10000
-            )
-            
-            # Compter les forwards par canal
             channel_forwards = {}
-            for event in forwards.get("forwarding_events", []):
-                chan_id_in = str(event.get("chan_id_in"))
-                chan_id_out = str(event.get("chan_id_out"))
-                
-                if chan_id_in not in channel_forwards:
-                    channel_forwards[chan_id_in] = {"in": 0, "out": 0, "fees": 0}
-                if chan_id_out not in channel_forwards:
-                    channel_forwards[chan_id_out] = {"in": 0, "out": 0, "fees": 0}
-                
-                channel_forwards[chan_id_in]["in"] += 1
-                channel_forwards[chan_id_in]["fees"] += event.get("fee", 0)
-                channel_forwards[chan_id_out]["out"] += 1
+            rollups = await self._get_forwarding_rollups("day", start_time, end_time, "channel_id")
+            
+            if rollups is not None:
+                for row in rollups:
+                    channel_forwards[row["channel_id"]] = {
+                        "in": row["forwards_in"],
+                        "out": row["forwards_out"],
+                        "fees": row["fees_in"]
+                    }
+            else:
+                # Compter les forwards par canal sur tout l'historique de la période
+                analytics = await ForwardingAnalytics.from_batches(
+                    self.node_aggregator.lnd_client.iter_forwarding_batches(
+                        start_time=start_time,
+                        end_time=end_time
+                    )
+                )
+                for chan_id, stats in analytics.channels_in().items():
+                    channel_forwards.setdefault(
+                        chan_id, {"in": 0, "out": 0, "fees": 0}
+                    ).update({"in": stats["count"], "fees": stats["fees"]})
+                for chan_id, stats in analytics.channels_out().items():
+                    channel_forwards.setdefault(
+                        chan_id, {"in": 0, "out": 0, "fees": 0}
+                    )["out"] = stats["count"]
+            
+            # Enrichir tous les pairs en parallèle
+            peers = await self.node_aggregator.get_enriched_nodes(
+                [channel.get("remote_pubkey") for channel in channels]
+            )
             
             # Générer des suggestions d'optimisation
             suggestions = []
@@ -357,12 +373,9 @@ class VisualizationExporter:
                 
                 # Récupérer les détails du pair
                 peer_alias = "Inconnu"
-                try:
-                    peer = await self.node_aggregator.get_enriched_node(remote_pubkey)
-                    if peer:
-                        peer_alias = peer.get("alias", "Inconnu")
-                except Exception:
-                    pass
+                peer = peers.get(remote_pubkey)
+                if peer:
+                    peer_alias = peer.get("alias", "Inconnu")
                 
                 # Analyser le canal pour des suggestions
                 current_fee = channel.get("fee_per_kw", 0)
@@ -506,39 +519,41 @@ class VisualizationExporter:
             start_time_unix = int(start_time.timestamp())
             end_time_unix = int(now.timestamp())
             
-            forwarding_history = self.node_aggregator.lnd_client.get_forwarding_history(
-                start_time=start_time_unix,
-                end_time=end_time_unix,
-                limit=10000
-            )
-            
-            events = forwarding_history.get("forwarding_events", [])
+            # Agréger les statistiques de routage sur tout l'historique de la période
+            total_forwards = 0
+            total_amount = 0
+            total_fees = 0
+            channel_stats = {}
             
-            # Agréger les statistiques de routage
-            total_forwards = len(events)
-            total_amount = sum(event.get("amt_out", 0) for event in events)
-            total_fees = sum(event.get("fee", 0) for event in events)
+            # Rapport quotidien : agrégats horaires, sinon journaliers
+            granularity = "hour" if report_type == "daily" else "day"
+            rollups = await self._get_forwarding_rollups(
+                granularity, start_time_unix, end_time_unix, "channel_id"
+            )
             
-            # Identifier les canaux les plus actifs
-            channel_stats = {}
-            for event in events:
-                chan_id_in = str(event.get("chan_id_in"))
-                chan_id_out = str(event.get("chan_id_out"))
-                
-                for chan_id in [chan_id_in, chan_id_out]:
-                    if chan_id not in channel_stats:
-                        channel_stats[chan_id] = {
-                            "count": 0,
-                            "amount": 0,
-                            "fees": 0
-                        }
-                
-                channel_stats[chan_id_in]["count"] += 1
-                channel_stats[chan_id_in]["amount"] += event.get("amt_in", 0)
-                channel_stats[chan_id_in]["fees"] += event.get("fee", 0)
-                
-                channel_stats[chan_id_out]["count"] += 1
-                channel_stats[chan_id_out]["amount"] += event.get("amt_out", 0)
+            if rollups is not None:
+                for row in rollups:
+                    # Chaque forward est compté une fois, côté sortant
+                    total_forwards += row["forwards_out"]
+                    total_amount += row["amount_out"]
+                    total_fees += row["fees_out"]
+                    channel_stats[row["channel_id"]] = {
+                        "count": row["forwards_in"] + row["forwards_out"],
+                        "amount": row["amount_in"] + row["amount_out"],
+                        "fees": row["fees_in"]
+                    }
+            else:
+                analytics = await ForwardingAnalytics.from_batches(
+                    self.node_aggregator.lnd_client.iter_forwarding_batches(
+                        start_time=start_time_unix,
+                        end_time=end_time_unix
+                    )
+                )
+                total_forwards = analytics.total_forwards
+                total_amount = analytics.total_amount_out
+                total_fees = analytics.total_fees
+                # Identifier les canaux les plus actifs
+                channel_stats = analytics.channel_totals()
             
             # Trier les canaux par nombre de forwards
             top_channels = []
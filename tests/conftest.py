@@ -25,4 +25,11 @@ def mock_env_vars(monkeypatch):
     monkeypatch.setenv('LND_CERT_PATH', '/fake/path/tls.cert')
     monkeypatch.setenv('LND_MACAROON_PATH', '/fake/path/admin.macaroon')
     monkeypatch.setenv('DATABASE_URL', 'sqlite:///:memory:')
-    monkeypatch.setenv('ENVIRONMENT', 'test') 
\ No newline at end of file
+    monkeypatch.setenv('ENVIRONMENT', 'test')
+
+
+@pytest.fixture(autouse=True)
+def no_local_metrics_storage(monkeypatch):
+    """Les tests n'écrivent pas dans le fichier SQLite local des métriques"""
+    from core.config import settings
+    monkeypatch.setattr(settings, "METRICS_LOCAL_DB_PATH", "")
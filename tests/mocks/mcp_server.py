@@ -0,0 +1,95 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class MCPHandler(BaseHTTPRequestHandler):
+    """API MCP minimale : nœuds, canaux et listes paginées"""
+    protocol_version = "HTTP/1.1"
+    # En-têtes et corps dans un même segment TCP (pas d'attente d'ACK retardé)
+    wbufsize = 65536
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.latency)
+            status, body = self.route()
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def route(self):
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        query = {key: int(values[0]) for key, values in parse_qs(url.query).items()}
+        nodes, channels = self.server.nodes, self.server.channels
+
+        if parts == ["network", "nodes"]:
+            return 200, list(nodes.values())[query["offset"]:query["offset"] + query["limit"]]
+        if parts == ["channels", "list"]:
+            return 200, list(channels.values())[query["offset"]:query["offset"] + query["limit"]]
+        if parts[:2] == ["network", "nodes"] and parts[2] in nodes:
+            if len(parts) == 3:
+                return 200, nodes[parts[2]]
+            if parts[3:] == ["channels"]:
+                return 200, [c for c in channels.values() if parts[2] in (c["node1_pub"], c["node2_pub"])]
+        if parts[0] == "channels" and len(parts) == 2 and parts[1] in channels:
+            return 200, channels[parts[1]]
+        return 404, {"error": "not found"}
+
+    def log_message(self, *args):
+        pass
+
+
+class MockMCPServer:
+    """Serveur MCP local (thread) pour tester MCPService de bout en bout"""
+
+    def __init__(self, num_nodes: int = 30, latency: float = 0.0):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), MCPHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.lock = threading.Lock()
+        self.httpd.requests = []
+        self.httpd.in_flight = 0
+        self.httpd.max_in_flight = 0
+        self.httpd.latency = latency
+        self.httpd.nodes = {
+            f"node{i}": {"pub_key": f"node{i}", "alias": f"alias{i}"} for i in range(num_nodes)
+        }
+        self.httpd.channels = {
+            str(i): {"channel_id": str(i), "node1_pub": f"node{i}",
+                     "node2_pub": f"node{(i + 1) % num_nodes}", "capacity": 1000000}
+            for i in range(num_nodes)
+        }
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    @property
+    def requests(self):
+        return self.httpd.requests
+
+    @property
+    def max_in_flight(self) -> int:
+        return self.httpd.max_in_flight
+
+    def start(self) -> "MockMCPServer":
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,196 @@
+"""Mock en mémoire de l'API asynchrone de motor utilisée par MongoMetricsStorage"""
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+
+def _compare(value, operator, operand):
+    if operator == "$exists":
+        return (value is not None) == operand
+    if operator == "$in":
+        return value in operand
+    if operator == "$not":
+        return not all(_compare(value, op, arg) for op, arg in operand.items())
+    if value is None:
+        return False
+    if operator == "$lt":
+        return value < operand
+    if operator == "$lte":
+        return value <= operand
+    if operator == "$gt":
+        return value > operand
+    if operator == "$gte":
+        return value >= operand
+    raise NotImplementedError(operator)
+
+
+def matches(document, query):
+    """Filtre MongoDB simplifié : égalité et opérateurs de comparaison"""
+    for field, condition in query.items():
+        value = document.get(field)
+        if isinstance(condition, dict) and all(key.startswith("$") for key in condition):
+            if not all(_compare(value, op, operand) for op, operand in condition.items()):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class MongoCursorMock:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            self.documents = sorted(
+                self.documents, key=lambda document: document[field], reverse=direction < 0
+            )
+        return self
+
+    def limit(self, length):
+        self.documents = self.documents[:length]
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+    async def to_list(self, length=None):
+        return self.documents[:length] if length else list(self.documents)
+
+
+class MongoCollectionMock:
+    """Collection en mémoire ; la clé des documents est _id ou la clé des événements"""
+
+    def __init__(self, name):
+        self.name = name
+        self.documents = {}
+        self.indexes = {}
+        self.bulk_calls = []
+        self.aggregate_result = []
+
+    @staticmethod
+    def _key(document):
+        if "_id" in document:
+            return document["_id"]
+        if "timestamp_ns" in document:
+            return (document["timestamp_ns"], document["chan_id_in"], document["chan_id_out"])
+        return id(document)
+
+    async def index_information(self):
+        return dict(self.indexes)
+
+    async def create_index(self, keys, unique=False, name=None, **kwargs):
+        name = name or "_".join(f"{field}_{direction}" for field, direction in keys)
+        if unique:
+            # Comme MongoDB, un champ absent compte comme null dans la clé
+            seen = set()
+            for document in self.documents.values():
+                value = tuple(document.get(field) for field, _ in keys)
+                if value in seen:
+                    raise DuplicateKeyError(f"E11000 duplicate key error index: {name} dup key: {value}")
+                seen.add(value)
+        self.indexes[name] = {"key": keys, "unique": unique, **kwargs}
+        return name
+
+    async def drop_index(self, name):
+        del self.indexes[name]
+
+    async def find_one(self, query):
+        if list(query) == ["_id"]:
+            return self.documents.get(query["_id"])
+        return next(iter(self.find(query).documents), None)
+
+    async def update_one(self, query, update, upsert=False):
+        document = self.documents.setdefault(query["_id"], {"_id": query["_id"]})
+        document.update(update.get("$set", {}))
+        for field, value in update.get("$max", {}).items():
+            document[field] = max(document.get(field, value), value)
+
+    @staticmethod
+    def _view(key, document):
+        # Les documents sans _id (événements, agrégats) sont identifiés par leur clé
+        return document if "_id" in document else {"_id": key, **document}
+
+    def find(self, query, projection=None):
+        return MongoCursorMock([
+            self._view(key, document) for key, document in self.documents.items()
+            if matches(self._view(key, document), query)
+        ])
+
+    async def delete_many(self, query):
+        keys = [
+            key for key, document in self.documents.items()
+            if matches(self._view(key, document), query)
+        ]
+        for key in keys:
+            del self.documents[key]
+        return type("Result", (), {"deleted_count": len(keys)})()
+
+    async def update_many(self, query, update):
+        self.last_update_many = (query, update)
+        if isinstance(update, list):
+            # Mise à jour par pipeline : non simulée
+            return type("Result", (), {"modified_count": 0})()
+        modified = 0
+        for key, document in self.documents.items():
+            if matches(self._view(key, document), query):
+                document.update(update.get("$set", {}))
+                for field in update.get("$unset", {}):
+                    document.pop(field, None)
+                modified += 1
+        return type("Result", (), {"modified_count": modified})()
+
+    async def insert_many(self, documents, ordered=True):
+        ids = []
+        for document in documents:
+            ids.append((await self.insert_one(document)).inserted_id)
+        return type("Result", (), {"inserted_ids": ids})()
+
+    async def insert_one(self, document):
+        document.setdefault("_id", f"{self.name}-{len(self.documents) + 1}")
+        self.documents[document["_id"]] = document
+        return type("Result", (), {"inserted_id": document["_id"]})()
+
+    async def bulk_write(self, requests, ordered=True):
+        self.bulk_calls.append((len(requests), ordered))
+        inserted, errors = 0, []
+        for index, request in enumerate(requests):
+            if isinstance(request, UpdateOne):
+                if "_id" in request._filter:
+                    document = self.documents[request._filter["_id"]]
+                else:
+                    key = tuple(request._filter.values())
+                    document = self.documents.setdefault(key, dict(request._filter))
+                document.update(request._doc.get("$set", {}))
+                for field, value in request._doc.get("$inc", {}).items():
+                    document[field] = document.get(field, 0) + value
+                continue
+            document = request._doc
+            key = self._key(document)
+            if key in self.documents:
+                errors.append({"index": index, "code": 11000})
+            else:
+                self.documents[key] = document
+                inserted += 1
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": inserted})
+        return type("Result", (), {"inserted_count": inserted})()
+
+    def aggregate(self, pipeline):
+        self.last_pipeline = pipeline
+        return MongoCursorMock(self.aggregate_result)
+
+
+class MongoDatabaseMock:
+    name = "fake"
+
+    def __init__(self):
+        self.collections = {}
+
+    def __getitem__(self, name):
+        if name not in self.collections:
+            self.collections[name] = MongoCollectionMock(name)
+        return self.collections[name]
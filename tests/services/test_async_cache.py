@@ -0,0 +1,143 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+import services.async_cache as async_cache
+from services.async_cache import AsyncTTLCache, add_access_listener, remove_access_listener
+from services.lnrouter_client import LNRouterClient
+
+
+class Clock:
+    """Horloge monotone contrôlée par le test"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Horloge du module seulement : celle de la boucle d'événements reste réelle
+    monkeypatch.setattr(async_cache, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def counting_call(result="value", delay=0):
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return result
+
+    return call, calls
+
+
+class TestAsyncTTLCache:
+    """Tests du cache des réponses des API"""
+
+    @pytest.mark.asyncio
+    async def test_hit_after_miss(self):
+        cache = AsyncTTLCache("test", maxsize=10, ttl=60)
+        call, calls = counting_call()
+
+        assert await cache.get_or_call("key", call) == "value"
+        assert await cache.get_or_call("key", call) == "value"
+
+        assert len(calls) == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_entries_expire(self, clock):
+        cache = AsyncTTLCache("test", maxsize=10, ttl=60)
+        call, calls = counting_call()
+
+        await cache.get_or_call("key", call)
+        clock.now += 59
+        await cache.get_or_call("key", call)
+        clock.now += 1
+        await cache.get_or_call("key", call)
+
+        assert len(calls) == 2
+        assert cache.expirations == 1
+
+    def test_least_recently_used_is_evicted(self):
+        cache = AsyncTTLCache("test", maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert (cache.get("a"), cache.get("c")) == (1, 3)
+        assert cache.evictions == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_are_coalesced(self):
+        cache = AsyncTTLCache("test", maxsize=10, ttl=60)
+        call, calls = counting_call(delay=0.01)
+
+        results = await asyncio.gather(*(cache.get_or_call("key", call) for _ in range(10)))
+
+        assert results == ["value"] * 10
+        assert len(calls) == 1
+        assert (cache.misses, cache.coalesced) == (1, 9)
+
+    @pytest.mark.asyncio
+    async def test_exceptions_are_not_cached(self):
+        cache = AsyncTTLCache("test", maxsize=10, ttl=60)
+        failing = AsyncMock(side_effect=RuntimeError("API indisponible"))
+
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await cache.get_or_call("key", failing)
+
+        assert failing.await_count == 2
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_call(self):
+        cache = AsyncTTLCache("test", maxsize=10, ttl=60)
+        call, calls = counting_call(delay=0.05)
+
+        first = asyncio.ensure_future(cache.get_or_call("key", call))
+        second = asyncio.ensure_future(cache.get_or_call("key", call))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert await second == "value"
+        assert first.cancelled()
+        assert cache.get("key") == "value"
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_access_listener(self):
+        accesses = []
+        listener = lambda name, hit: accesses.append((name, hit))
+        add_access_listener(listener)
+        try:
+            cache = AsyncTTLCache("lnrouter_nodes", maxsize=10, ttl=60)
+            call, _ = counting_call()
+            await cache.get_or_call("key", call)
+            await cache.get_or_call("key", call)
+        finally:
+            remove_access_listener(listener)
+
+        assert accesses == [("lnrouter_nodes", False), ("lnrouter_nodes", True)]
+
+    @pytest.mark.asyncio
+    async def test_lnrouter_key_nodes_called_twice(self):
+        """Avec lru_cache, le second appel réattendait une coroutine déjà consommée"""
+        client = LNRouterClient()
+        client._make_request = AsyncMock(return_value=[{"pubkey": "02abc"}])
+
+        assert await client.get_key_nodes(limit=10) == [{"pubkey": "02abc"}]
+        assert await client.get_key_nodes(limit=10) == [{"pubkey": "02abc"}]
+        assert await client.get_key_nodes(limit=20) == [{"pubkey": "02abc"}]
+
+        assert client._make_request.await_count == 2
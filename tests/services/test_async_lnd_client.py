@@ -0,0 +1,295 @@
+import os
+
+import grpc
+import pytest
+from unittest.mock import AsyncMock, MagicMock, Mock
+
+from services.async_lnd_client import AsyncLNDClient, call_lnd
+from services.lnd_client import LNDClient
+
+
+class TestAsyncLNDClient:
+    """Tests unitaires pour le client LND asynchrone"""
+
+    @pytest.fixture
+    def mock_stub(self):
+        """Crée un stub grpc.aio simulé"""
+        stub = MagicMock()
+        stub.GetInfo = AsyncMock()
+        stub.ListChannels = AsyncMock()
+        stub.ForwardingHistory = AsyncMock()
+        stub.UpdateChannelPolicy = AsyncMock()
+        return stub
+
+    @pytest.fixture
+    def client(self, mock_stub):
+        """Crée un client avec des certificats factices et le stub simulé"""
+        client = AsyncLNDClient(
+            cert_path="fake_cert.pem",
+            macaroon_path="fake_macaroon",
+            grpc_host="127.0.0.1:10009"
+        )
+        client._stub = mock_stub
+        client._router_stub = mock_stub
+        return client
+
+    @pytest.mark.asyncio
+    async def test_get_node_info(self, client, mock_stub):
+        """Vérifie que GetInfo est attendu et formaté comme LNDClient"""
+        mock_info = Mock()
+        mock_info.identity_pubkey = "02778f4a4eb3a2344b9fd8ee72e7ec5f03f803e5f5273e2e1a2af508"
+        mock_info.alias = "Feustey"
+        mock_info.block_height = 820305
+        mock_info.chains = ["bitcoin"]
+        mock_info.features = {}
+        mock_info.best_header_timestamp = 1700000000
+        mock_stub.GetInfo.return_value = mock_info
+
+        result = await client.get_node_info()
+
+        mock_stub.GetInfo.assert_awaited_once()
+        assert result["pubkey"] == mock_info.identity_pubkey
+        assert result["alias"] == "Feustey"
+        assert result["block_height"] == 820305
+        assert result["chains"] == ["bitcoin"]
+
+    @pytest.mark.asyncio
+    async def test_list_channels_active_only(self, client, mock_stub):
+        """Vérifie le filtrage des canaux actifs"""
+        active = Mock(channel_id=1, active=True, pending_htlcs=[])
+        inactive = Mock(channel_id=2, active=False, pending_htlcs=[])
+        mock_stub.ListChannels.return_value = Mock(channels=[active, inactive])
+
+        result = await client.list_channels(active_only=True)
+
+        assert len(result) == 1
+        assert result[0]["channel_id"] == "1"
+
+    @pytest.mark.asyncio
+    async def test_get_forwarding_history(self, client, mock_stub):
+        """Vérifie le formatage de l'historique de forwarding"""
+        event = Mock(
+            timestamp=1700000000, chan_id_in=123, chan_id_out=456,
+            amt_in=1001, amt_out=1000, fee=1, fee_msat=1000,
+            amt_in_msat=1001000, amt_out_msat=1000000
+        )
+        mock_stub.ForwardingHistory.return_value = Mock(
+            forwarding_events=[event], last_offset_index=1
+        )
+
+        result = await client.get_forwarding_history(
+            start_time=1690000000, end_time=1700000000, limit=10
+        )
+
+        assert result["total_count"] == 1
+        assert result["last_offset_index"] == 1
+        assert result["forwarding_events"][0]["chan_id_in"] == "123"
+        assert result["forwarding_events"][0]["fee"] == 1
+
+    @pytest.mark.asyncio
+    async def test_close(self, client):
+        """Vérifie que close libère le client sans fermer le canal partagé"""
+        channel = MagicMock()
+        channel.close = AsyncMock()
+        client._channel = channel
+
+        await client.close()
+
+        channel.close.assert_not_awaited()
+        assert client._stub is None
+        assert client._channel is None
+
+    @pytest.mark.asyncio
+    async def test_call_lnd_sync_and_async(self):
+        """Vérifie que call_lnd accepte les méthodes bloquantes et les coroutines"""
+        sync_method = Mock(return_value={"alias": "sync"})
+        async_method = AsyncMock(return_value={"alias": "async"})
+
+        assert await call_lnd(sync_method, limit=5) == {"alias": "sync"}
+        assert await call_lnd(async_method) == {"alias": "async"}
+        sync_method.assert_called_once_with(limit=5)
+        async_method.assert_awaited_once()
+
+
+class TestForwardingHistoryPagination:
+    """Tests du parcours paginé de ForwardingHistory"""
+
+    @pytest.fixture
+    def pages(self):
+        """Deux pages pleines suivies d'une page incomplète"""
+        from proto import lightning_pb2 as ln
+
+        def event(i):
+            return ln.ForwardingEvent(
+                timestamp=1700000000 + i, chan_id_in=100 + i % 2,
+                chan_id_out=200, amt_in=1001, amt_out=1000, fee=1
+            )
+
+        return [
+            ln.ForwardingHistoryResponse(
+                forwarding_events=[event(0), event(1)], last_offset_index=2
+            ),
+            ln.ForwardingHistoryResponse(
+                forwarding_events=[event(2), event(3)], last_offset_index=4
+            ),
+            ln.ForwardingHistoryResponse(
+                forwarding_events=[event(4)], last_offset_index=5
+            ),
+        ]
+
+    @pytest.fixture
+    def client(self, pages):
+        client = AsyncLNDClient(
+            cert_path="fake_cert.pem",
+            macaroon_path="fake_macaroon",
+            grpc_host="127.0.0.1:10009"
+        )
+        client._stub = MagicMock()
+        client._stub.ForwardingHistory = AsyncMock(side_effect=pages)
+        return client
+
+    @pytest.mark.asyncio
+    async def test_iter_forwarding_history_walks_all_pages(self, client):
+        """Vérifie que tous les événements sont produits en suivant last_offset_index"""
+        events = [
+            event async for event in client.iter_forwarding_history(
+                start_time=1690000000, end_time=1710000000, page_size=2
+            )
+        ]
+
+        assert len(events) == 5
+        offsets = [
+            call.args[0].index_offset
+            for call in client._stub.ForwardingHistory.await_args_list
+        ]
+        assert offsets == [0, 2, 4]
+        request = client._stub.ForwardingHistory.await_args_list[0].args[0]
+        assert request.num_max_events == 2
+
+    @pytest.mark.asyncio
+    async def test_iter_forwarding_batches_columns(self, client):
+        """Vérifie le mode colonnaire page par page"""
+        batches = [
+            batch async for batch in client.iter_forwarding_batches(
+                start_time=1690000000, end_time=1710000000, page_size=2
+            )
+        ]
+
+        assert [len(batch["fee"]) for batch in batches] == [2, 2, 1]
+        assert batches[0]["chan_id_in"].tolist() == [100, 101]
+        assert batches[-1]["last_offset_index"] == 5
+        assert sum(int(batch["amt_out"].sum()) for batch in batches) == 5000
+
+    @pytest.mark.asyncio
+    async def test_sync_client_iterates_in_thread(self, pages):
+        """Vérifie que LNDClient parcourt aussi les pages via un thread"""
+        client = LNDClient(
+            cert_path="fake_cert.pem",
+            macaroon_path="fake_macaroon",
+            grpc_host="127.0.0.1:10009"
+        )
+        client._stub = MagicMock()
+        client._stub.ForwardingHistory = Mock(side_effect=pages)
+
+        events = [
+            event async for event in client.iter_forwarding_history(page_size=2)
+        ]
+
+        assert len(events) == 5
+        assert client._stub.ForwardingHistory.call_count == 3
+
+
+class TestSubscriptionStreams:
+    """Tests des abonnements contre les stubs générés et un serveur grpc.aio local"""
+
+    TXID = bytes(range(32))
+
+    @pytest.fixture
+    def protos(self, monkeypatch):
+        # Le code généré importe lightning_pb2 en absolu
+        proto_dir = os.path.join(os.path.dirname(__file__), "..", "..", "proto")
+        monkeypatch.syspath_prepend(os.path.abspath(proto_dir))
+        from proto import lightning_pb2 as ln
+        from proto import lightning_pb2_grpc as lnrpc
+        return ln, lnrpc
+
+    @pytest.fixture
+    async def client(self, protos):
+        ln, lnrpc = protos
+        txid = self.TXID
+
+        class FakeLightning(lnrpc.LightningServicer):
+            async def SubscribeChannelEvents(self, request, context):
+                yield ln.ChannelEventUpdate(
+                    open_channel=ln.Channel(channel_id=42, remote_pubkey="02" + "aa" * 32, capacity=500000),
+                    type=ln.ChannelEventUpdate.OPEN_CHANNEL
+                )
+                yield ln.ChannelEventUpdate(
+                    inactive_channel=ln.ChannelPoint(funding_txid_bytes=txid, output_index=1),
+                    type=ln.ChannelEventUpdate.INACTIVE_CHANNEL
+                )
+                yield ln.ChannelEventUpdate(
+                    pending_open_channel=ln.PendingUpdate(txid=txid, output_index=0),
+                    type=ln.ChannelEventUpdate.PENDING_OPEN_CHANNEL
+                )
+                yield ln.ChannelEventUpdate(
+                    closed_channel=ln.ChannelCloseSummary(
+                        chan_id=42, remote_pubkey="02" + "aa" * 32, capacity=500000,
+                        close_type=ln.ChannelCloseSummary.REMOTE_FORCE_CLOSE
+                    ),
+                    type=ln.ChannelEventUpdate.CLOSED_CHANNEL
+                )
+
+            async def SubscribeInvoices(self, request, context):
+                yield ln.Invoice(
+                    memo="café", r_hash=txid, value=1000, value_msat=1000000,
+                    creation_date=1700000000, settle_date=1700000060,
+                    add_index=request.add_index + 7, settle_index=3, amt_paid_msat=1000000,
+                    state=ln.Invoice.SETTLED,
+                    route_hints=[ln.RouteHint(hop_hints=[
+                        ln.HopHint(node_id="03" + "bb" * 32, chan_id=7, cltv_expiry_delta=40)
+                    ])],
+                    htlcs=[ln.InvoiceHTLC(chan_id=7, amt_msat=1000000, state=ln.SETTLED,
+                                          custom_records={5482373484: b"\x01"})]
+                )
+
+        server = grpc.aio.server()
+        lnrpc.add_LightningServicer_to_server(FakeLightning(), server)
+        port = server.add_insecure_port("127.0.0.1:0")
+        await server.start()
+
+        client = AsyncLNDClient(cert_path="-", macaroon_path="-", grpc_host=f"127.0.0.1:{port}")
+        channel = grpc.aio.insecure_channel(f"127.0.0.1:{port}")
+        client._stub = lnrpc.LightningStub(channel)
+        yield client
+        await channel.close()
+        await server.stop(None)
+
+    @pytest.mark.asyncio
+    async def test_channel_events(self, client):
+        """Chaque variante de ChannelEventUpdate est décodée selon la disposition de LND"""
+        events = [event async for event in client.stream_channel_events()]
+        channel_point = f"{self.TXID[::-1].hex()}"
+
+        assert events == [
+            ("open_channel", {"channel_id": 42, "remote_pubkey": "02" + "aa" * 32, "capacity": 500000}),
+            ("inactive_channel", {"channel_point": f"{channel_point}:1"}),
+            ("pending_open_channel", {"channel_point": f"{channel_point}:0"}),
+            ("closed_channel", {"channel_id": 42, "remote_pubkey": "02" + "aa" * 32,
+                                "capacity": 500000, "close_type": "REMOTE_FORCE_CLOSE"}),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_invoice_events(self, client):
+        invoices = [invoice async for invoice in client.stream_invoice_events()]
+
+        assert len(invoices) == 1
+        invoice = invoices[0]
+        assert invoice["memo"] == "café"
+        assert invoice["r_hash"] == self.TXID.hex()
+        assert invoice["add_index"] == 7
+        assert invoice["state"] == "SETTLED"
+        assert invoice["route_hints"][0]["hop_hints"][0]["node_id"] == "03" + "bb" * 32
+        assert invoice["htlcs"][0]["state"] == "SETTLED"
+        assert invoice["htlcs"][0]["custom_records"] == {5482373484: "01"}
+
@@ -0,0 +1,162 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+import services.async_cache as async_cache
+from services.cached_data_source import CachedDataSource
+from services.graph_sync import GraphSync
+from services.local_data_source import LocalDataSource
+from services.lnd_subscriptions import CHANNEL_EVENTS, SubscriptionManager
+
+
+class Clock:
+    """Horloge monotone contrôlée par le test"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Horloge du module seulement : celle de la boucle d'événements reste réelle
+    monkeypatch.setattr(async_cache, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+@pytest.fixture
+def source():
+    source = MagicMock(spec=LocalDataSource)
+    source.lnd_client = MagicMock()
+    source.get_node_details.return_value = {"pubkey": "02abc", "alias": "node"}
+    source.get_channels_list.return_value = [{"channel_id": "1"}]
+    return source
+
+
+def http_error(status_code):
+    request = httpx.Request("GET", "https://api.test/nodes/02abc")
+    response = httpx.Response(status_code, request=request)
+    return httpx.HTTPStatusError("erreur", request=request, response=response)
+
+
+class TestCachedDataSource:
+    """Tests du cache en lecture des sources de données"""
+
+    @pytest.mark.asyncio
+    async def test_repeated_calls_hit_cache(self, source):
+        cached = CachedDataSource(source)
+
+        for _ in range(3):
+            assert await cached.get_node_details("02abc") == {"pubkey": "02abc", "alias": "node"}
+        # limit=50 est la valeur par défaut : même clé
+        await cached.get_channels_list()
+        await cached.get_channels_list(50, offset=0)
+
+        source.get_node_details.assert_awaited_once_with("02abc")
+        assert source.get_channels_list.await_count == 1
+        assert cached.get_stats()["get_node_details"]["hits"] == 2
+
+    def test_behaves_like_wrapped_source(self, source):
+        cached = CachedDataSource(source)
+
+        assert not isinstance(cached, LocalDataSource)
+        assert cached.unwrap() is source
+        assert cached.lnd_client is source.lnd_client
+
+    @pytest.mark.asyncio
+    async def test_absences_expire_sooner(self, source, clock):
+        source.get_node_details.return_value = None
+        cached = CachedDataSource(source, negative_ttl=60)
+
+        await cached.get_node_details("02abc")
+        clock.now += 30
+        await cached.get_node_details("02abc")
+        clock.now += 31 + cached.caches["get_node_details"].stale_ttl
+        await cached.get_node_details("02abc")
+
+        assert source.get_node_details.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_error_responses_not_cached(self, source):
+        source.get_channels_stats.return_value = {"error": "LND indisponible", "source": "local"}
+        cached = CachedDataSource(source)
+
+        await cached.get_channels_stats()
+        await cached.get_channels_stats()
+
+        assert source.get_channels_stats.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_not_found_is_cached(self, source):
+        source.get_node_info.side_effect = http_error(404)
+        source.get_channel_info.side_effect = http_error(500)
+        cached = CachedDataSource(source)
+
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                await cached.get_node_info("02abc")
+            with pytest.raises(httpx.HTTPStatusError):
+                await cached.get_channel_info("1")
+
+        assert source.get_node_info.await_count == 1
+        assert source.get_channel_info.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_served_while_revalidating(self, source, clock):
+        cached = CachedDataSource(source, policies={"get_channels_list": (60, 120)})
+
+        await cached.get_channels_list()
+        source.get_channels_list.return_value = [{"channel_id": "2"}]
+        clock.now += 90
+
+        assert await cached.get_channels_list() == [{"channel_id": "1"}]
+        await asyncio.sleep(0.01)
+        assert await cached.get_channels_list() == [{"channel_id": "2"}]
+        assert source.get_channels_list.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_graph_updates_invalidate_changed_entries(self, source):
+        graph_sync = GraphSync(lnd_client=MagicMock())
+        cached = CachedDataSource(source)
+        cached.attach_graph_sync(graph_sync)
+
+        await cached.get_node_details("02abc")
+        await cached.get_node_details("03def")
+        graph_sync.apply_update({"node_updates": [{"pub_key": "02abc", "alias": "renamed"}]})
+        await cached.get_node_details("02abc")
+        await cached.get_node_details("03def")
+
+        assert [call.args for call in source.get_node_details.await_args_list] == [
+            ("02abc",), ("03def",), ("02abc",)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_channel_events_invalidate_channel_data(self, source):
+        lnd_client = MagicMock()
+
+        async def stream_channel_events():
+            await asyncio.Event().wait()
+            yield
+
+        lnd_client.stream_channel_events = stream_channel_events
+        manager = SubscriptionManager(lnd_client=lnd_client)
+        cached = CachedDataSource(source)
+        cached.attach_subscription_manager(manager)
+
+        await cached.get_channels_list()
+        await cached.get_node_details("02abc")
+        await manager.publish(CHANNEL_EVENTS, {"type": "closed_channel", "data": {}})
+        await asyncio.sleep(0)
+        await cached.get_channels_list()
+        await cached.get_node_details("02abc")
+
+        assert source.get_channels_list.await_count == 2
+        assert source.get_node_details.await_count == 1
+        await cached.close()
+        await manager.stop()
@@ -140,9 +140,12 @@ class TestDataSourceFactory:
         ):
             
             await DataSourceFactory.initialize()
+            source = DataSourceFactory.get_data_source("local")
             await DataSourceFactory.shutdown()
             
             assert not DataSourceFactory._initialized
+            # Les sources fermées ne sont plus renvoyées
+            assert DataSourceFactory.get_data_source("local") is not source
             mock_clients["health_manager"].stop_background_checks.assert_called_once()
     
     @pytest.mark.asyncio
@@ -178,7 +181,7 @@ class TestDataSourceFactory:
             mock_clients["health_manager"].is_source_available.return_value = True
             
             source = DataSourceFactory.get_data_source("auto")
-            assert isinstance(source, MCPDataSource)
+            assert isinstance(source.unwrap(), MCPDataSource)
             mock_clients["health_manager"].is_source_available.assert_called_with("mcp")
     
     @pytest.mark.asyncio
@@ -216,7 +219,7 @@ class TestDataSourceFactory:
             mock_clients["health_manager"].is_source_available.side_effect = is_source_available
             
             source = DataSourceFactory.get_data_source("auto")
-            assert isinstance(source, LocalDataSource)
+            assert isinstance(source.unwrap(), LocalDataSource)
             
             # Vérifier que le health manager a été consulté pour les deux sources
             mock_clients["health_manager"].is_source_available.assert_any_call("mcp")
@@ -292,7 +295,7 @@ class TestDataSourceFactory:
             DataSourceFactory._initialized = False
             
             source = DataSourceFactory.get_data_source("auto")
-            assert isinstance(source, MCPDataSource)
+            assert isinstance(source.unwrap(), MCPDataSource)
             mock_clients["mcp_service"].get_network_stats.assert_called_once()
     
     @pytest.mark.asyncio
@@ -325,5 +328,5 @@ class TestDataSourceFactory:
             )
             
             source = DataSourceFactory.get_data_source("auto")
-            assert isinstance(source, LocalDataSource)
+            assert isinstance(source.unwrap(), LocalDataSource)
             mock_clients["mcp_service"].get_network_stats.assert_called_once() 
\ No newline at end of file
@@ -1,3 +1,5 @@
+import threading
+
 import pytest
 from unittest.mock import patch, AsyncMock, MagicMock
 from datetime import datetime
@@ -62,6 +64,35 @@ class TestLocalDataSource:
         assert "node" in result
         assert result["node"]["pubkey"] == "test_pubkey"  # Vérifier les données de LNRouter
     
+    @pytest.mark.asyncio
+    async def test_lnd_calls_leave_event_loop_free(self, local_data_source, mock_clients):
+        """Les appels bloquants de LNDClient s'exécutent hors du thread de la boucle"""
+        loop_thread = threading.get_ident()
+        threads = []
+        channel = {"channel_id": "1", "remote_pubkey": "pubkey1", "capacity": 1000000,
+                   "active": True, "local_balance": 600000, "remote_balance": 400000}
+        mock_clients["lnd_client"].list_channels = MagicMock(
+            side_effect=lambda: threads.append(threading.get_ident()) or [channel]
+        )
+        
+        channels = await local_data_source.get_channels_list()
+        
+        assert channels[0]["node1_pub"] == "test_pubkey"
+        assert threads and loop_thread not in threads
+    
+    @pytest.mark.asyncio
+    async def test_async_lnd_client_is_awaited(self, mock_clients):
+        """Les méthodes d'AsyncLNDClient sont attendues directement"""
+        lnd_client = MagicMock()
+        lnd_client.get_node_info = AsyncMock(return_value={"pubkey": "test_pubkey"})
+        lnd_client.list_channels = AsyncMock(return_value=[])
+        source = LocalDataSource(lnd_client=lnd_client, lnrouter_client=mock_clients["lnrouter_client"])
+        
+        channels = await source.get_node_channels("test_pubkey")
+        
+        assert channels == []
+        lnd_client.list_channels.assert_awaited_once()
+    
     @pytest.mark.asyncio
     async def test_get_channel_info_success(self, local_data_source, mock_clients):
         """Test de la récupération réussie des informations d'un canal"""
@@ -209,8 +240,30 @@ class TestMCPDataSource:
         
         assert "Erreur API MCP" in str(exc_info.value)
 
+def run_until_complete(coro):
+    """Exécute jusqu'au bout une coroutine qui ne suspend jamais (AsyncMock)"""
+    try:
+        coro.send(None)
+    except StopIteration as e:
+        return e.value
+    raise RuntimeError("La coroutine s'est suspendue")
+
+
 class TestDataSourceFactory:
     
+    @pytest.fixture(autouse=True)
+    def reset_factory(self):
+        """Repart d'une factory vierge (sources et clients partagés)"""
+        from services.data_source_factory import DataSourceFactory
+        DataSourceFactory._sources = {}
+        DataSourceFactory._lnd_client = None
+        DataSourceFactory._lnrouter_client = None
+        DataSourceFactory._mcp_service = None
+        DataSourceFactory._health_manager = None
+        DataSourceFactory._initialized = False
+        yield
+        DataSourceFactory._sources = {}
+    
     @pytest.fixture
     def mock_clients(self):
         """Crée les mocks des clients pour les tests de la factory"""
@@ -229,7 +282,7 @@ class TestDataSourceFactory:
             from services.data_source_factory import DataSourceFactory
             source = DataSourceFactory.get_data_source("local")
             
-            assert isinstance(source, LocalDataSource)
+            assert isinstance(source.unwrap(), LocalDataSource)
             assert source.lnd_client == mock_clients["lnd_client"]
             assert source.lnrouter_client == mock_clients["lnrouter_client"]
     
@@ -241,7 +294,7 @@ class TestDataSourceFactory:
             from services.data_source_factory import DataSourceFactory
             source = DataSourceFactory.get_data_source("mcp")
             
-            assert isinstance(source, MCPDataSource)
+            assert isinstance(source.unwrap(), MCPDataSource)
             assert source.mcp_service == mock_clients["mcp_service"]
     
     @pytest.mark.asyncio
@@ -260,13 +313,13 @@ class TestDataSourceFactory:
             
             # Configurer le mock pour run_until_complete
             mock_loop.return_value = MagicMock()
-            mock_loop.return_value.run_until_complete = lambda x: None
+            mock_loop.return_value.run_until_complete = run_until_complete
             
             from services.data_source_factory import DataSourceFactory
             source = DataSourceFactory.get_data_source("auto")
             
             # En mode auto avec MCP configuré, devrait choisir MCP
-            assert isinstance(source, MCPDataSource)
+            assert isinstance(source.unwrap(), MCPDataSource)
             assert source.mcp_service == mock_clients["mcp_service"]
     
     @pytest.mark.asyncio
@@ -282,7 +335,7 @@ class TestDataSourceFactory:
             source = DataSourceFactory.get_data_source("auto")
             
             # En mode auto sans MCP configuré, devrait choisir local
-            assert isinstance(source, LocalDataSource)
+            assert isinstance(source.unwrap(), LocalDataSource)
     
     @pytest.mark.asyncio
     async def test_get_data_source_invalid_type(self, mock_clients):
@@ -294,7 +347,7 @@ class TestDataSourceFactory:
             source = DataSourceFactory.get_data_source("invalid_type")
             
             # Devrait fallback sur local
-            assert isinstance(source, LocalDataSource)
+            assert isinstance(source.unwrap(), LocalDataSource)
     
     @pytest.mark.asyncio
     async def test_get_data_source_auto_all_fail(self, mock_clients):
@@ -311,7 +364,7 @@ class TestDataSourceFactory:
             
             # Configurer le mock pour run_until_complete
             mock_loop.return_value = MagicMock()
-            mock_loop.return_value.run_until_complete = lambda x: None
+            mock_loop.return_value.run_until_complete = run_until_complete
             
             from services.data_source_factory import DataSourceFactory
             # Réinitialiser le cache des sources
@@ -322,7 +375,7 @@ class TestDataSourceFactory:
             source = DataSourceFactory.get_data_source("auto")
             
             # Devrait fallback sur local
-            assert isinstance(source, LocalDataSource)
+            assert isinstance(source.unwrap(), LocalDataSource)
             assert source.lnd_client == mock_clients["lnd_client"]
             assert source.lnrouter_client == mock_clients["lnrouter_client"]
     
@@ -341,7 +394,7 @@ class TestDataSourceFactory:
             
             # Configurer le mock pour run_until_complete
             mock_loop.return_value = MagicMock()
-            mock_loop.return_value.run_until_complete = lambda x: None
+            mock_loop.return_value.run_until_complete = run_until_complete
             
             from services.data_source_factory import DataSourceFactory
             # Réinitialiser le cache des sources
@@ -352,6 +405,6 @@ class TestDataSourceFactory:
             source = DataSourceFactory.get_data_source("auto")
             
             # Devrait fallback sur local
-            assert isinstance(source, LocalDataSource)
+            assert isinstance(source.unwrap(), LocalDataSource)
             assert source.lnd_client == mock_clients["lnd_client"]
             assert source.lnrouter_client == mock_clients["lnrouter_client"] 
\ No newline at end of file
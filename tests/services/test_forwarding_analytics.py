@@ -0,0 +1,151 @@
+import pytest
+
+import numpy as np
+
+import services.forwarding_analytics as forwarding_analytics
+from services.forwarding_analytics import ForwardingAnalytics, events_to_columns
+
+
+def make_events(count, start=1_700_000_000):
+    """Forwards alternant deux canaux entrants vers un canal sortant, un par minute"""
+    return [
+        {
+            "timestamp_ns": (start + i * 60) * 1_000_000_000,
+            "chan_id_in": "100" if i % 2 == 0 else "300",
+            "chan_id_out": "200",
+            "amt_in": 1010 + i, "amt_out": 1000 + i, "fee": 10
+        }
+        for i in range(count)
+    ]
+
+
+def reference_summary(events):
+    """Agrégation par boucle Python, telle que faite avant le noyau vectorisé"""
+    channels_in, channels_out = {}, {}
+    for event in events:
+        entry = channels_in.setdefault(event["chan_id_in"], {"count": 0, "amount": 0, "fees": 0})
+        entry["count"] += 1
+        entry["amount"] += event["amt_in"]
+        entry["fees"] += event["fee"]
+        entry = channels_out.setdefault(event["chan_id_out"], {"count": 0, "amount": 0})
+        entry["count"] += 1
+        entry["amount"] += event["amt_out"]
+    return {
+        "total_forwards": len(events),
+        "total_amount_forwarded": sum(event["amt_out"] for event in events),
+        "total_fees_earned": sum(event["fee"] for event in events),
+        "channels_in": channels_in,
+        "channels_out": channels_out
+    }
+
+
+def as_batches(events, size):
+    columns = events_to_columns(events)
+    return [
+        {name: values[i:i + size] for name, values in columns.items()}
+        for i in range(0, len(events), size)
+    ]
+
+
+class TestForwardingAnalytics:
+    """Tests du noyau d'agrégation des forwards"""
+
+    def test_summary_matches_python_loop(self):
+        events = make_events(50)
+        assert ForwardingAnalytics.from_events(events).summary() == reference_summary(events)
+
+    def test_partial_aggregates_are_merged(self, monkeypatch):
+        """Les agrégats de plusieurs réductions successives sont additionnés"""
+        monkeypatch.setattr(forwarding_analytics, "FLUSH_ROWS", 7)
+        events = make_events(50)
+        analytics = ForwardingAnalytics(bucket_seconds=600, pairs=True)
+        for batch in as_batches(events, 5):
+            analytics.add(batch)
+
+        expected = ForwardingAnalytics.from_events(events, bucket_seconds=600, pairs=True)
+        assert analytics.summary() == expected.summary()
+        assert analytics.time_buckets() == expected.time_buckets()
+        assert analytics.pair_flows() == expected.pair_flows()
+
+    @pytest.mark.asyncio
+    async def test_grpc_batches_use_string_channel_ids(self):
+        async def batches():
+            yield {
+                "timestamp": np.array([60, 120], dtype=np.int64),
+                "chan_id_in": np.array([100, 100], dtype=np.uint64),
+                "chan_id_out": np.array([200, 300], dtype=np.uint64),
+                "amt_in": np.array([1010, 2020], dtype=np.int64),
+                "amt_out": np.array([1000, 2000], dtype=np.int64),
+                "fee": np.array([10, 20], dtype=np.int64),
+                "last_offset_index": 2
+            }
+
+        analytics = await ForwardingAnalytics.from_batches(batches())
+
+        assert analytics.channels_in() == {"100": {"count": 2, "amount": 3030, "fees": 30}}
+        assert analytics.channel_activity() == {"100": 2, "200": 1, "300": 1}
+
+    def test_channel_totals_combine_directions(self):
+        events = make_events(4)
+        events[0]["chan_id_out"] = "100"
+        totals = ForwardingAnalytics.from_events(events).channel_totals()
+
+        # Les frais sont attribués au canal entrant
+        assert totals["100"] == {"count": 3, "amount": 1010 + 1012 + 1000, "fees": 20}
+        assert totals["200"] == {"count": 3, "amount": 1001 + 1002 + 1003, "fees": 0}
+
+    def test_time_buckets_from_origin(self):
+        events = make_events(10, start=1000)
+        analytics = ForwardingAnalytics.from_events(events, bucket_seconds=300, bucket_origin=1000)
+
+        buckets = analytics.time_buckets()
+        assert list(buckets) == [1000, 1300]
+        assert buckets[1000]["count"] == 5
+        assert buckets[1300]["total_fees"] == 50
+
+    def test_optional_aggregations_must_be_requested(self):
+        analytics = ForwardingAnalytics.from_events(make_events(2))
+        with pytest.raises(ValueError):
+            analytics.time_buckets()
+        with pytest.raises(ValueError):
+            analytics.pair_flows()
+        with pytest.raises(ValueError):
+            analytics.fee_rate_percentiles()
+
+    def test_pair_flows_sorted_by_count(self):
+        events = make_events(5)
+        flows = ForwardingAnalytics.from_events(events, pairs=True).pair_flows()
+
+        assert [(flow["chan_id_in"], flow["count"]) for flow in flows] == [("100", 3), ("300", 2)]
+        assert flows[0]["fees"] == 30
+        assert ForwardingAnalytics.from_events(events, pairs=True).pair_flows(limit=1) == flows[:1]
+
+    def test_fee_rate_percentiles(self):
+        events = make_events(3)
+        for event, (fee, amt_out) in zip(events, ((1, 1000), (2, 1000), (3, 1000))):
+            event.update(fee=fee, amt_out=amt_out)
+        events.append({**events[0], "amt_out": 0, "fee": 5})
+
+        percentiles = ForwardingAnalytics.from_events(events, fee_rates=True).fee_rate_percentiles(
+            (0, 50, 100)
+        )
+        assert percentiles == {"p0": 1000.0, "p50": 2000.0, "p100": 3000.0}
+
+    def test_empty(self):
+        analytics = ForwardingAnalytics.from_events([], bucket_seconds=60, pairs=True, fee_rates=True)
+
+        assert analytics.summary()["channels_in"] == {}
+        assert analytics.time_buckets() == {}
+        assert analytics.pair_flows() == []
+        assert analytics.fee_rate_percentiles() == {"p50": 0.0, "p90": 0.0, "p99": 0.0}
+
+    def test_rest_events(self):
+        """Format de l'API REST : nombres en chaînes, timestamp en secondes"""
+        columns = events_to_columns([
+            {"timestamp": "1700000000", "chan_id_in": "1", "amt_in": "1010",
+             "amt_out": "1000", "fee": "10"}
+        ])
+
+        assert columns["timestamp"].tolist() == [1700000000]
+        assert columns["chan_id_out"].tolist() == ["unknown"]
+        assert columns["fee"].tolist() == [10]
@@ -0,0 +1,120 @@
+import pytest
+from unittest.mock import patch
+
+from services.forwarding_analytics import events_to_columns
+from services.metrics_collector import MetricsCollector
+from services.metrics_storage import MongoMetricsStorage
+from tests.mocks.mongo import MongoDatabaseMock
+
+
+class FakeLNDClient:
+    """Historique de forwarding paginé par offset, comme ForwardingHistory"""
+
+    def __init__(self, events):
+        self.events = events
+        self.requested_offsets = []
+
+    async def iter_forwarding_pages(self, start_time=None, end_time=None,
+                                    page_size=100, index_offset=0):
+        offset = index_offset
+        while True:
+            self.requested_offsets.append(offset)
+            page = self.events[offset:offset + page_size]
+            yield {
+                "forwarding_events": [dict(event) for event in page],
+                "last_offset_index": offset + len(page),
+                "total_count": len(page)
+            }
+            if len(page) < page_size:
+                break
+            offset += len(page)
+
+    async def iter_forwarding_batches(self, start_time=None, end_time=None,
+                                      page_size=100, index_offset=0):
+        async for page in self.iter_forwarding_pages(start_time, end_time, page_size, index_offset):
+            if page["forwarding_events"]:
+                yield events_to_columns(page["forwarding_events"])
+
+
+def make_event(i):
+    return {
+        "timestamp_ns": 1_700_000_000_000_000_000 + i,
+        "chan_id_in": str(100 + i % 3),
+        "chan_id_out": str(200 + i % 5),
+        "amt_in": 1010, "amt_out": 1000, "fee": 10
+    }
+
+
+@pytest.fixture
+def collector():
+    with patch("services.metrics_collector.MCPService"), \
+            patch("services.metrics_collector.LNRouterClient"):
+        collector = MetricsCollector(
+            lnd_client=FakeLNDClient([make_event(i) for i in range(25)]),
+            storage=MongoMetricsStorage(database=MongoDatabaseMock())
+        )
+    return collector
+
+
+class TestForwardingIngestion:
+    """Tests de l'ingestion incrémentale des événements de forwarding"""
+
+    @pytest.mark.asyncio
+    async def test_ingests_in_unordered_batches(self, collector):
+        stats = await collector.ingest_forwarding_events(page_size=10)
+
+        assert stats["ingested"] == 25
+        assert stats["last_offset_index"] == 25
+        assert collector.storage.db["forwarding_events"].bulk_calls == [(10, False), (10, False), (5, False)]
+        assert await collector.storage.get_forwarding_watermark() == 25
+
+    @pytest.mark.asyncio
+    async def test_only_new_events_are_requested(self, collector):
+        await collector.ingest_forwarding_events(page_size=10)
+        collector.lnd_client.events.extend(make_event(i) for i in range(25, 30))
+        collector.lnd_client.requested_offsets.clear()
+
+        stats = await collector.ingest_forwarding_events(page_size=10)
+
+        assert collector.lnd_client.requested_offsets == [25]
+        assert stats["ingested"] == 5
+        assert stats["previous_offset_index"] == 25
+        assert stats["last_offset_index"] == 30
+
+    @pytest.mark.asyncio
+    async def test_duplicates_are_skipped(self, collector):
+        """Un watermark perdu ne produit pas de doublons ni d'erreur"""
+        await collector.ingest_forwarding_events(page_size=10)
+        collector.storage.db["ingestion_state"].documents.clear()
+
+        stats = await collector.ingest_forwarding_events(page_size=10)
+
+        assert stats["ingested"] == 0
+        assert stats["duplicates"] == 25
+        assert len(collector.storage.db["forwarding_events"].documents) == 25
+
+    def test_summarize_forwards(self, collector):
+        summary = collector._summarize_forwards([make_event(i) for i in range(6)])
+
+        assert summary["total_forwards"] == 6
+        assert summary["total_amount_forwarded"] == 6000
+        assert summary["total_fees_earned"] == 60
+        assert summary["channels_in"]["100"] == {"count": 2, "amount": 2020, "fees": 20}
+        assert summary["channels_out"]["200"] == {"count": 2, "amount": 2000}
+
+    @pytest.mark.asyncio
+    async def test_collect_without_storage_reads_whole_history(self):
+        """Sans base, toutes les pages de la période sont agrégées (pas de limite à 1000)"""
+        with patch("services.metrics_collector.MCPService"), \
+                patch("services.metrics_collector.LNRouterClient"):
+            collector = MetricsCollector(
+                lnd_client=FakeLNDClient([make_event(i) for i in range(1500)])
+            )
+        collector.storage = None
+
+        metrics = await collector.collect_forwarding_metrics(time_window_hours=24)
+
+        assert metrics["total_forwards"] == 1500
+        assert metrics["total_fees_earned"] == 15000
+        assert metrics["channels_in"]["100"]["count"] == 500
+        assert len(collector.lnd_client.requested_offsets) == 16
@@ -0,0 +1,201 @@
+import os
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock
+
+import numpy as np
+
+from services.graph_cache import read_graph_cache, write_graph_cache
+from services.graph_store import GraphStore
+from services.lnrouter_client import LNRouterClient
+from services.local_data_source import LocalDataSource
+
+NODE_A = "02" + "aa" * 32
+NODE_B = "02" + "bb" * 32
+NODE_C = "03" + "cc" * 32
+
+
+def policy(fee_rate, disabled=False):
+    return {
+        "time_lock_delta": 40, "min_htlc": 1000, "fee_base_msat": 1000,
+        "fee_rate_milli_msat": fee_rate, "disabled": disabled,
+        "max_htlc_msat": 990000000
+    }
+
+
+@pytest.fixture
+def graph_data():
+    return {
+        "nodes": [
+            {"pub_key": NODE_A, "alias": "A", "color": "#ff0000", "last_update": 10},
+            {"pub_key": NODE_B, "alias": "B"},
+        ],
+        "channels": [
+            {"channel_id": "1", "node1_pub": NODE_A, "node2_pub": NODE_B,
+             "capacity": 1000000, "node1_policy": policy(100), "node2_policy": policy(200)},
+            {"channel_id": "2", "node1_pub": NODE_B, "node2_pub": NODE_C,
+             "capacity": 2000000, "node1_policy": policy(1, disabled=True), "node2_policy": None},
+            {"channel_id": "3", "node1_pub": NODE_A, "node2_pub": NODE_B,
+             "capacity": 500000, "node1_policy": policy(50), "node2_policy": policy(60)},
+        ]
+    }
+
+
+class TestGraphStore:
+    """Tests du graphe en tableaux NumPy"""
+
+    def test_interning_and_arrays(self, graph_data):
+        """Les pubkeys sont internées, y compris celles connues uniquement par un canal"""
+        store = GraphStore.from_graph_data(graph_data, version=1)
+
+        assert store.pubkeys == [NODE_A, NODE_B, NODE_C]
+        assert store.num_channels == 3
+        assert store.total_capacity == 3500000
+        assert store.degree.tolist() == [2, 3, 1]
+        # Arête 0 : node1 -> node2 du canal 1 avec node1_policy
+        assert store.fee_rate_ppm[0] == 100
+        assert store.fee_rate_ppm[3] == 200
+
+    def test_csr_out_edges(self, graph_data):
+        """L'index CSR renvoie les arêtes sortantes de chaque nœud"""
+        store = GraphStore.from_graph_data(graph_data)
+
+        b_edges = store.out_edges(store.index[NODE_B])
+        assert sorted(store.edge_dst[b_edges].tolist()) == [0, 0, 2]
+
+    def test_usable_edges_and_sparse(self, graph_data):
+        """Les arêtes désactivées ou sans politique sont exclues ; les doublons gardent le minimum"""
+        store = GraphStore.from_graph_data(graph_data)
+        matrix = store.to_sparse(store.fee_rate_ppm.astype(float))
+
+        a, b, c = (store.index[k] for k in (NODE_A, NODE_B, NODE_C))
+        assert matrix[a, b] == 50
+        assert matrix[b, a] == 60
+        assert matrix[b, c] == 0
+        assert matrix[c, b] == 0
+
+    def test_networkx_view_is_lazy_and_compact(self, graph_data):
+        """La vue NetworkX n'est construite qu'une fois et n'embarque pas les dicts complets"""
+        store = GraphStore.from_graph_data(graph_data)
+        G = store.to_networkx()
+
+        assert store.to_networkx() is G
+        assert G.number_of_edges() == 2
+        assert set(G[NODE_A][NODE_B]) == {"channel_id", "capacity", "last_update"}
+        assert G.nodes[NODE_A]["alias"] == "A"
+
+    def test_adjacency_ignores_parallel_channels(self, graph_data):
+        """La matrice d'adjacence compte une fois chaque paire de voisins"""
+        store = GraphStore.from_graph_data(graph_data)
+        assert store.adjacency().nnz == 4
+
+
+class TestLocalDataSourceGraphStore:
+    """Tests de LocalDataSource sur le GraphStore partagé"""
+
+    @pytest.fixture
+    def data_source(self, graph_data):
+        lnrouter_client = AsyncMock()
+        lnrouter_client.get_graph_store.return_value = GraphStore.from_graph_data(graph_data)
+        lnd_client = AsyncMock()
+        return LocalDataSource(lnd_client=lnd_client, lnrouter_client=lnrouter_client)
+
+    @pytest.mark.asyncio
+    async def test_get_network_nodes(self, data_source):
+        nodes = await data_source.get_network_nodes(limit=2, offset=1)
+
+        assert [n["pubkey"] for n in nodes] == [NODE_B, NODE_C]
+        assert nodes[0]["degree"] == 3
+
+    @pytest.mark.asyncio
+    async def test_get_node_channels_from_graph(self, data_source):
+        data_source.lnd_client.get_node_info = lambda: {"pubkey": "autre"}
+
+        channels = await data_source.get_node_channels(NODE_C)
+
+        assert channels == [{
+            "channel_id": "2", "node1_pub": NODE_C, "node2_pub": NODE_B,
+            "capacity": 2000000, "source": "local_graph"
+        }]
+
+
+class TestGraphCache:
+    """Tests du cache binaire du graphe"""
+
+    def test_round_trip(self, graph_data, tmp_path):
+        """Le store relu depuis le cache est identique à l'original"""
+        path = str(tmp_path / "graph.bin")
+        store = GraphStore.from_graph_data(graph_data)
+        timestamp = datetime(2024, 1, 1, 12, 0, 0)
+
+        write_graph_cache(store, path, timestamp)
+        loaded, loaded_at = read_graph_cache(path, version="v")
+
+        assert loaded_at == timestamp
+        assert loaded.version == "v"
+        assert loaded.pubkeys == store.pubkeys
+        assert loaded.index == store.index
+        assert loaded.aliases == store.aliases
+        assert loaded.channel_ids == store.channel_ids
+        for name in ("channel_capacity", "fee_rate_ppm", "disabled", "indptr", "csr_edges"):
+            np.testing.assert_array_equal(getattr(loaded, name), getattr(store, name))
+        assert loaded.to_graph_data() == store.to_graph_data()
+        # Aucun fichier temporaire ne subsiste après le renommage
+        assert os.listdir(tmp_path) == ["graph.bin"]
+
+    def test_loaded_store_is_writable_copy(self, graph_data, tmp_path):
+        """Le store mappé peut être modifié sans altérer le fichier"""
+        path = str(tmp_path / "graph.bin")
+        write_graph_cache(GraphStore.from_graph_data(graph_data), path)
+
+        loaded, _ = read_graph_cache(path)
+        loaded.fee_rate_ppm[0] = 999
+
+        reloaded, _ = read_graph_cache(path)
+        assert reloaded.fee_rate_ppm[0] == 100
+
+    def test_corrupted_cache_is_rejected(self, graph_data, tmp_path):
+        """Une somme de contrôle invalide ou un fichier tronqué sont refusés"""
+        path = tmp_path / "graph.bin"
+        write_graph_cache(GraphStore.from_graph_data(graph_data), str(path))
+        data = bytearray(path.read_bytes())
+
+        data[-1] ^= 0xFF
+        path.write_bytes(bytes(data))
+        with pytest.raises(ValueError):
+            read_graph_cache(str(path))
+
+        path.write_bytes(bytes(data[:-10]))
+        with pytest.raises(ValueError):
+            read_graph_cache(str(path))
+
+    @pytest.mark.asyncio
+    async def test_cold_start_uses_binary_cache(self, graph_data, tmp_path):
+        """Au démarrage, un cache récent évite le téléchargement du graphe"""
+        path = str(tmp_path / "graph.bin")
+        write_graph_cache(GraphStore.from_graph_data(graph_data), path)
+
+        client = LNRouterClient()
+        client.graph_cache_file = path
+        client._make_request = AsyncMock(side_effect=AssertionError("téléchargement inattendu"))
+
+        store = await client.get_graph_store()
+
+        assert store.num_channels == 3
+        assert await client.get_graph_store() is store
+        assert len((await client.get_graph())["channels"]) == 3
+
+    @pytest.mark.asyncio
+    async def test_download_writes_cache(self, graph_data, tmp_path):
+        """Un graphe téléchargé est sauvegardé et son store est réutilisé"""
+        client = LNRouterClient()
+        client.graph_cache_file = str(tmp_path / "graph.bin")
+        client._make_request = AsyncMock(return_value=graph_data)
+
+        graph = await client.get_graph()
+        store = await client.get_graph_store()
+
+        assert graph is graph_data
+        assert store.num_nodes == 3
+        assert os.path.exists(client.graph_cache_file)
+        client._make_request.assert_awaited_once()
@@ -0,0 +1,259 @@
+import asyncio
+
+import pytest
+from unittest.mock import MagicMock
+
+from services.graph_sync import GraphSync
+from services.graph_store import GraphStore
+from services.lnrouter_client import LNRouterClient
+
+NODE_A = "02" + "aa" * 32
+NODE_B = "02" + "bb" * 32
+NODE_C = "03" + "cc" * 32
+
+
+def policy(fee_rate):
+    return {
+        "time_lock_delta": 40, "min_htlc": 1000, "fee_base_msat": 1000,
+        "fee_rate_milli_msat": fee_rate, "disabled": False,
+        "max_htlc_msat": 990000000, "last_update": 1700000000
+    }
+
+
+@pytest.fixture
+def lnd_client():
+    """Client LND simulé renvoyant un petit graphe"""
+    client = MagicMock()
+    client.describe_graph.return_value = {
+        "nodes": [
+            {"pub_key": NODE_A, "alias": "A"},
+            {"pub_key": NODE_B, "alias": "B"},
+            {"pub_key": NODE_C, "alias": "C"},
+        ],
+        "channels": [
+            {"channel_id": "1", "node1_pub": NODE_A, "node2_pub": NODE_B,
+             "capacity": 1000000, "node1_policy": policy(1), "node2_policy": policy(1)},
+            {"channel_id": "2", "node1_pub": NODE_B, "node2_pub": NODE_C,
+             "capacity": 2000000, "node1_policy": policy(1), "node2_policy": policy(1)},
+        ]
+    }
+    return client
+
+
+@pytest.fixture
+async def graph_sync(lnd_client):
+    sync = GraphSync(lnd_client=lnd_client)
+    await sync.seed()
+    return sync
+
+
+class TestGraphSync:
+    """Tests de la synchronisation incrémentale du graphe"""
+
+    @pytest.mark.asyncio
+    async def test_seed(self, graph_sync):
+        """Le graphe est chargé depuis DescribeGraph"""
+        graph = graph_sync.get_graph()
+
+        assert graph_sync.is_synced
+        assert graph["version"] == 1
+        assert len(graph["nodes"]) == 3
+        assert len(graph["channels"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_apply_policy_update(self, graph_sync):
+        """Une mise à jour de politique modifie le bon côté du canal"""
+        changed = graph_sync.apply_update({
+            "channel_updates": [{
+                "channel_id": "1", "capacity": 1000000,
+                "advertising_node": NODE_B, "connecting_node": NODE_A,
+                "routing_policy": policy(500)
+            }]
+        })
+
+        assert changed
+        assert graph_sync.version == 2
+        channel = graph_sync.channels["1"]
+        assert channel["node2_policy"]["fee_rate_milli_msat"] == 500
+        assert channel["node1_policy"]["fee_rate_milli_msat"] == 1
+        assert graph_sync.changes_since(1) == (set(), {"1"})
+
+    @pytest.mark.asyncio
+    async def test_new_channel_and_closure(self, graph_sync):
+        """Les nouveaux canaux sont créés et les canaux fermés retirés"""
+        graph_sync.apply_update({
+            "channel_updates": [{
+                "channel_id": "3", "capacity": 500000,
+                "advertising_node": NODE_C, "connecting_node": NODE_A,
+                "routing_policy": policy(10)
+            }],
+            "closed_chans": [{"channel_id": "2", "capacity": 2000000, "closed_height": 1}]
+        })
+
+        assert "2" not in graph_sync.channels
+        channel = graph_sync.channels["3"]
+        assert (channel["node1_pub"], channel["node2_pub"]) == (NODE_A, NODE_C)
+        assert channel["node2_policy"]["fee_rate_milli_msat"] == 10
+        assert channel["node1_policy"] is None
+
+    @pytest.mark.asyncio
+    async def test_empty_update_keeps_version(self, graph_sync):
+        """Une mise à jour sans effet ne change pas la version"""
+        assert not graph_sync.apply_update({"closed_chans": [{"channel_id": "42"}]})
+        assert graph_sync.version == 1
+
+    @pytest.mark.asyncio
+    async def test_changes_before_seed_require_reload(self, graph_sync):
+        """Une version antérieure au dernier chargement impose un rechargement"""
+        await graph_sync.seed()
+        assert graph_sync.changes_since(1) is None
+        assert graph_sync.changes_since(2) == (set(), set())
+
+    @pytest.mark.asyncio
+    async def test_run_replays_updates_received_during_seed(self, lnd_client):
+        """DescribeGraph attend l'abonnement et les mises à jour reçues sont rejouées ensuite"""
+        calls = []
+        describe_graph = lnd_client.describe_graph.return_value
+        lnd_client.describe_graph.side_effect = lambda: calls.append("describe") or describe_graph
+
+        async def stream_graph_updates(ready=None):
+            # Abonnement lent à s'établir : l'instantané doit l'attendre
+            await asyncio.sleep(0.05)
+            calls.append("stream")
+            ready.set()
+            # Mise à jour émise pendant le chargement de l'instantané
+            yield {"channel_updates": [{
+                "channel_id": "1", "advertising_node": NODE_A, "connecting_node": NODE_B,
+                "routing_policy": policy(50)
+            }]}
+            await asyncio.Event().wait()
+
+        lnd_client.stream_graph_updates = stream_graph_updates
+        sync = GraphSync(lnd_client=lnd_client)
+        sync.start()
+        try:
+            for _ in range(100):
+                if sync.updates_applied:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await sync.stop()
+
+        assert calls == ["stream", "describe"]
+        assert sync.channels["1"]["node1_policy"]["fee_rate_milli_msat"] == 50
+
+    @pytest.mark.asyncio
+    async def test_refused_subscription_skips_seed(self, lnd_client):
+        """Sans abonnement établi, DescribeGraph n'est pas appelé"""
+        attempts = []
+
+        async def stream_graph_updates(ready=None):
+            attempts.append(1)
+            raise RuntimeError("abonnement refusé")
+            yield
+
+        lnd_client.stream_graph_updates = stream_graph_updates
+        sync = GraphSync(lnd_client=lnd_client, reconnect_delay=0.01)
+        sync.start()
+        try:
+            while len(attempts) < 2:
+                await asyncio.sleep(0.01)
+        finally:
+            await sync.stop()
+
+        lnd_client.describe_graph.assert_not_called()
+        assert not sync.is_synced
+
+
+class TestLNRouterClientGraphSync:
+    """Tests de l'intégration du GraphSync dans LNRouterClient"""
+
+    @pytest.mark.asyncio
+    async def test_get_graph_uses_sync(self, graph_sync):
+        """get_graph ne télécharge plus le graphe quand un GraphSync est attaché"""
+        client = LNRouterClient()
+        client._make_request = MagicMock(side_effect=AssertionError("pas d'appel HTTP"))
+        client.attach_graph_sync(graph_sync)
+
+        graph = await client.get_graph()
+
+        assert graph["source"] == "lnd"
+        assert len(graph["channels"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_incremental_networkx_matches_full_rebuild(self, graph_sync):
+        """Le graphe NetworkX mis à jour incrémentalement égale une reconstruction"""
+        client = LNRouterClient()
+        client.attach_graph_sync(graph_sync)
+        await client.convert_to_networkx()
+
+        graph_sync.apply_update({
+            "node_updates": [{"pub_key": NODE_C, "alias": "C2", "color": "#000000"}],
+            "channel_updates": [{
+                "channel_id": "4", "capacity": 300000,
+                "advertising_node": NODE_A, "connecting_node": NODE_B,
+                "routing_policy": policy(7)
+            }],
+            "closed_chans": [{"channel_id": "2"}]
+        })
+        G = await client.convert_to_networkx()
+        rebuilt = GraphStore.from_graph_data(graph_sync.get_graph()).to_networkx()
+
+        assert set(G.edges()) == set(rebuilt.edges())
+        assert G.nodes[NODE_C]["alias"] == "C2"
+        assert not G.has_edge(NODE_B, NODE_C)
+
+        # Politiques et fermetures sont répercutées sur une copie de la vue NetworkX
+        graph_sync.apply_update({
+            "channel_updates": [{
+                "channel_id": "1", "capacity": 1000000,
+                "advertising_node": NODE_A, "connecting_node": NODE_B,
+                "routing_policy": policy(9)
+            }]
+        })
+        assert set((await client.convert_to_networkx()).edges()) == set(G.edges())
+
+        # La fermeture d'un canal parallèle garde l'arête portée par l'autre canal
+        edge_channel = G[NODE_A][NODE_B]["channel_id"]
+        graph_sync.apply_update({"closed_chans": [{"channel_id": edge_channel}]})
+        incremental = await client.convert_to_networkx()
+        assert incremental is not G
+        assert incremental.has_edge(NODE_A, NODE_B)
+        assert incremental[NODE_A][NODE_B]["channel_id"] != edge_channel
+        # La vue de l'ancien store n'a pas changé
+        assert G[NODE_A][NODE_B]["channel_id"] == edge_channel
+
+    @pytest.mark.asyncio
+    async def test_new_channel_appended_without_rebuild(self, graph_sync, monkeypatch):
+        """Un canal inconnu est ajouté à un nouveau store ; l'ancien reste intact"""
+        client = LNRouterClient()
+        client.attach_graph_sync(graph_sync)
+        store = await client.get_graph_store()
+        fee_rates = store.fee_rate_ppm.copy()
+        node_d = "03" + "dd" * 32
+
+        monkeypatch.setattr(
+            GraphStore, "from_graph_data", MagicMock(side_effect=AssertionError("reconstruction complète"))
+        )
+        graph_sync.apply_update({"channel_updates": [
+            {"channel_id": "3", "capacity": 500000, "advertising_node": NODE_C,
+             "connecting_node": node_d, "routing_policy": policy(5)},
+            {"channel_id": "1", "advertising_node": NODE_A, "connecting_node": NODE_B,
+             "routing_policy": policy(9)},
+        ]})
+        updated = await client.get_graph_store()
+        engine = await client.get_routing_engine()
+        monkeypatch.undo()
+
+        assert updated is not store
+        assert store.num_nodes == 3 and store.num_channels == 2
+        assert (store.fee_rate_ppm == fee_rates).all()
+
+        rebuilt = GraphStore.from_graph_data(graph_sync.get_graph())
+        assert updated.pubkeys == rebuilt.pubkeys
+        for name in ("edge_src", "edge_dst", "edge_channel", "fee_rate_ppm", "has_policy",
+                     "channel_capacity", "indptr", "csr_edges", "degree"):
+            assert (getattr(updated, name) == getattr(rebuilt, name)).all(), name
+
+        route = engine.find_route(NODE_B, node_d, 1000)
+        assert [hop["channel_id"] for hop in route["hops"]] == ["2", "3"]
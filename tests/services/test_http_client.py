@@ -0,0 +1,108 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.http_client import HTTPClientManager
+from services.lnrouter_client import LNRouterClient
+from services.mcp import MCPService
+import services.http_client as http_client
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    """Serveur HTTP/1.1 keepalive qui compte les connexions ouvertes"""
+    protocol_version = "HTTP/1.1"
+    # En-têtes et corps dans un même segment TCP (pas d'attente d'ACK retardé)
+    wbufsize = 65536
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+    httpd.connections = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def base_url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    manager = HTTPClientManager(http2=False)
+    monkeypatch.setattr(http_client, "_manager", manager)
+    return manager
+
+
+class TestHTTPClientManager:
+    """Tests des clients HTTP partagés"""
+
+    @pytest.mark.asyncio
+    async def test_one_client_per_host(self, manager):
+        client = manager.get_client("https://lnrouter.app/api/v1")
+
+        assert manager.get_client("https://lnrouter.app/api/v2") is client
+        assert manager.get_client("https://api.mcp.network") is not client
+        assert manager.get_stats()["hosts"] == ["https://lnrouter.app:443", "https://api.mcp.network:443"]
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_closed_client_is_recreated(self, manager):
+        client = manager.get_client("http://localhost:8080")
+        await manager.close()
+
+        assert client.is_closed
+        assert manager.get_client("http://localhost:8080") is not client
+        assert manager.clients_created == 2
+        await manager.close()
+
+    def test_client_per_event_loop(self, manager):
+        """Chaque asyncio.run (commandes CLI) obtient un client lié à sa boucle"""
+        async def get_client():
+            return manager.get_client("http://localhost:8080")
+
+        first = asyncio.run(get_client())
+        second = asyncio.run(get_client())
+
+        assert first is not second
+
+    def test_http2_requires_h2(self, monkeypatch):
+        monkeypatch.setattr(http_client, "HTTP2_AVAILABLE", False)
+        assert HTTPClientManager(http2=True).http2 is False
+
+    @pytest.mark.asyncio
+    async def test_services_reuse_connections(self, manager, server, base_url):
+        """Les requêtes successives d'un service passent par une seule connexion"""
+        lnrouter = LNRouterClient()
+        lnrouter.base_url = base_url
+        mcp = MCPService()
+        mcp.base_url = base_url
+
+        for i in range(5):
+            assert await lnrouter._make_request("GET", f"/nodes/{i}") == {"path": f"/nodes/{i}"}
+        assert await mcp._make_request("GET", "/network/stats") == {"path": "/network/stats"}
+
+        assert server.connections == 1
+        await manager.close()
@@ -0,0 +1,117 @@
+import os
+import pytest
+from unittest.mock import MagicMock, patch
+
+from services.async_lnd_client import AsyncLNDClient
+from services.lnd_connection import LNDConnectionManager, get_connection_manager
+
+
+@pytest.fixture
+def credentials_files(tmp_path):
+    cert = tmp_path / "tls.cert"
+    macaroon = tmp_path / "admin.macaroon"
+    cert.write_bytes(b"-----BEGIN CERTIFICATE-----\n-----END CERTIFICATE-----\n")
+    macaroon.write_bytes(b"\x02\x01macaroon")
+    return str(cert), str(macaroon)
+
+
+@pytest.fixture
+def manager(credentials_files):
+    cert, macaroon = credentials_files
+    return LNDConnectionManager("localhost:10009", cert, macaroon, max_message_length=1024)
+
+
+class TestLNDConnectionManager:
+    """Tests du gestionnaire de connexions LND partagé"""
+
+    def test_channel_options(self, manager):
+        options = dict(manager.channel_options())
+
+        assert options["grpc.keepalive_time_ms"] > 0
+        assert options["grpc.keepalive_permit_without_calls"] == 1
+        assert options["grpc.max_receive_message_length"] == 1024
+        assert options["grpc.max_reconnect_backoff_ms"] >= options["grpc.initial_reconnect_backoff_ms"]
+
+    def test_credentials_are_cached_until_files_change(self, manager, credentials_files):
+        first = manager.get_credentials()
+        assert manager.get_credentials() is first
+        assert manager.credentials_loaded == 1
+
+        cert, _ = credentials_files
+        stat = os.stat(cert)
+        os.utime(cert, (stat.st_atime, stat.st_mtime + 10))
+
+        assert manager.get_credentials() is not first
+        assert manager.credentials_loaded == 2
+
+    def test_missing_credentials(self, tmp_path):
+        manager = LNDConnectionManager("localhost:10009", str(tmp_path / "absent"), str(tmp_path / "absent"))
+        with pytest.raises(ValueError):
+            manager.get_credentials()
+
+    def test_sync_channel_is_shared_and_recreated_after_reset(self, manager):
+        channel = manager.get_channel()
+        generation = manager.generation
+
+        assert manager.get_channel() is channel
+
+        manager.reset()
+        new_channel = manager.get_channel()
+        assert new_channel is not channel
+        assert manager.generation > generation
+        assert manager.channels_created == 2
+        manager.reset()
+
+    def test_registry_shares_managers(self, credentials_files):
+        cert, macaroon = credentials_files
+
+        assert get_connection_manager("h:1", cert, macaroon) is get_connection_manager("h:1", cert, macaroon)
+        assert get_connection_manager("h:2", cert, macaroon) is not get_connection_manager("h:1", cert, macaroon)
+
+    @pytest.mark.asyncio
+    async def test_async_clients_share_channel(self, manager):
+        """Les clients partagent le canal grpc.aio et reconstruisent leurs stubs s'il est recréé"""
+        first = AsyncLNDClient(connection=manager)
+        second = AsyncLNDClient(connection=manager)
+
+        with patch("services.async_lnd_client.lnrpc", create=True) as lnrpc:
+            lnrpc.LightningStub.side_effect = lambda channel: MagicMock()
+
+            stub = second.stub
+            first.stub
+            assert first._channel is second._channel
+            assert manager.channels_created == 1
+
+            # Fermer un client ne ferme pas le canal utilisé par les autres
+            await first.close()
+            assert second.stub is stub
+            assert manager.channels_created == 1
+
+            await manager.close_aio()
+            assert second.stub is not stub
+            assert second._channel is manager.get_aio_channel()
+            assert manager.channels_created == 2
+
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_generations_are_tracked_per_channel_kind(self, manager):
+        """Recréer le canal synchrone ne périme pas les stubs asynchrones, et inversement"""
+        client = AsyncLNDClient(connection=manager)
+
+        with patch("services.async_lnd_client.lnrpc", create=True) as lnrpc:
+            lnrpc.LightningStub.side_effect = lambda channel: MagicMock()
+
+            stub = client.stub
+            manager.get_channel()
+            manager.reset()
+            assert client.stub is stub
+
+            aio_generation = manager.aio_generation
+            generation = manager.generation
+            await manager.close_aio()
+            assert manager.generation == generation
+            assert manager.aio_generation > aio_generation
+            assert client.stub is not stub
+
+        await manager.close()
@@ -0,0 +1,155 @@
+import asyncio
+import threading
+import pytest
+
+import grpc
+
+from services.lnd_client import iterate_in_thread
+from services.lnd_subscriptions import (
+    SubscriptionManager, BLOCK, DROP_NEWEST, DROP_OLDEST
+)
+
+
+class FakeStreamingClient:
+    """Client LND simulé dont les flux sont alimentés par le test"""
+
+    def __init__(self):
+        self.opened = 0
+        self.channel_events: asyncio.Queue = asyncio.Queue()
+
+    async def stream_channel_events(self):
+        self.opened += 1
+        while True:
+            item = await self.channel_events.get()
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    async def stream_invoice_events(self):
+        self.opened += 1
+        yield {"memo": "test", "settled": True}
+        await asyncio.Event().wait()
+
+
+class TestSubscriptionManager:
+    """Tests du bus de diffusion des événements LND"""
+
+    @pytest.fixture
+    def client(self):
+        return FakeStreamingClient()
+
+    @pytest.fixture
+    async def manager(self, client):
+        manager = SubscriptionManager(lnd_client=client, reconnect_delay=0.01)
+        yield manager
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_fan_out_single_stream(self, manager, client):
+        """Plusieurs consommateurs partagent un seul flux LND"""
+        first = manager.subscribe("channel")
+        second = manager.subscribe("channel")
+
+        await client.channel_events.put(("open_channel", {"channel_id": 1}))
+
+        event1 = await asyncio.wait_for(first.get(), 1)
+        event2 = await asyncio.wait_for(second.get(), 1)
+        assert event1["type"] == event2["type"] == "open_channel"
+        assert event1["data"] == {"channel_id": 1}
+        assert client.opened == 1
+
+    @pytest.mark.asyncio
+    async def test_invoice_topic(self, manager):
+        """Les invoices réglées sont typées 'settled_invoice'"""
+        subscription = manager.subscribe("invoice")
+
+        event = await asyncio.wait_for(subscription.get(), 1)
+
+        assert event["type"] == "settled_invoice"
+        assert event["data"]["memo"] == "test"
+
+    @pytest.mark.asyncio
+    async def test_drop_policies(self, manager):
+        """Les files pleines appliquent leur politique de saturation"""
+        oldest = manager.subscribe("channel", maxsize=2, policy=DROP_OLDEST)
+        newest = manager.subscribe("channel", maxsize=2, policy=DROP_NEWEST)
+
+        for i in range(4):
+            await manager.publish("channel", {"type": "test", "data": {"i": i}})
+
+        assert [(await oldest.get())["data"]["i"] for _ in range(2)] == [2, 3]
+        assert [(await newest.get())["data"]["i"] for _ in range(2)] == [0, 1]
+        assert oldest.dropped == newest.dropped == 2
+
+    @pytest.mark.asyncio
+    async def test_block_policy_backpressure(self, manager):
+        """La politique 'block' fait attendre le producteur"""
+        subscription = manager.subscribe("channel", maxsize=1, policy=BLOCK)
+        await manager.publish("channel", {"type": "test", "data": {"i": 0}})
+
+        pending = asyncio.create_task(
+            manager.publish("channel", {"type": "test", "data": {"i": 1}})
+        )
+        await asyncio.sleep(0.01)
+        assert not pending.done()
+
+        assert (await subscription.get())["data"]["i"] == 0
+        await asyncio.wait_for(pending, 1)
+        assert (await subscription.get())["data"]["i"] == 1
+
+    @pytest.mark.asyncio
+    async def test_reconnect_after_error(self, manager, client):
+        """Le flux est rouvert après une erreur gRPC"""
+        subscription = manager.subscribe("channel")
+
+        await client.channel_events.put(grpc.RpcError())
+        await client.channel_events.put(("active_channel", {"channel_id": 2}))
+
+        event = await asyncio.wait_for(subscription.get(), 1)
+        assert event["type"] == "active_channel"
+        assert client.opened == 2
+        assert manager.get_stats()["channel"]["reconnects"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_ends_iteration(self, manager):
+        """La fermeture d'un abonnement termine son itération"""
+        subscription = manager.subscribe("channel")
+        subscription.close()
+
+        events = [event async for event in subscription]
+
+        assert events == []
+        assert not manager.get_stats()["channel"]["stream_active"]
+
+
+class TestIterateInThread:
+    """Tests du pont entre flux gRPC bloquants et boucle asyncio"""
+
+    @pytest.mark.asyncio
+    async def test_items_are_consumed_off_loop(self):
+        """Les éléments sont lus dans un autre thread que celui de la boucle"""
+        loop_thread = threading.get_ident()
+        reader_threads = set()
+
+        def blocking_stream():
+            for i in range(3):
+                reader_threads.add(threading.get_ident())
+                yield i
+
+        items = [item async for item in iterate_in_thread(blocking_stream)]
+
+        assert items == [0, 1, 2]
+        assert loop_thread not in reader_threads
+
+    @pytest.mark.asyncio
+    async def test_errors_are_propagated(self):
+        """Les erreurs du flux sont relevées côté asyncio"""
+        def failing_stream():
+            yield 1
+            raise grpc.RpcError()
+
+        received = []
+        with pytest.raises(grpc.RpcError):
+            async for item in iterate_in_thread(failing_stream):
+                received.append(item)
+        assert received == [1]
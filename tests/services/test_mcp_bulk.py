@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+import services.http_client as http_client
+from services.http_client import HTTPClientManager
+from services.mcp import MCPService
+from services.mcp_data_source import MCPDataSource
+from tests.mocks.mcp_server import MockMCPServer
+
+
+@pytest.fixture
+def server():
+    server = MockMCPServer(num_nodes=30, latency=0.02).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+async def mcp(monkeypatch, server):
+    manager = HTTPClientManager(http2=False)
+    monkeypatch.setattr(http_client, "_manager", manager)
+    service = MCPService()
+    service.base_url = server.url
+    yield service
+    await manager.close()
+
+
+class TestMCPBulk:
+    """Tests des méthodes groupées de MCPService contre un serveur MCP local"""
+
+    @pytest.mark.asyncio
+    async def test_nodes_details_bounded_and_merged(self, mcp, server, monkeypatch):
+        monkeypatch.setattr("core.config.settings.API_BULK_CONCURRENCY", 5)
+        monkeypatch.setattr("core.config.settings.API_BULK_CHUNK_SIZE", 8)
+        node_ids = [f"node{i}" for i in range(20)] + ["node3", "missing"]
+
+        nodes = await mcp.get_nodes_details(node_ids)
+
+        assert list(nodes) == [f"node{i}" for i in range(20)] + ["missing"]
+        assert nodes["node7"] == {"pub_key": "node7", "alias": "alias7"}
+        assert nodes["missing"] is None
+        assert len(server.requests) == 21
+        assert 1 < server.max_in_flight <= 5
+
+    @pytest.mark.asyncio
+    async def test_bulk_reuses_single_entity_cache(self, mcp, server):
+        await mcp.get_node_details("node1")
+        channels = await mcp.get_channels_details(["1", "2"])
+        nodes = await mcp.get_nodes_details(["node1", "node2"])
+
+        assert channels["2"]["node2_pub"] == "node3"
+        assert nodes["node1"]["alias"] == "alias1"
+        assert server.requests.count("/network/nodes/node1") == 1
+
+    @pytest.mark.asyncio
+    async def test_iter_network_nodes_prefetches(self, mcp, server):
+        consumed = []
+        async for node in mcp.iter_network_nodes(page_size=7):
+            if len(consumed) == 0:
+                # La page suivante est demandée pendant la consommation de la première
+                await asyncio.sleep(0.05)
+                assert "/network/nodes?limit=7&offset=7" in server.requests
+            consumed.append(node["pub_key"])
+
+        assert consumed == [f"node{i}" for i in range(30)]
+        # 30 nœuds en pages de 7 : la cinquième page (2 nœuds) termine le parcours
+        assert [r for r in server.requests if r.startswith("/network/nodes?")][-1].endswith("offset=28")
+
+    @pytest.mark.asyncio
+    async def test_iter_stops_early_without_error(self, mcp, server):
+        async def first_channels(count):
+            channels = []
+            iterator = mcp.iter_channels_list(page_size=10)
+            async for channel in iterator:
+                channels.append(channel["channel_id"])
+                if len(channels) == count:
+                    break
+            await iterator.aclose()
+            return channels
+
+        assert await first_channels(3) == ["0", "1", "2"]
+
+    @pytest.mark.asyncio
+    async def test_data_source_tags_bulk_results(self, mcp):
+        source = MCPDataSource(mcp_service=mcp)
+
+        channels = await source.get_nodes_channels(["node0", "missing"])
+        nodes = [node async for node in source.iter_network_nodes(page_size=50)]
+
+        assert {c["channel_id"] for c in channels["node0"]} == {"0", "29"}
+        assert channels["missing"] == []
+        assert len(nodes) == 30 and all(node["source"] == "mcp" for node in nodes)
@@ -1,7 +1,9 @@
+import asyncio
+import time
 import unittest
 import pytest
 from unittest.mock import Mock, patch, AsyncMock, MagicMock
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Utiliser patch pour mocker les imports
 @patch('services.metrics_collector.MCPService')
@@ -205,5 +207,180 @@ class TestMetricsCollector(unittest.TestCase):
         # Vérifier les statistiques par montant
         self.assertIn("amount_distribution", result)
 
+
+@pytest.fixture
+def trends_collector():
+    from services.metrics_collector import MetricsCollector
+
+    storage = MagicMock()
+    storage.query_snapshot_trends = AsyncMock(return_value=[
+        {"timestamp": "2024-03-01T00:00:00+00:00", "node_metrics.total_capacity": 5000000}
+    ])
+    with patch('services.metrics_collector.MCPService'), \
+            patch('services.metrics_collector.LNRouterClient'):
+        return MetricsCollector(lnd_client=Mock(), storage=storage)
+
+
+class TestMetricsTrends:
+    """Tests de l'API générique de tendances"""
+
+    @pytest.mark.asyncio
+    async def test_aliases_and_paths(self, trends_collector):
+        points = await trends_collector.query_trends(
+            ["total_capacity", "node_metrics.total_capacity"], days=90
+        )
+
+        paths, start, end, bucket, aggregation = trends_collector.storage.query_snapshot_trends.call_args.args
+        assert paths == ["node_metrics.total_capacity"]
+        assert end - start == timedelta(days=90)
+        assert bucket == 90 * 86400 // 500
+        assert points == [{
+            "timestamp": "2024-03-01T00:00:00+00:00",
+            "total_capacity": 5000000,
+            "node_metrics.total_capacity": 5000000
+        }]
+
+    @pytest.mark.asyncio
+    async def test_unknown_metric(self, trends_collector):
+        with pytest.raises(ValueError):
+            await trends_collector.query_trends(["$where"])
+
+    @pytest.mark.asyncio
+    async def test_historical_trends_are_daily(self, trends_collector):
+        trend = await trends_collector.generate_historical_trends("total_capacity", days=7)
+
+        assert trends_collector.storage.query_snapshot_trends.call_args.args[3] == 86400
+        assert trend == [{"date": "2024-03-01", "value": 5000000}]
+
+
+class TestChannelBalanceHistory:
+    """Tests de l'enregistrement et de la lecture des balances par canal"""
+
+    @pytest.mark.asyncio
+    async def test_samples_are_throttled(self, trends_collector):
+        trends_collector.storage.write_channel_balances = AsyncMock(return_value=1)
+        channels = [{"channel_id": "1", "local_balance": 600, "remote_balance": 400, "active": True}]
+
+        assert await trends_collector._record_channel_balances(channels) is True
+        assert await trends_collector._record_channel_balances(channels) is False
+
+        samples = trends_collector.storage.write_channel_balances.call_args.args[0]
+        assert samples == [{"channel_id": "1", "local": 600, "remote": 400, "active": True}]
+
+    @pytest.mark.asyncio
+    async def test_history_per_channel(self, trends_collector):
+        trends_collector.storage.get_channel_balances = AsyncMock(return_value={
+            "1": [{"ts": "2024-03-01T00:00:00+00:00", "local": 600, "remote": 400, "active": True}]
+        })
+
+        history = await trends_collector.get_channel_balance_history(["1", "2"], days=30)
+
+        channel_ids, start, end, bucket = trends_collector.storage.get_channel_balances.call_args.args
+        assert channel_ids == ["1", "2"]
+        assert bucket == 30 * 86400 // 240
+        assert history == {"1": [{
+            "timestamp": "2024-03-01T00:00:00+00:00", "local_balance": 600,
+            "remote_balance": 400, "local_ratio": 0.6, "active": True
+        }]}
+
+
+@pytest.fixture
+def snapshot_collector(trends_collector):
+    lnd_client = trends_collector.lnd_client
+    lnd_client.get_node_info.return_value = {
+        "pubkey": "pubkey", "num_active_channels": 1, "num_inactive_channels": 0,
+        "num_pending_channels": 0, "block_height": 800000, "synced_to_chain": True,
+        "synced_to_graph": True, "version": "0.17.0"
+    }
+    lnd_client.list_channels.return_value = []
+    trends_collector.storage = None
+    trends_collector._write_snapshot_file = Mock(return_value="snapshot.json")
+    return trends_collector
+
+
+class TestSnapshotAssembly:
+    """Tests de la collecte parallèle des sources d'un snapshot"""
+
+    @pytest.mark.asyncio
+    async def test_sources_run_concurrently_with_one_list_channels(self, snapshot_collector):
+        async def slow(*args, **kwargs):
+            await asyncio.sleep(0.2)
+            return {"total_forwards": 0}
+
+        snapshot_collector.collect_forwarding_metrics = slow
+        snapshot_collector.collect_network_context = slow
+
+        started = time.perf_counter()
+        await snapshot_collector.create_daily_snapshot()
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.35
+        snapshot_collector.lnd_client.list_channels.assert_called_once()
+        snapshot = snapshot_collector._write_snapshot_file.call_args.args[0]
+        assert snapshot["partial"] is False
+        assert snapshot["node_metrics"]["node_pubkey"] == "pubkey"
+
+    @pytest.mark.asyncio
+    async def test_slow_source_gives_partial_snapshot(self, snapshot_collector):
+        async def stuck(*args, **kwargs):
+            await asyncio.sleep(10)
+
+        snapshot_collector.collect_network_context = stuck
+        snapshot_collector.collect_forwarding_metrics = AsyncMock(return_value={"total_forwards": 3})
+
+        with patch("services.metrics_collector.settings.SNAPSHOT_SOURCE_TIMEOUT", 0.1):
+            await snapshot_collector.create_daily_snapshot()
+
+        snapshot = snapshot_collector._write_snapshot_file.call_args.args[0]
+        assert snapshot["partial"] is True
+        assert list(snapshot["errors"]) == ["network_context"]
+        assert snapshot["forwarding_metrics"] == {"total_forwards": 3}
+        assert "error" in snapshot["network_context"]
+
+    @pytest.mark.asyncio
+    async def test_recent_network_context_is_reused(self, snapshot_collector):
+        snapshot_collector.collect_network_context = AsyncMock(return_value={"mcp": {"num_nodes": 1}})
+        snapshot_collector.collect_forwarding_metrics = AsyncMock(return_value={"total_forwards": 0})
+
+        await snapshot_collector.refresh_network_context()
+        await snapshot_collector.create_daily_snapshot()
+
+        snapshot_collector.collect_network_context.assert_called_once()
+        snapshot = snapshot_collector._write_snapshot_file.call_args.args[0]
+        assert snapshot["network_context"] == {"mcp": {"num_nodes": 1}}
+
+    @pytest.mark.asyncio
+    async def test_incomplete_network_context_is_not_cached(self, snapshot_collector):
+        snapshot_collector.collect_network_context = AsyncMock(
+            return_value={"mcp": {}, "errors": {"lnrouter": "Délai dépassé"}}
+        )
+
+        await snapshot_collector.refresh_network_context()
+        await snapshot_collector.get_network_context()
+
+        assert snapshot_collector.collect_network_context.call_count == 2
+
+
+class TestChannelBalanceSampling:
+    """Tests de l'échantillonnage planifié des balances"""
+
+    @pytest.mark.asyncio
+    async def test_scheduled_sample_ignores_throttle(self, trends_collector):
+        trends_collector.storage.write_channel_balances = AsyncMock()
+        trends_collector.lnd_client.list_channels.return_value = [
+            {"channel_id": "1", "local_balance": 600, "remote_balance": 400, "active": True}
+        ]
+
+        assert await trends_collector.sample_channel_balances() == 1
+        assert await trends_collector.sample_channel_balances() == 1
+        assert not await trends_collector._record_channel_balances(
+            trends_collector.lnd_client.list_channels.return_value
+        )
+
+        assert trends_collector.storage.write_channel_balances.await_count == 2
+        samples = trends_collector.storage.write_channel_balances.call_args.args[0]
+        assert samples == [{"channel_id": "1", "local": 600, "remote": 400, "active": True}]
+
+
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,78 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from services.metrics_retention import MetricsRetention
+from services.metrics_storage import MongoMetricsStorage
+from tests.mocks.mongo import MongoDatabaseMock
+
+
+@pytest.fixture
+def storage():
+    return MongoMetricsStorage(database=MongoDatabaseMock())
+
+
+class TestMetricsRetention:
+    """Tests de l'enchaînement des étapes de rétention"""
+
+    @pytest.mark.asyncio
+    async def test_stages_follow_horizons(self, storage):
+        now = datetime.now(timezone.utc)
+        for days in (1, 10, 100, 1000):
+            await storage.write_channel_balances(
+                [{"channel_id": "1", "local": days, "remote": 0, "active": True}],
+                ts=now - timedelta(days=days)
+            )
+            await storage.insert_snapshot({
+                "timestamp": (now - timedelta(days=days)).isoformat(),
+                "channel_metrics": [], "ts": now - timedelta(days=days)
+            })
+
+        result = await MetricsRetention(storage).run()
+
+        assert result["channel_balances"] == 1
+        assert result["snapshots"] == 1
+        assert result["compacted_snapshots"] == 1
+        balances = storage.db["channel_balances"].documents.values()
+        assert sorted((point["local"], point.get("resolution")) for point in balances) == [
+            (1, None), (10, 3600), (100, 86400)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_batches_are_bounded_per_run(self, storage):
+        old = datetime.now(timezone.utc) - timedelta(days=1000)
+        await storage.write_channel_balances(
+            [{"channel_id": str(i), "local": 0, "remote": 0, "active": True} for i in range(25)],
+            ts=old
+        )
+        retention = MetricsRetention(storage, batch_size=10, max_batches=2)
+
+        first = await retention.run()
+        second = await retention.run()
+
+        assert first["channel_balances"] == 20
+        assert second["channel_balances"] == 5
+        assert retention.get_stats()["totals"]["channel_balances"] == 25
+
+    @pytest.mark.asyncio
+    async def test_disabled_stage_is_skipped(self, storage):
+        with patch("services.metrics_retention.settings.METRICS_FORWARDING_RETENTION_DAYS", 0):
+            result = await MetricsRetention(storage).run()
+
+        assert "forwarding_events" not in result
+        assert "hourly_rollups" in result
+
+    @pytest.mark.asyncio
+    async def test_failing_stage_does_not_stop_others(self):
+        storage = MagicMock()
+        for method in ("purge_forwarding_events", "purge_forwarding_rollups",
+                       "downsample_channel_balances", "purge_channel_balances",
+                       "compact_snapshots", "purge_snapshots"):
+            setattr(storage, method, AsyncMock(return_value=0))
+        storage.purge_forwarding_events.side_effect = RuntimeError("base indisponible")
+
+        result = await MetricsRetention(storage).run()
+
+        assert "forwarding_events" not in result
+        assert result["snapshots"] == 0
+        storage.purge_snapshots.assert_awaited_once()
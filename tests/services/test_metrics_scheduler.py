@@ -0,0 +1,166 @@
+import asyncio
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+from services.metrics_scheduler import MetricsScheduler, ScheduledJob
+
+
+@pytest.fixture
+def collector():
+    collector = MagicMock()
+    collector.sample_channel_balances = AsyncMock(return_value=3)
+    collector.ingest_forwarding_events = AsyncMock(return_value={"ingested": 0})
+    collector.refresh_network_context = AsyncMock(return_value={})
+    collector.create_daily_snapshot = AsyncMock(return_value="snapshot-1")
+    collector.storage = MagicMock()
+    collector.storage.get_job_last_run = AsyncMock(return_value=None)
+    collector.storage.set_job_last_run = AsyncMock()
+    return collector
+
+
+class TestScheduledJob:
+    """Tests du calendrier d'une tâche planifiée"""
+
+    def test_first_run_is_immediate_without_history(self):
+        job = ScheduledJob("balances", AsyncMock(), interval=60)
+
+        assert job.schedule(now=1000) == 1000
+
+    def test_recent_run_is_not_repeated_after_restart(self):
+        job = ScheduledJob("snapshot", AsyncMock(), interval=86400)
+
+        assert job.schedule(now=10000, last_run=4000) == 90400
+        assert job.missed == 0
+
+    def test_overdue_run_is_caught_up_once(self):
+        job = ScheduledJob("snapshot", AsyncMock(), interval=100)
+
+        assert job.schedule(now=1000, last_run=550) == 1000
+        assert job.missed == 3
+
+    def test_calendar_does_not_drift(self):
+        job = ScheduledJob("forwards", AsyncMock(), interval=300)
+        job.schedule(now=0)
+
+        # Exécution de 40s : l'échéance suivante reste alignée sur le calendrier
+        assert job.advance(now=40) == 300
+        assert job.advance(now=320) == 600
+
+    def test_long_stall_gives_single_catch_up(self):
+        job = ScheduledJob("balances", AsyncMock(), interval=60)
+        job.schedule(now=0)
+
+        assert job.advance(now=605) == 605
+        assert job.missed == 9
+        assert job.advance(now=606) == 665
+
+    def test_jitter_is_bounded(self):
+        job = ScheduledJob("balances", AsyncMock(), interval=60, jitter=0.5)
+
+        delays = {job.schedule(now=0) for _ in range(50)}
+        assert all(0 <= delay <= 30 for delay in delays)
+        assert len(delays) > 1
+
+    def test_invalid_interval(self):
+        with pytest.raises(ValueError):
+            ScheduledJob("balances", AsyncMock(), interval=0)
+
+    @pytest.mark.asyncio
+    async def test_overlapping_run_is_skipped(self):
+        release = asyncio.Event()
+        calls = []
+
+        async def slow():
+            calls.append(1)
+            await release.wait()
+
+        job = ScheduledJob("snapshot", slow, interval=60)
+        first = asyncio.create_task(job.run())
+        await asyncio.sleep(0)
+
+        assert await job.run() is False
+        release.set()
+        assert await first is True
+        assert len(calls) == 1
+        assert job.skipped == 1
+        assert job.runs == 1
+
+    @pytest.mark.asyncio
+    async def test_failure_and_duration_metrics(self):
+        job = ScheduledJob("forwards", AsyncMock(side_effect=RuntimeError("LND indisponible")), interval=60)
+
+        assert await job.run() is False
+        job.func = AsyncMock()
+        assert await job.run() is True
+
+        stats = job.get_stats()
+        assert stats["runs"] == 2
+        assert stats["failures"] == 1
+        assert stats["last_error"] is None
+        assert stats["avg_duration"] is not None
+        assert stats["max_duration"] >= stats["last_duration"]
+
+
+class TestMetricsScheduler:
+    """Tests du planificateur de collecte des métriques"""
+
+    def test_default_jobs(self, collector):
+        scheduler = MetricsScheduler(collector, snapshot_interval_hours=12)
+
+        intervals = {name: job.interval for name, job in scheduler.jobs.items()}
+        assert intervals == {
+            "channel_balances": 60, "forwarding_events": 300,
+            "network_context": 3600, "daily_snapshot": 43200, "retention": 3600
+        }
+
+    def test_no_retention_without_storage(self, collector):
+        collector.storage = None
+
+        assert "retention" not in MetricsScheduler(collector).jobs
+
+    @pytest.mark.asyncio
+    async def test_jobs_run_and_record_last_run(self, collector):
+        last_snapshot = datetime.now(timezone.utc)
+        collector.storage.get_job_last_run = AsyncMock(
+            side_effect=lambda name: last_snapshot if name == "daily_snapshot" else None
+        )
+        scheduler = MetricsScheduler(collector, jitter=0)
+        scheduler.remove_job("retention")
+
+        await scheduler.start()
+        await asyncio.sleep(0.05)
+        stats = scheduler.get_stats()
+        await scheduler.stop()
+
+        collector.sample_channel_balances.assert_awaited_once()
+        collector.ingest_forwarding_events.assert_awaited_once()
+        collector.refresh_network_context.assert_awaited_once()
+        # Snapshot récent (avant redémarrage) : pas de nouvelle collecte
+        collector.create_daily_snapshot.assert_not_awaited()
+        saved = {call.args[0] for call in collector.storage.set_job_last_run.await_args_list}
+        assert saved == {"channel_balances", "forwarding_events", "network_context"}
+        assert stats["running"] is True
+        assert stats["jobs"]["channel_balances"]["runs"] == 1
+        assert not scheduler.is_running
+
+    @pytest.mark.asyncio
+    async def test_failed_snapshot_is_not_recorded(self, collector):
+        collector.create_daily_snapshot = AsyncMock(return_value="Erreur: base indisponible")
+        scheduler = MetricsScheduler(collector)
+
+        assert await scheduler.run_now("daily_snapshot") is False
+
+        collector.storage.set_job_last_run.assert_not_awaited()
+        assert scheduler.jobs["daily_snapshot"].last_error == "Erreur: base indisponible"
+
+    @pytest.mark.asyncio
+    async def test_works_without_storage(self, collector):
+        collector.storage = None
+        scheduler = MetricsScheduler(collector, jitter=0)
+
+        await scheduler.start()
+        await asyncio.sleep(0.05)
+        await scheduler.stop()
+
+        collector.create_daily_snapshot.assert_awaited_once()
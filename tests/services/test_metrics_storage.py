@@ -0,0 +1,410 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from datetime import datetime, timedelta, timezone
+
+from pymongo.errors import BulkWriteError
+
+from services.metrics_storage import (
+    LEGACY_FORWARDING_INDEX, MongoMetricsStorage, close_all_metrics_storages,
+    get_metrics_storage
+)
+from tests.mocks.mongo import MongoDatabaseMock
+
+
+@pytest.fixture
+def storage():
+    return MongoMetricsStorage(database=MongoDatabaseMock())
+
+
+class TestMongoMetricsStorage:
+    """Tests du stockage asynchrone des métriques"""
+
+    def test_client_pool_options(self):
+        storage = MongoMetricsStorage(
+            "mongodb://localhost:27017/daznode", pool_size=7, min_pool_size=1, retry_writes=True
+        )
+
+        stats = storage.get_stats()
+        assert stats["database"] == "daznode"
+        assert stats["max_pool_size"] == 7
+        assert stats["min_pool_size"] == 1
+        assert stats["retry_writes"] is True
+        storage.close()
+
+    def test_shared_storage_per_url(self):
+        url = "mongodb://localhost:27017/shared"
+
+        assert get_metrics_storage(url) is get_metrics_storage(url)
+        with patch("services.metrics_storage.settings.DATABASE_URL", None):
+            assert get_metrics_storage() is None
+        close_all_metrics_storages()
+
+    @pytest.mark.asyncio
+    async def test_indexes_replace_legacy_index(self, storage):
+        events = storage.db["forwarding_events"]
+        await events.create_index([("timestamp", 1)], unique=True, name=LEGACY_FORWARDING_INDEX)
+
+        await storage.ensure_indexes()
+        await storage.ensure_indexes()
+
+        indexes = await events.index_information()
+        assert LEGACY_FORWARDING_INDEX not in indexes
+        assert indexes["forwarding_event_key"]["unique"] is True
+
+    @pytest.mark.asyncio
+    async def test_insert_snapshot_keeps_document_serializable(self, storage):
+        snapshot = {"timestamp": datetime.now().isoformat(), "node_metrics": {}}
+
+        snapshot_id = await storage.insert_snapshot(snapshot)
+
+        assert snapshot_id
+        assert "_id" not in snapshot
+
+    @pytest.mark.asyncio
+    async def test_other_bulk_errors_are_raised(self, storage):
+        error = BulkWriteError({"writeErrors": [{"index": 0, "code": 121}], "nInserted": 0})
+
+        with patch.object(storage.db["forwarding_events"], "bulk_write", side_effect=error):
+            with pytest.raises(BulkWriteError):
+                await storage.write_forwarding_events([
+                    {"timestamp_ns": 1, "chan_id_in": "1", "chan_id_out": "2"}
+                ])
+
+    @pytest.mark.asyncio
+    async def test_summarize_forwards(self, storage):
+        storage.db["forwarding_events"].aggregate_result = [{
+            "totals": [{"_id": None, "count": 3, "amount": 3000, "fees": 30}],
+            "channels_in": [{"_id": "1", "count": 3, "amount": 3030, "fees": 30}],
+            "channels_out": [{"_id": "2", "count": 3, "amount": 3000}]
+        }]
+
+        summary = await storage.summarize_forwards(1700000000, 1700086400)
+
+        match = storage.db["forwarding_events"].last_pipeline[0]["$match"]
+        assert match["timestamp_ns"] == {"$gte": 1700000000 * 10**9, "$lt": 1700086400 * 10**9}
+        assert summary["total_forwards"] == 3
+        assert summary["channels_in"]["1"] == {"count": 3, "amount": 3030, "fees": 30}
+        assert summary["channels_out"]["2"] == {"count": 3, "amount": 3000}
+
+    @pytest.mark.asyncio
+    async def test_summarize_without_events(self, storage):
+        summary = await storage.summarize_forwards(0, 1)
+
+        assert summary["total_forwards"] == 0
+        assert summary["channels_in"] == {}
+
+
+def make_event(seconds, chan_in="1", chan_out="2", amount=1000, fee=10):
+    return {
+        "timestamp_ns": seconds * 1_000_000_000 + 1,
+        "chan_id_in": chan_in, "chan_id_out": chan_out,
+        "amt_in": amount + fee, "amt_out": amount, "fee": fee
+    }
+
+
+class TestForwardingRollups:
+    """Tests des agrégats horaires / journaliers / hebdomadaires de forwarding"""
+
+    @pytest.mark.asyncio
+    async def test_rollups_follow_inserted_events(self, storage):
+        day = 1_700_006_400  # début d'une journée UTC
+        await storage.write_forwarding_events([
+            make_event(day + 10), make_event(day + 20), make_event(day + 3700, chan_in="2", chan_out="3")
+        ])
+
+        rollups = storage.db["forwarding_rollups"].documents
+        assert rollups[("hour", "1", day)]["forwards_in"] == 2
+        assert rollups[("hour", "1", day)]["amount_in"] == 2020
+        assert rollups[("hour", "2", day)]["forwards_out"] == 2
+        assert rollups[("hour", "2", day + 3600)]["forwards_in"] == 1
+        assert rollups[("day", "2", day)] == {
+            "granularity": "day", "channel_id": "2", "bucket_start": day,
+            "forwards_in": 1, "forwards_out": 2, "amount_in": 1010,
+            "amount_out": 2000, "fees_in": 10, "fees_out": 20
+        }
+        week = day - day % 604800
+        assert rollups[("week", "3", week)]["fees_out"] == 10
+
+    @pytest.mark.asyncio
+    async def test_duplicates_are_not_counted_twice(self, storage):
+        events = [make_event(1_700_000_000), make_event(1_700_000_100)]
+        await storage.write_forwarding_events([dict(event) for event in events])
+
+        result = await storage.write_forwarding_events(
+            [dict(event) for event in events] + [make_event(1_700_000_200)]
+        )
+
+        assert result == {"inserted": 1, "duplicates": 2}
+        hour = 1_700_000_000 - 1_700_000_000 % 3600
+        assert storage.db["forwarding_rollups"].documents[("hour", "1", hour)]["forwards_in"] == 3
+
+    @pytest.mark.asyncio
+    async def test_get_rollups_groups_server_side(self, storage):
+        rollups = storage.db["forwarding_rollups"]
+        rollups.aggregate_result = [{"_id": "1", "forwards_in": 3, "forwards_out": 0}]
+
+        rows = await storage.get_forwarding_rollups("day", 1_700_000_000, 1_700_500_000, "channel_id")
+
+        assert rows == [{"channel_id": "1", "forwards_in": 3, "forwards_out": 0}]
+        match, group = rollups.last_pipeline[0]["$match"], rollups.last_pipeline[1]["$group"]
+        assert match["granularity"] == "day"
+        assert match["bucket_start"] == {"$gte": 1_700_000_000 - 1_700_000_000 % 86400, "$lt": 1_700_500_000}
+        assert group["_id"] == "$channel_id"
+
+    @pytest.mark.asyncio
+    async def test_get_rollups_rejects_unknown_granularity(self, storage):
+        with pytest.raises(ValueError):
+            await storage.get_forwarding_rollups("month", 0, 1)
+
+    @pytest.mark.asyncio
+    async def test_existing_events_are_rolled_up_once(self, storage):
+        with patch.object(storage, "rebuild_forwarding_rollups", AsyncMock()) as rebuild:
+            await storage.ensure_forwarding_rollups()
+            await storage.ensure_forwarding_rollups()
+
+        rebuild.assert_awaited_once()
+
+
+DAY = 1_700_006_400  # début d'une journée UTC
+
+
+@pytest.fixture
+async def legacy_storage(storage):
+    """Base contenant des événements écrits avant l'ingestion incrémentale (sans timestamp_ns)"""
+    for seconds, chan_in in ((0, "1"), (1, "1"), (60, "4")):
+        await storage.db["forwarding_events"].insert_one({
+            "timestamp": datetime.fromtimestamp(DAY + seconds).isoformat(),
+            "chan_id_in": chan_in, "chan_id_out": "2", "amt_in": 1010, "amt_out": 1000, "fee": 10
+        })
+    return storage
+
+
+class TestLegacyForwardingEvents:
+    """Tests des événements de forwarding antérieurs à timestamp_ns"""
+
+    @pytest.mark.asyncio
+    async def test_indexes_created_over_legacy_events(self, legacy_storage):
+        await legacy_storage.ensure_indexes()
+
+        events = legacy_storage.db["forwarding_events"]
+        documents = list(events.documents.values())
+        assert sorted(d["timestamp_ns"] for d in documents) == [
+            DAY * 10**9, (DAY + 1) * 10**9, (DAY + 60) * 10**9
+        ]
+        assert all(d["legacy"] for d in documents)
+        assert (await events.index_information())["forwarding_event_key"]["unique"] is True
+
+    @pytest.mark.asyncio
+    async def test_ingested_events_replace_legacy_ones(self, legacy_storage):
+        await legacy_storage.ensure_indexes()
+        events = legacy_storage.db["forwarding_events"]
+        # Agrégats recalculés depuis les événements stockés, anciens compris
+        await legacy_storage.update_forwarding_rollups(list(events.documents.values()))
+
+        await legacy_storage.write_forwarding_events([make_event(DAY), make_event(DAY + 1)])
+
+        legacy = [d for d in events.documents.values() if d.get("legacy")]
+        assert [d["chan_id_in"] for d in legacy] == ["4"]
+        assert len(events.documents) == 3
+        rollups = legacy_storage.db["forwarding_rollups"].documents
+        assert rollups[("hour", "1", DAY)]["forwards_in"] == 2
+        assert rollups[("hour", "2", DAY)]["forwards_out"] == 3
+        assert rollups[("hour", "2", DAY)]["fees_out"] == 30
+
+
+class TestSnapshotTrends:
+    """Tests des séries de tendances des snapshots"""
+
+    @pytest.mark.asyncio
+    async def test_snapshots_get_a_real_date(self, storage):
+        await storage.insert_snapshot({"timestamp": "2024-03-01T10:00:00"})
+
+        document = next(iter(storage.db["daily_snapshots"].documents.values()))
+        assert document["ts"].tzinfo is not None
+        assert "snapshot_ts" in await storage.db["daily_snapshots"].index_information()
+        query, _ = storage.db["daily_snapshots"].last_update_many
+        assert query == {"ts": {"$exists": False}}
+
+    @pytest.mark.asyncio
+    async def test_query_uses_date_range_and_buckets(self, storage):
+        snapshots = storage.db["daily_snapshots"]
+        snapshots.aggregate_result = [
+            {"_id": 1_700_000_000_000, "m0": 10.0, "m1": 3},
+            {"_id": 1_700_003_600_000, "m0": 12.0, "m1": None}
+        ]
+        start, end = datetime(2024, 1, 1, tzinfo=timezone.utc), datetime(2024, 4, 1, tzinfo=timezone.utc)
+
+        rows = await storage.query_snapshot_trends(
+            ["node_metrics.total_capacity", "forwarding_metrics.total_forwards"], start, end, 3600, "max"
+        )
+
+        pipeline = snapshots.last_pipeline
+        assert pipeline[0] == {"$match": {"ts": {"$gte": start, "$lt": end}}}
+        assert pipeline[2]["$project"]["m0"] == "$node_metrics.total_capacity"
+        assert pipeline[3]["$group"]["m1"] == {"$max": "$m1"}
+        assert rows[0] == {
+            "timestamp": "2023-11-14T22:13:20+00:00",
+            "node_metrics.total_capacity": 10.0,
+            "forwarding_metrics.total_forwards": 3
+        }
+        assert rows[1]["forwarding_metrics.total_forwards"] is None
+
+    @pytest.mark.asyncio
+    async def test_query_rejects_unknown_aggregation(self, storage):
+        with pytest.raises(ValueError):
+            await storage.query_snapshot_trends(["node_metrics.x"], datetime.now(), datetime.now(), 60, "median")
+
+
+class TestChannelBalances:
+    """Tests de la série temporelle des balances par canal"""
+
+    @pytest.mark.asyncio
+    async def test_write_samples(self, storage):
+        ts = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+        written = await storage.write_channel_balances([
+            {"channel_id": "1", "local": 600, "remote": 400, "active": True},
+            {"channel_id": "2", "local": 0, "remote": 1000, "active": False}
+        ], ts=ts)
+
+        assert written == 2
+        documents = list(storage.db["channel_balances"].documents.values())
+        assert {document["ts"] for document in documents} == {ts}
+        indexes = await storage.db["channel_balances"].index_information()
+        assert indexes["channel_balance_key"]["key"] == [("channel_id", 1), ("ts", 1)]
+
+    @pytest.mark.asyncio
+    async def test_history_is_one_query_grouped_by_channel(self, storage):
+        balances = storage.db["channel_balances"]
+        balances.aggregate_result = [
+            {"channel_id": "1", "ts": datetime(2024, 3, 1), "local": 600, "remote": 400, "active": True},
+            {"channel_id": "1", "ts": datetime(2024, 3, 2), "local": 500, "remote": 500, "active": True},
+            {"channel_id": "2", "ts": datetime(2024, 3, 1), "local": 0, "remote": 1000, "active": False}
+        ]
+        start, end = datetime(2024, 2, 1, tzinfo=timezone.utc), datetime(2024, 3, 3, tzinfo=timezone.utc)
+
+        series = await storage.get_channel_balances(["1", "2"], start, end, bucket_seconds=3600)
+
+        match = balances.last_pipeline[0]["$match"]
+        assert match == {"channel_id": {"$in": ["1", "2"]}, "ts": {"$gte": start, "$lt": end}}
+        assert balances.last_pipeline[2]["$group"]["local"] == {"$last": "$local"}
+        assert [point["local"] for point in series["1"]] == [600, 500]
+        assert series["2"][0] == {
+            "ts": "2024-03-01T00:00:00+00:00", "local": 0, "remote": 1000, "active": False
+        }
+
+
+class TestSchedulerState:
+    """Tests de l'état des tâches planifiées"""
+
+    @pytest.mark.asyncio
+    async def test_job_last_run_round_trip(self, storage):
+        assert await storage.get_job_last_run("daily_snapshot") is None
+
+        await storage.set_job_last_run("daily_snapshot", datetime(2024, 3, 1, 12, tzinfo=timezone.utc))
+        # motor renvoie une date naïve en UTC
+        storage.db["ingestion_state"].documents["scheduler:daily_snapshot"]["last_run"] = datetime(2024, 3, 1, 12)
+
+        last_run = await storage.get_job_last_run("daily_snapshot")
+        assert last_run == datetime(2024, 3, 1, 12, tzinfo=timezone.utc)
+
+
+class TestRetention:
+    """Tests des opérations de rétention par lots"""
+
+    @pytest.mark.asyncio
+    async def test_purge_forwarding_events_in_batches(self, storage):
+        await storage.write_forwarding_events([make_event(1_700_000_000 + i) for i in range(5)])
+        await storage.write_forwarding_events([make_event(1_800_000_000)])
+
+        assert await storage.purge_forwarding_events(1_750_000_000, batch_size=3) == 3
+        assert await storage.purge_forwarding_events(1_750_000_000, batch_size=3) == 2
+        assert await storage.purge_forwarding_events(1_750_000_000, batch_size=3) == 0
+
+        assert len(storage.db["forwarding_events"].documents) == 1
+        state = storage.db["ingestion_state"].documents["forwarding_retention"]
+        assert state["purged_before"] == 1_750_000_000
+
+    @pytest.mark.asyncio
+    async def test_rebuild_keeps_rollups_of_purged_period(self, storage):
+        await storage.write_forwarding_events([make_event(1_700_000_000), make_event(1_800_000_000)])
+        await storage.purge_forwarding_events(1_750_000_000, batch_size=10)
+
+        await storage.rebuild_forwarding_rollups(since=0)
+
+        rollups = storage.db["forwarding_rollups"].documents
+        hour = 1_700_000_000 - 1_700_000_000 % 3600
+        assert rollups[("hour", "1", hour)]["forwards_in"] == 1
+        # Seuls les agrégats postérieurs à la purge sont supprimés puis recalculés
+        # ($merge n'est pas simulé)
+        assert all(bucket_start < 1_750_000_000 for _, _, bucket_start in rollups)
+
+    @pytest.mark.asyncio
+    async def test_purge_rollups_by_granularity(self, storage):
+        await storage.write_forwarding_events([make_event(1_700_000_000)])
+
+        deleted = await storage.purge_forwarding_rollups("hour", 1_800_000_000, batch_size=100)
+
+        assert deleted == 2
+        assert {key[0] for key in storage.db["forwarding_rollups"].documents} == {"day", "week"}
+
+    @pytest.mark.asyncio
+    async def test_downsample_keeps_last_point_per_hour(self, storage):
+        start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+        for minute in range(0, 120, 10):
+            await storage.write_channel_balances([
+                {"channel_id": "1", "local": minute, "remote": 0, "active": True},
+                {"channel_id": "2", "local": -minute, "remote": 0, "active": True}
+            ], ts=start + timedelta(minutes=minute))
+
+        examined = await storage.downsample_channel_balances(
+            datetime(2024, 3, 2, tzinfo=timezone.utc), 3600, batch_size=1000
+        )
+
+        assert examined == 24
+        points = sorted(
+            (point["channel_id"], point["local"], point["resolution"])
+            for point in storage.db["channel_balances"].documents.values()
+        )
+        assert points == [("1", 50, 3600), ("1", 110, 3600), ("2", -110, 3600), ("2", -50, 3600)]
+        assert await storage.downsample_channel_balances(
+            datetime(2024, 3, 2, tzinfo=timezone.utc), 3600, batch_size=1000
+        ) == 0
+
+    @pytest.mark.asyncio
+    async def test_downsample_defers_incomplete_bucket(self, storage):
+        start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+        for minute in (0, 30, 60, 70, 80):
+            await storage.write_channel_balances(
+                [{"channel_id": "1", "local": minute, "remote": 0, "active": True}],
+                ts=start + timedelta(minutes=minute)
+            )
+        before = datetime(2024, 3, 2, tzinfo=timezone.utc)
+
+        # Le lot s'arrête au milieu de la deuxième heure : elle n'est pas touchée
+        assert await storage.downsample_channel_balances(before, 3600, batch_size=4) == 4
+        balances = storage.db["channel_balances"].documents.values()
+        assert sorted(point["local"] for point in balances) == [30, 60, 70, 80]
+
+        await storage.downsample_channel_balances(before, 3600, batch_size=4)
+        assert sorted(point["local"] for point in balances) == [30, 80]
+
+    @pytest.mark.asyncio
+    async def test_compact_then_purge_snapshots(self, storage):
+        for day in (1, 2, 3):
+            await storage.insert_snapshot({
+                "timestamp": f"2024-03-0{day}T00:00:00", "node_metrics": {"total_capacity": day},
+                "channel_metrics": [{"channel_id": "1"}],
+                "ts": datetime(2024, 3, day, tzinfo=timezone.utc)
+            })
+        snapshots = storage.db["daily_snapshots"].documents
+
+        assert await storage.compact_snapshots(datetime(2024, 3, 3, tzinfo=timezone.utc), 10) == 2
+        assert await storage.compact_snapshots(datetime(2024, 3, 3, tzinfo=timezone.utc), 10) == 0
+        compacted = [document for document in snapshots.values() if document.get("compacted")]
+        assert len(compacted) == 2
+        assert all("channel_metrics" not in document for document in compacted)
+        assert all("node_metrics" in document for document in compacted)
+
+        assert await storage.purge_snapshots(datetime(2024, 3, 2, tzinfo=timezone.utc), 10) == 1
+        assert len(snapshots) == 2
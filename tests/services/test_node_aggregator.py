@@ -0,0 +1,86 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services.node_aggregator import NodeAggregator
+
+
+@pytest.fixture
+def aggregator():
+    with patch("services.node_aggregator.DataSourceFactory.get_data_source", return_value=MagicMock()):
+        return NodeAggregator(lnd_client=MagicMock(), lnrouter_client=MagicMock())
+
+
+def slow_enrichment(aggregator, delay=0.01, missing=()):
+    """Remplace get_enriched_node ; renvoie (appels, concurrence maximale)"""
+    calls = []
+    running = {"current": 0, "max": 0}
+
+    async def get_enriched_node(pubkey):
+        calls.append(pubkey)
+        running["current"] += 1
+        running["max"] = max(running["max"], running["current"])
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            running["current"] -= 1
+        return None if pubkey in missing else {"pubkey": pubkey, "alias": f"alias-{pubkey}"}
+
+    aggregator.get_enriched_node = get_enriched_node
+    return calls, running
+
+
+class TestGetEnrichedNodes:
+    """Tests de l'enrichissement des nœuds par lots"""
+
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency(self, monkeypatch):
+        monkeypatch.setattr("core.config.settings.NODE_ENRICHMENT_CONCURRENCY", 4)
+        with patch("services.node_aggregator.DataSourceFactory.get_data_source", return_value=MagicMock()):
+            aggregator = NodeAggregator(lnd_client=MagicMock(), lnrouter_client=MagicMock())
+        calls, running = slow_enrichment(aggregator)
+        pubkeys = [f"02{i:02x}" for i in range(20)]
+
+        # La limite couvre les appels concurrents, pas chaque appel séparément
+        nodes, others = await asyncio.gather(
+            aggregator.get_enriched_nodes(pubkeys[:10]),
+            aggregator.get_enriched_nodes(pubkeys[10:])
+        )
+
+        assert list(nodes) + list(others) == pubkeys
+        assert nodes["0205"]["alias"] == "alias-0205"
+        assert running["max"] == 4
+        assert len(calls) == 20
+
+    @pytest.mark.asyncio
+    async def test_duplicates_enriched_once(self, aggregator):
+        calls, _ = slow_enrichment(aggregator)
+
+        nodes, again = await asyncio.gather(
+            aggregator.get_enriched_nodes(["02aa", "02bb", "02aa", None]),
+            aggregator.get_enriched_nodes(["02bb"])
+        )
+
+        assert list(nodes) == ["02aa", "02bb"]
+        assert again["02bb"] is nodes["02bb"]
+        assert sorted(calls) == ["02aa", "02bb"]
+
+    @pytest.mark.asyncio
+    async def test_results_cached_except_missing(self, aggregator):
+        calls, _ = slow_enrichment(aggregator, delay=0, missing={"02bb"})
+
+        first = await aggregator.get_enriched_nodes(["02aa", "02bb"])
+        second = await aggregator.get_enriched_nodes(["02aa", "02bb"])
+
+        assert first == second == {"02aa": {"pubkey": "02aa", "alias": "alias-02aa"}, "02bb": None}
+        assert calls == ["02aa", "02bb", "02bb"]
+
+    @pytest.mark.asyncio
+    async def test_timeout_per_node(self, aggregator):
+        slow_enrichment(aggregator, delay=1.0)
+
+        nodes = await aggregator.get_enriched_nodes(["02aa"], timeout=0.01)
+
+        assert nodes == {"02aa": None}
+        assert len(aggregator.enriched_nodes_cache) == 0
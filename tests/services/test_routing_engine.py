@@ -0,0 +1,123 @@
+import pytest
+from datetime import datetime
+
+from services.graph_store import GraphStore
+from services.lnrouter_client import LNRouterClient
+from services.routing_engine import RoutingEngine
+
+SOURCE = "02" + "00" * 32
+A = "02" + "aa" * 32
+B = "02" + "bb" * 32
+TARGET = "02" + "ff" * 32
+
+
+def policy(base=1000, rate=1, cltv=40, disabled=False):
+    return {
+        "fee_base_msat": base, "fee_rate_milli_msat": rate, "time_lock_delta": cltv,
+        "min_htlc": 1000, "max_htlc_msat": 0, "disabled": disabled
+    }
+
+
+def channel(channel_id, node1, node2, capacity, policy1=None, policy2=None):
+    return {
+        "channel_id": channel_id, "node1_pub": node1, "node2_pub": node2,
+        "capacity": capacity,
+        "node1_policy": policy1 or policy(), "node2_policy": policy2 or policy()
+    }
+
+
+@pytest.fixture
+def graph_data():
+    return {
+        "nodes": [{"pub_key": pubkey} for pubkey in (SOURCE, A, B, TARGET)],
+        "channels": [
+            # Via A : frais élevés
+            channel("1", SOURCE, A, 2000000),
+            channel("2", A, TARGET, 2000000, policy1=policy(base=5000, rate=2000)),
+            # Via B : frais faibles
+            channel("3", SOURCE, B, 2000000),
+            channel("4", B, TARGET, 2000000, policy1=policy(base=0, rate=10)),
+            # Canal direct trop petit pour les gros montants
+            channel("5", SOURCE, TARGET, 50000),
+        ]
+    }
+
+
+@pytest.fixture
+def engine(graph_data):
+    return RoutingEngine(GraphStore.from_graph_data(graph_data))
+
+
+class TestRoutingEngine:
+    """Tests du moteur de routage"""
+
+    def test_small_amount_uses_direct_channel(self, engine):
+        """Un canal direct suffisant est toujours le moins coûteux"""
+        route = engine.find_route(SOURCE, TARGET, 10000 * 1000)
+
+        assert [hop["channel_id"] for hop in route["hops"]] == ["5"]
+        assert route["total_fee_msat"] == 0
+
+    def test_amount_prunes_small_channels(self, engine):
+        """Un canal trop petit pour le montant est écarté au profit du moins cher"""
+        route = engine.find_route(SOURCE, TARGET, 100000 * 1000)
+
+        assert [hop["channel_id"] for hop in route["hops"]] == ["3", "4"]
+
+    def test_fees_are_recomputed_along_route(self, engine):
+        """Les frais sont facturés par les nœuds intermédiaires sur le montant transféré"""
+        amount_msat = 100000 * 1000
+        route = engine.find_route(SOURCE, TARGET, amount_msat)
+        first, last = route["hops"]
+
+        assert last["fee_msat"] == amount_msat * 10 // 1_000_000
+        assert last["amount_to_forward_msat"] == amount_msat
+        assert first["fee_msat"] == 0
+        assert first["amount_to_forward_msat"] == amount_msat + last["fee_msat"]
+        assert route["total_fee_msat"] == last["fee_msat"]
+        assert route["total_cltv_delta"] == 40
+        assert 0 < route["probability"] < 1
+
+    def test_disabled_edges_are_ignored(self, graph_data):
+        """Une politique désactivée rend l'arête inutilisable dans ce sens"""
+        graph_data["channels"][3]["node1_policy"]["disabled"] = True
+        engine = RoutingEngine(GraphStore.from_graph_data(graph_data))
+
+        route = engine.find_route(SOURCE, TARGET, 100000 * 1000)
+
+        assert [hop["channel_id"] for hop in route["hops"]] == ["1", "2"]
+
+    def test_no_route_when_amount_too_large(self, engine):
+        assert engine.find_route(SOURCE, TARGET, 5000000 * 1000) is None
+
+    def test_k_shortest_routes(self, engine):
+        """Les routes alternatives sont distinctes et triées par coût"""
+        routes = engine.find_routes(SOURCE, TARGET, 10000 * 1000, k=5)
+        paths = [[hop["channel_id"] for hop in route["hops"]] for route in routes]
+
+        assert paths == [["5"], ["3", "4"], ["1", "2"]]
+        assert [r["cost"] for r in routes] == sorted(r["cost"] for r in routes)
+
+    def test_routes_from_single_search(self, engine):
+        """Une seule recherche fournit les routes vers toutes les destinations"""
+        routes = engine.routes_from(SOURCE, 100000 * 1000)
+
+        assert set(routes) == {A, B, TARGET}
+        assert [hop["channel_id"] for hop in routes[TARGET]["hops"]] == ["3", "4"]
+
+    def test_unknown_node_raises(self, engine):
+        with pytest.raises(ValueError):
+            engine.find_route(SOURCE, "03" + "12" * 32)
+
+    @pytest.mark.asyncio
+    async def test_lnrouter_find_path(self, graph_data):
+        """find_path utilise le moteur de routage sur le GraphStore partagé"""
+        client = LNRouterClient()
+        client.graph = graph_data
+        client.last_graph_update = datetime.now()
+
+        path = await client.find_path(SOURCE, TARGET, amount_sats=100000)
+
+        assert [hop["channel_id"] for hop in path] == ["3", "4"]
+        assert path[0]["from_node"] == SOURCE
+        assert (await client.get_routing_engine()) is (await client.get_routing_engine())
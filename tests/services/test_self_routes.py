@@ -0,0 +1,219 @@
+import asyncio
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+
+from core.config import settings
+from services.graph_store import GraphStore
+from services.lnrouter_client import LNRouterClient
+from services.routing_engine import RoutingEngine
+from services.self_routes import SelfRoutes
+
+OWN = "02" + "00" * 32
+A = "02" + "aa" * 32
+B = "02" + "bb" * 32
+TARGET = "02" + "ff" * 32
+AMOUNT_MSAT = 100000 * 1000
+
+
+def policy(base=1000, rate=1):
+    return {
+        "fee_base_msat": base, "fee_rate_milli_msat": rate, "time_lock_delta": 40,
+        "min_htlc": 1000, "max_htlc_msat": 0, "disabled": False
+    }
+
+
+def channel(channel_id, node1, node2, capacity=2000000, policy1=None, policy2=None):
+    return {
+        "channel_id": channel_id, "node1_pub": node1, "node2_pub": node2,
+        "capacity": capacity,
+        "node1_policy": policy1 or policy(), "node2_policy": policy2 or policy()
+    }
+
+
+@pytest.fixture
+def graph_data():
+    return {
+        "nodes": [{"pub_key": pubkey} for pubkey in (OWN, A, B, TARGET)],
+        "channels": [
+            channel("1", OWN, A),
+            channel("2", A, TARGET, policy1=policy(base=5000, rate=2000)),
+            channel("3", OWN, B),
+            channel("4", B, TARGET, policy1=policy(base=0, rate=10)),
+            # Canal coûteux entre A et B, hors des arbres
+            channel("5", A, B, policy1=policy(base=90000, rate=5000),
+                    policy2=policy(base=90000, rate=5000)),
+        ]
+    }
+
+
+@pytest.fixture
+def store(graph_data):
+    return GraphStore.from_graph_data(graph_data, version=1)
+
+
+@pytest.fixture
+def self_routes(store):
+    return SelfRoutes(RoutingEngine(store), OWN, AMOUNT_MSAT)
+
+
+def channel_ids(route):
+    return [hop["channel_id"] for hop in route["hops"]]
+
+
+class TestSelfRoutes:
+    """Tests des arbres de routes de notre nœud"""
+
+    def test_route_to_matches_engine(self, self_routes):
+        """La route lue dans l'arbre est celle d'une recherche complète"""
+        expected = self_routes.engine.find_route(OWN, TARGET, AMOUNT_MSAT)
+        route = self_routes.route_to(TARGET)
+
+        assert channel_ids(route) == channel_ids(expected) == ["3", "4"]
+        assert route["total_fee_msat"] == expected["total_fee_msat"]
+        assert self_routes.cost_to(TARGET) == pytest.approx(expected["cost"])
+
+    def test_route_from(self, self_routes):
+        route = self_routes.route_from(TARGET)
+
+        assert route["hops"][0]["from_node"] == TARGET
+        assert route["hops"][-1]["to_node"] == OWN
+        assert route["hops"][0]["fee_msat"] == 0
+
+    def test_irrelevant_update_skips_recomputation(self, self_routes, store):
+        """Une politique modifiée hors des arbres ne déclenche pas de Dijkstra"""
+        edge_a_to_b = 4  # canal "5", sens node1 -> node2
+        store.fee_base_msat[edge_a_to_b] += 1000
+        store.version = 2
+
+        assert self_routes.refresh() is False
+        assert self_routes.skipped_updates == 1
+        assert self_routes.full_recomputations == 1
+
+    def test_tree_edge_update_recomputes(self, self_routes, store):
+        """Une arête de l'arbre désactivée impose un nouveau calcul"""
+        edge_b_to_target = 3  # canal "4", sens node1 -> node2
+        store.disabled[edge_b_to_target] = True
+        store.version = 2
+
+        assert self_routes.refresh() is True
+        assert channel_ids(self_routes.route_to(TARGET)) == ["1", "2"]
+
+    def test_updated_for_new_store_leaves_original(self, self_routes, store, graph_data):
+        """Les arbres suivent un nouveau store sur une copie ; un nouveau canal impose un calcul"""
+        C = "03" + "cc" * 32
+        graph_sync = SimpleNamespace(nodes={}, channels={
+            "6": channel("6", OWN, C), "2": graph_data["channels"][1]
+        })
+        new_store = store.with_changes(graph_sync, [], ["6", "2"], version=2)
+
+        updated = self_routes.updated(RoutingEngine(new_store))
+
+        assert updated is not self_routes
+        assert self_routes.engine.store is store and self_routes.version == 1
+        assert updated.full_recomputations == 2
+        assert channel_ids(updated.route_to(C)) == ["6"]
+        assert channel_ids(self_routes.route_to(TARGET)) == ["3", "4"]
+
+
+class TestLNRouterSelfRoutes:
+    """Tests de l'utilisation des arbres par LNRouterClient"""
+
+    @pytest.mark.asyncio
+    async def test_find_path_from_own_node_uses_tree(self, graph_data, monkeypatch):
+        monkeypatch.setattr(settings, "NODE_PUBKEY", OWN)
+        client = LNRouterClient()
+        client.graph = graph_data
+        client.last_graph_update = datetime.now()
+
+        path = await client.find_path(OWN, TARGET, amount_sats=50000)
+        self_routes = await client.get_self_routes()
+
+        assert [hop["channel_id"] for hop in path] == ["3", "4"]
+        assert path[-1]["amount_to_forward_msat"] == 50000 * 1000
+        assert self_routes.full_recomputations == 1
+        assert await client.get_self_routes() is self_routes
+
+    @pytest.mark.asyncio
+    async def test_trees_built_once_for_reference_amount(self, graph_data, monkeypatch):
+        """Les appels concurrents partagent un seul calcul, au montant de référence"""
+        monkeypatch.setattr(settings, "NODE_PUBKEY", OWN)
+        monkeypatch.setattr(settings, "SELF_ROUTES_AMOUNT_SATS", 100000)
+        client = LNRouterClient()
+        client.graph = graph_data
+        client.last_graph_update = datetime.now()
+        built = []
+        monkeypatch.setattr(
+            "services.lnrouter_client.SelfRoutes",
+            lambda *args: built.append(args) or SelfRoutes(*args)
+        )
+
+        await asyncio.gather(*(
+            client.find_path(OWN, TARGET, amount_sats=amount) for amount in (1000, 20000, 100000)
+        ))
+
+        assert [args[2] for args in built] == [AMOUNT_MSAT]
+
+    @pytest.mark.asyncio
+    async def test_smaller_amount_respects_htlc_limits(self, graph_data, monkeypatch):
+        """Sous le montant de référence, une route de l'arbre inutilisable est recherchée"""
+        monkeypatch.setattr(settings, "NODE_PUBKEY", OWN)
+        monkeypatch.setattr(settings, "SELF_ROUTES_AMOUNT_SATS", 100000)
+        C = "03" + "cc" * 32
+        graph_data["channels"][3] = channel(
+            "4", B, TARGET, policy1={**policy(base=0, rate=10), "min_htlc": 50000000}
+        )
+        graph_data["nodes"].append({"pub_key": C})
+        # Pair joignable uniquement par un canal trop petit pour le montant de référence
+        graph_data["channels"].append(channel("6", OWN, C, capacity=20000))
+        client = LNRouterClient()
+        client.graph = graph_data
+        client.last_graph_update = datetime.now()
+
+        def ids(path):
+            return [hop["channel_id"] for hop in path]
+
+        engine = await client.get_routing_engine()
+        assert ids(await client.find_path(OWN, TARGET, amount_sats=100000)) == ["3", "4"]
+        assert ids(await client.find_path(OWN, TARGET, amount_sats=60000)) == ["3", "4"]
+        small = await client.find_path(OWN, TARGET, amount_sats=1000)
+        assert ids(small) == channel_ids(engine.find_route(OWN, TARGET, 1000 * 1000)) == ["1", "2"]
+        assert ids(await client.find_path(OWN, C, amount_sats=1000)) == ["6"]
+        assert await client.find_path(OWN, C, amount_sats=100000) == []
+
+    @pytest.mark.asyncio
+    async def test_larger_amount_searched_on_demand(self, graph_data, monkeypatch):
+        """Au-delà du montant de référence, la route est recherchée par le moteur"""
+        monkeypatch.setattr(settings, "NODE_PUBKEY", OWN)
+        monkeypatch.setattr(settings, "SELF_ROUTES_AMOUNT_SATS", 1000)
+        client = LNRouterClient()
+        client.graph = graph_data
+        client.last_graph_update = datetime.now()
+
+        path = await client.find_path(OWN, TARGET, amount_sats=100000)
+
+        assert [hop["channel_id"] for hop in path] == ["3", "4"]
+        assert client._self_routes is None
+
+    @pytest.mark.asyncio
+    async def test_self_routes_unavailable_without_node(self, graph_data, monkeypatch):
+        monkeypatch.setattr(settings, "NODE_PUBKEY", None)
+        client = LNRouterClient()
+        client.graph = graph_data
+        client.last_graph_update = datetime.now()
+
+        assert await client.get_self_routes() is None
+
+    @pytest.mark.asyncio
+    async def test_find_path_unknown_target_raises(self, graph_data, monkeypatch):
+        """Une destination inconnue lève ValueError, depuis notre nœud ou non"""
+        monkeypatch.setattr(settings, "NODE_PUBKEY", OWN)
+        client = LNRouterClient()
+        client.graph = graph_data
+        client.last_graph_update = datetime.now()
+        unknown = "03" + "12" * 32
+
+        with pytest.raises(ValueError):
+            await client.find_path(OWN, unknown, amount_sats=1000)
+        with pytest.raises(ValueError):
+            await client.find_path(A, unknown, amount_sats=1000)
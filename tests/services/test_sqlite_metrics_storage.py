@@ -0,0 +1,164 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from services.metrics_retention import MetricsRetention
+from services.metrics_storage import close_all_metrics_storages, get_metrics_storage
+from services.sqlite_metrics_storage import SQLiteMetricsStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteMetricsStorage(str(tmp_path / "metrics.db"))
+    yield storage
+    storage.close()
+
+
+def make_event(seconds, chan_in="1", chan_out="2", amount=1000, fee=10):
+    return {
+        "timestamp_ns": seconds * 1_000_000_000 + 1,
+        "chan_id_in": chan_in, "chan_id_out": chan_out,
+        "amt_in": amount + fee, "amt_out": amount, "fee": fee
+    }
+
+
+class TestSQLiteMetricsStorage:
+    """Tests du stockage local des métriques"""
+
+    def test_storage_selected_from_url(self, tmp_path):
+        path = tmp_path / "local.db"
+
+        storage = get_metrics_storage(f"sqlite:///{path}")
+        assert isinstance(storage, SQLiteMetricsStorage)
+        assert storage.path == str(path)
+        with patch("services.metrics_storage.settings.DATABASE_URL", None), \
+                patch("services.metrics_storage.settings.METRICS_LOCAL_DB_PATH", str(path)):
+            assert get_metrics_storage() is storage
+        with pytest.raises(ValueError):
+            get_metrics_storage("postgresql://localhost/daznode")
+        close_all_metrics_storages()
+
+    @pytest.mark.asyncio
+    async def test_file_created_on_first_use(self, tmp_path):
+        path = tmp_path / "nested" / "metrics.db"
+        storage = SQLiteMetricsStorage(str(path))
+        assert not path.exists()
+
+        await storage.ensure_indexes()
+
+        assert path.exists()
+        assert storage.get_stats()["size_bytes"] > 0
+        storage.close()
+
+    @pytest.mark.asyncio
+    async def test_snapshot_trends(self, storage):
+        for hour, capacity in ((0, 100), (6, 300), (30, 500)):
+            await storage.insert_snapshot({
+                "timestamp": f"snapshot-{hour}",
+                "node_metrics": {"total_capacity": capacity},
+                "ts": datetime(2024, 3, 1, tzinfo=timezone.utc) + timedelta(hours=hour)
+            })
+        start, end = datetime(2024, 3, 1, tzinfo=timezone.utc), datetime(2024, 3, 3, tzinfo=timezone.utc)
+
+        average = await storage.query_snapshot_trends(["node_metrics.total_capacity"], start, end, 86400)
+        last = await storage.query_snapshot_trends(
+            ["node_metrics.total_capacity", "node_metrics.missing"], start, end, 86400, "last"
+        )
+
+        assert average == [
+            {"timestamp": "2024-03-01T00:00:00+00:00", "node_metrics.total_capacity": 200.0},
+            {"timestamp": "2024-03-02T00:00:00+00:00", "node_metrics.total_capacity": 500.0}
+        ]
+        assert [point["node_metrics.total_capacity"] for point in last] == [300, 500]
+        assert last[0]["node_metrics.missing"] is None
+        with pytest.raises(ValueError):
+            await storage.query_snapshot_trends(["node_metrics.total_capacity"], start, end, 60, "median")
+
+    @pytest.mark.asyncio
+    async def test_channel_balances_last_point_per_bucket(self, storage):
+        start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+        for minute, local in ((0, 600), (30, 500), (70, 400)):
+            await storage.write_channel_balances(
+                [{"channel_id": "1", "local": local, "remote": 1000 - local, "active": True}],
+                ts=start + timedelta(minutes=minute)
+            )
+
+        series = await storage.get_channel_balances(
+            ["1", "2"], start, start + timedelta(days=1), bucket_seconds=3600
+        )
+
+        assert series == {"1": [
+            {"ts": "2024-03-01T00:30:00+00:00", "local": 500, "remote": 500, "active": True},
+            {"ts": "2024-03-01T01:10:00+00:00", "local": 400, "remote": 600, "active": True}
+        ]}
+
+    @pytest.mark.asyncio
+    async def test_forwarding_events_and_rollups(self, storage):
+        day = 1_700_006_400
+        events = [make_event(day + 10), make_event(day + 20), make_event(day + 3700, "2", "3")]
+
+        assert await storage.write_forwarding_events([dict(event) for event in events]) == {
+            "inserted": 3, "duplicates": 0
+        }
+        assert await storage.write_forwarding_events([dict(events[0])]) == {
+            "inserted": 0, "duplicates": 1
+        }
+
+        summary = await storage.summarize_forwards(day, day + 86400)
+        assert summary["total_forwards"] == 3
+        assert summary["total_fees_earned"] == 30
+        assert summary["channels_in"]["1"] == {"count": 2, "amount": 2020, "fees": 20}
+        assert summary["channels_out"]["2"] == {"count": 2, "amount": 2000}
+
+        hours = await storage.get_forwarding_rollups("hour", day, day + 86400)
+        assert [(row["bucket_start"], row["forwards_in"]) for row in hours] == [(day, 2), (day + 3600, 1)]
+        channels = await storage.get_forwarding_rollups("day", day, day + 86400, "channel_id")
+        assert channels[1] == {
+            "channel_id": "2", "forwards_in": 1, "forwards_out": 2, "amount_in": 1010,
+            "amount_out": 2000, "fees_in": 10, "fees_out": 20
+        }
+
+    @pytest.mark.asyncio
+    async def test_rebuild_matches_incremental_rollups(self, storage):
+        await storage.write_forwarding_events(
+            [make_event(1_700_000_000 + i * 5000, str(i % 3), str((i + 1) % 3)) for i in range(40)]
+        )
+        before = await storage.get_forwarding_rollups("hour", 0, 2_000_000_000, "channel_id")
+
+        await storage.rebuild_forwarding_rollups()
+
+        assert await storage.get_forwarding_rollups("hour", 0, 2_000_000_000, "channel_id") == before
+
+    @pytest.mark.asyncio
+    async def test_retention_and_state(self, storage):
+        now = datetime.now(timezone.utc)
+        old = int((now - timedelta(days=400)).timestamp())
+        await storage.write_forwarding_events([make_event(old + i) for i in range(3)])
+        await storage.write_forwarding_events([make_event(int(now.timestamp()) - 60)])
+        await storage.write_channel_balances(
+            [{"channel_id": "1", "local": 1, "remote": 0, "active": True}],
+            ts=now - timedelta(days=1000)
+        )
+        await storage.insert_snapshot({
+            "timestamp": "old", "channel_metrics": [{"channel_id": "1"}],
+            "ts": now - timedelta(days=100)
+        })
+
+        result = await MetricsRetention(storage, batch_size=2).run()
+
+        assert result["forwarding_events"] == 3
+        assert result["hourly_rollups"] > 0
+        assert result["channel_balances"] == 1
+        assert result["compacted_snapshots"] == 1
+        summary = await storage.summarize_forwards(0, int(now.timestamp()) + 1)
+        assert summary["total_forwards"] == 1
+        # Les agrégats journaliers de la période purgée sont conservés
+        await storage.rebuild_forwarding_rollups()
+        days = await storage.get_forwarding_rollups("day", old - 86400, old + 86400)
+        assert days[0]["forwards_in"] == 3
+
+        await storage.set_forwarding_watermark(42)
+        await storage.set_job_last_run("retention", now)
+        assert await storage.get_forwarding_watermark() == 42
+        assert abs((await storage.get_job_last_run("retention") - now).total_seconds()) < 1e-3
+        assert await storage.get_job_last_run("daily_snapshot") is None
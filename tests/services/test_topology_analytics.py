@@ -0,0 +1,108 @@
+import pytest
+
+import networkx as nx
+import numpy as np
+from scipy import sparse
+
+from services.graph_store import GraphStore
+from services.topology_analytics import (
+    TopologyAnalytics, compute_topology, double_sweep_diameter, sampled_betweenness
+)
+
+
+def graph_data_from_networkx(G):
+    pubkeys = {node: "02" + f"{node:064x}" for node in G.nodes}
+    return {
+        "nodes": [{"pub_key": pubkeys[node], "alias": str(node)} for node in G.nodes],
+        "channels": [
+            {"channel_id": str(i), "node1_pub": pubkeys[u], "node2_pub": pubkeys[v],
+             "capacity": 1000000}
+            for i, (u, v) in enumerate(G.edges)
+        ]
+    }
+
+
+@pytest.fixture
+def small_world():
+    return nx.connected_watts_strogatz_graph(120, 4, 0.1, seed=7)
+
+
+def adjacency_of(G):
+    return sparse.csr_matrix(nx.to_scipy_sparse_array(G, nodelist=sorted(G.nodes)))
+
+
+class TestTopologyKernels:
+    """Tests des calculs de centralité et de diamètre"""
+
+    def test_betweenness_matches_networkx(self, small_world):
+        """Avec toutes les sources, le résultat est la centralité exacte de NetworkX"""
+        n = small_world.number_of_nodes()
+        betweenness = sampled_betweenness(adjacency_of(small_world), sample_size=n)
+        expected = nx.betweenness_centrality(small_world, normalized=True)
+
+        np.testing.assert_allclose(betweenness, [expected[i] for i in range(n)], atol=1e-12)
+
+    def test_sampled_betweenness_is_reproducible(self, small_world):
+        adjacency = adjacency_of(small_world)
+        first = sampled_betweenness(adjacency, sample_size=20, seed=3)
+        second = sampled_betweenness(adjacency, sample_size=20, seed=3)
+
+        np.testing.assert_array_equal(first, second)
+
+    def test_double_sweep_diameter(self):
+        """Le double balayage est exact sur un chemin et borne inférieure ailleurs"""
+        path = nx.path_graph(10)
+        assert double_sweep_diameter(adjacency_of(path), np.arange(10)) == 9
+
+        G = nx.connected_watts_strogatz_graph(120, 4, 0.1, seed=7)
+        estimate = double_sweep_diameter(adjacency_of(G), np.arange(120))
+        assert 0 < estimate <= nx.diameter(G)
+
+    def test_compute_topology(self, small_world):
+        store = GraphStore.from_graph_data(graph_data_from_networkx(small_world))
+
+        result = compute_topology(store, sample_size=30, top=5)
+
+        assert result["num_nodes"] == 120
+        assert result["num_channels"] == small_world.number_of_edges()
+        assert result["largest_component_ratio"] == 1
+        assert len(result["top_betweenness_nodes"]) == 5
+        assert result["betweenness_sample_size"] == 30
+
+
+class TestTopologyAnalytics:
+    """Tests du calcul en arrière-plan"""
+
+    @pytest.fixture
+    def store(self, small_world):
+        return GraphStore.from_graph_data(graph_data_from_networkx(small_world), version=1)
+
+    @pytest.mark.asyncio
+    async def test_result_is_cached_per_version(self, store):
+        analytics = TopologyAnalytics(sample_size=10, workers=1)
+
+        first = await analytics.get(store)
+        assert first["graph_version"] == "1"
+        assert await analytics.get(store) is first
+        assert analytics.schedule(store) is None
+
+    @pytest.mark.asyncio
+    async def test_new_version_served_stale_until_recomputed(self, store):
+        """Une nouvelle version renvoie l'ancien résultat pendant le recalcul"""
+        analytics = TopologyAnalytics(sample_size=10, workers=1, refresh_interval=0)
+        first = await analytics.get(store)
+
+        store.version = 2
+        assert await analytics.get(store) is first
+
+        await analytics._task
+        assert (await analytics.get(store))["graph_version"] == "2"
+
+    @pytest.mark.asyncio
+    async def test_refresh_interval_limits_recomputation(self, store):
+        analytics = TopologyAnalytics(sample_size=10, workers=1, refresh_interval=3600)
+        await analytics.get(store)
+
+        store.version = 2
+        assert analytics.schedule(store) is None
+        await analytics.stop()